@@ -1,5 +1,25 @@
 """Backtesting engine module"""
 
 from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.execution import AbortRules, StopRules
+from app.backtesting.engine.costs import (
+    CostModel, PercentCommission, PerShareFee, SpreadCost, SquareRootImpact, TieredCommission,
+)
+from app.backtesting.engine.sweep import SweepResult, parameter_grid
+from app.backtesting.engine.streaming import StreamingEngine
+from app.backtesting.engine.portfolio import PortfolioEngine, PortfolioResult
+from app.backtesting.engine.montecarlo import MonteCarlo, MonteCarloResult
+from app.backtesting.engine.sizing import (
+    ATRVolatilityTarget, EqualWeight, FixedFraction, FixedRisk, KellyFraction, VolatilityTarget,
+)
+from app.backtesting.engine.walkforward import WalkForwardResult, WalkForwardRunner
+from app.backtesting.engine.halving import HalvingResult, SuccessiveHalving
 
-__all__ = ["BacktestEngine"]
+__all__ = [
+    "BacktestEngine", "SweepResult", "parameter_grid", "StreamingEngine",
+    "PortfolioEngine", "PortfolioResult", "EqualWeight", "FixedFraction", "VolatilityTarget",
+    "ATRVolatilityTarget", "FixedRisk", "KellyFraction",
+    "MonteCarlo", "MonteCarloResult", "WalkForwardRunner", "WalkForwardResult",
+    "AbortRules", "SuccessiveHalving", "HalvingResult", "StopRules",
+    "CostModel", "PercentCommission", "PerShareFee", "SpreadCost", "SquareRootImpact", "TieredCommission",
+]
@@ -2,9 +2,16 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+from app.backtesting.engine.execution import (
+    AbortRules, ExecutionCore, MarketArrays, PositionState, StopRules, normalize_signal,
+)
+from app.backtesting.engine.costs import CostModel, apply_costs
+from app.backtesting.engine.ledger import TradeLedger
+from app.backtesting.engine.sizing import SizingRule
+from app.backtesting.strategies.base_strategy import BarArrays, BaseStrategy
 
 
 @dataclass
@@ -27,7 +34,10 @@ class BacktestMetrics:
 class BacktestEngine:
     """Core backtesting engine"""
     
-    def __init__(self, initial_capital: float = 10000.0, commission: float = 0.001, slippage: float = 0.0):
+    def __init__(self, initial_capital: float = 10000.0, commission: float = 0.001, slippage: float = 0.0,
+                 abort: Optional[AbortRules] = None, stops: Optional[StopRules] = None,
+                 cost_model: Optional[CostModel] = None, sizing: Optional[SizingRule] = None,
+                 direction: str = "long", borrow_rate: float = 0.0):
         """
         Initialize backtesting engine
         
@@ -35,131 +45,222 @@ class BacktestEngine:
             initial_capital: Starting capital
             commission: Commission per trade (0.001 = 0.1%)
             slippage: Price slippage percentage
+            abort: Optional rules that stop a run (or sweep column) early
+            stops: Optional stop-loss, take-profit and trailing-stop levels checked on high/low
+            cost_model: Optional CostModel charged on every fill on top of commission and slippage
+            sizing: Optional SizingRule for the share of cash each entry commits (default: all of it)
+            direction: "long", "short" or "long_short" (stop-and-reverse on every signal flip)
+            borrow_rate: Annual borrow fee on the entry notional of short positions (0.03 = 3%)
         """
         self.initial_capital = initial_capital
         self.commission = commission
         self.slippage = slippage
-        self.trades = []
+        self.abort = abort
+        self.stops = stops
+        self.cost_model = cost_model
+        self.sizing = sizing
+        self.direction = direction
+        self.borrow_rate = borrow_rate
+        self.aborted_at: Optional[int] = None
+        self.trades = TradeLedger()
         self.equity_curve = []
+        self.final_state: Optional[PositionState] = None
+        self.indicators: Dict[str, np.ndarray] = {}
     
-    def run_backtest(self, data: pd.DataFrame, strategy) -> Tuple[BacktestMetrics, Dict[str, Any]]:
+    def run_backtest(self, data: pd.DataFrame, strategy,
+                     symbol: Optional[str] = None) -> Tuple[BacktestMetrics, Dict[str, Any]]:
         """
         Run backtest on data with given strategy
         
         Args:
             data: DataFrame with OHLCV data
-            strategy: Strategy object with generate_signals method
+            strategy: Strategy object with compute_signals or generate_signals method
+            symbol: Optional symbol of data, keying the cached views of the strategy's timeframes
         
         Returns:
             Tuple of (metrics, details)
         """
-        # Generate signals
-        signals_data = strategy.generate_signals(data.copy())
+        compute_signals = getattr(strategy, "compute_signals", None)
+        # Strategies that only implement generate_signals get the whole frame, extra columns included,
+        # and their output (which may have dropped rows) is executed as returned
+        legacy = isinstance(strategy, BaseStrategy) and type(strategy).compute_signals is BaseStrategy.compute_signals
+        if compute_signals is not None and not legacy:
+            # Strategy reads zero-copy views of the data and returns only the signal array
+            bars = BarArrays.from_frame(data)
+            rules = strategy.timeframes() if hasattr(strategy, "timeframes") else ()
+            if rules:
+                bars = bars.with_timeframes(rules, symbol)
+            output = compute_signals(bars)
+            self.indicators = output.indicators
+            equity = self._execute(bars.close, normalize_signal(output.signal), bars.high, bars.low, bars.open)
+            trade_index = data.index
+        else:
+            signals_data = strategy.generate_signals(data.copy())
+            self.indicators = {}
+            equity = self._execute_trades(signals_data)
+            trade_index = signals_data.index
+            bars = BarArrays.from_frame(signals_data) if self.cost_model is not None else None
         
-        # Execute trades and calculate equity
-        equity = self._execute_trades(signals_data)
+        if self.cost_model is not None:
+            equity = self._charge_costs(equity, bars)
         
         # Calculate metrics
-        metrics = self._calculate_metrics(equity, signals_data)
+        metrics = self._calculate_metrics(equity)
         
         # Prepare details
         details = {
-            "trades": [asdict(t) for t in self.trades],
+            "trades": self.trades.to_dicts(trade_index),
             "equity_curve": equity.tolist(),
-            "timestamps": data.index.tolist(),
+            "timestamps": trade_index[:len(equity)].tolist(),
         }
+        if self.abort is not None:
+            details["aborted_at"] = self.aborted_at
         
         return metrics, details
     
+    def run_sweep(self, data: pd.DataFrame, signals, parameters: Optional[List[Dict[str, Any]]] = None):
+        """
+        Run many signal sets over the same data in one pass
+        
+        Args:
+            data: DataFrame with a 'close' column
+            signals: Signal matrix of shape (bars, parameter sets), ndarray or DataFrame
+            parameters: Optional parameter dict per column, kept in the result
+        
+        Returns:
+            SweepResult with one BacktestMetrics row per column
+        """
+        from app.backtesting.engine.sweep import SweepCore, SweepResult
+        
+        close = np.ascontiguousarray(data["close"].to_numpy(dtype=np.float64))
+        matrix = normalize_signal(np.asarray(signals))
+        if matrix.ndim == 1:
+            matrix = matrix[:, np.newaxis]
+        if parameters is not None and len(parameters) != matrix.shape[1]:
+            raise ValueError("parameters must have one entry per signal column")
+        
+        if self.stops is not None:
+            raise ValueError("run_sweep does not simulate stops; use run_backtest per parameter set")
+        core = SweepCore(self.initial_capital, self.commission, self.slippage, abort=self.abort, sizing=self.sizing,
+                         direction=self.direction, borrow_rate=self.borrow_rate)
+        prices = self._sizing_prices(data)
+        if self.cost_model is not None:
+            self.cost_model.prepare(BarArrays.from_frame(data))
+            output = core.run_costs(close, matrix, [self.cost_model], *prices)[0]
+            return SweepResult.from_core(output, parameters=parameters)
+        return SweepResult.from_core(core.run(close, matrix, *prices), parameters=parameters)
+    
+    def run_cost_sweep(self, data: pd.DataFrame, signals, cost_models: Dict[str, CostModel],
+                       parameters: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Run many signal sets under several cost models in one pass
+        
+        The positions of every column are simulated once; each model then
+        prices all fills of the sweep in a single call.
+        
+        Args:
+            data: DataFrame with OHLCV data
+            signals: Signal matrix of shape (bars, parameter sets), ndarray or DataFrame
+            cost_models: Cost models by name, charged on top of commission and slippage
+            parameters: Optional parameter dict per column, kept in the results
+        
+        Returns:
+            Dict of model name -> SweepResult
+        """
+        from app.backtesting.engine.sweep import SweepCore, SweepResult
+        
+        matrix = normalize_signal(np.asarray(signals))
+        if matrix.ndim == 1:
+            matrix = matrix[:, np.newaxis]
+        if parameters is not None and len(parameters) != matrix.shape[1]:
+            raise ValueError("parameters must have one entry per signal column")
+        if self.stops is not None or self.abort is not None:
+            raise ValueError("run_cost_sweep does not simulate stops or abort rules")
+        
+        bars = BarArrays.from_frame(data)
+        for model in cost_models.values():
+            model.prepare(bars)
+        core = SweepCore(self.initial_capital, self.commission, self.slippage, sizing=self.sizing,
+                         direction=self.direction, borrow_rate=self.borrow_rate)
+        outputs = core.run_costs(np.ascontiguousarray(bars.close), matrix, list(cost_models.values()),
+                                 *self._sizing_prices(data))
+        return {name: SweepResult.from_core(output, parameters=parameters)
+                for name, output in zip(cost_models, outputs)}
+    
+    def run_chunked(self, store, strategy, chunk_size: int = 1_000_000, equity_path: Optional[str] = None,
+                    checkpoint_path: Optional[str] = None,
+                    checkpoint_every: int = 1) -> Tuple[BacktestMetrics, Dict[str, Any]]:
+        """
+        Run backtest over a memory-mapped BarStore, chunk_size bars at a time
+        
+        Args:
+            store: BarStore with the OHLCV columns
+            strategy: Strategy object with compute_signals_chunk
+            chunk_size: Bars paged in per step
+            equity_path: Optional .npy file to write the equity curve to
+            checkpoint_path: Optional file snapshotting progress; an existing one is resumed from
+            checkpoint_every: Chunks between checkpoints
+        
+        Returns:
+            Tuple of (metrics, details)
+        """
+        from app.backtesting.engine.chunked import ChunkedEngine
+        
+        unsupported = [name for name in ("abort", "stops", "cost_model", "sizing") if getattr(self, name) is not None]
+        if unsupported:
+            raise ValueError(f"run_chunked does not simulate {', '.join(unsupported)}; use run_backtest")
+        engine = ChunkedEngine(self.initial_capital, self.commission, self.slippage, chunk_size,
+                               direction=self.direction, borrow_rate=self.borrow_rate,
+                               checkpoint_every=checkpoint_every)
+        result = engine.run(store, strategy, equity_path, checkpoint_path)
+        self.indicators = {}
+        self.trades = result.trades
+        self.final_state = result.state
+        self.equity_curve = result.equity if result.equity is not None else []
+        
+        details = {
+            "trades": self.trades.to_dicts(store.labels()),
+            "equity_path": str(equity_path) if equity_path is not None else None,
+            "bars": result.bars,
+        }
+        return result.metrics, details
+    
     def _execute_trades(self, signals_data: pd.DataFrame) -> np.ndarray:
         """Execute trades based on signals and calculate equity curve"""
-        equity = np.zeros(len(signals_data))
-        equity[0] = self.initial_capital
+        arrays = MarketArrays.from_frame(signals_data)
+        prices = [signals_data[c].to_numpy(dtype=np.float64) if c in signals_data.columns else None
+                  for c in ("high", "low", "open")]
+        return self._execute(arrays.close, arrays.signal, *prices)
+    
+    def _execute(self, close: np.ndarray, signal: np.ndarray, high: Optional[np.ndarray] = None,
+                 low: Optional[np.ndarray] = None, open: Optional[np.ndarray] = None) -> np.ndarray:
+        """Run the execution core over close prices and int8 signals; high/low/open feed the stops"""
+        core = ExecutionCore(self.initial_capital, self.commission, self.slippage, abort=self.abort, stops=self.stops,
+                             sizing=self.sizing, direction=self.direction, borrow_rate=self.borrow_rate)
+        result = core.execute(close, signal, high, low, open)
         
-        position = 0
-        position_value = 0  # Value of open position
-        entry_price = 0
-        entry_date = None
-        cash = self.initial_capital
-        
-        for i in range(len(signals_data)):
-            current_price = signals_data["close"].iloc[i]
-            
-            # Check for entry signal (BUY)
-            if signals_data["signal"].iloc[i] == 1 and position == 0:
-                # Enter long position
-                entry_price = current_price * (1 + self.slippage)
-                entry_date = signals_data.index[i]
-                quantity = int(cash / entry_price)
-                
-                if quantity > 0:
-                    position = quantity
-                    position_value = quantity * entry_price
-                    cash -= position_value
-            
-            # Check for exit signal (SELL)
-            elif signals_data["signal"].iloc[i] == -1 and position > 0:
-                # Exit long position
-                exit_price = current_price * (1 - self.slippage)
-                exit_date = signals_data.index[i]
-                
-                # Calculate PnL
-                gross_pnl = (exit_price - entry_price) * position
-                commission_cost = (position_value + position * exit_price) * self.commission
-                net_pnl = gross_pnl - commission_cost
-                
-                # Update cash
-                cash += position * exit_price + net_pnl
-                
-                # Record trade
-                trade = {
-                    "entry_date": entry_date,
-                    "entry_price": entry_price,
-                    "exit_date": exit_date,
-                    "exit_price": exit_price,
-                    "quantity": position,
-                    "side": "BUY",
-                    "pnl": net_pnl,
-                    "pnl_percent": (net_pnl / position_value) * 100 if position_value > 0 else 0
-                }
-                self.trades.append(trade)
-                
-                position = 0
-                position_value = 0
-            
-            # Calculate equity (Mark-to-Market)
-            if position > 0:
-                mtm_value = position * current_price
-                equity[i] = cash + mtm_value
-            else:
-                equity[i] = cash
-        
-        # Close any open positions at the end
-        if position > 0:
-            exit_price = signals_data["close"].iloc[-1] * (1 - self.slippage)
-            pnl = (exit_price - entry_price) * position
-            commission_cost = (position_value + position * exit_price) * self.commission
-            net_pnl = pnl - commission_cost
-            
-            trade = {
-                "entry_date": entry_date,
-                "entry_price": entry_price,
-                "exit_date": signals_data.index[-1],
-                "exit_price": exit_price,
-                "quantity": position,
-                "side": "BUY",
-                "pnl": net_pnl,
-                "pnl_percent": (net_pnl / position_value) * 100 if position_value > 0 else 0
-            }
-            self.trades.append(trade)
-            
-            # Final equity with closed position
-            equity[-1] = cash + position * exit_price
+        self.trades = result.trades
+        self.final_state = result.state
+        self.aborted_at = result.aborted_at
         
+        self.equity_curve = result.equity
+        return result.equity
+    
+    def _sizing_prices(self, data: pd.DataFrame) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """High and low columns for the sizing rule, None when absent or without a rule"""
+        if self.sizing is None:
+            return None, None
+        return tuple(data[c].to_numpy(dtype=np.float64) if c in data.columns else None for c in ("high", "low"))
+    
+    def _charge_costs(self, equity: np.ndarray, bars: BarArrays) -> np.ndarray:
+        """Lower the equity curve and trade P&Ls by the cost model's charge on every fill"""
+        self.cost_model.prepare(bars)
+        equity, records = apply_costs(equity, self.trades.records, self.cost_model)
+        self.trades = TradeLedger.from_records(records)
         self.equity_curve = equity
         return equity
     
-    def _calculate_metrics(self, equity: np.ndarray, signals_data: pd.DataFrame) -> BacktestMetrics:
+    def _calculate_metrics(self, equity: np.ndarray, signals_data: Optional[pd.DataFrame] = None) -> BacktestMetrics:
         """Calculate performance metrics"""
         
         # Returns
@@ -173,41 +274,48 @@ class BacktestEngine:
         # Maximum Drawdown
         max_drawdown = self._calculate_max_drawdown(equity)
         
-        # Trade statistics
-        if len(self.trades) > 0:
-            pnls = [t["pnl"] for t in self.trades]
-            winning_trades = len([t for t in self.trades if t["pnl"] > 0])
-            losing_trades = len([t for t in self.trades if t["pnl"] < 0])
-            win_rate = (winning_trades / len(self.trades)) * 100 if len(self.trades) > 0 else 0
+        metrics = BacktestMetrics(
+            total_return=total_return,
+            roi=roi,
+            sharpe_ratio=sharpe_ratio,
+            max_drawdown=max_drawdown,
+            **self._trade_statistics(self.trades.pnl),
+        )
+        
+        return metrics
+    
+    @staticmethod
+    def _trade_statistics(pnls: np.ndarray) -> Dict[str, Any]:
+        """Trade-count and P&L fields of BacktestMetrics from closed-trade P&Ls"""
+        if len(pnls) > 0:
+            wins = pnls > 0
+            losses = pnls < 0
+            winning_trades = int(np.count_nonzero(wins))
+            losing_trades = int(np.count_nonzero(losses))
+            win_rate = (winning_trades / len(pnls)) * 100
             
-            total_profit = sum([t["pnl"] for t in self.trades if t["pnl"] > 0])
-            total_loss = abs(sum([t["pnl"] for t in self.trades if t["pnl"] < 0]))
+            total_profit = pnls[wins].sum()
+            total_loss = abs(pnls[losses].sum())
             profit_factor = total_profit / total_loss if total_loss > 0 else 0
             
             average_trade = np.mean(pnls)
-            best_trade = max(pnls)
-            worst_trade = min(pnls)
+            best_trade = pnls.max()
+            worst_trade = pnls.min()
         else:
             winning_trades = losing_trades = 0
             win_rate = profit_factor = average_trade = 0
             best_trade = worst_trade = 0
         
-        metrics = BacktestMetrics(
-            total_return=total_return,
-            roi=roi,
-            sharpe_ratio=sharpe_ratio,
-            max_drawdown=max_drawdown,
-            win_rate=win_rate,
-            profit_factor=profit_factor,
-            total_trades=len(self.trades),
-            winning_trades=winning_trades,
-            losing_trades=losing_trades,
-            average_trade=average_trade,
-            best_trade=best_trade,
-            worst_trade=worst_trade,
-        )
-        
-        return metrics
+        return {
+            "win_rate": win_rate,
+            "profit_factor": profit_factor,
+            "total_trades": len(pnls),
+            "winning_trades": winning_trades,
+            "losing_trades": losing_trades,
+            "average_trade": average_trade,
+            "best_trade": best_trade,
+            "worst_trade": worst_trade,
+        }
     
     @staticmethod
     def _calculate_sharpe_ratio(returns: np.ndarray, risk_free_rate: float = 0.02) -> float:
@@ -0,0 +1,118 @@
+"""Compact binary snapshots of a run's state, for resuming long backtests"""
+
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, Union
+from app.backtesting.strategies.base_strategy import OHLCV_COLUMNS, BarArrays
+
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(path: Union[str, Path], state: Dict[str, Any]) -> None:
+    """
+    Write a nested state dict as one uncompressed .npz file
+
+    Leaves may be None, Python or NumPy scalars, strings, arrays (structured
+    ones included), lists and tuples of scalars, and BarArrays; dicts nest.
+    Each leaf is stored as its own array under a path-like name, so nothing
+    is pickled and arrays keep their exact bits. The file is written next
+    to path and renamed over it, so a crash mid-write leaves the previous
+    checkpoint intact.
+
+    Args:
+        path: Checkpoint file
+        state: Dict with string keys
+    """
+    arrays = {"__version__": np.array(CHECKPOINT_VERSION)}
+    _flatten(state, "", arrays)
+    path = Path(path)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as file:
+        np.savez(file, **arrays)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path: Union[str, Path]) -> Dict[str, Any]:
+    """Read a state dict written by save_checkpoint"""
+    with np.load(path, allow_pickle=False) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+    version = int(arrays.pop("__version__", -1))
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {version} in {path}")
+    state: Dict[str, Any] = {}
+    bars: Dict[str, Dict[str, np.ndarray]] = {}
+    for name, values in arrays.items():
+        key, _, kind = name.partition(":")
+        if kind.startswith("bars/"):
+            bars.setdefault(key, {})[kind[len("bars/"):]] = values
+            continue
+        _insert(state, key, _leaf(kind, values))
+    for key, columns in bars.items():
+        _insert(state, key, _bars(columns))
+    return state
+
+
+def _flatten(value: Any, path: str, arrays: Dict[str, np.ndarray]) -> None:
+    if isinstance(value, dict):
+        if not value:
+            arrays[f"{path}:dict"] = np.zeros(0)
+        for key, item in value.items():
+            if not isinstance(key, str) or "/" in key or ":" in key:
+                raise ValueError(f"Checkpoint keys must be strings without '/' or ':', got {key!r}")
+            _flatten(item, f"{path}/{key}" if path else key, arrays)
+    elif value is None:
+        arrays[f"{path}:none"] = np.zeros(0)
+    elif isinstance(value, BarArrays):
+        for name in OHLCV_COLUMNS:
+            column = getattr(value, name)
+            if column is not None:
+                arrays[f"{path}:bars/{name}"] = np.asarray(column)
+        if isinstance(value.index, pd.DatetimeIndex):
+            arrays[f"{path}:bars/datetime"] = value.index.as_unit("ns").asi8
+            arrays[f"{path}:bars/tz"] = np.array(str(value.index.tz) if value.index.tz is not None else "")
+        else:
+            arrays[f"{path}:bars/labels"] = np.asarray(value.index)
+    elif isinstance(value, np.ndarray):
+        arrays[f"{path}:array"] = value
+    elif isinstance(value, (list, tuple)):
+        arrays[f"{path}:list"] = np.asarray(value)
+    elif isinstance(value, (bool, int, float, str, np.generic)):
+        arrays[path] = np.asarray(value)
+    else:
+        raise TypeError(f"Cannot checkpoint {type(value).__name__} at {path!r}")
+
+
+def _leaf(kind: str, values: np.ndarray) -> Any:
+    if kind == "none":
+        return None
+    if kind == "dict":
+        return {}
+    if kind == "array":
+        return values
+    if kind == "list":
+        return values.tolist()
+    return values.item()
+
+
+def _bars(columns: Dict[str, np.ndarray]) -> BarArrays:
+    if "datetime" in columns:
+        index = pd.DatetimeIndex(columns.pop("datetime").view("datetime64[ns]"))
+        tz = str(columns.pop("tz"))
+        if tz:
+            index = index.tz_localize("UTC").tz_convert(tz)
+    else:
+        index = pd.Index(columns.pop("labels"))
+    return BarArrays(index=index, **columns)
+
+
+def _insert(state: Dict[str, Any], key: str, value: Any) -> None:
+    *parents, name = key.split("/")
+    for parent in parents:
+        state = state.setdefault(parent, {})
+    if isinstance(value, dict) and isinstance(state.get(name), dict):
+        return
+    state[name] = value
@@ -0,0 +1,286 @@
+"""Out-of-core backtesting over memory-mapped bar files"""
+
+import json
+import math
+import numpy as np
+import pandas as pd
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from app.backtesting.engine.backtest import BacktestEngine, BacktestMetrics
+from app.backtesting.engine.checkpoint import load_checkpoint, save_checkpoint
+from app.backtesting.engine.execution import ExecutionCore, PositionState, index_to_epoch, normalize_signal
+from app.backtesting.engine.ledger import TradeLedger
+from app.backtesting.strategies.base_strategy import OHLCV_COLUMNS, BarArrays
+
+INDEX_FILE = "index.npy"
+
+
+class BarStore:
+    """
+    OHLCV columns kept as one .npy file each in a directory
+
+    Columns are opened as read-only memory maps, so opening a store reads
+    nothing and a slice only pages in the bars it covers. The optional
+    index.npy holds int64 epoch nanoseconds; without it bars are numbered.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.columns = {
+            name: np.load(self.directory / f"{name}.npy", mmap_mode="r")
+            for name in OHLCV_COLUMNS if (self.directory / f"{name}.npy").exists()
+        }
+        if "close" not in self.columns:
+            raise ValueError(f"No close.npy in {self.directory}")
+        index_path = self.directory / INDEX_FILE
+        self.index = np.load(index_path, mmap_mode="r") if index_path.exists() else None
+        lengths = {len(values) for values in self.columns.values()}
+        if self.index is not None:
+            lengths.add(len(self.index))
+        if len(lengths) != 1:
+            raise ValueError("Columns of a bar store must have the same length")
+
+    @classmethod
+    def write(cls, directory: Union[str, Path], data: pd.DataFrame) -> "BarStore":
+        """Save the OHLCV columns of data (and a DatetimeIndex) as a new store"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in OHLCV_COLUMNS:
+            if name in data.columns:
+                np.save(directory / f"{name}.npy", data[name].to_numpy(dtype=np.float64))
+        if isinstance(data.index, pd.DatetimeIndex):
+            np.save(directory / INDEX_FILE, index_to_epoch(data.index))
+        return cls(directory)
+
+    def __len__(self) -> int:
+        return len(self.columns["close"])
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.columns["close"]
+
+    def bars(self, start: int, stop: int) -> BarArrays:
+        """Zero-copy BarArrays over bars [start, stop)"""
+        return BarArrays(index=self.labels(start, stop),
+                         **{name: np.asarray(values[start:stop]) for name, values in self.columns.items()})
+
+    def labels(self, start: int = 0, stop: Optional[int] = None) -> pd.Index:
+        """Index labels of bars [start, stop)"""
+        stop = len(self) if stop is None else stop
+        if self.index is None:
+            return pd.RangeIndex(start, stop)
+        return pd.DatetimeIndex(np.asarray(self.index[start:stop]).view("datetime64[ns]"))
+
+
+@dataclass
+class ChunkedResult:
+    """Output of a chunked run; the equity curve is only kept when written to a file"""
+    metrics: BacktestMetrics
+    trades: TradeLedger
+    state: PositionState
+    bars: int
+    equity: Optional[np.ndarray] = None  # memory map of equity_path
+
+
+class ChunkedEngine:
+    """
+    Backtest a bar store chunk by chunk with bounded memory
+
+    Each chunk of `chunk_size` bars is paged in from the store, turned into
+    signals with the strategy's compute_signals_chunk (which carries the
+    indicator warm-up from one chunk to the next), and executed with
+    ExecutionCore.execute_chunk, which carries the open position. Equity
+    metrics are accumulated per chunk, so memory depends on chunk_size,
+    not on the length of the history. The equity curve is written to a
+    .npy memory map only when equity_path is given.
+
+    Trades, equity and final state are those of BacktestEngine on the
+    whole frame. Strategies that recompute rolling means over the warm-up
+    overlap can differ in the last bits of an indicator value, and the
+    Sharpe ratio is merged from per-chunk moments, so both agree with the
+    in-memory run to float rounding.
+
+    With a checkpoint_path, every `checkpoint_every` chunks the bar cursor,
+    position state, trades so far, equity statistics and the strategy's
+    chunk state are written to that file (see save_checkpoint). A later run
+    with the same settings, strategy and store picks up after the last
+    checkpointed chunk and ends with the same bits as an uninterrupted run;
+    the checkpoint is removed once the run completes.
+    """
+
+    def __init__(self, initial_capital: float = 10000.0, commission: float = 0.001, slippage: float = 0.0,
+                 chunk_size: int = 1_000_000, direction: str = "long", borrow_rate: float = 0.0,
+                 checkpoint_every: int = 1):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be >= 1")
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.slippage = slippage
+        self.chunk_size = chunk_size
+        self.direction = direction
+        self.borrow_rate = borrow_rate
+        self.checkpoint_every = checkpoint_every
+
+    def run(self, store: BarStore, strategy, equity_path: Optional[Union[str, Path]] = None,
+            checkpoint_path: Optional[Union[str, Path]] = None) -> ChunkedResult:
+        """
+        Run strategy over every bar of store
+
+        Args:
+            store: Bars to backtest
+            strategy: Strategy implementing compute_signals_chunk
+            equity_path: Optional .npy file for the full equity curve
+            checkpoint_path: Optional file to snapshot progress to and, when it exists, resume from
+
+        Returns:
+            ChunkedResult with metrics, trade ledger and final position state
+        """
+        n = len(store)
+        core = ExecutionCore(self.initial_capital, self.commission, self.slippage, direction=self.direction,
+                             borrow_rate=self.borrow_rate)
+        state = PositionState(cash=self.initial_capital)
+        trades = TradeLedger()
+        stats = EquityStatistics(self.initial_capital)
+        strategy_state = None
+        cursor = 0
+        run_key = self._run_key(store, strategy)
+        if checkpoint_path is not None and Path(checkpoint_path).exists():
+            cursor, state, trades, stats, strategy_state = self._restore(checkpoint_path, run_key)
+        equity = None
+        if equity_path is not None:
+            if cursor:
+                if not Path(equity_path).exists():
+                    raise ValueError(f"Cannot resume without the equity file {equity_path} written so far")
+                equity = np.lib.format.open_memmap(equity_path, mode="r+")
+            else:
+                equity = np.lib.format.open_memmap(equity_path, mode="w+", dtype=np.float64, shape=(n,))
+
+        chunks = 0
+        for start in range(cursor, n, self.chunk_size):
+            stop = min(start + self.chunk_size, n)
+            bars = store.bars(start, stop)
+            signal, strategy_state = strategy.compute_signals_chunk(bars, strategy_state)
+            result = core.execute_chunk(bars.close, normalize_signal(signal), state, offset=start)
+            trades.extend(result.trades.records)
+            stats.update(result.equity)
+            if equity is not None:
+                equity[start:stop] = result.equity
+            chunks += 1
+            if checkpoint_path is not None and chunks % self.checkpoint_every == 0 and stop < n:
+                if equity is not None:
+                    equity.flush()
+                save_checkpoint(checkpoint_path, {
+                    "run": run_key, "cursor": stop, "state": asdict(state), "trades": trades.records,
+                    "stats": asdict(stats), "strategy": strategy_state,
+                })
+
+        if n and state.position != 0:
+            record, final_equity = core.close_out(state, n - 1, store.close[n - 1])
+            trades.append(record)
+            stats.revise_last(final_equity)
+            if equity is not None:
+                equity[-1] = final_equity
+        if equity is not None:
+            equity.flush()
+        if checkpoint_path is not None:
+            Path(checkpoint_path).unlink(missing_ok=True)
+
+        metrics = stats.to_metrics(BacktestEngine._trade_statistics(trades.pnl)) if n else None
+        return ChunkedResult(metrics=metrics, trades=trades, state=state, bars=n, equity=equity)
+
+    def _run_key(self, store: BarStore, strategy) -> str:
+        """
+        Settings, strategy and store size a checkpoint must have been written with to be resumed
+
+        Every engine setting except the checkpoint interval is part of the key,
+        so options added to the engine later are covered without listing them.
+        """
+        settings = {name: value for name, value in vars(self).items() if name != "checkpoint_every"}
+        return json.dumps({
+            **settings, "bars": len(store), "strategy": type(strategy).__name__,
+            "parameters": getattr(strategy, "parameters", None),
+        }, sort_keys=True, default=str)
+
+    @staticmethod
+    def _restore(checkpoint_path: Union[str, Path], run_key: str):
+        """(cursor, position state, trades, equity statistics, strategy state) saved in a checkpoint"""
+        checkpoint: Dict[str, Any] = load_checkpoint(checkpoint_path)
+        if checkpoint["run"] != run_key:
+            raise ValueError(f"Checkpoint {checkpoint_path} was written by a different run")
+        return (checkpoint["cursor"], PositionState(**checkpoint["state"]),
+                TradeLedger.from_records(checkpoint["trades"]),
+                EquityStatistics(**checkpoint["stats"]), checkpoint["strategy"])
+
+
+@dataclass
+class EquityStatistics:
+    """
+    Equity fields of BacktestMetrics accumulated over consecutive chunks
+
+    Returns are reduced per chunk to (count, mean, sum of squared
+    deviations) and merged with Chan's formula; the drawdown carries the
+    running peak. The last value is held back until the next chunk
+    arrives so a close-out on the final bar can still revise it.
+    """
+    initial_capital: float
+    risk_free_rate: float = 0.02
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    peak: float = -math.inf
+    min_drawdown: float = math.inf
+    last: Optional[float] = None
+    pending: Optional[float] = None
+
+    def update(self, equity: np.ndarray) -> None:
+        """Add the equity of the next bars"""
+        if len(equity) == 0:
+            return
+        if self.pending is not None:
+            equity = np.concatenate([[self.pending], equity])
+        self._add(equity[:-1])
+        self.pending = float(equity[-1])
+
+    def revise_last(self, equity: float) -> None:
+        """Replace the equity of the latest bar"""
+        self.pending = equity
+
+    def to_metrics(self, trade_statistics: dict) -> BacktestMetrics:
+        """BacktestMetrics from the accumulated equity and the given trade fields"""
+        if self.pending is not None:
+            self._add(np.array([self.pending]))
+            self.pending = None
+        total_return = self.last - self.initial_capital
+        std = math.sqrt(self.m2 / self.count) if self.count else 0.0
+        sharpe = (self.mean - self.risk_free_rate / 252) / std * math.sqrt(252) if std > 0 else 0
+        return BacktestMetrics(
+            total_return=total_return,
+            roi=(total_return / self.initial_capital) * 100,
+            sharpe_ratio=float(sharpe),
+            max_drawdown=float(self.min_drawdown * 100),
+            **trade_statistics,
+        )
+
+    def _add(self, equity: np.ndarray) -> None:
+        if len(equity) == 0:
+            return
+        series = equity if self.last is None else np.concatenate([[self.last], equity])
+        returns = np.diff(series) / series[:-1]
+        if len(returns):
+            count = len(returns)
+            mean = returns.mean()
+            m2 = float(np.square(returns - mean).sum())
+            total = self.count + count
+            delta = mean - self.mean
+            self.m2 += m2 + delta * delta * self.count * count / total
+            self.mean += delta * count / total
+            self.count = total
+
+        running_max = np.maximum.accumulate(equity)
+        np.maximum(running_max, self.peak, out=running_max)
+        self.min_drawdown = min(self.min_drawdown, float(((equity - running_max) / running_max).min()))
+        self.peak = float(running_max[-1])
+        self.last = float(equity[-1])
@@ -0,0 +1,280 @@
+"""Vectorized transaction-cost and market-impact models"""
+
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+from app.backtesting.indicators.indicators import TechnicalIndicators
+from app.backtesting.strategies.base_strategy import BarArrays
+
+
+@dataclass
+class Fills:
+    """Order fills as flat arrays"""
+    bar: np.ndarray  # int64 bar number
+    price: np.ndarray
+    quantity: np.ndarray  # shares, > 0
+    side: np.ndarray  # int8, 1 = buy, -1 = sell
+    run: Optional[np.ndarray] = None  # run (sweep column) of each fill when fills of several runs are mixed
+
+    def __len__(self) -> int:
+        return len(self.bar)
+
+    @property
+    def notional(self) -> np.ndarray:
+        return self.price * self.quantity
+
+    @classmethod
+    def from_trades(cls, trades: np.ndarray, run: Optional[np.ndarray] = None) -> "Fills":
+        """
+        Entry fills of every trade followed by their exit fills; negative quantities are shorts
+
+        Args:
+            trades: Structured array of TRADE_DTYPE records, e.g. TradeLedger.records
+            run: Optional run id per trade
+        """
+        quantity = np.abs(trades["quantity"]).astype(np.float64)
+        side = np.where(trades["quantity"] < 0, -1, 1).astype(np.int8)
+        return cls(
+            bar=np.concatenate([trades["entry_index"], trades["exit_index"]]),
+            price=np.concatenate([trades["entry_price"], trades["exit_price"]]),
+            quantity=np.concatenate([quantity, quantity]),
+            side=np.concatenate([side, -side]),
+            run=None if run is None else np.concatenate([run, run]),
+        )
+
+
+class CostModel:
+    """
+    Cost of a batch of fills, in account currency.
+
+    The engine calls prepare() once with the bars of the run, so a model can
+    precompute per-bar series (spread, ATR, volume) with array ops, then
+    fill_costs() with every fill of a ledger, or of a whole sweep, at once.
+    Models add up with `+`.
+    """
+
+    def prepare(self, bars: BarArrays) -> None:
+        pass
+
+    def fill_costs(self, fills: Fills) -> np.ndarray:
+        """
+        Args:
+            fills: Fills on the bars given to prepare()
+
+        Returns:
+            float64 cost of each fill, >= 0
+        """
+        raise NotImplementedError
+
+    def __add__(self, other: "CostModel") -> "CompositeCost":
+        return CompositeCost([self, other])
+
+
+class CompositeCost(CostModel):
+    """Sum of several cost models"""
+
+    def __init__(self, models: Sequence[CostModel]):
+        self.models: List[CostModel] = []
+        for model in models:
+            self.models.extend(model.models if isinstance(model, CompositeCost) else [model])
+
+    def prepare(self, bars: BarArrays) -> None:
+        for model in self.models:
+            model.prepare(bars)
+
+    def fill_costs(self, fills: Fills) -> np.ndarray:
+        costs = np.zeros(len(fills))
+        for model in self.models:
+            costs += model.fill_costs(fills)
+        return costs
+
+
+class PercentCommission(CostModel):
+    """A fraction of the traded notional"""
+
+    def __init__(self, rate: float = 0.001):
+        if rate < 0:
+            raise ValueError("rate must be >= 0")
+        self.rate = rate
+
+    def fill_costs(self, fills: Fills) -> np.ndarray:
+        return fills.notional * self.rate
+
+
+class PerShareFee(CostModel):
+    """
+    A fee per share with a per-order minimum and an optional cap
+
+    E.g. 0.005 per share, at least 1.00 per order and at most 1% of the
+    order's notional.
+    """
+
+    def __init__(self, per_share: float = 0.005, minimum: float = 0.0, max_fraction: Optional[float] = None):
+        if per_share < 0 or minimum < 0:
+            raise ValueError("per_share and minimum must be >= 0")
+        self.per_share = per_share
+        self.minimum = minimum
+        self.max_fraction = max_fraction
+
+    def fill_costs(self, fills: Fills) -> np.ndarray:
+        costs = np.maximum(fills.quantity * self.per_share, self.minimum)
+        if self.max_fraction is not None:
+            costs = np.minimum(costs, fills.notional * self.max_fraction)
+        return costs
+
+
+class TieredCommission(CostModel):
+    """
+    Per-share rates that fall as the shares traded in a period grow
+
+    `tiers` are (shares traded so far, rate per share) pairs starting at 0.
+    A fill that crosses a tier boundary pays each rate on its part, which
+    is a difference of the piecewise-linear cumulative cost function, so
+    every fill is priced with one np.interp call. Volume accumulates per
+    run and, with `period` (e.g. "M") and a DatetimeIndex, restarts at
+    each calendar period.
+    """
+
+    def __init__(self, tiers: Sequence[Tuple[float, float]] = ((0, 0.0035), (300_000, 0.002), (3_000_000, 0.0015),
+                                                               (20_000_000, 0.001), (100_000_000, 0.0005)),
+                 minimum: float = 0.0, period: Optional[str] = None):
+        thresholds = np.array([t for t, _ in tiers], dtype=np.float64)
+        if len(tiers) == 0 or thresholds[0] != 0 or np.any(np.diff(thresholds) <= 0):
+            raise ValueError("tiers must start at 0 with increasing thresholds")
+        self.thresholds = thresholds
+        self.rates = np.array([r for _, r in tiers], dtype=np.float64)
+        # Cumulative cost at each threshold
+        self.cumulative = np.concatenate([[0.0], np.cumsum(np.diff(thresholds) * self.rates[:-1])])
+        self.minimum = minimum
+        self.period = period
+        self.period_of_bar: Optional[np.ndarray] = None
+
+    def prepare(self, bars: BarArrays) -> None:
+        self.period_of_bar = None
+        if self.period is not None and isinstance(bars.index, pd.DatetimeIndex):
+            self.period_of_bar = bars.index.to_period(self.period).asi8
+
+    def fill_costs(self, fills: Fills) -> np.ndarray:
+        keys = [fills.bar]
+        if self.period_of_bar is not None:
+            keys.append(self.period_of_bar[fills.bar])
+        if fills.run is not None:
+            keys.append(fills.run)
+        order = np.lexsort(keys)
+
+        # Shares traded before each fill within its (run, period) group
+        quantity = fills.quantity[order]
+        group_key = np.stack(keys[1:], axis=1)[order] if len(keys) > 1 else np.zeros((len(order), 1))
+        starts = np.ones(len(order), dtype=bool)
+        starts[1:] = np.any(group_key[1:] != group_key[:-1], axis=1)
+        total = np.cumsum(quantity)
+        before = total - quantity
+        before -= np.maximum.accumulate(np.where(starts, before, 0.0))
+
+        sorted_costs = self._cost_to(before + quantity) - self._cost_to(before)
+        costs = np.empty(len(order))
+        costs[order] = np.maximum(sorted_costs, self.minimum)
+        return costs
+
+    def _cost_to(self, shares: np.ndarray) -> np.ndarray:
+        """Cumulative cost of trading `shares` from the start of a period"""
+        last = self.thresholds[-1]
+        within = np.interp(np.minimum(shares, last), self.thresholds, self.cumulative)
+        return within + np.maximum(shares - last, 0.0) * self.rates[-1]
+
+
+class SpreadCost(CostModel):
+    """
+    Half the bid/ask spread estimated from highs and lows
+
+    The spread of each bar is the Corwin-Schultz estimator over that bar
+    and the one before (negative estimates count as zero), averaged over
+    the last `window` bars; no later bar is used. A fill pays half the
+    spread times its notional.
+    """
+
+    def __init__(self, window: int = 20):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self.spread: Optional[np.ndarray] = None
+
+    def prepare(self, bars: BarArrays) -> None:
+        if bars.high is None or bars.low is None:
+            raise ValueError("SpreadCost needs high and low")
+        self.spread = self.estimate(bars.high, bars.low, self.window)
+
+    @staticmethod
+    def estimate(high: np.ndarray, low: np.ndarray, window: int = 20) -> np.ndarray:
+        """Relative spread per bar from the two-bar Corwin-Schultz estimator"""
+        log_range = np.log(high / low) ** 2
+        beta = log_range[1:] + log_range[:-1]
+        gamma = np.log(np.maximum(high[1:], high[:-1]) / np.minimum(low[1:], low[:-1])) ** 2
+        k = 3 - 2 * np.sqrt(2)
+        alpha = (np.sqrt(2 * beta) - np.sqrt(beta)) / k - np.sqrt(gamma / k)
+        spread = np.maximum(2 * (np.exp(alpha) - 1) / (1 + np.exp(alpha)), 0.0)
+        spread = np.concatenate([[spread[0] if len(spread) else 0.0], spread])
+        return pd.Series(spread).rolling(window, min_periods=1).mean().to_numpy()
+
+    def fill_costs(self, fills: Fills) -> np.ndarray:
+        return 0.5 * self.spread[fills.bar] * fills.notional
+
+
+class SquareRootImpact(CostModel):
+    """
+    Square-root market impact: coefficient * ATR * sqrt(shares / average volume) per share
+
+    ATR (TechnicalIndicators.atr) and the average volume over
+    `volume_window` bars are taken at the fill bar, so larger orders in
+    more volatile or thinner markets pay more. Bars before the first full
+    window use the first available value.
+    """
+
+    def __init__(self, coefficient: float = 1.0, atr_period: int = 14, volume_window: int = 20):
+        if coefficient < 0:
+            raise ValueError("coefficient must be >= 0")
+        self.coefficient = coefficient
+        self.atr_period = atr_period
+        self.volume_window = volume_window
+        self.atr: Optional[np.ndarray] = None
+        self.volume: Optional[np.ndarray] = None
+
+    def prepare(self, bars: BarArrays) -> None:
+        if bars.high is None or bars.low is None or bars.volume is None:
+            raise ValueError("SquareRootImpact needs high, low and volume")
+        high, low, close = (pd.Series(values) for values in (bars.high, bars.low, bars.close))
+        self.atr = TechnicalIndicators.atr(high, low, close, self.atr_period).bfill().to_numpy()
+        self.volume = pd.Series(bars.volume).rolling(self.volume_window).mean().bfill().to_numpy()
+
+    def fill_costs(self, fills: Fills) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            participation = fills.quantity / self.volume[fills.bar]
+        impact = self.coefficient * self.atr[fills.bar] * np.sqrt(participation) * fills.quantity
+        return np.nan_to_num(impact, nan=0.0, posinf=0.0)
+
+
+def apply_costs(equity: np.ndarray, trades: np.ndarray, model: CostModel) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Charge a prepared cost model on a run's fills
+
+    Costs are paid on the fill bar: equity from that bar on is lowered by
+    them and each trade's pnl by its entry and exit costs. Quantities are
+    those of the run, so costs do not feed back into position sizes.
+
+    Args:
+        equity: Equity curve of the run
+        trades: Its TRADE_DTYPE trade records
+
+    Returns:
+        (equity net of costs, trade records with net pnl)
+    """
+    fills = Fills.from_trades(trades)
+    costs = model.fill_costs(fills)
+    paid = np.bincount(fills.bar, weights=costs, minlength=len(equity))[:len(equity)]
+    records = trades.copy()
+    records["pnl"] -= costs[:len(trades)] + costs[len(trades):]
+    position_value = records["entry_price"] * np.abs(records["quantity"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        records["pnl_percent"] = np.where(position_value > 0, records["pnl"] / position_value * 100, 0.0)
+    return equity - np.cumsum(paid), records
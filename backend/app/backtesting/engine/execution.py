@@ -0,0 +1,673 @@
+"""Array-native trade execution core"""
+
+import bisect
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from app.backtesting.engine.ledger import TradeLedger
+from app.backtesting.engine.sizing import SizingRule
+
+
+@dataclass
+class MarketArrays:
+    """Contiguous NumPy columns extracted once from a signals DataFrame"""
+    close: np.ndarray
+    signal: np.ndarray
+    index: np.ndarray  # int64 epoch nanoseconds (bar position for non-datetime indexes)
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame) -> "MarketArrays":
+        """Extract close, signal and index arrays from a signals DataFrame"""
+        close = np.ascontiguousarray(data["close"].to_numpy(dtype=np.float64))
+        return cls(
+            close=close,
+            signal=normalize_signal(data["signal"].to_numpy()),
+            index=index_to_epoch(data.index),
+        )
+
+
+def normalize_signal(signal: np.ndarray) -> np.ndarray:
+    """Map raw signal values to int8 {-1, 0, 1}; anything other than +/-1 is a hold"""
+    signal = np.asarray(signal)
+    return (signal == 1).astype(np.int8) - (signal == -1).astype(np.int8)
+
+
+def index_to_epoch(index: pd.Index) -> np.ndarray:
+    """Convert a DataFrame index to int64 epoch nanoseconds"""
+    if isinstance(index, pd.DatetimeIndex):
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        return np.ascontiguousarray(index.as_unit("ns").asi8)
+    return np.arange(len(index), dtype=np.int64)
+
+
+@dataclass
+class PositionState:
+    """Per-position state machine carried across the bars of a run"""
+    cash: float
+    position: int = 0
+    entry_price: float = 0.0
+    position_value: float = 0.0
+    entry_index: int = -1
+
+
+# Signals that open a position from flat, per ExecutionCore direction
+DIRECTIONS = {"long": (1,), "short": (-1,), "long_short": (1, -1)}
+
+# (entry_index, exit_index, entry_price, exit_price, quantity, pnl, pnl_percent), see TRADE_DTYPE
+TradeRecord = Tuple[int, int, float, float, int, float, float]
+
+
+@dataclass
+class ExecutionResult:
+    """Output of the execution core"""
+    equity: np.ndarray
+    trades: TradeLedger = field(default_factory=TradeLedger)
+    state: Optional[PositionState] = None
+    aborted_at: Optional[int] = None  # bar an abort rule stopped the run at; equity ends there
+
+
+@dataclass(frozen=True)
+class AbortRules:
+    """
+    Conditions that stop a run early, checked by ExecutionCore.execute
+
+    A run is aborted on the first bar where the marked-to-market equity is
+    more than max_drawdown percent below its running peak or below
+    equity_floor, or at bar min_trades_by when fewer than min_trades
+    positions have been opened up to and including that bar. The open
+    position is closed on the abort bar and the equity curve ends there.
+    """
+    max_drawdown: Optional[float] = None  # percent, e.g. 25.0
+    equity_floor: Optional[float] = None
+    min_trades: int = 0
+    min_trades_by: Optional[int] = None
+
+    def __post_init__(self):
+        if self.max_drawdown is not None and self.max_drawdown <= 0:
+            raise ValueError("max_drawdown must be > 0")
+        if self.min_trades > 0 and (self.min_trades_by is None or self.min_trades_by < 0):
+            raise ValueError("min_trades needs a min_trades_by bar >= 0")
+
+    def first_breach(self, equity: np.ndarray, peak: float = -np.inf) -> int:
+        """
+        Position of the first bar of an equity segment breaching the drawdown or floor rule
+
+        Args:
+            equity: Marked-to-market equity of consecutive bars
+            peak: Highest equity before the segment
+
+        Returns:
+            Position within the segment, or -1 when no bar breaches
+        """
+        breach = np.zeros(len(equity), dtype=bool)
+        if self.max_drawdown is not None:
+            running_max = np.maximum.accumulate(equity)
+            np.maximum(running_max, peak, out=running_max)
+            breach |= (equity - running_max) / running_max * 100 < -self.max_drawdown
+        if self.equity_floor is not None:
+            breach |= equity < self.equity_floor
+        return int(np.argmax(breach)) if breach.any() else -1
+
+
+class _AbortTracker:
+    """Running peak and entry count of a guarded run"""
+
+    def __init__(self, rules: AbortRules):
+        self.rules = rules
+        self.peak = -np.inf
+        self.entries = 0
+
+    def check(self, equity: np.ndarray, start: int) -> Optional[int]:
+        """Abort bar within the segment starting at bar `start`, or None"""
+        rules = self.rules
+        breach = rules.first_breach(equity, self.peak)
+        stop = start + breach if breach >= 0 else None
+        if rules.min_trades_by is not None and start <= rules.min_trades_by < start + len(equity) \
+                and self.entries < rules.min_trades:
+            stop = rules.min_trades_by if stop is None else min(stop, rules.min_trades_by)
+        self.peak = max(self.peak, float(equity.max()))
+        return stop
+
+
+@dataclass(frozen=True)
+class StopRules:
+    """
+    Per-position exit levels checked against each bar's high and low
+
+    stop_loss and take_profit are fractions below and above the entry
+    price; trailing_stop is a fraction below the highest high since entry.
+    Stops are live from the bar after entry: the trailing level of a bar
+    uses the highs of earlier bars only, and when the stop and the target
+    are both inside one bar's range the stop is assumed to fill first. A
+    level gapped through at the open fills at the open.
+    """
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    trailing_stop: Optional[float] = None
+
+    def __post_init__(self):
+        for name in ("stop_loss", "take_profit", "trailing_stop"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be > 0")
+
+    def first_hit(self, entry_price: float, high: np.ndarray, low: np.ndarray, open: Optional[np.ndarray],
+                  start: int, stop: int) -> Optional[Tuple[int, float]]:
+        """
+        First bar in [start, stop) where a stop or the target is reached
+
+        Returns:
+            (bar, fill price before slippage), or None when no level is reached
+        """
+        if stop <= start:
+            return None
+        k, price, on_stop = self._scan(np.array([entry_price]), high[start:stop][np.newaxis],
+                                       low[start:stop][np.newaxis])
+        if k[0] < 0:
+            return None
+        bar = start + int(k[0])
+        if open is not None:
+            price = self._gap_fill(price, on_stop, open[bar])
+        return bar, float(price[0])
+
+    def first_hits(self, entry_price: np.ndarray, high: np.ndarray, low: np.ndarray, open: Optional[np.ndarray],
+                   start: np.ndarray, stop: np.ndarray, horizon: int = 64, max_horizon: int = 4096,
+                   max_cells: int = 1 << 20) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        first_hit for many positions at once
+
+        The first `horizon` bars of every window are gathered into one
+        (positions, horizon) matrix and scanned with a row-wise cumulative
+        max. Windows without a hit there are rescanned with an 8x longer
+        horizon; past max_horizon they are scanned one by one over
+        contiguous slices.
+
+        Args:
+            entry_price: Entry price of each position
+            start: First bar each position's levels are live on
+            stop: End (exclusive) of each position's window
+
+        Returns:
+            (bar, fill price) arrays; bar is -1 where no level is reached
+        """
+        if self.trailing_stop is None and len(start) and np.all(start[1:] >= stop[:-1]):
+            return self._fixed_hits(entry_price, high, low, open, start, stop)
+        bars = np.full(len(start), -1, dtype=np.int64)
+        prices = np.full(len(start), np.nan)
+        length = stop - start
+        pending = np.flatnonzero(length > 0)
+        while len(pending) and horizon <= max_horizon:
+            rows = max(1, max_cells // horizon)
+            for first in range(0, len(pending), rows):
+                block = pending[first:first + rows]
+                offsets = np.arange(int(min(horizon, length[block].max())))
+                cols = np.minimum(start[block, np.newaxis] + offsets, len(low) - 1)
+                k, price, on_stop = self._scan(entry_price[block], high[cols], low[cols],
+                                               offsets < length[block, np.newaxis])
+                hit = k >= 0
+                bar = start[block[hit]] + k[hit]
+                if open is not None:
+                    price[hit] = self._gap_fill(price[hit], on_stop[hit], open[bar])
+                bars[block[hit]] = bar
+                prices[block[hit]] = price[hit]
+            pending = pending[(bars[pending] < 0) & (length[pending] > horizon)]
+            horizon *= 8
+
+        for row in pending.tolist():
+            hit = self.first_hit(entry_price[row], high, low, open, int(start[row]), int(stop[row]))
+            if hit is not None:
+                bars[row], prices[row] = hit
+        return bars, prices
+
+    def _fixed_hits(self, entry_price: np.ndarray, high: np.ndarray, low: np.ndarray, open: Optional[np.ndarray],
+                    start: np.ndarray, stop: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        first_hits for fixed stop-loss/take-profit levels over ordered, disjoint windows
+
+        Each window's levels are spread over its bars with np.repeat, so
+        the whole series is compared in one contiguous pass and the first
+        hit of each window is found with searchsorted.
+        """
+        n = len(low)
+        edges = np.empty(2 * len(start) + 2, dtype=np.int64)
+        edges[0], edges[-1] = 0, n
+        edges[1:-1:2], edges[2:-1:2] = start, np.maximum(stop, start)
+        counts = np.diff(edges)  # gap, window, gap, window, ..., gap
+
+        hit = np.zeros(n, dtype=bool)
+        stop_level = target = None
+        if self.stop_loss is not None:
+            stop_level = entry_price * (1 - self.stop_loss)
+            values = np.full(len(counts), -np.inf)
+            values[1::2] = stop_level
+            hit |= low <= np.repeat(values, counts)
+        if self.take_profit is not None:
+            target = entry_price * (1 + self.take_profit)
+            values = np.full(len(counts), np.inf)
+            values[1::2] = target
+            hit |= high >= np.repeat(values, counts)
+
+        events = np.flatnonzero(hit)
+        following = np.searchsorted(events, start)
+        candidate = np.append(events, n)[following]
+        found = candidate < stop
+        bars = np.where(found, candidate, -1)
+        prices = np.full(len(start), np.nan)
+        rows = np.flatnonzero(found)
+        bar = bars[rows]
+        on_stop = low[bar] <= stop_level[rows] if stop_level is not None else np.zeros(len(rows), dtype=bool)
+        price = np.where(on_stop, stop_level[rows] if stop_level is not None else np.nan,
+                         target[rows] if target is not None else np.nan)
+        if open is not None:
+            price = self._gap_fill(price, on_stop, open[bar])
+        prices[rows] = price
+        return bars, prices
+
+    def _scan(self, entry_price: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+              valid: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        First hit along each row of (positions, bars) high/low windows
+
+        Returns:
+            (column of the first hit or -1, level reached there, whether it is the stop rather than the target)
+        """
+        if self.trailing_stop is not None:
+            level = np.empty(lows.shape)
+            level[:, 0] = entry_price
+            np.maximum.accumulate(highs[:, :-1], axis=1, out=level[:, 1:])
+            np.maximum(level, entry_price[:, np.newaxis], out=level)
+            level *= 1 - self.trailing_stop
+        else:
+            level = np.full(lows.shape, -np.inf)
+        if self.stop_loss is not None:
+            np.maximum(level, (entry_price * (1 - self.stop_loss))[:, np.newaxis], out=level)
+        stopped = lows <= level
+        hit = stopped
+        if self.take_profit is not None:
+            target = entry_price * (1 + self.take_profit)
+            hit = hit | (highs >= target[:, np.newaxis])
+        if valid is not None:
+            hit &= valid
+
+        rows = np.flatnonzero(hit.any(axis=1))
+        k = np.full(len(entry_price), -1, dtype=np.int64)
+        k[rows] = np.argmax(hit[rows], axis=1)
+        on_stop = np.zeros(len(entry_price), dtype=bool)
+        on_stop[rows] = stopped[rows, k[rows]]
+        price = np.full(len(entry_price), np.nan)
+        price[rows] = np.where(on_stop[rows], level[rows, k[rows]], target[rows] if self.take_profit else np.nan)
+        return k, price, on_stop
+
+    @staticmethod
+    def _gap_fill(price: np.ndarray, on_stop: np.ndarray, open: np.ndarray) -> np.ndarray:
+        """Fill at the open instead of the level when the bar opened beyond it"""
+        return np.where(on_stop, np.minimum(price, open), np.maximum(price, open))
+
+
+# Signal density (non-zero signals per bar) at or below which execute() takes the sparse path
+SPARSE_DENSITY = 0.25
+
+
+class ExecutionCore:
+    """
+    Long-only execution over plain NumPy arrays.
+
+    The position state machine only runs when the position changes; the
+    mark-to-market equity between two state changes is filled as one
+    vectorized slice. Arithmetic mirrors the original per-bar loop
+    operation for operation, so trades and equity are bit-identical.
+
+    Two paths give identical results: the dense path scans every bar's
+    signal, the sparse path jumps between the non-zero signals found with
+    np.flatnonzero. mode="auto" picks the sparse path when at most
+    SPARSE_DENSITY of the bars carry a signal.
+
+    With `abort` rules, execute() checks every filled segment and stops at
+    the first bar that breaks a rule instead of running to the last bar.
+    With `stops`, execute() looks for the first stop hit of each position
+    with one vectorized StopRules.first_hit call over its holding bars.
+    With a `sizing` rule, execute() computes the fraction of cash to commit
+    at every bar once (SizingRule.entry_fractions) and each entry buys
+    int(cash * fraction / entry price) shares instead of all it can afford.
+
+    `direction` picks the positions a signal can open: "long" (BUY opens,
+    SELL exits), "short" (SELL opens a short, BUY covers) or "long_short"
+    (stop-and-reverse: a SELL exits a long and opens a short on the same
+    bar, a BUY covers and goes long). A short posts its entry notional as
+    collateral like a long pays for its shares, and is marked at
+    collateral + quantity * (entry price - close). Borrowing accrues at
+    borrow_rate per year on the entry notional, marked bar by bar and
+    charged to the trade's P&L on exit. Trade records carry negative
+    quantities for shorts.
+    """
+
+    def __init__(self, initial_capital: float = 10000.0, commission: float = 0.001, slippage: float = 0.0,
+                 mode: str = "auto", abort: Optional[AbortRules] = None, stops: Optional["StopRules"] = None,
+                 sizing: Optional[SizingRule] = None, direction: str = "long", borrow_rate: float = 0.0,
+                 periods_per_year: int = 252):
+        if mode not in ("auto", "dense", "sparse"):
+            raise ValueError(f"Unknown execution mode: {mode}")
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}")
+        if stops is not None and direction != "long":
+            raise ValueError("Stops are only simulated for long positions")
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.slippage = slippage
+        self.mode = mode
+        self.abort = abort
+        self.stops = stops
+        self.sizing = sizing
+        self.direction = direction
+        self.borrow_rate = borrow_rate
+        self.periods_per_year = periods_per_year
+        # Signals that open a position from flat, and the per-bar borrow fee on a short's entry notional
+        self._opens = DIRECTIONS[direction]
+        self._borrow_per_bar = borrow_rate / periods_per_year
+
+    def execute(self, close: np.ndarray, signal: np.ndarray, high: Optional[np.ndarray] = None,
+                low: Optional[np.ndarray] = None, open: Optional[np.ndarray] = None) -> ExecutionResult:
+        """
+        Run the state machine over a full series and close any open position on the last bar
+
+        Args:
+            close: float64 close prices
+            signal: int8 signals (1 = BUY, -1 = SELL, 0 = HOLD)
+            high: Bar highs for the stops (close when omitted)
+            low: Bar lows for the stops (close when omitted)
+            open: Bar opens; a stop gapped through at the open fills there
+
+        Returns:
+            ExecutionResult with equity curve, trade ledger and final state
+        """
+        n = len(close)
+        equity = np.empty(n, dtype=np.float64)
+        trades = TradeLedger()
+        state = PositionState(cash=self.initial_capital)
+
+        if n == 0:
+            return ExecutionResult(equity=equity, trades=trades, state=state)
+
+        fractions = self.sizing.entry_fractions(close, high, low) if self.sizing is not None else None
+        if self.abort is not None or self.stops is not None:
+            prices = (close if high is None else high, close if low is None else low, open)
+            aborted_at = self._run_events(close, signal, state, equity, trades, prices, fractions)
+            if aborted_at is not None:
+                equity = equity[:aborted_at + 1]
+                if state.position != 0:
+                    record, equity[-1] = self.close_out(state, aborted_at, close[aborted_at])
+                    trades.append(record)
+                return ExecutionResult(equity=equity, trades=trades, state=state, aborted_at=aborted_at)
+        else:
+            self._run(close, signal, state, equity, trades, fractions=fractions)
+
+        if state.position != 0:
+            record, equity[-1] = self.close_out(state, n - 1, close[-1])
+            trades.append(record)
+
+        return ExecutionResult(equity=equity, trades=trades, state=state)
+
+    def execute_chunk(self, close: np.ndarray, signal: np.ndarray, state: PositionState,
+                      offset: int = 0) -> ExecutionResult:
+        """
+        Continue a run over the next chunk of bars without closing the position at its end
+
+        Args:
+            close: float64 close prices of the chunk
+            signal: int8 signals of the chunk
+            state: Position state left by the previous chunk, updated in place
+            offset: Bar number of the chunk's first bar in the whole series; trade records use whole-series bars
+
+        Returns:
+            ExecutionResult with the chunk's marked-to-market equity and the trades closed in it
+        """
+        if self.abort is not None or self.stops is not None or self.sizing is not None:
+            raise ValueError("Abort rules, stops and sizing rules need the whole series; use execute()")
+        equity = np.empty(len(close), dtype=np.float64)
+        trades = TradeLedger()
+        if len(close):
+            self._run(close, signal, state, equity, trades, offset)
+        return ExecutionResult(equity=equity, trades=trades, state=state)
+
+    def _run(self, close: np.ndarray, signal: np.ndarray, state: PositionState, equity: np.ndarray,
+             trades: TradeLedger, offset: int = 0, fractions: Optional[np.ndarray] = None) -> None:
+        """Take the dense or sparse path over a series"""
+        events = None
+        if self.mode != "dense":
+            events = np.flatnonzero(signal)
+            if self.mode == "auto" and len(events) > SPARSE_DENSITY * len(close):
+                events = None
+        if events is None:
+            self._run_dense(close, signal, state, equity, trades, offset, fractions)
+        else:
+            self._run_sparse(close, signal, events, state, equity, trades, offset, fractions)
+
+    def apply_signal(self, state: PositionState, index: int, price: float, signal: int,
+                     fraction: Optional[float] = None) -> Optional[TradeRecord]:
+        """
+        Advance the position state machine by one bar
+
+        Args:
+            fraction: Share of cash an entry commits (all of it when None)
+
+        Returns:
+            The trade record when the bar closes a position, otherwise None
+        """
+        record = None
+        if state.position * signal < 0:
+            record = self._exit(state, index, self._exit_price(state, price))
+            if self.direction != "long_short":
+                return record
+        if state.position == 0 and signal in self._opens:
+            entry_price = price * (1 + self.slippage) if signal > 0 else price * (1 - self.slippage)
+            if fraction is None:
+                quantity = int(state.cash / entry_price)
+            else:
+                quantity = int(state.cash * fraction / entry_price)
+            if quantity > 0:
+                self._open(state, index, entry_price, quantity if signal > 0 else -quantity)
+        return record
+
+    def acts(self, position: int, signal: int) -> bool:
+        """Whether `signal` changes a position of `position` shares"""
+        return signal != 0 and (position * signal < 0 or (position == 0 and signal in self._opens))
+
+    def _exit(self, state: PositionState, index: int, exit_price: float) -> TradeRecord:
+        """Close the open position at exit_price and return its trade record"""
+        record = self._close_trade(state, index, exit_price)
+        state.cash += self._position_worth(state, exit_price) + record[5]
+        state.position = 0
+        state.position_value = 0
+        return record
+
+    def close_out(self, state: PositionState, index: int, price: float) -> Tuple[TradeRecord, float]:
+        """Close the open position at the end of the data; returns (trade record, final equity)"""
+        exit_price = self._exit_price(state, price)
+        final_equity = state.cash + self._position_worth(state, exit_price) - self._borrow_cost(state, index)
+        return self._close_trade(state, index, exit_price), final_equity
+
+    def _exit_price(self, state: PositionState, price: float) -> float:
+        """Fill price for closing the open position: sell a long, buy back a short"""
+        return price * (1 - self.slippage) if state.position > 0 else price * (1 + self.slippage)
+
+    @staticmethod
+    def _position_worth(state: PositionState, price: float) -> float:
+        """Value of the open position at `price`: the shares of a long, the collateral plus P&L of a short"""
+        if state.position > 0:
+            return state.position * price
+        return -state.position * (2 * state.entry_price - price)
+
+    def _borrow_cost(self, state: PositionState, index: int) -> float:
+        """Borrow fee accrued on the open short up to bar `index`"""
+        if state.position >= 0 or not self._borrow_per_bar:
+            return 0.0
+        return self._borrow_per_bar * state.position_value * (index - state.entry_index)
+
+    def _run_dense(self, close: np.ndarray, signal: np.ndarray, state: PositionState,
+                   equity: np.ndarray, trades: TradeLedger, offset: int = 0,
+                   fractions: Optional[np.ndarray] = None) -> None:
+        """Visit every bar, only touching equity when the position changes"""
+        segment_start = 0
+        opens = self._opens
+        for i, s in enumerate(signal.tolist()):
+            if s != 0 and (state.position * s < 0 or (state.position == 0 and s in opens)):
+                self._fill_equity(equity, close, state, segment_start, i, offset)
+                segment_start = i
+                record = self.apply_signal(state, offset + i, close[i], s,
+                                           None if fractions is None else fractions[i])
+                if record is not None:
+                    trades.append(record)
+
+        self._fill_equity(equity, close, state, segment_start, len(close), offset)
+
+    def _run_sparse(self, close: np.ndarray, signal: np.ndarray, events: np.ndarray, state: PositionState,
+                    equity: np.ndarray, trades: TradeLedger, offset: int = 0,
+                    fractions: Optional[np.ndarray] = None) -> None:
+        """Visit only the bars with a non-zero signal; flat and in-position stretches are filled as slices"""
+        segment_start = 0
+        opens = self._opens
+        for i, s in zip(events.tolist(), signal[events].tolist()):
+            if state.position * s < 0 or (state.position == 0 and s in opens):
+                self._fill_equity(equity, close, state, segment_start, i, offset)
+                segment_start = i
+                record = self.apply_signal(state, offset + i, close[i], s,
+                                           None if fractions is None else fractions[i])
+                if record is not None:
+                    trades.append(record)
+
+        self._fill_equity(equity, close, state, segment_start, len(close), offset)
+
+    def _run_events(self, close: np.ndarray, signal: np.ndarray, state: PositionState, equity: np.ndarray,
+                    trades: TradeLedger, prices: Optional[Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]] = None,
+                    fractions: Optional[np.ndarray] = None) -> Optional[int]:
+        """
+        Sparse path with intrabar stops and abort checks on every filled segment
+
+        Args:
+            prices: (high, low, open) arrays the stops are checked against
+
+        Returns:
+            The abort bar, or None when the run reached the last bar
+        """
+        n = len(close)
+        events = np.flatnonzero(signal)
+        bars, values = events.tolist(), signal[events].tolist()
+        sells = events[signal[events] == -1]
+        # After a stop exit the run is flat, so it resumes at the next BUY event
+        buy_events = np.flatnonzero(signal[events] == 1)
+        buy_bars, buy_events = events[buy_events].tolist(), buy_events.tolist() + [len(bars)]
+        tracker = _AbortTracker(self.abort) if self.abort is not None else None
+        hits = self._leading_hits(close, signal, events, sells, prices) if self.stops is not None else {}
+        segment_start = 0
+        j = 0
+        while True:
+            if j < len(bars):
+                i, s = bars[j], values[j]
+                j += 1
+                if not self.acts(state.position, s):
+                    continue
+            else:
+                i, s = n, 0
+            aborted_at = self._mark_segment(equity, close, state, segment_start, i, tracker)
+            if aborted_at is not None or i == n:
+                return aborted_at
+            segment_start = i
+            record = self.apply_signal(state, i, close[i], s, None if fractions is None else fractions[i])
+            if record is not None:
+                trades.append(record)
+            if state.position == 0 or state.entry_index != i:
+                continue
+            if tracker is not None:
+                tracker.entries += 1
+            if self.stops is None:
+                continue
+
+            if i in hits:
+                hit = hits[i]
+            else:
+                k = int(np.searchsorted(sells, i, side="right"))
+                stop = min(int(sells[k]) + 1, n) if k < len(sells) else n
+                hit = self.stops.first_hit(state.entry_price, *prices, i + 1, stop)
+            if hit is None:
+                continue
+            k, price = hit
+            aborted_at = self._mark_segment(equity, close, state, segment_start, k, tracker)
+            if aborted_at is not None:
+                return aborted_at
+            trades.append(self._exit(state, k, price * (1 - self.slippage)))
+            segment_start = k
+            j = buy_events[bisect.bisect_left(buy_bars, k)]
+
+    def _leading_hits(self, close: np.ndarray, signal: np.ndarray, events: np.ndarray, sells: np.ndarray,
+                      prices: Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]) -> Dict[int, Optional[Tuple[int, float]]]:
+        """
+        Stop hits of every BUY that follows a SELL (or starts the series), found in one batch
+
+        Stops are live from the bar after entry up to and including the next
+        SELL bar. These are the entries a run without stops makes; an entry
+        at another BUY (after a stop exit) is looked up on its own.
+        """
+        values = signal[events]
+        leading = events[(values == 1) & (np.concatenate([[0], values[:-1]]) != 1)]
+        following = np.searchsorted(sells, leading, side="right")
+        stop = np.append(np.minimum(sells + 1, len(close)), len(close))[following]
+        entry_price = close[leading] * (1 + self.slippage)
+        bars, fills = self.stops.first_hits(entry_price, *prices, leading + 1, stop)
+        return {
+            entry: (bar, fill) if bar >= 0 else None
+            for entry, bar, fill in zip(leading.tolist(), bars.tolist(), fills.tolist())
+        }
+
+    def _mark_segment(self, equity: np.ndarray, close: np.ndarray, state: PositionState, start: int, stop: int,
+                      tracker: Optional["_AbortTracker"]) -> Optional[int]:
+        """Fill a constant-position segment and check it against the abort rules"""
+        self._fill_equity(equity, close, state, start, stop)
+        if tracker is None or stop <= start:
+            return None
+        return tracker.check(equity[start:stop], start)
+
+    def _fill_equity(self, equity: np.ndarray, close: np.ndarray, state: PositionState, start: int, stop: int,
+                     offset: int = 0) -> None:
+        """Mark-to-market a segment with constant position and cash"""
+        if stop <= start:
+            return
+        if state.position > 0:
+            equity[start:stop] = state.cash + state.position * close[start:stop]
+        elif state.position < 0:
+            # cash + collateral + P&L, i.e. cash - position * (2 * entry price - close)
+            segment = equity[start:stop]
+            np.multiply(close[start:stop], state.position, out=segment)
+            segment += state.cash - 2 * state.position * state.entry_price
+            if self._borrow_per_bar:
+                fee = self._borrow_per_bar * state.position_value
+                segment -= np.arange(offset + start - state.entry_index, offset + stop - state.entry_index) * fee
+        else:
+            equity[start:stop] = state.cash
+
+    @staticmethod
+    def _open(state: PositionState, index: int, entry_price: float, quantity: int) -> None:
+        """Enter a position, long for a positive quantity and short for a negative one"""
+        state.position = quantity
+        state.entry_price = entry_price
+        state.entry_index = index
+        state.position_value = quantity * entry_price if quantity > 0 else -quantity * entry_price
+        state.cash -= state.position_value
+
+    def _close_trade(self, state: PositionState, index: int, exit_price: float) -> TradeRecord:
+        """Compute the trade record for closing the open position at exit_price"""
+        position = state.position
+        if position > 0:
+            gross_pnl = (exit_price - state.entry_price) * position
+            commission_cost = (state.position_value + position * exit_price) * self.commission
+        else:
+            gross_pnl = (state.entry_price - exit_price) * -position
+            commission_cost = (state.position_value - position * exit_price) * self.commission
+            commission_cost += self._borrow_cost(state, index)
+        net_pnl = gross_pnl - commission_cost
+        pnl_percent = (net_pnl / state.position_value) * 100 if state.position_value > 0 else 0
+        return (state.entry_index, index, state.entry_price, exit_price, position, net_pnl, pnl_percent)
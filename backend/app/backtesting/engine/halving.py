@@ -0,0 +1,179 @@
+"""Successive-halving parameter search over growing history prefixes"""
+
+import math
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from app.backtesting.engine.backtest import BacktestMetrics
+from app.backtesting.engine.execution import AbortRules, normalize_signal
+from app.backtesting.engine.sweep import METRIC_FIELDS, SweepCore, SweepResult
+
+
+@dataclass
+class Rung:
+    """One round of the search: the candidates evaluated on the first `bars` bars"""
+    bars: int
+    candidates: np.ndarray  # columns of the full candidate list
+    result: SweepResult  # one row per entry of candidates
+    promoted: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    seconds: float = 0.0
+
+
+@dataclass
+class HalvingResult:
+    """Rungs of a successive-halving search and the winner on the full history"""
+    rungs: List[Rung]
+    n_bars: int
+    n_candidates: int
+    best: Optional[int] = None  # column of the winner, None when every candidate was aborted
+    parameters: Optional[Dict[str, Any]] = None
+    metrics: Optional[BacktestMetrics] = None  # winner's metrics over the full history
+    seconds: float = 0.0
+
+    @property
+    def work(self) -> int:
+        """Bars simulated over all rungs, summed over candidates"""
+        return sum(rung.bars * len(rung.candidates) for rung in self.rungs)
+
+    @property
+    def exhaustive_work(self) -> int:
+        """Bars an exhaustive search over the full history would simulate"""
+        return self.n_bars * self.n_candidates
+
+    @property
+    def work_fraction(self) -> float:
+        """work relative to an exhaustive search"""
+        return self.work / self.exhaustive_work if self.exhaustive_work else 0.0
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per rung: prefix length, candidates evaluated, aborted and promoted, seconds"""
+        return pd.DataFrame([{
+            "bars": rung.bars,
+            "candidates": len(rung.candidates),
+            "aborted": int((~rung.result.completed).sum()),
+            "promoted": len(rung.promoted),
+            "seconds": rung.seconds,
+        } for rung in self.rungs])
+
+
+class SuccessiveHalving:
+    """
+    Successive-halving search that only runs the most promising parameter sets on the full history
+
+    All candidates are first evaluated on a short prefix of the history.
+    Candidates stopped by the abort rules are dropped, the best 1/eta of
+    the rest by `metric` are promoted to a prefix eta times longer, and so
+    on until the last rung runs the few survivors on every bar. Signals
+    are computed per rung for the prefix and the survivors only; indicators
+    are causal, so a prefix run equals the start of a full-history run.
+
+    The schedule has floor(log_eta(candidates)) + 1 rungs, fewer when the
+    first prefix would be shorter than min_bars.
+    """
+
+    def __init__(self, initial_capital: float = 10000.0, commission: float = 0.001, slippage: float = 0.0,
+                 eta: int = 3, min_bars: int = 500, metric: str = "sharpe_ratio", maximize: bool = True,
+                 abort: Optional[AbortRules] = None):
+        """
+        Args:
+            eta: Reduction factor: 1/eta of the candidates survive each rung, prefixes grow eta times
+            min_bars: Shortest prefix of the first rung
+            metric: BacktestMetrics field used to rank candidates
+            maximize: Rank the largest value of metric first
+            abort: Optional rules that stop and drop a candidate early
+        """
+        if eta < 2:
+            raise ValueError("eta must be >= 2")
+        if metric not in METRIC_FIELDS:
+            raise ValueError(f"Unknown metric: {metric}")
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.slippage = slippage
+        self.eta = eta
+        self.min_bars = min_bars
+        self.metric = metric
+        self.maximize = maximize
+        self.abort = abort
+
+    def schedule(self, n_bars: int, n_candidates: int) -> List[Tuple[int, int]]:
+        """(prefix bars, planned candidates) of every rung"""
+        last = 0
+        while self.eta ** (last + 1) <= n_candidates:
+            last += 1
+        while last > 0 and n_bars // self.eta ** last < self.min_bars:
+            last -= 1
+        return [(n_bars // self.eta ** (last - rung), math.ceil(n_candidates / self.eta ** rung))
+                for rung in range(last + 1)]
+
+    def run(self, data: pd.DataFrame, strategy_class: Type,
+            parameter_sets: List[Dict[str, Any]]) -> HalvingResult:
+        """
+        Search parameter_sets of strategy_class over data
+
+        Args:
+            data: DataFrame with OHLCV data
+            strategy_class: BaseStrategy subclass
+            parameter_sets: Candidate parameters dicts
+
+        Returns:
+            HalvingResult with the rungs and the full-history winner
+        """
+        def signals(bars: int, columns: np.ndarray) -> np.ndarray:
+            return strategy_class.signal_matrix(data.iloc[:bars], [parameter_sets[c] for c in columns])
+
+        close = np.ascontiguousarray(data["close"].to_numpy(dtype=np.float64))
+        return self._search(close, len(parameter_sets), signals, parameter_sets)
+
+    def run_signals(self, close: np.ndarray, signals: np.ndarray,
+                    parameter_sets: Optional[List[Dict[str, Any]]] = None) -> HalvingResult:
+        """
+        Search the columns of a precomputed (bars, candidates) signal matrix
+
+        Args:
+            close: float64 close prices
+            signals: Signals of every candidate, e.g. from signal_matrix
+            parameter_sets: Optional parameters dict per column
+        """
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        if signals.ndim != 2 or len(signals) != len(close):
+            raise ValueError("signals must have shape (bars, candidates)")
+        return self._search(close, signals.shape[1], lambda bars, columns: signals[:bars, columns], parameter_sets)
+
+    def _search(self, close: np.ndarray, n_candidates: int, signals: Callable[[int, np.ndarray], np.ndarray],
+                parameter_sets: Optional[List[Dict[str, Any]]]) -> HalvingResult:
+        """Run the rungs, evaluating signals(prefix bars, columns) for the survivors of each"""
+        started = time.perf_counter()
+        core = SweepCore(self.initial_capital, self.commission, self.slippage, abort=self.abort)
+        schedule = self.schedule(len(close), n_candidates)
+        alive = np.arange(n_candidates)
+        rungs = []
+        for rung, (bars, _) in enumerate(schedule):
+            rung_started = time.perf_counter()
+            matrix = normalize_signal(signals(bars, alive))
+            result = SweepResult.from_core(core.run(close[:bars], matrix))
+            rungs.append(Rung(bars=bars, candidates=alive, result=result))
+            if rung + 1 < len(schedule):
+                rungs[-1].promoted = alive = self._promote(alive, result, schedule[rung + 1][1])
+            rungs[-1].seconds = time.perf_counter() - rung_started
+            if len(alive) == 0:
+                break
+
+        outcome = HalvingResult(rungs=rungs, n_bars=len(close), n_candidates=n_candidates)
+        final = rungs[-1] if rungs else None
+        if final is not None and final.bars == len(close) and final.result.completed.any():
+            column = final.result.best(self.metric, self.maximize)
+            outcome.best = int(final.candidates[column])
+            outcome.metrics = final.result[column]
+            if parameter_sets is not None:
+                outcome.parameters = parameter_sets[outcome.best]
+        outcome.seconds = time.perf_counter() - started
+        return outcome
+
+    def _promote(self, candidates: np.ndarray, result: SweepResult, keep: int) -> np.ndarray:
+        """The `keep` best candidates that ran to the end of the rung, in ranking order"""
+        completed = np.flatnonzero(result.completed)
+        values = result.metrics[self.metric][completed]
+        order = np.argsort(-values if self.maximize else values, kind="stable")
+        return candidates[completed[order[:keep]]]
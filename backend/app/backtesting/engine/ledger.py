@@ -0,0 +1,131 @@
+"""Columnar trade ledger"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+TRADE_DTYPE = np.dtype([
+    ("entry_index", np.int64),
+    ("exit_index", np.int64),
+    ("entry_price", np.float64),
+    ("exit_price", np.float64),
+    ("quantity", np.int64),  # negative for short positions
+    ("pnl", np.float64),
+    ("pnl_percent", np.float64),
+])
+
+
+class TradeLedger:
+    """
+    Growable structured array of closed trades.
+
+    Rows follow TRADE_DTYPE, the same field order as the execution core's
+    trade records, so a record tuple can be stored as-is. Capacity doubles
+    when full, keeping appends amortized O(1). Columns are exposed as
+    zero-copy views; dicts are only built at the API boundary.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._data = np.empty(max(capacity, 1), dtype=TRADE_DTYPE)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        """Column view, e.g. ledger["pnl"]"""
+        return self._data[field][:self._size]
+
+    @property
+    def records(self) -> np.ndarray:
+        """Structured view of the stored trades"""
+        return self._data[:self._size]
+
+    @property
+    def pnl(self) -> np.ndarray:
+        return self["pnl"]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def append(self, record) -> None:
+        """Add one trade record (tuple in TRADE_DTYPE field order)"""
+        self._reserve(1)
+        self._data[self._size] = record
+        self._size += 1
+
+    def extend(self, records: Iterable) -> None:
+        """Add many trade records (structured array or iterable of tuples)"""
+        if not isinstance(records, np.ndarray):
+            records = np.array(list(records), dtype=TRADE_DTYPE)
+        self._reserve(len(records))
+        self._data[self._size:self._size + len(records)] = records
+        self._size += len(records)
+
+    def clear(self) -> None:
+        self._size = 0
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        if needed <= len(self._data):
+            return
+        capacity = len(self._data)
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty(capacity, dtype=TRADE_DTYPE)
+        grown[:self._size] = self._data[:self._size]
+        self._data = grown
+
+    @classmethod
+    def from_records(cls, records: Iterable) -> "TradeLedger":
+        ledger = cls()
+        ledger.extend(records)
+        return ledger
+
+    def to_frame(self, index: Optional[pd.Index] = None) -> pd.DataFrame:
+        """Ledger as a DataFrame, with entry/exit dates when the bar index is given"""
+        frame = pd.DataFrame(self.records)
+        if index is not None:
+            frame.insert(0, "entry_date", index[frame["entry_index"].to_numpy()])
+            frame.insert(2, "exit_date", index[frame["exit_index"].to_numpy()])
+        return frame
+
+    def to_dicts(self, index: Optional[pd.Index] = None) -> List[Dict[str, Any]]:
+        """
+        Trades as the list of dicts returned by the API
+
+        Args:
+            index: Bar index used to turn entry/exit positions into dates
+        """
+        records = self.records
+        if index is not None:
+            entry_dates = index[records["entry_index"]].tolist()
+            exit_dates = index[records["exit_index"]].tolist()
+        else:
+            entry_dates = records["entry_index"].tolist()
+            exit_dates = records["exit_index"].tolist()
+        return [
+            {
+                "entry_date": entry_date,
+                "entry_price": entry_price,
+                "exit_date": exit_date,
+                "exit_price": exit_price,
+                "quantity": abs(quantity),
+                "side": "BUY" if quantity > 0 else "SELL",
+                "pnl": pnl,
+                "pnl_percent": pnl_percent,
+            }
+            for entry_date, entry_price, exit_date, exit_price, quantity, pnl, pnl_percent in zip(
+                entry_dates,
+                records["entry_price"].tolist(),
+                exit_dates,
+                records["exit_price"].tolist(),
+                records["quantity"].tolist(),
+                records["pnl"].tolist(),
+                records["pnl_percent"].tolist(),
+            )
+        ]
@@ -0,0 +1,314 @@
+"""Monte Carlo robustness analysis of a finished backtest"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from typing import Any, Dict, Optional, Sequence, Tuple
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.ledger import TradeLedger
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Upper bound on the cells of one (paths, bars) equity matrix; larger runs are split into chunks
+CHUNK_CELLS = 1 << 20
+
+METRICS = ("roi", "sharpe_ratio", "max_drawdown")
+
+
+@dataclass
+class MonteCarloResult:
+    """Per-path metrics of one Monte Carlo method"""
+    method: str
+    roi: np.ndarray
+    sharpe_ratio: np.ndarray
+    max_drawdown: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.roi)
+
+    def percentiles(self, q: Sequence[float] = PERCENTILES) -> pd.DataFrame:
+        """Distribution of each metric, one row per metric and one column per percentile"""
+        values = np.vstack([self.roi, self.sharpe_ratio, self.max_drawdown])
+        return pd.DataFrame(np.percentile(values, q, axis=1).T, index=list(METRICS),
+                            columns=[f"p{p:g}" for p in q])
+
+    @property
+    def probability_of_loss(self) -> float:
+        """Share of paths ending below the initial capital"""
+        return float(np.mean(self.roi < 0)) if len(self) else 0.0
+
+
+class MonteCarlo:
+    """
+    Resample a finished backtest into thousands of alternative equity paths
+
+    Three methods, each building its paths as one (paths, bars) matrix:
+
+    - reshuffle_trades: the bar returns of every trade are kept together and
+      the trades are replayed in random order (or drawn with replacement).
+      A permutation leaves ROI and Sharpe unchanged and shows how much of
+      the drawdown is down to the order the trades came in.
+    - block_bootstrap: circular block bootstrap of the bar returns.
+    - cost_draws: the trades are re-executed on their original bars with
+      commission and slippage drawn per path, repeating the execution
+      core's arithmetic (sizing rule included), so a draw of the original
+      costs gives back the original equity curve exactly.
+
+    Metrics follow BacktestEngine._calculate_metrics. Paths are generated in
+    chunks of at most CHUNK_CELLS cells, each with its own child of
+    SeedSequence(seed), so results only depend on the seed, never on the
+    number of workers.
+    """
+
+    def __init__(self, close: np.ndarray, equity: np.ndarray, trades: TradeLedger,
+                 initial_capital: float = 10000.0, commission: float = 0.001, slippage: float = 0.0,
+                 closed_out: bool = False, engine_features: Sequence[str] = (),
+                 entry_fractions: Optional[np.ndarray] = None):
+        """
+        Args:
+            close: float64 close prices the backtest ran on
+            equity: Equity curve of the backtest
+            trades: Trade ledger of the backtest
+            closed_out: True when the last trade was closed by the end of the data rather than a signal
+            engine_features: Engine settings of the backtest that cost_draws cannot repeat
+                (e.g. "stops"); cost_draws refuses to run when any are given
+            entry_fractions: Share of cash each trade's entry committed under the engine's sizing
+                rule, one per trade (all of it when None)
+        """
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.equity = np.ascontiguousarray(equity, dtype=np.float64)
+        if len(self.close) != len(self.equity):
+            raise ValueError("close and equity must have the same length")
+        self.entries = trades["entry_index"].copy()
+        self.exits = trades["exit_index"].copy()
+        self.has_shorts = bool((trades["quantity"] < 0).any())
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.slippage = slippage
+        self.closed_out = closed_out
+        self.engine_features = tuple(engine_features)
+        self.entry_fractions = None if entry_fractions is None else np.asarray(entry_fractions, dtype=np.float64)
+
+    @classmethod
+    def from_backtest(cls, engine: BacktestEngine, data: pd.DataFrame) -> "MonteCarlo":
+        """
+        Build from an engine after run_backtest() on data
+
+        A run stopped early by abort rules is resampled over the bars it
+        simulated, which end on the abort bar.
+        """
+        state = engine.final_state
+        close = data["close"].to_numpy(dtype=np.float64)[:len(engine.equity_curve)]
+        features = [name for name in ("stops", "cost_model") if getattr(engine, name) is not None]
+        fractions = None
+        if engine.sizing is not None:
+            # The rule's fraction depends on the bars only, so every path commits the same share at an entry
+            fractions = engine.sizing.entry_fractions(data["close"].to_numpy(dtype=np.float64),
+                                                      *engine._sizing_prices(data))
+            fractions = fractions[engine.trades["entry_index"]]
+        return cls(close, engine.equity_curve, engine.trades,
+                   initial_capital=engine.initial_capital, commission=engine.commission,
+                   slippage=engine.slippage, closed_out=state is not None and state.position != 0,
+                   engine_features=features, entry_fractions=fractions)
+
+    def reshuffle_trades(self, paths: int = 1000, seed: Optional[int] = None, replace: bool = False,
+                         workers: int = 1) -> MonteCarloResult:
+        """
+        Replay the trades in random order
+
+        Args:
+            replace: Draw as many trades as the backtest made with replacement instead of permuting them
+        """
+        return self._simulate("reshuffle_trades", paths, seed, workers, {"replace": replace})
+
+    def block_bootstrap(self, paths: int = 1000, block: int = 20, seed: Optional[int] = None,
+                        workers: int = 1) -> MonteCarloResult:
+        """
+        Resample the bar returns in blocks of consecutive bars
+
+        Args:
+            block: Block length in bars; longer blocks keep more autocorrelation
+        """
+        if block < 1:
+            raise ValueError("block must be >= 1")
+        return self._simulate("block_bootstrap", paths, seed, workers, {"block": block})
+
+    def cost_draws(self, paths: int = 1000, commission: Optional[Tuple[float, float]] = None,
+                   slippage: Optional[Tuple[float, float]] = None, seed: Optional[int] = None,
+                   workers: int = 1) -> MonteCarloResult:
+        """
+        Re-execute the trades with commission and slippage drawn uniformly per path
+
+        Args:
+            commission: (low, high) range, defaults to half to twice the backtest commission
+            slippage: (low, high) range, defaults to half to twice the backtest slippage,
+                or 0 to 0.1% when it was zero
+        """
+        if self.has_shorts:
+            raise ValueError("cost_draws re-executes long trades only")
+        if self.engine_features:
+            # Stop fills at the stop level and cost model charges are not in the close-price re-execution
+            raise ValueError(f"cost_draws cannot re-execute runs with {', '.join(self.engine_features)}")
+        if commission is None:
+            commission = (self.commission / 2, self.commission * 2)
+        if slippage is None:
+            slippage = (self.slippage / 2, self.slippage * 2) if self.slippage > 0 else (0.0, 0.001)
+        return self._simulate("cost_draws", paths, seed, workers,
+                              {"commission": tuple(commission), "slippage": tuple(slippage)})
+
+    def run(self, paths: int = 1000, seed: Optional[int] = None, workers: int = 1) -> Dict[str, MonteCarloResult]:
+        """All three methods with their default settings, keyed by method name"""
+        seeds = np.random.SeedSequence(seed).spawn(3)
+        return {
+            "reshuffle_trades": self.reshuffle_trades(paths, seed=seeds[0], workers=workers),
+            "block_bootstrap": self.block_bootstrap(paths, seed=seeds[1], workers=workers),
+            "cost_draws": self.cost_draws(paths, seed=seeds[2], workers=workers),
+        }
+
+    def _simulate(self, method: str, paths: int, seed, workers: int, options: Dict[str, Any]) -> MonteCarloResult:
+        """Split the paths into chunks, one seed each, and run them serially or on a process pool"""
+        if paths < 1:
+            raise ValueError("paths must be >= 1")
+        chunk = max(1, min(paths, CHUNK_CELLS // max(len(self.equity), 1)))
+        sizes = [chunk] * (paths // chunk) + ([paths % chunk] if paths % chunk else [])
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        seeds = seed.spawn(len(sizes))
+        arguments = (repeat(self), repeat(method), sizes, seeds, repeat(options))
+        if workers > 1 and len(sizes) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunks = list(pool.map(_simulate_chunk, *arguments))
+        else:
+            chunks = list(map(_simulate_chunk, *arguments))
+        metrics = np.hstack(chunks)
+        return MonteCarloResult(method, *metrics)
+
+    def _returns(self) -> np.ndarray:
+        """Bar returns as BacktestEngine computes them for the Sharpe ratio"""
+        return np.diff(self.equity) / self.equity[:-1]
+
+    def _from_returns(self, returns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(paths, bars) equity matrix starting from the first bar of the backtest, and the returns"""
+        equity = np.empty((len(returns), len(self.equity)))
+        equity[:, 0] = self.equity[0]
+        growth = equity[:, 1:]
+        np.add(returns, 1, out=growth)
+        np.multiply.accumulate(growth, axis=1, out=growth)
+        growth *= self.equity[0]
+        return equity, returns
+
+    def _reshuffle_trades_paths(self, paths: int, rng: np.random.Generator,
+                                replace: bool) -> Tuple[np.ndarray, np.ndarray]:
+        returns = self._returns()
+        width = len(returns)
+        count = len(self.entries)
+        # Return j is bar j + 1 against bar j; trade returns run from its entry bar to its exit bar
+        starts = np.maximum(self.entries, 1) - 1
+        lengths = self.exits - starts
+        if replace:
+            order = rng.integers(0, max(count, 1), size=(paths, count))
+        else:
+            order = rng.permuted(np.broadcast_to(np.arange(count), (paths, count)), axis=1)
+
+        # Each row reads the drawn trades end to end, then the zero returns of the flat bars
+        # (a block of zeros past the returns). The source positions are a running sum that
+        # steps by one inside a segment and jumps at segment starts.
+        source = np.concatenate([returns, np.zeros(width)])
+        segment_starts = np.hstack([starts[order], np.full((paths, 1), width)])
+        segment_lengths = lengths[order]
+        columns = np.zeros((paths, count + 1), dtype=np.int64)
+        np.cumsum(segment_lengths, axis=1, out=columns[:, 1:])
+        previous_ends = np.zeros((paths, count + 1), dtype=np.int64)
+        previous_ends[:, 1:] = segment_starts[:, :-1] + segment_lengths - 1
+        steps = np.ones((paths, width), dtype=np.intp if 2 * width > np.iinfo(np.int32).max else np.int32)
+        rows, slots = np.nonzero(columns < width)
+        steps[rows, columns[rows, slots]] = segment_starts[rows, slots] - previous_ends[rows, slots]
+        return self._from_returns(source[np.cumsum(steps, axis=1, out=steps)])
+
+    def _block_bootstrap_paths(self, paths: int, rng: np.random.Generator,
+                               block: int) -> Tuple[np.ndarray, np.ndarray]:
+        returns = self._returns()
+        width = len(returns)
+        if width == 0:
+            return self._from_returns(np.empty((paths, 0)))
+        # Circular blocks: every window of `block` returns, wrapping past the end
+        wrapped = np.concatenate([returns, np.resize(returns, block - 1)])
+        windows = np.lib.stride_tricks.sliding_window_view(wrapped, block)
+        starts = rng.integers(0, width, size=(paths, -(-width // block)))
+        return self._from_returns(windows[starts].reshape(paths, -1)[:, :width])
+
+    def _cost_draws_paths(self, paths: int, rng: np.random.Generator, commission: Tuple[float, float],
+                          slippage: Tuple[float, float]) -> Tuple[np.ndarray, None]:
+        close = self.close
+        commission = rng.uniform(*commission, size=paths)
+        slippage = rng.uniform(*slippage, size=paths)
+        equity = np.empty((paths, len(close)))
+        cash = np.full(paths, float(self.initial_capital))
+        flat_start = 0
+        last = len(self.entries) - 1
+        for k, (entry, exit) in enumerate(zip(self.entries.tolist(), self.exits.tolist())):
+            equity[:, flat_start:entry] = cash[:, np.newaxis]
+            # Same operations as ExecutionCore.apply_signal and _close_trade, one path per element
+            entry_price = close[entry] * (1 + slippage)
+            if self.entry_fractions is None:
+                quantity = np.floor(cash / entry_price)
+            else:
+                quantity = np.floor(cash * self.entry_fractions[k] / entry_price)
+            position_value = quantity * entry_price
+            cash = cash - position_value
+            equity[:, entry:exit] = cash[:, np.newaxis] + quantity[:, np.newaxis] * close[entry:exit]
+            exit_price = close[exit] * (1 - slippage)
+            if k == last and self.closed_out:
+                equity[:, exit] = cash + quantity * exit_price
+                return equity, None
+            gross_pnl = (exit_price - entry_price) * quantity
+            net_pnl = gross_pnl - (position_value + quantity * exit_price) * commission
+            cash = cash + (quantity * exit_price + net_pnl)
+            flat_start = exit
+        equity[:, flat_start:] = cash[:, np.newaxis]
+        return equity, None
+
+
+def _simulate_chunk(simulation: MonteCarlo, method: str, paths: int, seed: np.random.SeedSequence,
+                    options: Dict[str, Any]) -> np.ndarray:
+    """Generate one chunk of paths and reduce it to a (metrics, paths) array"""
+    rng = np.random.default_rng(seed)
+    equity, returns = getattr(simulation, f"_{method}_paths")(paths, rng, **options)
+    return path_metrics(equity, simulation.initial_capital, returns=returns)
+
+
+def path_metrics(equity: np.ndarray, initial_capital: float, returns: Optional[np.ndarray] = None,
+                 risk_free_rate: float = 0.02) -> np.ndarray:
+    """
+    ROI, Sharpe ratio and max drawdown of every row of an equity matrix
+
+    Row-wise version of BacktestEngine._calculate_metrics, written to
+    make as few passes over the matrix as possible.
+
+    Args:
+        returns: Bar returns of the rows when the caller already has them
+
+    Returns:
+        float64 array of shape (3, paths) in METRICS order
+    """
+    out = np.zeros((3, len(equity)))
+    out[0] = (equity[:, -1] - initial_capital) / initial_capital * 100
+
+    if returns is None:
+        returns = np.diff(equity, axis=1)
+        returns /= equity[:, :-1]
+    if returns.shape[1]:
+        # The risk-free rate shifts the mean only, so the deviation of the returns is that of the excess returns
+        mean = returns.mean(axis=1)
+        centered = returns - mean[:, np.newaxis]
+        deviation = np.sqrt(np.einsum("ij,ij->i", centered, centered) / returns.shape[1])
+        del centered
+        varies = deviation != 0
+        out[1, varies] = (mean[varies] - risk_free_rate / 252) / deviation[varies] * np.sqrt(252)
+
+    running_max = np.maximum.accumulate(equity, axis=1)
+    np.divide(equity, running_max, out=running_max)
+    out[2] = (running_max.min(axis=1) - 1) * 100
+    return out
@@ -0,0 +1,172 @@
+"""Process-pool parameter sweeps over shared-memory OHLCV data"""
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.sweep import SweepResult
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# BacktestEngine settings forwarded to the worker engines
+ENGINE_SETTINGS = ("initial_capital", "commission", "slippage", "abort", "stops", "cost_model", "sizing",
+                   "direction", "borrow_rate")
+
+
+class SharedOHLCV:
+    """
+    OHLCV columns and an int64 index laid out in one shared memory block.
+    A DatetimeIndex is stored as UTC nanoseconds with its time zone in the spec.
+
+    The owner creates the block once and is the only one to unlink it;
+    workers attach by name through `spec`, which is a small picklable
+    dict, so the bars are never pickled per task.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, spec: Dict[str, Any], owner: bool):
+        self.shm = shm
+        self.spec = spec
+        self.owner = owner
+
+    @classmethod
+    def create(cls, data: pd.DataFrame) -> "SharedOHLCV":
+        """Copy the OHLCV columns of `data` into a new shared memory block"""
+        columns = [c for c in OHLCV_COLUMNS if c in data.columns]
+        n = len(data)
+        shm = shared_memory.SharedMemory(create=True, size=max(8 * n * (len(columns) + 1), 1))
+        buffer = np.ndarray((len(columns) + 1, n), dtype=np.float64, buffer=shm.buf)
+        for row, column in enumerate(columns):
+            buffer[row] = data[column].to_numpy(dtype=np.float64)
+        index = buffer[-1].view(np.int64)
+        tz = ""
+        if isinstance(data.index, pd.DatetimeIndex):
+            index[:] = data.index.as_unit("ns").asi8
+            index_kind = "datetime"
+            tz = str(data.index.tz) if data.index.tz is not None else ""
+        else:
+            index[:] = np.arange(n)
+            index_kind = "range"
+        spec = {"name": shm.name, "columns": columns, "length": n, "index": index_kind, "tz": tz}
+        return cls(shm, spec, owner=True)
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> "SharedOHLCV":
+        """Attach to a block created by another process"""
+        return cls(shared_memory.SharedMemory(name=spec["name"]), spec, owner=False)
+
+    def _buffer(self) -> np.ndarray:
+        """(columns + index, bars) view of the whole block"""
+        return np.ndarray((len(self.spec["columns"]) + 1, self.spec["length"]), dtype=np.float64, buffer=self.shm.buf)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Zero-copy column views into the shared block"""
+        buffer = self._buffer()
+        arrays = {column: buffer[row] for row, column in enumerate(self.spec["columns"])}
+        arrays["index"] = buffer[-1].view(np.int64)
+        return arrays
+
+    def frame(self) -> pd.DataFrame:
+        """DataFrame backed by the shared block (valid while it stays attached)"""
+        buffer = self._buffer()
+        if self.spec["index"] == "datetime":
+            index = pd.DatetimeIndex(buffer[-1].view("datetime64[ns]"))
+            if self.spec["tz"]:
+                # The block holds UTC nanoseconds; restore the zone so calendar rules bucket as in-process
+                index = index.tz_localize("UTC").tz_convert(self.spec["tz"])
+        else:
+            index = pd.RangeIndex(self.spec["length"])
+        return pd.DataFrame(buffer[:-1].T, index=index, columns=self.spec["columns"], copy=False)
+
+    def close(self) -> None:
+        """Release the mapping, and the block itself when this process owns it"""
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self) -> "SharedOHLCV":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Per-worker state, populated once by the pool initializer
+_worker_shared: Optional[SharedOHLCV] = None
+_worker_frame: Optional[pd.DataFrame] = None
+
+
+def _init_worker(spec: Dict[str, Any]) -> None:
+    """Attach to the shared bars for the lifetime of the worker"""
+    global _worker_shared, _worker_frame
+    _worker_shared = SharedOHLCV.attach(spec)
+    _worker_frame = _worker_shared.frame()
+
+
+def _run_chunk(start: int, strategy_class: Type, parameter_sets: List[Dict[str, Any]],
+               engine_kwargs: Dict[str, Any]) -> Tuple[int, SweepResult]:
+    """Sweep one chunk of parameter sets in a worker"""
+    signals = strategy_class.signal_matrix(_worker_frame, parameter_sets)
+    engine = BacktestEngine(**engine_kwargs)
+    return start, engine.run_sweep(_worker_frame, signals, parameters=parameter_sets)
+
+
+class ParallelSweepRunner:
+    """Fan parameter chunks out to a process pool"""
+
+    def __init__(self, initial_capital: float = 10000.0, commission: float = 0.001, slippage: float = 0.0,
+                 max_workers: Optional[int] = None, chunk_size: int = 64, engine: Optional[BacktestEngine] = None):
+        """
+        Initialize sweep runner
+
+        Args:
+            initial_capital: Starting capital
+            commission: Commission per trade (0.001 = 0.1%)
+            slippage: Price slippage percentage
+            max_workers: Worker processes (defaults to the CPU count)
+            chunk_size: Parameter sets per task
+            engine: Optional engine whose whole configuration (direction, borrow rate, sizing,
+                abort rules, cost model) the workers use instead of the three settings above
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        if engine is not None:
+            if engine.stops is not None:
+                raise ValueError("run_sweep does not simulate stops; use run_backtest per parameter set")
+            self.engine_kwargs = {name: getattr(engine, name) for name in ENGINE_SETTINGS}
+        else:
+            self.engine_kwargs = {"initial_capital": initial_capital, "commission": commission, "slippage": slippage}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def iter_chunks(self, data: pd.DataFrame, strategy_class: Type,
+                    parameter_sets: List[Dict[str, Any]]) -> Iterator[Tuple[int, SweepResult]]:
+        """
+        Yield (offset of the chunk in parameter_sets, SweepResult) as chunks finish
+
+        Args:
+            data: DataFrame with OHLCV data
+            strategy_class: BaseStrategy subclass
+            parameter_sets: One parameters dict per backtest
+        """
+        with SharedOHLCV.create(data) as shared:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(shared.spec,)) as pool:
+                futures = [
+                    pool.submit(_run_chunk, start, strategy_class,
+                                parameter_sets[start:start + self.chunk_size], self.engine_kwargs)
+                    for start in range(0, len(parameter_sets), self.chunk_size)
+                ]
+                try:
+                    for future in as_completed(futures):
+                        yield future.result()
+                finally:
+                    for future in futures:
+                        future.cancel()
+
+    def run(self, data: pd.DataFrame, strategy_class: Type, parameter_sets: List[Dict[str, Any]]) -> SweepResult:
+        """Run the whole grid and return results in parameter_sets order"""
+        chunks = sorted(self.iter_chunks(data, strategy_class, parameter_sets), key=lambda chunk: chunk[0])
+        return SweepResult.concat([result for _, result in chunks])
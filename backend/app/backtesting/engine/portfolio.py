@@ -0,0 +1,329 @@
+"""Multi-symbol portfolio backtesting with a shared cash pool"""
+
+import heapq
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import List, Optional, Union
+from app.backtesting.engine.backtest import BacktestEngine, BacktestMetrics
+from app.backtesting.engine.execution import normalize_signal
+from app.backtesting.engine.ledger import TradeLedger, TRADE_DTYPE
+from app.backtesting.engine.sizing import SizingRule, EqualWeight
+
+FILL_DTYPE = np.dtype([
+    ("bar", np.int64),
+    ("symbol", np.int64),
+    ("quantity", np.float64),  # signed whole shares, negative for sells
+    ("price", np.float64),  # execution price including slippage
+    ("commission", np.float64),
+])
+
+Matrix = Union[pd.DataFrame, np.ndarray]
+
+
+@dataclass
+class PortfolioResult:
+    """Output of a portfolio run"""
+    equity: np.ndarray  # (bars,) book value
+    cash: np.ndarray  # (bars,)
+    holdings: np.ndarray  # (bars, symbols) shares held at the close of each bar
+    fills: np.ndarray  # FILL_DTYPE, in execution order
+    trades: TradeLedger  # round trips (flat -> long -> flat) of every symbol
+    trade_symbols: np.ndarray  # symbol number of each round trip
+    metrics: BacktestMetrics
+    symbol_metrics: pd.DataFrame
+    symbols: List[str]
+    index: Optional[pd.Index] = None
+
+    def fills_frame(self) -> pd.DataFrame:
+        """Fills with symbol names (and dates when the bar index is known)"""
+        frame = pd.DataFrame(self.fills)
+        frame.insert(2, "symbol_name", np.asarray(self.symbols, dtype=object)[frame["symbol"].to_numpy()])
+        if self.index is not None:
+            frame.insert(0, "date", self.index[frame["bar"].to_numpy()])
+        return frame
+
+
+class PortfolioEngine:
+    """
+    Long-only backtester for many symbols sharing one cash pool.
+
+    Prices and signals are aligned (bars, symbols) matrices. A symbol is
+    wanted long from a BUY signal until the next SELL, as in
+    ExecutionCore. The loop only visits rebalance bars: bars where the
+    set of wanted symbols changes, plus every `rebalance_every` bars when
+    set. On a signal change, exits are sold and entries are bought at the
+    whole-share count of their target weight from the sizing rule, funded
+    by the shared cash (scaled down when it runs short) while open
+    positions keep their size; on a scheduled rebalance every symbol is
+    moved to its target. Sells always execute first so their proceeds
+    fund the buys. Holdings are constant between rebalances, so the book
+    is marked to market with one matrix product over all bars instead of
+    a per-symbol loop. Missing prices (NaN) make a symbol untradable on
+    that bar; it is held and marked at its last price, and an entry or
+    exit it misses is re-queued for its next bar with a price, where only
+    the re-queued symbols trade. Everything still held is sold on the
+    last bar.
+    """
+
+    def __init__(self, initial_capital: float = 100000.0, commission: float = 0.001, slippage: float = 0.0,
+                 sizing: Optional[SizingRule] = None, rebalance_every: Optional[int] = None):
+        """
+        Initialize portfolio engine
+
+        Args:
+            initial_capital: Starting cash shared by all symbols
+            commission: Commission per trade as a fraction of traded value
+            slippage: Price slippage percentage
+            sizing: Sizing rule (default: EqualWeight())
+            rebalance_every: Also rebalance every this many bars (default: only on signal changes)
+        """
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.slippage = slippage
+        self.sizing = sizing if sizing is not None else EqualWeight()
+        self.rebalance_every = rebalance_every
+
+    def run(self, close: Matrix, signal: Matrix, high: Optional[Matrix] = None,
+            low: Optional[Matrix] = None) -> PortfolioResult:
+        """
+        Backtest a universe
+
+        Args:
+            close: Close prices, (bars, symbols) DataFrame or array; NaN for missing bars
+            signal: Signals of the same shape (1 = BUY, -1 = SELL, 0 = HOLD)
+            high: Optional highs of the same shape, for ATR-based sizing rules
+            low: Optional lows of the same shape, for ATR-based sizing rules
+
+        Returns:
+            PortfolioResult with the equity curve, holdings, fills and metrics
+        """
+        prices = np.asarray(close, dtype=np.float64)
+        signals = normalize_signal(np.asarray(signal))
+        if prices.ndim != 2 or prices.shape != signals.shape:
+            raise ValueError("close and signal must be (bars, symbols) matrices of the same shape")
+        symbols = [str(c) for c in close.columns] if isinstance(close, pd.DataFrame) else \
+            [str(i) for i in range(prices.shape[1])]
+        index = close.index if isinstance(close, pd.DataFrame) else None
+
+        n, m = prices.shape
+        tradable = np.isfinite(prices)
+        marks = _forward_fill(prices)
+        wanted = _long_regime(signals)
+
+        rebalance = np.zeros(n, dtype=bool)
+        if n:
+            rebalance[0] = wanted[0].any()
+            rebalance[1:] = (wanted[1:] != wanted[:-1]).any(axis=1)
+            if self.rebalance_every:
+                rebalance[::self.rebalance_every] = True
+        events = np.flatnonzero(rebalance)
+
+        self.sizing.prepare(prices, *(None if matrix is None else np.asarray(matrix, dtype=np.float64)
+                                      for matrix in (high, low)))
+        next_tradable = _next_valid(tradable)
+        holdings = np.zeros(m)
+        cash = self.initial_capital
+        # Entry k + 1 holds the book after the k-th visited bar; entry 0 is the initial empty book
+        visited = []
+        event_holdings = [holdings.copy()]
+        event_cash = [cash]
+        fills = []
+        # Bars an entry or exit was deferred to (a heap) and the symbols deferred to each
+        queued: List[int] = []
+        deferred = {}
+
+        scheduled = events.tolist()
+        i = 0
+        while i < len(scheduled) or queued:
+            if queued and (i == len(scheduled) or queued[0] < scheduled[i]):
+                bar = heapq.heappop(queued)
+                only = deferred.pop(bar)
+            else:
+                bar = scheduled[i]
+                i += 1
+                only = None
+                if queued and queued[0] == bar:
+                    heapq.heappop(queued)
+                    deferred.pop(bar)
+            price = prices[bar]
+            can_trade = tradable[bar]
+            value = cash + np.dot(holdings, np.nan_to_num(marks[bar]))
+            weights = self.sizing.weights(bar, wanted[bar] & can_trade)
+            with np.errstate(invalid="ignore"):
+                target = np.floor(weights * value / (price * (1 + self.slippage) * (1 + self.commission)))
+            if only is not None or not (self.rebalance_every and bar % self.rebalance_every == 0):
+                # Between scheduled rebalances only entries and exits trade; open positions keep their size
+                target = np.where((holdings > 0) & wanted[bar], holdings, target)
+            if only is not None:
+                target = np.where(only, target, holdings)
+            # Entries and exits blocked by a missing price wait for the symbol's next priced bar
+            blocked = ~can_trade & (wanted[bar] != (holdings > 0))
+            if only is not None:
+                blocked &= only
+            for symbol in np.flatnonzero(blocked).tolist():
+                later = int(next_tradable[bar, symbol])
+                if later < n:
+                    if later not in deferred:
+                        deferred[later] = np.zeros(m, dtype=bool)
+                        heapq.heappush(queued, later)
+                    deferred[later][symbol] = True
+            target = np.where(can_trade, target, holdings)
+            cash = self._trade(bar, holdings, target - holdings, price, cash, fills)
+            visited.append(bar)
+            event_holdings.append(holdings.copy())
+            event_cash.append(cash)
+
+        # Bar -> entry of the last visited bar at or before it
+        rows = np.searchsorted(np.array(visited, dtype=np.int64), np.arange(n), side="right")
+        holdings_matrix = np.array(event_holdings)[rows]
+        cash_curve = np.array(event_cash)[rows]
+        equity = cash_curve + np.einsum("ij,ij->i", holdings_matrix, np.nan_to_num(marks))
+
+        if n and holdings.any():
+            # Close out the book on the last bar, at the last known price of each symbol
+            cash = self._trade(n - 1, holdings, -holdings, marks[-1], cash, fills)
+            cash_curve[-1] = cash
+            equity[-1] = cash
+
+        fills = np.concatenate(fills) if fills else np.empty(0, dtype=FILL_DTYPE)
+        trades, trade_symbols = _round_trips(fills)
+        metrics_engine = BacktestEngine(self.initial_capital, self.commission, self.slippage)
+        metrics_engine.trades = trades
+        metrics = metrics_engine._calculate_metrics(equity) if n else None
+
+        return PortfolioResult(
+            equity=equity,
+            cash=cash_curve,
+            holdings=holdings_matrix,
+            fills=fills,
+            trades=trades,
+            trade_symbols=trade_symbols,
+            metrics=metrics,
+            symbol_metrics=self._symbol_metrics(fills, trades, trade_symbols, holdings_matrix, symbols),
+            symbols=symbols,
+            index=index,
+        )
+
+    def _trade(self, bar: int, holdings: np.ndarray, delta: np.ndarray, price: np.ndarray,
+               cash: float, fills: list) -> float:
+        """Execute share changes in place on holdings, sells first; returns the new cash balance"""
+        sells = np.flatnonzero(delta < 0)
+        buys = np.flatnonzero(delta > 0)
+        sell_price = price[sells] * (1 - self.slippage)
+        proceeds = -delta[sells] * sell_price
+        cash += proceeds.sum() - (proceeds * self.commission).sum()
+
+        buy_price = price[buys] * (1 + self.slippage)
+        cost = delta[buys] * buy_price
+        total = (cost * (1 + self.commission)).sum()
+        if total > cash:
+            # Not enough cash after sells (prices moved since sizing): shrink every buy proportionally
+            delta[buys] = np.floor(delta[buys] * (cash / total))
+            cost = delta[buys] * buy_price
+        cash -= cost.sum() + (cost * self.commission).sum()
+
+        holdings += delta
+        batch = np.empty(len(sells) + len(buys), dtype=FILL_DTYPE)
+        batch["bar"] = bar
+        batch["symbol"] = np.concatenate([sells, buys])
+        batch["quantity"] = np.concatenate([delta[sells], delta[buys]])
+        batch["price"] = np.concatenate([sell_price, buy_price])
+        batch["commission"] = np.concatenate([proceeds, cost]) * self.commission
+        fills.append(batch[batch["quantity"] != 0])
+        return cash
+
+    def _symbol_metrics(self, fills: np.ndarray, trades: TradeLedger, trade_symbols: np.ndarray,
+                        holdings: np.ndarray, symbols: List[str]) -> pd.DataFrame:
+        """Per-symbol P&L, round trips, exposure and turnover"""
+        m = len(symbols)
+        symbol = fills["symbol"]
+        notional = fills["quantity"] * fills["price"]
+        pnl = np.bincount(symbol, weights=-notional - fills["commission"], minlength=m)
+        round_trips = np.bincount(trade_symbols, minlength=m)
+        wins = np.bincount(trade_symbols, weights=trades.pnl > 0, minlength=m)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            win_rate = np.where(round_trips > 0, wins / round_trips * 100, 0.0)
+        return pd.DataFrame({
+            "pnl": pnl,
+            "return_contribution": pnl / self.initial_capital * 100,
+            "round_trips": round_trips,
+            "win_rate": win_rate,
+            "exposure": (holdings > 0).mean(axis=0) * 100 if len(holdings) else np.zeros(m),
+            "turnover": np.bincount(symbol, weights=np.abs(notional), minlength=m) / self.initial_capital,
+            "commission": np.bincount(symbol, weights=fills["commission"], minlength=m),
+        }, index=pd.Index(symbols, name="symbol"))
+
+
+def _forward_fill(prices: np.ndarray) -> np.ndarray:
+    """Carry the last valid price of each column forward over missing bars"""
+    valid = np.isfinite(prices)
+    if valid.all():
+        return prices
+    rows = np.where(valid, np.arange(len(prices))[:, np.newaxis], 0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return np.take_along_axis(prices, rows, axis=0)
+
+
+def _next_valid(valid: np.ndarray) -> np.ndarray:
+    """Per bar and column, the first bar at or after it with a valid price (len(valid) when there is none)"""
+    n = len(valid)
+    rows = np.where(valid, np.arange(n)[:, np.newaxis], n)
+    return np.minimum.accumulate(rows[::-1], axis=0)[::-1]
+
+
+def _long_regime(signals: np.ndarray) -> np.ndarray:
+    """True from each BUY until the next SELL, per column"""
+    rows = np.where(signals != 0, np.arange(len(signals))[:, np.newaxis], -1)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    last = np.take_along_axis(signals, np.maximum(rows, 0), axis=0)
+    return (rows >= 0) & (last == 1)
+
+
+def _round_trips(fills: np.ndarray):
+    """
+    Group fills into flat -> long -> flat round trips per symbol
+
+    Returns:
+        (TradeLedger of round trips, symbol of each round trip). Entry and
+        exit prices are volume-weighted averages of the buys and sells of
+        the trip, quantity its largest holding.
+    """
+    if len(fills) == 0:
+        return TradeLedger(), np.empty(0, dtype=np.int64)
+    order = np.argsort(fills["symbol"], kind="stable")
+    fills = fills[order]
+    symbol = fills["symbol"]
+    quantity = fills["quantity"]
+    held = np.cumsum(quantity)
+    starts = np.flatnonzero(np.r_[True, symbol[1:] != symbol[:-1]])
+    # Per-symbol running holdings: subtract the cumulative total before each symbol's first fill
+    group_offset = np.repeat(held[starts] - quantity[starts], np.diff(np.r_[starts, len(fills)]))
+    held -= group_offset
+    before = held - quantity
+    trip = np.cumsum((before == 0) & (quantity > 0)) - 1
+
+    trips = trip[-1] + 1
+    bought = quantity > 0
+    notional = quantity * fills["price"]
+    cash_flow = -notional - fills["commission"]
+    buy_quantity = np.bincount(trip, weights=np.where(bought, quantity, 0), minlength=trips)
+    sell_quantity = np.bincount(trip, weights=np.where(bought, 0, -quantity), minlength=trips)
+    buy_value = np.bincount(trip, weights=np.where(bought, notional, 0), minlength=trips)
+    sell_value = np.bincount(trip, weights=np.where(bought, 0, -notional), minlength=trips)
+    largest = np.zeros(trips)
+    np.maximum.at(largest, trip, held)
+    first = np.flatnonzero(np.r_[True, trip[1:] != trip[:-1]])
+    last = np.r_[first[1:], len(fills)] - 1
+
+    records = np.empty(trips, dtype=TRADE_DTYPE)
+    records["entry_index"] = fills["bar"][first]
+    records["exit_index"] = fills["bar"][last]
+    records["entry_price"] = buy_value / buy_quantity
+    with np.errstate(invalid="ignore", divide="ignore"):
+        records["exit_price"] = np.where(sell_quantity > 0, sell_value / sell_quantity, np.nan)
+        records["quantity"] = largest
+        records["pnl"] = np.bincount(trip, weights=cash_flow, minlength=trips)
+        records["pnl_percent"] = records["pnl"] / buy_value * 100
+    chronological = np.argsort(records["entry_index"], kind="stable")
+    return TradeLedger.from_records(records[chronological]), symbol[first][chronological]
@@ -0,0 +1,226 @@
+"""Position sizing rules for the portfolio and single-symbol engines"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional, Union
+from app.backtesting.indicators.panel import PanelIndicators
+
+
+class SizingRule:
+    """
+    Target portfolio weights at a rebalance bar.
+
+    The portfolio engine calls prepare() once with the full (bars, symbols)
+    close matrix (and high/low matrices when it has them), so a rule can
+    precompute whatever it needs for every bar with matrix ops, then
+    weights() at each rebalance bar. Weights are fractions of portfolio
+    value, zero for inactive symbols, and sum to at most 1 (the engine
+    does not borrow).
+
+    `fraction` is the weight of a symbol held on its own: a scalar, or a
+    (bars, symbols) matrix set by prepare(). The single-symbol engines read
+    it through entry_fractions() and size each entry as
+    int(cash * fraction / entry price).
+    """
+
+    fraction: Union[float, np.ndarray] = 1.0
+
+    def prepare(self, close: np.ndarray, high: Optional[np.ndarray] = None,
+                low: Optional[np.ndarray] = None) -> None:
+        pass
+
+    def entry_fractions(self, close: np.ndarray, high: Optional[np.ndarray] = None,
+                        low: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Fraction of cash to commit to a single symbol at every bar
+
+        Args:
+            close: float64 close prices, shape (bars,)
+            high: Bar highs (close when omitted)
+            low: Bar lows (close when omitted)
+
+        Returns:
+            float64 fraction per bar, clipped to [0, 1]; 0 where the rule has no value yet
+        """
+        self.prepare(_column(close), _column(high), _column(low))
+        fraction = np.broadcast_to(self.fraction, (len(close), 1))[:, 0]
+        return np.clip(np.nan_to_num(fraction, nan=0.0, posinf=1.0), 0.0, 1.0)
+
+    def weights(self, bar: int, active: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            bar: Bar number of the rebalance
+            active: Boolean mask of symbols whose signal regime is long and that trade on this bar
+
+        Returns:
+            float64 weight per symbol
+        """
+        fraction = self.fraction if np.ndim(self.fraction) == 0 else self.fraction[bar]
+        return _cap_total(np.where(active, np.nan_to_num(fraction), 0.0))
+
+
+class EqualWeight(SizingRule):
+    """
+    Split the book equally between active symbols
+
+    With max_positions, every active symbol gets 1 / max_positions of the
+    book (a fixed number of slots), or 1 / active count once more symbols
+    than slots are active.
+    """
+
+    def __init__(self, max_positions: Optional[int] = None):
+        if max_positions is not None and max_positions < 1:
+            raise ValueError("max_positions must be >= 1")
+        self.max_positions = max_positions
+        self.fraction = 1.0 / (max_positions or 1)
+
+    def weights(self, bar: int, active: np.ndarray) -> np.ndarray:
+        count = int(np.count_nonzero(active))
+        slots = max(count, self.max_positions or 0)
+        return active / slots if slots else np.zeros(len(active))
+
+
+class FixedFraction(SizingRule):
+    """Put a fixed fraction of the book in every active symbol, scaled down when they add up to more than 100%"""
+
+    def __init__(self, fraction: float = 0.1):
+        if not 0 < fraction <= 1:
+            raise ValueError("fraction must be in (0, 1]")
+        self.fraction = fraction
+
+    def weights(self, bar: int, active: np.ndarray) -> np.ndarray:
+        return _cap_total(active * self.fraction)
+
+
+class VolatilityTarget(SizingRule):
+    """
+    Size each active symbol so the book targets an annualized volatility
+
+    Each of the k active symbols gets target / (k * sigma), where sigma is
+    its annualized standard deviation of close-to-close returns over the
+    last `lookback` bars, capped at max_weight. Symbols without a full
+    lookback of returns get no allocation. Volatilities of every bar and
+    symbol are computed once in prepare().
+    """
+
+    def __init__(self, target: float = 0.15, lookback: int = 20, periods_per_year: int = 252,
+                 max_weight: float = 1.0):
+        if target <= 0 or lookback < 2:
+            raise ValueError("target must be > 0 and lookback >= 2")
+        self.target = target
+        self.lookback = lookback
+        self.periods_per_year = periods_per_year
+        self.max_weight = max_weight
+        self.volatility = None
+        self.fraction = None
+
+    def prepare(self, close: np.ndarray, high: Optional[np.ndarray] = None,
+                low: Optional[np.ndarray] = None) -> None:
+        returns = pd.DataFrame(close, copy=False).pct_change(fill_method=None)
+        volatility = returns.rolling(window=self.lookback).std().to_numpy()
+        self.volatility = volatility * np.sqrt(self.periods_per_year)
+        self._set_fraction()
+
+    def _set_fraction(self) -> None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.fraction = np.minimum(self.target / self.volatility, self.max_weight)
+
+    def weights(self, bar: int, active: np.ndarray) -> np.ndarray:
+        count = int(np.count_nonzero(active))
+        if count == 0:
+            return np.zeros(len(active))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights = self.target / (count * self.volatility[bar])
+        weights = np.where(active & np.isfinite(weights), np.minimum(weights, self.max_weight), 0.0)
+        return _cap_total(weights)
+
+
+class ATRVolatilityTarget(VolatilityTarget):
+    """
+    VolatilityTarget with volatility measured by the Average True Range
+
+    Annualized volatility is ATR / close * sqrt(periods_per_year), so gaps
+    and intrabar ranges count, not only close-to-close moves. Without
+    high/low the true range falls back to close-to-close moves.
+    """
+
+    def __init__(self, target: float = 0.15, atr_period: int = 14, periods_per_year: int = 252,
+                 max_weight: float = 1.0):
+        super().__init__(target, max(atr_period, 2), periods_per_year, max_weight)
+        self.atr_period = atr_period
+
+    def prepare(self, close: np.ndarray, high: Optional[np.ndarray] = None,
+                low: Optional[np.ndarray] = None) -> None:
+        atr = _atr(close, high, low, self.atr_period)
+        self.volatility = atr / close * np.sqrt(self.periods_per_year)
+        self._set_fraction()
+
+
+class FixedRisk(SizingRule):
+    """
+    Risk a fixed fraction of the book per position
+
+    The stop is assumed atr_multiple ATRs below the entry, so a position of
+    risk * value / (atr_multiple * ATR) shares loses `risk` of the book
+    when stopped out; its weight is risk * close / (atr_multiple * ATR),
+    capped at max_weight. Pair it with StopRules at the same distance to
+    enforce the assumed stop.
+    """
+
+    def __init__(self, risk: float = 0.01, atr_multiple: float = 2.0, atr_period: int = 14,
+                 max_weight: float = 1.0):
+        if not 0 < risk <= 1 or atr_multiple <= 0:
+            raise ValueError("risk must be in (0, 1] and atr_multiple > 0")
+        self.risk = risk
+        self.atr_multiple = atr_multiple
+        self.atr_period = atr_period
+        self.max_weight = max_weight
+        self.fraction = None
+
+    def prepare(self, close: np.ndarray, high: Optional[np.ndarray] = None,
+                low: Optional[np.ndarray] = None) -> None:
+        atr = _atr(close, high, low, self.atr_period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.fraction = np.minimum(self.risk * close / (self.atr_multiple * atr), self.max_weight)
+
+
+class KellyFraction(SizingRule):
+    """
+    Fractional Kelly sizing from trailing returns, capped
+
+    The continuous-time Kelly weight of a symbol is mean / variance of its
+    bar returns over the last `lookback` bars; the rule holds kelly (e.g.
+    0.5 for half Kelly) of that, clipped to [0, max_weight]. Symbols with a
+    negative trailing edge get no allocation.
+    """
+
+    def __init__(self, lookback: int = 100, kelly: float = 0.5, max_weight: float = 0.5):
+        if lookback < 2 or not 0 < kelly <= 1 or not 0 < max_weight <= 1:
+            raise ValueError("lookback must be >= 2, kelly and max_weight in (0, 1]")
+        self.lookback = lookback
+        self.kelly = kelly
+        self.max_weight = max_weight
+        self.fraction = None
+
+    def prepare(self, close: np.ndarray, high: Optional[np.ndarray] = None,
+                low: Optional[np.ndarray] = None) -> None:
+        returns = pd.DataFrame(close, copy=False).pct_change(fill_method=None).rolling(window=self.lookback)
+        mean, variance = returns.mean().to_numpy(), returns.var().to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.fraction = np.clip(self.kelly * mean / variance, 0.0, self.max_weight)
+
+
+def _atr(close: np.ndarray, high: Optional[np.ndarray], low: Optional[np.ndarray], period: int) -> np.ndarray:
+    """ATR of every column, with close standing in for missing highs and lows"""
+    return PanelIndicators.atr(close if high is None else high, close if low is None else low, close, period)
+
+
+def _column(values: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """One-symbol (bars, 1) matrix view of a price array"""
+    return None if values is None else np.asarray(values, dtype=np.float64)[:, np.newaxis]
+
+
+def _cap_total(weights: np.ndarray) -> np.ndarray:
+    """Scale weights down proportionally when they sum to more than 1"""
+    total = weights.sum()
+    return weights / total if total > 1 else weights
@@ -0,0 +1,187 @@
+"""Bar-by-bar backtesting engine for live feeds and replays"""
+
+import math
+import pandas as pd
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from app.backtesting.engine.backtest import BacktestMetrics
+from app.backtesting.engine.execution import ExecutionCore, PositionState
+
+
+class RunningMetrics:
+    """
+    Constant-memory versions of the BacktestEngine metrics.
+
+    Returns feed a Welford mean/variance, drawdown tracks the running peak
+    and trades only update counters. The previous bar's state is kept so
+    the last equity value can be revised when a position is closed out.
+    """
+
+    def __init__(self, initial_capital: float, risk_free_rate: float = 0.02):
+        self.initial_capital = initial_capital
+        self.risk_free_rate = risk_free_rate
+        self._equity_state = (0, 0.0, 0.0, -math.inf, 0.0, math.nan)
+        self._previous_equity_state = self._equity_state
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.total_profit = 0.0
+        self.total_loss = 0.0
+        self.pnl_sum = 0.0
+        self.best_trade = -math.inf
+        self.worst_trade = math.inf
+
+    def update_equity(self, equity: float) -> None:
+        """Add the equity of a new bar"""
+        self._previous_equity_state = self._equity_state
+        self._equity_state = self._advance(self._equity_state, equity)
+
+    def revise_last_equity(self, equity: float) -> None:
+        """Replace the equity of the latest bar"""
+        self._equity_state = self._advance(self._previous_equity_state, equity)
+
+    @staticmethod
+    def _advance(state: Tuple, equity: float) -> Tuple:
+        count, mean, m2, peak, min_drawdown, last = state
+        if last == last:
+            ret = (equity - last) / last
+            count += 1
+            delta = ret - mean
+            mean += delta / count
+            m2 += delta * (ret - mean)
+        peak = max(peak, equity)
+        min_drawdown = min(min_drawdown, (equity - peak) / peak)
+        return count, mean, m2, peak, min_drawdown, equity
+
+    def add_trade(self, pnl: float) -> None:
+        """Add a closed trade"""
+        self.total_trades += 1
+        self.pnl_sum += pnl
+        if pnl > 0:
+            self.winning_trades += 1
+            self.total_profit += pnl
+        elif pnl < 0:
+            self.losing_trades += 1
+            self.total_loss += -pnl
+        self.best_trade = max(self.best_trade, pnl)
+        self.worst_trade = min(self.worst_trade, pnl)
+
+    @property
+    def equity(self) -> float:
+        return self._equity_state[5]
+
+    def to_metrics(self) -> BacktestMetrics:
+        """Snapshot as BacktestMetrics"""
+        count, mean, m2, _, min_drawdown, equity = self._equity_state
+        total_return = equity - self.initial_capital
+        std = math.sqrt(m2 / count) if count else 0.0
+        sharpe = (mean - self.risk_free_rate / 252) / std * math.sqrt(252) if std > 0 else 0
+        has_trades = self.total_trades > 0
+        return BacktestMetrics(
+            total_return=total_return,
+            roi=(total_return / self.initial_capital) * 100,
+            sharpe_ratio=sharpe,
+            max_drawdown=min_drawdown * 100,
+            win_rate=(self.winning_trades / self.total_trades) * 100 if has_trades else 0,
+            profit_factor=self.total_profit / self.total_loss if self.total_loss > 0 else 0,
+            total_trades=self.total_trades,
+            winning_trades=self.winning_trades,
+            losing_trades=self.losing_trades,
+            average_trade=self.pnl_sum / self.total_trades if has_trades else 0,
+            best_trade=self.best_trade if has_trades else 0,
+            worst_trade=self.worst_trade if has_trades else 0,
+        )
+
+
+class StreamingEngine:
+    """Incremental engine: position, cash, equity and metrics advance in O(1) per bar"""
+
+    def __init__(self, strategy, initial_capital: float = 10000.0, commission: float = 0.001, slippage: float = 0.0):
+        """
+        Initialize streaming engine
+
+        Args:
+            strategy: IncrementalStrategy with an on_bar method
+            initial_capital: Starting capital
+            commission: Commission per trade (0.001 = 0.1%)
+            slippage: Price slippage percentage
+        """
+        self.strategy = strategy
+        self.initial_capital = initial_capital
+        self.core = ExecutionCore(initial_capital, commission, slippage)
+        self.state = PositionState(cash=initial_capital)
+        self.metrics = RunningMetrics(initial_capital)
+        self.trades: List[Dict[str, Any]] = []
+        self.bar_count = 0
+        self.last_close = math.nan
+        self.last_timestamp = None
+        self.entry_timestamp = None
+
+    @property
+    def equity(self) -> float:
+        """Mark-to-market equity after the latest bar"""
+        return self.metrics.equity
+
+    def on_bar(self, bar: Mapping[str, float], timestamp: Any = None) -> int:
+        """
+        Consume one bar
+
+        Args:
+            bar: Mapping with at least a 'close' price
+            timestamp: Bar timestamp, stored on trades
+
+        Returns:
+            Signal emitted by the strategy for this bar
+        """
+        signal = self.strategy.on_bar(bar)
+        price = float(bar["close"])
+        index = self.bar_count
+        record = self.core.apply_signal(self.state, index, price, signal)
+        if record is not None:
+            self._record_trade(record, timestamp)
+        elif self.state.position > 0 and self.state.entry_index == index:
+            self.entry_timestamp = timestamp
+
+        if self.state.position > 0:
+            self.metrics.update_equity(self.state.cash + self.state.position * price)
+        else:
+            self.metrics.update_equity(self.state.cash)
+
+        self.bar_count += 1
+        self.last_close = price
+        self.last_timestamp = timestamp
+        return signal
+
+    def finish(self) -> BacktestMetrics:
+        """Close any open position at the last close, as the batch engine does"""
+        if self.state.position > 0:
+            record, final_equity = self.core.close_out(self.state, self.bar_count - 1, self.last_close)
+            self._record_trade(record, self.last_timestamp)
+            self.state.position = 0
+            self.metrics.revise_last_equity(final_equity)
+        return self.metrics.to_metrics()
+
+    def replay(self, data: pd.DataFrame) -> Tuple[BacktestMetrics, Dict[str, Any]]:
+        """Feed a historical frame bar by bar; returns the same shape as BacktestEngine.run_backtest"""
+        columns = [c for c in ("open", "high", "low", "close", "volume") if c in data.columns]
+        equity = []
+        for timestamp, *values in data[columns].itertuples(name=None):
+            self.on_bar(dict(zip(columns, values)), timestamp)
+            equity.append(self.equity)
+        metrics = self.finish()
+        if equity:
+            equity[-1] = self.equity
+        return metrics, {"trades": self.trades, "equity_curve": equity, "timestamps": data.index.tolist()}
+
+    def _record_trade(self, record, exit_timestamp) -> None:
+        _, _, entry_price, exit_price, quantity, pnl, pnl_percent = record
+        self.trades.append({
+            "entry_date": self.entry_timestamp,
+            "entry_price": entry_price,
+            "exit_date": exit_timestamp,
+            "exit_price": exit_price,
+            "quantity": quantity,
+            "side": "BUY",
+            "pnl": pnl,
+            "pnl_percent": pnl_percent,
+        })
+        self.metrics.add_trade(pnl)
@@ -0,0 +1,458 @@
+"""Batched parameter-sweep execution"""
+
+import itertools
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, fields
+from app.backtesting.engine.backtest import BacktestMetrics
+from app.backtesting.engine.costs import CostModel, Fills, apply_costs
+from app.backtesting.engine.execution import DIRECTIONS, AbortRules, ExecutionCore
+from app.backtesting.engine.ledger import TRADE_DTYPE
+from app.backtesting.engine.sizing import SizingRule
+
+METRIC_FIELDS = [f.name for f in fields(BacktestMetrics)]
+
+
+def parameter_grid(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    """Expand {"fast_period": [5, 10], "slow_period": [20, 50]} into a list of parameter dicts"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+@dataclass
+class SweepResult:
+    """Columnar BacktestMetrics, one entry per parameter set"""
+    metrics: Dict[str, np.ndarray]
+    parameters: Optional[List[Dict[str, Any]]] = None
+    aborted_at: Optional[np.ndarray] = None  # abort bar per column, -1 = ran to the end
+
+    @classmethod
+    def from_core(cls, output: Dict[str, np.ndarray],
+                  parameters: Optional[List[Dict[str, Any]]] = None) -> "SweepResult":
+        """Wrap SweepCore.run output, which carries 'aborted_at' when abort rules were set"""
+        metrics = dict(output)
+        return cls(metrics=metrics, parameters=parameters, aborted_at=metrics.pop("aborted_at", None))
+
+    def __len__(self) -> int:
+        return len(self.metrics["roi"])
+
+    def __getitem__(self, column: int) -> BacktestMetrics:
+        """Metrics of a single parameter set"""
+        values = {}
+        for name in METRIC_FIELDS:
+            value = self.metrics[name][column]
+            values[name] = int(value) if name.endswith("trades") else float(value)
+        return BacktestMetrics(**values)
+
+    @property
+    def completed(self) -> np.ndarray:
+        """Boolean mask of the columns no abort rule stopped"""
+        if self.aborted_at is None:
+            return np.ones(len(self), dtype=bool)
+        return self.aborted_at < 0
+
+    def best(self, metric: str = "sharpe_ratio", maximize: bool = True) -> int:
+        """Column index of the best parameter set by `metric`, preferring columns that ran to the end"""
+        values = self.metrics[metric]
+        if self.aborted_at is not None and self.completed.any():
+            values = np.where(self.completed, values, -np.inf if maximize else np.inf)
+        return int(np.argmax(values) if maximize else np.argmin(values))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Metrics table, with parameter columns when parameters are known"""
+        frame = pd.DataFrame(self.metrics)
+        if self.aborted_at is not None:
+            frame["aborted_at"] = self.aborted_at
+        if self.parameters is not None:
+            frame = pd.concat([pd.DataFrame(self.parameters), frame], axis=1)
+        return frame
+
+    @classmethod
+    def concat(cls, results: Sequence["SweepResult"]) -> "SweepResult":
+        """Join results computed for consecutive parameter chunks"""
+        metrics = {name: np.concatenate([r.metrics[name] for r in results]) for name in METRIC_FIELDS}
+        parameters = None
+        if all(r.parameters is not None for r in results):
+            parameters = [p for r in results for p in r.parameters]
+        aborted_at = None
+        if any(r.aborted_at is not None for r in results):
+            aborted_at = np.concatenate([np.full(len(r), -1, dtype=np.int64) if r.aborted_at is None
+                                         else r.aborted_at for r in results])
+        return cls(metrics=metrics, parameters=parameters, aborted_at=aborted_at)
+
+
+class SweepCore:
+    """
+    Long-only execution of many signal columns over one price series.
+
+    Each column follows the same rules as ExecutionCore: the position
+    regime comes from the last non-zero signal, so entries and exits of
+    every column are found with whole-matrix ops. Only the cash hand-off
+    between consecutive trades is sequential, and that loop runs once per
+    trade number across all columns at once. Columns are processed in
+    blocks so the bars x columns temporaries stay within `max_cells`.
+
+    A rejected entry (not enough cash for one share) lets the per-bar
+    engine retry on the next BUY bar, which the regime view cannot see;
+    the few columns where that happens are re-run on ExecutionCore.
+
+    With `abort` rules, the first breaching bar of every column is found on
+    the equity matrix; the aborted columns are re-run on ExecutionCore with
+    the same rules, so their metrics cover the run up to the abort bar.
+
+    run_costs charges several cost models on the same simulated positions:
+    the fills of a whole block go to each model in one call, and the paid
+    costs are spread back onto the equity matrix with one bincount.
+
+    With a `sizing` rule, the fraction of cash committed at every bar is
+    computed once per sweep and gathered at each trade number's entry bars
+    for all columns at once.
+
+    `direction` follows ExecutionCore: the held side is the last non-zero
+    signal, so a stop-and-reverse is the end of one trade and the start of
+    the next on the same bar, and short and long_short sweeps run through
+    the same matrix ops as long-only ones.
+    """
+
+    def __init__(self, initial_capital: float = 10000.0, commission: float = 0.001,
+                 slippage: float = 0.0, max_cells: int = 1 << 22, abort: Optional[AbortRules] = None,
+                 sizing: Optional[SizingRule] = None, direction: str = "long", borrow_rate: float = 0.0,
+                 periods_per_year: int = 252):
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction: {direction}")
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.slippage = slippage
+        self.max_cells = max_cells
+        self.abort = abort
+        self.sizing = sizing
+        self.direction = direction
+        self.borrow_rate = borrow_rate
+        self.periods_per_year = periods_per_year
+        self._borrow_per_bar = borrow_rate / periods_per_year
+
+    def run(self, close: np.ndarray, signals: np.ndarray, high: Optional[np.ndarray] = None,
+            low: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Simulate every column of `signals` against `close`
+
+        Args:
+            close: float64 close prices, shape (bars,)
+            signals: int8 signals, shape (bars, parameter sets)
+            high: Bar highs for the sizing rule (close when omitted)
+            low: Bar lows for the sizing rule (close when omitted)
+
+        Returns:
+            Dict of BacktestMetrics field name -> array with one value per column,
+            plus 'aborted_at' (abort bar, -1 = ran to the end) when abort rules are set
+        """
+        return self._run(close, signals, (None,), (high, low))[0]
+
+    def run_costs(self, close: np.ndarray, signals: np.ndarray, models: Sequence[CostModel],
+                  high: Optional[np.ndarray] = None, low: Optional[np.ndarray] = None) -> List[Dict[str, np.ndarray]]:
+        """
+        Simulate every column of `signals` once and charge each cost model on its fills
+
+        Args:
+            close: float64 close prices, shape (bars,)
+            signals: int8 signals, shape (bars, parameter sets)
+            models: Cost models already prepared with the bars of `close`
+            high: Bar highs for the sizing rule (close when omitted)
+            low: Bar lows for the sizing rule (close when omitted)
+
+        Returns:
+            One metrics dict (as returned by run) per model
+        """
+        if self.abort is not None:
+            raise ValueError("abort rules cannot be combined with cost models")
+        return self._run(close, signals, models, (high, low))
+
+    def _run(self, close: np.ndarray, signals: np.ndarray, models: Sequence[Optional[CostModel]],
+             prices: Tuple[Optional[np.ndarray], Optional[np.ndarray]] = (None, None)) -> List[Dict[str, np.ndarray]]:
+        n, m = signals.shape
+        if n != len(close):
+            raise ValueError("signals must have one row per bar")
+        fractions = self.sizing.entry_fractions(close, *prices) if self.sizing is not None else None
+
+        outputs = []
+        for _ in models:
+            out = {name: np.zeros(m, dtype=np.int64 if name.endswith("trades") else np.float64)
+                   for name in METRIC_FIELDS}
+            if self.abort is not None:
+                out["aborted_at"] = np.full(m, -1, dtype=np.int64)
+            outputs.append(out)
+        block = max(1, self.max_cells // max(n, 1))
+        for start in range(0, m, block):
+            stop = min(start + block, m)
+            block_signals = np.ascontiguousarray(signals[:, start:stop].T)
+            for out, metrics in zip(outputs, self._run_block(close, block_signals, models, fractions, prices)):
+                for name, values in metrics.items():
+                    out[name][start:stop] = values
+        return outputs
+
+    def _run_block(self, close: np.ndarray, signals: np.ndarray, models: Sequence[Optional[CostModel]] = (None,),
+                   fractions: Optional[np.ndarray] = None,
+                   prices: Tuple[Optional[np.ndarray], Optional[np.ndarray]] = (None, None)
+                   ) -> List[Dict[str, np.ndarray]]:
+        """Simulate a (columns, bars) block of signals, returning metrics per cost model (None = no model)"""
+        b, n = signals.shape
+
+        # Held side per bar: the last non-zero signal, restricted to the sides the direction allows
+        last = np.where(signals != 0, np.arange(n), -1)
+        np.maximum.accumulate(last, axis=1, out=last)
+        regime = np.take_along_axis(signals, np.maximum(last, 0), axis=1)
+        regime[last < 0] = 0
+        del last
+        if self.direction == "long":
+            regime = (regime == 1).astype(np.int8)
+        elif self.direction == "short":
+            regime = -(regime == -1).astype(np.int8)
+        previous = np.zeros_like(regime)
+        previous[:, 1:] = regime[:, :-1]
+        changed = regime != previous
+        starts = changed & (regime != 0)
+        ends = changed & (previous != 0)
+        del previous, changed
+
+        # Trade k of a row runs from its k-th start to its k-th end; a reversal ends k and starts k+1 on one bar
+        start_row, start_bar = np.nonzero(starts)
+        end_row, end_bar = np.nonzero(ends)
+        start_rank = _row_rank(start_row, b)
+        end_rank = _row_rank(end_row, b)
+        n_slots = int(start_rank.max()) + 1 if len(start_rank) else 0
+        entry_bar = np.full((b, n_slots), -1, dtype=np.int64)
+        exit_bar = np.full((b, n_slots), n - 1, dtype=np.int64)
+        side = np.zeros((b, n_slots), dtype=np.int8)
+        entry_bar[start_row, start_rank] = start_bar
+        side[start_row, start_rank] = regime[start_row, start_bar]
+        exit_bar[end_row, end_rank] = end_bar
+        closed_by_signal = np.zeros((b, n_slots), dtype=bool)
+        closed_by_signal[end_row, end_rank] = True
+        del regime, start_row, start_bar, end_row, end_bar, start_rank, end_rank
+
+        # Segment table: 0 = initial flat, 2k+1 = after entry k, 2k+2 = after exit k
+        seg_cash = np.empty((b, 2 * n_slots + 1))
+        seg_qty = np.zeros((b, 2 * n_slots + 1))
+        pnl = np.full((b, n_slots), np.nan)
+        cash = np.full(b, float(self.initial_capital))
+        seg_cash[:, 0] = cash
+        final_equity = np.full(b, np.nan)
+        rejected = np.zeros(b, dtype=bool)
+        opened = np.zeros((b, n_slots), dtype=bool)
+        slot_qty = np.zeros((b, n_slots))
+
+        # Fill prices and per-share amounts do not depend on cash, so only sizing is left to the slot loop
+        slot_entry_price = close[np.maximum(entry_bar, 0)] * (1 + side * self.slippage)
+        slot_exit_price = close[exit_bar] * (1 - side * self.slippage)
+        entry_fraction = None if fractions is None else fractions[np.maximum(entry_bar, 0)]
+        shorting = self.direction != "long"
+        accrues = shorting and bool(self.borrow_rate)
+        if shorting:
+            short = side < 0
+            # A short's cash column holds cash - 2 * position * entry price so it marks at cash + qty * close
+            carry = np.where(short, 2 * slot_entry_price, 0.0)
+            worth_per_share = np.where(short, 2 * slot_entry_price - slot_exit_price, slot_exit_price)
+            if accrues:
+                fee_rate = np.where(short, self._borrow_per_bar, 0.0)
+                held_bars = exit_bar - entry_bar
+                slot_fee = np.zeros((b, n_slots))  # borrow fee per bar while short
+
+        for k in range(n_slots):
+            valid = entry_bar[:, k] >= 0
+            sign = side[:, k]
+            entry_price = slot_entry_price[:, k]
+            exit_price = slot_exit_price[:, k]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if entry_fraction is None:
+                    quantity = np.trunc(cash / entry_price)
+                else:
+                    quantity = np.trunc(cash * entry_fraction[:, k] / entry_price)
+            traded = valid & (quantity > 0)
+            rejected |= valid & ~traded
+            quantity = np.where(traded, quantity, 0.0)
+            opened[:, k] = traded
+
+            position_value = quantity * entry_price
+            cash_in = np.where(traded, cash - position_value, cash)
+            gross_pnl = sign * (exit_price - entry_price) * quantity
+            commission_cost = (position_value + quantity * exit_price) * self.commission
+            if shorting:
+                seg_cash[:, 2 * k + 1] = cash_in + quantity * carry[:, k]
+                worth = quantity * worth_per_share[:, k]
+            else:
+                seg_cash[:, 2 * k + 1] = cash_in
+                worth = quantity * exit_price
+            borrow = 0.0
+            if accrues:
+                slot_fee[:, k] = fee_rate[:, k] * position_value
+                borrow = slot_fee[:, k] * held_bars[:, k]
+                commission_cost = commission_cost + borrow
+            net_pnl = gross_pnl - commission_cost
+
+            slot_qty[:, k] = sign * quantity
+            pnl[:, k] = np.where(traded, net_pnl, np.nan)
+
+            at_end = traded & ~closed_by_signal[:, k]
+            final_equity[at_end] = (cash_in + worth - borrow)[at_end]
+            cash = np.where(traded & closed_by_signal[:, k], cash_in + (worth + net_pnl), cash)
+            seg_cash[:, 2 * k + 2] = cash
+        seg_qty[:, 1::2] = slot_qty
+
+        # Mark to market from the segment tables
+        segment = np.cumsum(np.add(starts, ends, dtype=np.int8), axis=1, dtype=np.int64)
+        del starts, ends
+        equity_cash = np.take_along_axis(seg_cash, segment, axis=1)
+        equity_qty = np.take_along_axis(seg_qty, segment, axis=1)
+        equity = np.where(equity_qty != 0, equity_cash + equity_qty * close, equity_cash)
+        del equity_cash, equity_qty
+        if accrues:
+            seg_fee = np.zeros((b, 2 * n_slots + 1))
+            seg_fee[:, 1::2] = slot_fee
+            seg_entry = np.zeros((b, 2 * n_slots + 1), dtype=np.int64)
+            seg_entry[:, 1::2] = entry_bar
+            held = np.arange(n) - np.take_along_axis(seg_entry, segment, axis=1)
+            equity -= np.take_along_axis(seg_fee, segment, axis=1) * held
+            del held, seg_fee, seg_entry
+        del segment
+        exact = rejected
+        if self.abort is not None:
+            aborted_at = self._first_abort(equity, entry_bar, opened)
+            exact = rejected | (aborted_at >= 0)
+        open_at_end = ~np.isnan(final_equity)
+        equity[open_at_end, -1] = final_equity[open_at_end]
+
+        results = []
+        for model in models:
+            if model is None:
+                metrics = self._equity_metrics(equity)
+                metrics.update(self._trade_metrics(pnl))
+            else:
+                metrics = self._charged_metrics(model, equity, pnl, opened, entry_bar, exit_bar,
+                                                slot_qty, slot_entry_price, slot_exit_price)
+            if self.abort is not None:
+                metrics["aborted_at"] = aborted_at
+            results.append(metrics)
+        for row in np.flatnonzero(exact):
+            for metrics, exact_metrics in zip(results, self._run_exact(close, signals[row], models, prices)):
+                for name, values in exact_metrics.items():
+                    metrics[name][row] = values[0]
+        return results
+
+    def _charged_metrics(self, model: CostModel, equity: np.ndarray, pnl: np.ndarray, opened: np.ndarray,
+                         entry_bar: np.ndarray, exit_bar: np.ndarray, quantity: np.ndarray,
+                         entry_price: np.ndarray, exit_price: np.ndarray) -> Dict[str, np.ndarray]:
+        """Metrics of a block after charging one cost model on all of its fills in one call"""
+        b, n = equity.shape
+        row, slot = np.nonzero(opened)
+        trades = np.zeros(len(row), dtype=TRADE_DTYPE)
+        trades["entry_index"] = entry_bar[row, slot]
+        trades["exit_index"] = exit_bar[row, slot]
+        trades["entry_price"] = entry_price[row, slot]
+        trades["exit_price"] = exit_price[row, slot]
+        trades["quantity"] = quantity[row, slot]
+        fills = Fills.from_trades(trades, run=row)
+        costs = model.fill_costs(fills)
+
+        paid = np.bincount(fills.run * n + fills.bar, weights=costs, minlength=b * n).reshape(b, n)
+        net_equity = equity - np.cumsum(paid, axis=1)
+        del paid
+        net_pnl = pnl.copy()
+        net_pnl[row, slot] -= costs[:len(row)] + costs[len(row):]
+
+        metrics = self._equity_metrics(net_equity)
+        metrics.update(self._trade_metrics(net_pnl))
+        return metrics
+
+    def _first_abort(self, equity: np.ndarray, entry_bar: np.ndarray, opened: np.ndarray) -> np.ndarray:
+        """First bar breaking an abort rule per row of a marked-to-market equity matrix, -1 = none"""
+        rules = self.abort
+        n = equity.shape[1]
+        breach = np.zeros(equity.shape, dtype=bool)
+        if rules.max_drawdown is not None:
+            running_max = np.maximum.accumulate(equity, axis=1)
+            breach |= (equity - running_max) / running_max * 100 < -rules.max_drawdown
+            del running_max
+        if rules.equity_floor is not None:
+            breach |= equity < rules.equity_floor
+        first = np.where(breach.any(axis=1), np.argmax(breach, axis=1), -1)
+        if rules.min_trades_by is not None and rules.min_trades_by < n:
+            entries = (opened & (entry_bar <= rules.min_trades_by)).sum(axis=1)
+            short = entries < rules.min_trades
+            first = np.where(short & ((first < 0) | (first > rules.min_trades_by)), rules.min_trades_by, first)
+        return first
+
+    def _run_exact(self, close: np.ndarray, signal: np.ndarray, models: Sequence[Optional[CostModel]] = (None,),
+                   prices: Tuple[Optional[np.ndarray], Optional[np.ndarray]] = (None, None)
+                   ) -> List[Dict[str, np.ndarray]]:
+        """Metrics of one column from the per-bar execution core, per cost model"""
+        core = ExecutionCore(self.initial_capital, self.commission, self.slippage, abort=self.abort,
+                             sizing=self.sizing, direction=self.direction, borrow_rate=self.borrow_rate,
+                             periods_per_year=self.periods_per_year)
+        result = core.execute(close, signal, *prices)
+        results = []
+        for model in models:
+            equity, records = result.equity, result.trades.records
+            if model is not None:
+                equity, records = apply_costs(equity, records, model)
+            metrics = self._equity_metrics(equity[np.newaxis, :])
+            metrics.update(self._trade_metrics(records["pnl"].reshape(1, -1)))
+            if self.abort is not None:
+                metrics["aborted_at"] = np.array([-1 if result.aborted_at is None else result.aborted_at])
+            results.append(metrics)
+        return results
+
+    def _equity_metrics(self, equity: np.ndarray) -> Dict[str, np.ndarray]:
+        """Return, Sharpe and drawdown per row of an equity matrix"""
+        total_return = equity[:, -1] - self.initial_capital
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(equity, axis=1) / equity[:, :-1]
+            if returns.shape[1]:
+                std = np.std(returns, axis=1)
+                excess = returns - (0.02 / 252)
+                sharpe = np.mean(excess, axis=1) / np.std(excess, axis=1) * np.sqrt(252)
+            else:
+                std = sharpe = np.zeros(len(equity))
+            running_max = np.maximum.accumulate(equity, axis=1)
+            max_drawdown = np.min((equity - running_max) / running_max, axis=1) * 100
+        sharpe = np.where(std == 0, 0.0, sharpe)
+        return {
+            "total_return": total_return,
+            "roi": (total_return / self.initial_capital) * 100,
+            "sharpe_ratio": sharpe,
+            "max_drawdown": max_drawdown,
+        }
+
+    @staticmethod
+    def _trade_metrics(pnl: np.ndarray) -> Dict[str, np.ndarray]:
+        """Trade statistics per row of a (columns, trade slot) pnl table, NaN = no trade"""
+        traded = ~np.isnan(pnl)
+        total = traded.sum(axis=1)
+        wins = pnl > 0
+        losses = pnl < 0
+        winning = wins.sum(axis=1)
+        losing = losses.sum(axis=1)
+        total_profit = np.where(wins, pnl, 0.0).sum(axis=1)
+        total_loss = np.abs(np.where(losses, pnl, 0.0).sum(axis=1))
+        has_trades = total > 0
+        safe_total = np.maximum(total, 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            profit_factor = np.where(total_loss > 0, total_profit / total_loss, 0.0)
+        best = np.where(traded, pnl, -np.inf).max(axis=1, initial=-np.inf)
+        worst = np.where(traded, pnl, np.inf).min(axis=1, initial=np.inf)
+        return {
+            "win_rate": np.where(has_trades, winning / safe_total * 100, 0.0),
+            "profit_factor": profit_factor,
+            "total_trades": total,
+            "winning_trades": winning,
+            "losing_trades": losing,
+            "average_trade": np.where(has_trades, np.where(traded, pnl, 0.0).sum(axis=1) / safe_total, 0.0),
+            "best_trade": np.where(has_trades, best, 0.0),
+            "worst_trade": np.where(has_trades, worst, 0.0),
+        }
+
+
+def _row_rank(rows: np.ndarray, n_rows: int) -> np.ndarray:
+    """Position of each entry among the entries of its row, for row numbers sorted ascending"""
+    counts = np.bincount(rows, minlength=n_rows)
+    return np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
@@ -0,0 +1,250 @@
+"""Walk-forward optimization over signals computed once for the full history"""
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple, Type
+from app.backtesting.engine.backtest import BacktestEngine, BacktestMetrics
+from app.backtesting.engine.execution import ExecutionCore
+from app.backtesting.engine.ledger import TradeLedger
+from app.backtesting.engine.sweep import METRIC_FIELDS, SweepCore, SweepResult
+
+
+@dataclass
+class FoldResult:
+    """One in-sample optimization and its out-of-sample run"""
+    train: Tuple[int, int]  # [start, stop) bar positions
+    test: Tuple[int, int]
+    best: int  # column of the chosen parameter set
+    parameters: Optional[Dict[str, Any]]
+    in_sample: BacktestMetrics
+    out_of_sample: BacktestMetrics
+
+
+@dataclass
+class WalkForwardResult:
+    """Out-of-sample equity of every fold stitched into one curve"""
+    folds: List[FoldResult]
+    equity: np.ndarray
+    index: pd.Index
+    trades: TradeLedger = field(default_factory=TradeLedger)  # bar positions refer to the full history
+    metrics: Optional[BacktestMetrics] = None
+    full_index: Optional[pd.Index] = None  # labels of the full history, for to_frame
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per fold: bar ranges, chosen parameters and in/out-of-sample ROI and Sharpe"""
+        rows = []
+        for fold in self.folds:
+            row = {
+                "train_start": self.index_of(fold.train[0]), "test_start": self.index_of(fold.test[0]),
+                "test_stop": self.index_of(fold.test[1] - 1),
+            }
+            row.update(fold.parameters or {"column": fold.best})
+            row.update({
+                "in_sample_roi": fold.in_sample.roi, "in_sample_sharpe": fold.in_sample.sharpe_ratio,
+                "out_of_sample_roi": fold.out_of_sample.roi, "out_of_sample_sharpe": fold.out_of_sample.sharpe_ratio,
+            })
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def index_of(self, bar: int) -> Any:
+        """Label of a full-history bar position"""
+        return self.full_index[bar] if self.full_index is not None else bar
+
+
+class WalkForwardRunner:
+    """
+    Rolling in-sample optimization with out-of-sample evaluation
+
+    The strategy's signal_matrix is computed once over the full history for
+    every parameter set, so indicators warm up on all prior bars and are
+    never recomputed for overlapping windows. Each fold then works on row
+    slices (views) of that matrix: the in-sample window is swept with
+    SweepCore and the best column by `metric` is run on the following
+    out-of-sample window with ExecutionCore. Out-of-sample windows are
+    consecutive and do not overlap; each starts flat with the equity the
+    previous one ended with and closes its position on its last bar.
+
+    With max_workers > 1 the in-sample sweeps run on a process pool; the
+    close prices and signal matrix are placed once in shared memory and
+    workers slice them in place.
+    """
+
+    def __init__(self, train_size: int, test_size: int, initial_capital: float = 10000.0,
+                 commission: float = 0.001, slippage: float = 0.0, anchored: bool = False,
+                 metric: str = "sharpe_ratio", maximize: bool = True, max_workers: int = 1):
+        """
+        Args:
+            train_size: In-sample bars per fold (the first fold's when anchored)
+            test_size: Out-of-sample bars per fold, also the step between folds
+            anchored: Grow the in-sample window from the first bar instead of rolling it
+            metric: BacktestMetrics field used to pick the in-sample winner
+            maximize: Pick the largest value of metric (False for e.g. max_drawdown magnitude)
+            max_workers: Processes for the in-sample sweeps (None = CPU count)
+        """
+        if train_size < 2 or test_size < 1:
+            raise ValueError("train_size must be >= 2 and test_size >= 1")
+        if metric not in METRIC_FIELDS:
+            raise ValueError(f"Unknown metric: {metric}")
+        self.train_size = train_size
+        self.test_size = test_size
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.slippage = slippage
+        self.anchored = anchored
+        self.metric = metric
+        self.maximize = maximize
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def folds(self, n_bars: int) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """((train start, train stop), (test start, test stop)) bar ranges of every fold"""
+        folds = []
+        test_start = self.train_size
+        while test_start < n_bars:
+            train_start = 0 if self.anchored else test_start - self.train_size
+            folds.append(((train_start, test_start), (test_start, min(test_start + self.test_size, n_bars))))
+            test_start += self.test_size
+        return folds
+
+    def run(self, data: pd.DataFrame, strategy_class: Type,
+            parameter_sets: List[Dict[str, Any]]) -> WalkForwardResult:
+        """
+        Walk forward over data
+
+        Args:
+            data: DataFrame with OHLCV data
+            strategy_class: BaseStrategy subclass
+            parameter_sets: Candidate parameters dicts
+
+        Returns:
+            WalkForwardResult with per-fold choices and the stitched out-of-sample run
+        """
+        signals = strategy_class.signal_matrix(data, parameter_sets)
+        result = self.run_signals(data["close"].to_numpy(dtype=np.float64), signals, parameter_sets)
+        result.full_index = data.index
+        result.index = data.index[result.folds[0].test[0]:] if result.folds else data.index[:0]
+        return result
+
+    def run_signals(self, close: np.ndarray, signals: np.ndarray,
+                    parameter_sets: Optional[List[Dict[str, Any]]] = None) -> WalkForwardResult:
+        """
+        Walk forward over a precomputed (bars, parameter sets) signal matrix
+
+        Args:
+            close: float64 close prices
+            signals: Signals of every parameter set, e.g. from signal_matrix
+            parameter_sets: Optional parameters dict per column, reported per fold
+        """
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        if signals.ndim != 2 or len(signals) != len(close):
+            raise ValueError("signals must have shape (bars, parameter sets)")
+        folds = self.folds(len(close))
+        engine_args = (self.initial_capital, self.commission, self.slippage)
+
+        if self.max_workers > 1 and len(folds) > 1:
+            with _SharedSignals.create(close, signals) as shared:
+                with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                         initargs=(shared.spec,)) as pool:
+                    sweeps = list(pool.map(_optimize_shared, [train for train, _ in folds],
+                                           [engine_args] * len(folds)))
+        else:
+            sweeps = [_optimize(close, signals, train, engine_args) for train, _ in folds]
+
+        capital = self.initial_capital
+        pieces, results = [], []
+        trades = TradeLedger()
+        for (train, test), sweep in zip(folds, sweeps):
+            best = sweep.best(self.metric, self.maximize)
+            core = ExecutionCore(capital, self.commission, self.slippage)
+            run = core.execute(close[test[0]:test[1]], np.ascontiguousarray(signals[test[0]:test[1], best]))
+            records = run.trades.records.copy()
+            records["entry_index"] += test[0]
+            records["exit_index"] += test[0]
+            trades.extend(records)
+            results.append(FoldResult(
+                train=train, test=test, best=best,
+                parameters=parameter_sets[best] if parameter_sets is not None else None,
+                in_sample=sweep[best],
+                out_of_sample=self._metrics(capital, run.equity, run.trades),
+            ))
+            pieces.append(run.equity)
+            capital = run.equity[-1]
+
+        equity = np.concatenate(pieces) if pieces else np.empty(0)
+        start = folds[0][1][0] if folds else len(close)
+        return WalkForwardResult(
+            folds=results, equity=equity, index=pd.RangeIndex(start, len(close)), trades=trades,
+            metrics=self._metrics(self.initial_capital, equity, trades) if len(equity) else None,
+        )
+
+    def _metrics(self, capital: float, equity: np.ndarray, trades: TradeLedger) -> BacktestMetrics:
+        engine = BacktestEngine(capital, self.commission, self.slippage)
+        engine.trades = trades
+        return engine._calculate_metrics(equity)
+
+
+def _optimize(close: np.ndarray, signals: np.ndarray, train: Tuple[int, int],
+              engine_args: Tuple[float, float, float]) -> SweepResult:
+    """Sweep every parameter set over the in-sample rows of the full-history arrays"""
+    start, stop = train
+    core = SweepCore(*engine_args)
+    return SweepResult(metrics=core.run(close[start:stop], signals[start:stop]))
+
+
+class _SharedSignals:
+    """Close prices and an int8 signal matrix in one shared memory block, mirroring SharedOHLCV"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, spec: Dict[str, Any], owner: bool):
+        self.shm = shm
+        self.spec = spec
+        self.owner = owner
+
+    @classmethod
+    def create(cls, close: np.ndarray, signals: np.ndarray) -> "_SharedSignals":
+        n, m = signals.shape
+        shm = shared_memory.SharedMemory(create=True, size=max(8 * n + n * m, 1))
+        spec = {"name": shm.name, "bars": n, "columns": m}
+        shared = cls(shm, spec, owner=True)
+        shared_close, shared_signals = shared.arrays()
+        shared_close[:] = close
+        shared_signals[:] = signals
+        return shared
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> "_SharedSignals":
+        return cls(shared_memory.SharedMemory(name=spec["name"]), spec, owner=False)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Zero-copy (close, signals) views; signals are column-major like signal_matrix output"""
+        n, m = self.spec["bars"], self.spec["columns"]
+        close = np.ndarray((n,), dtype=np.float64, buffer=self.shm.buf)
+        signals = np.ndarray((m, n), dtype=np.int8, buffer=self.shm.buf, offset=8 * n).T
+        return close, signals
+
+    def close(self) -> None:
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self) -> "_SharedSignals":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Per-worker state, populated once by the pool initializer
+_worker_shared: Optional[_SharedSignals] = None
+
+
+def _init_worker(spec: Dict[str, Any]) -> None:
+    global _worker_shared
+    _worker_shared = _SharedSignals.attach(spec)
+
+
+def _optimize_shared(train: Tuple[int, int], engine_args: Tuple[float, float, float]) -> SweepResult:
+    close, signals = _worker_shared.arrays()
+    return _optimize(close, signals, train, engine_args)
@@ -0,0 +1,239 @@
+"""Memoizing indicator layer shared by strategies, sweeps and the ML features"""
+
+import inspect
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import Any, Callable, Hashable, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+from app.backtesting.indicators.indicators import TechnicalIndicators, VolumeIndicators
+
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def fingerprint(values: np.ndarray) -> Tuple:
+    """
+    Identity of an array's contents
+
+    Hashes every byte of the buffer together with the dtype and shape, so
+    any change, NaNs and swapped values included, alters the key. Costs
+    one pass over the data, far less than any indicator computed from it.
+    Object arrays are hashed through pandas' element hashing instead.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == "O":
+        values = pd.util.hash_array(values.ravel()).reshape(values.shape)
+    digest = blake2b(np.ascontiguousarray(values).data, digest_size=16)
+    return values.shape, values.dtype.str, digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters of an IndicatorCache"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    nbytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class IndicatorCache:
+    """
+    LRU cache of indicator results bounded by a byte budget.
+
+    Values are tuples of read-only arrays, so a cached result can be
+    handed to several callers without copying. The least recently used
+    entries are evicted once the stored arrays exceed max_bytes; results
+    larger than the whole budget are not stored.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES, max_entries: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached value for key, or None; counts a hit or a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Tuple[np.ndarray, ...]) -> None:
+        """Store a tuple of arrays, evicting least recently used entries to stay within budget"""
+        nbytes = sum(array.nbytes for array in value)
+        if nbytes > self.max_bytes:
+            return
+        for array in value:
+            array.flags.writeable = False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1]
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes or (self.max_entries and len(self._entries) > self.max_entries):
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_bytes
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Tuple[np.ndarray, ...]]) -> Tuple[np.ndarray, ...]:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self._entries),
+            nbytes=self.nbytes,
+        )
+
+
+class CachedIndicators:
+    """
+    Memoizing front for the indicator classes.
+
+    Exposes every static method of the wrapped classes under the same name
+    and signature, e.g. `cached.rsi(close, 14)`. The key is the indicator
+    name, a fingerprint of each Series or array argument, and the
+    remaining arguments with defaults applied, so `rsi(close)` and
+    `rsi(close, 14)` share an entry. Index and Series names are not part
+    of the key: results are stored as read-only arrays and re-wrapped with
+    the index and name of the first Series argument on every hit, so
+    callers must not modify a returned Series in place.
+    """
+
+    def __init__(self, cache: Optional[IndicatorCache] = None,
+                 sources: Iterable[type] = (TechnicalIndicators, VolumeIndicators)):
+        self.cache = cache if cache is not None else IndicatorCache()
+        self._functions = {}
+        for source in sources:
+            for name, member in vars(source).items():
+                if isinstance(member, staticmethod) and not name.startswith("_"):
+                    self._functions.setdefault(name, member.__func__)
+
+    def __getattr__(self, name: str) -> Callable:
+        functions = self.__dict__.get("_functions", {})
+        if name not in functions:
+            raise AttributeError(f"{type(self).__name__} has no indicator {name!r}")
+        wrapper = self._memoize(name, functions[name])
+        setattr(self, name, wrapper)
+        return wrapper
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self._functions))
+
+    def stats(self) -> CacheStats:
+        return self.cache.stats()
+
+    def _memoize(self, name: str, function: Callable) -> Callable:
+        signature = inspect.signature(function)
+
+        def cached(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = [name]
+            source = None
+            for argument, value in bound.arguments.items():
+                if isinstance(value, pd.Series):
+                    if source is None:
+                        source = value
+                    key.append((argument, fingerprint(value.to_numpy())))
+                elif isinstance(value, np.ndarray):
+                    key.append((argument, fingerprint(value)))
+                else:
+                    try:
+                        hash(value)
+                    except TypeError:
+                        return function(*args, **kwargs)
+                    key.append((argument, value))
+            key = tuple(key)
+
+            entry = self.cache.get(key)
+            if entry is None:
+                result = function(*args, **kwargs)
+                self.cache.put(key, self._pack(result, source))
+                return result
+            return self._unpack(entry, source)
+
+        cached.__name__ = name
+        cached.__doc__ = function.__doc__
+        cached.__signature__ = signature
+        return cached
+
+    @staticmethod
+    def _pack(result, source: Optional[pd.Series]) -> "_Entry":
+        """Copy the result arrays into a cache entry, leaving the caller's result writable"""
+        outputs = result if isinstance(result, tuple) else (result,)
+        arrays = tuple(np.array(output, copy=True) for output in outputs)
+        source_name = source.name if source is not None else None
+        names = tuple(
+            _SOURCE_NAME if getattr(output, "name", None) == source_name else output.name
+            for output in outputs
+        )
+        series = tuple(isinstance(output, pd.Series) for output in outputs)
+        return _Entry(arrays, names, series, isinstance(result, tuple))
+
+    @staticmethod
+    def _unpack(entry: "_Entry", source: Optional[pd.Series]):
+        index = source.index if source is not None else None
+        source_name = source.name if source is not None else None
+        outputs = tuple(
+            pd.Series(values, index=index, name=source_name if name is _SOURCE_NAME else name, copy=False)
+            if is_series else values
+            for values, name, is_series in zip(entry, entry.names, entry.series)
+        )
+        return outputs if entry.is_tuple else outputs[0]
+
+
+_SOURCE_NAME = object()
+
+
+class _Entry(tuple):
+    """Tuple of result arrays carrying how to rebuild the original return value"""
+
+    def __new__(cls, arrays, names, series, is_tuple):
+        entry = super().__new__(cls, arrays)
+        entry.names = names
+        entry.series = series
+        entry.is_tuple = is_tuple
+        return entry
+
+
+indicator_cache = IndicatorCache()
+cached_indicators = CachedIndicators(indicator_cache)
@@ -0,0 +1,106 @@
+"""Rolling minimum and maximum kernels"""
+
+import numpy as np
+from typing import Sequence
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling maximum with the van Herk/Gil-Werman algorithm
+
+    The series is cut into blocks of `window` bars. Every window spans at
+    most two blocks, so its maximum is the larger of a suffix maximum of
+    the first block and a prefix maximum of the second: three vectorized
+    passes regardless of the window length. Matches pandas
+    `rolling(window).max()`, including NaN for incomplete windows and for
+    windows containing a NaN.
+
+    Args:
+        values: Series of length bars, or a (bars, columns) matrix computed column-wise
+        window: Window length in bars
+
+    Returns:
+        float64 array shaped like values
+    """
+    return _van_herk(values, window, np.maximum)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling minimum with the van Herk/Gil-Werman algorithm, see rolling_max"""
+    return _van_herk(values, window, np.minimum)
+
+
+def rolling_max_multi(values: np.ndarray, windows: Sequence[int]) -> np.ndarray:
+    """
+    Rolling maximum for several windows from one sparse table
+
+    Level k of the table holds the maximum of every run of 2**k bars and
+    is built from level k-1 with one pass. A window of w bars is covered
+    by two overlapping runs of the largest 2**k <= w, so each window costs
+    one pass once its level exists. Levels are built in increasing order
+    and discarded as soon as no window needs them, keeping memory at two
+    series.
+
+    Args:
+        values: 1-D series
+        windows: Window lengths, one output column each
+
+    Returns:
+        float64 matrix of shape (bars, windows), NaN where pandas would give NaN
+    """
+    return _sparse_table(values, windows, np.maximum)
+
+
+def rolling_min_multi(values: np.ndarray, windows: Sequence[int]) -> np.ndarray:
+    """Rolling minimum for several windows from one sparse table, see rolling_max_multi"""
+    return _sparse_table(values, windows, np.minimum)
+
+
+def _van_herk(values: np.ndarray, window: int, combine: np.ufunc) -> np.ndarray:
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    # C order, so the block reshapes below are views
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    n = len(values)
+    out = np.full(values.shape, np.nan)
+    if window > n:
+        return out
+    if window == 1:
+        out[:] = values
+        return out
+
+    prefix = np.empty(values.shape)
+    suffix = np.empty(values.shape)
+    full = n - n % window
+    block_shape = (-1, window) + values.shape[1:]
+    blocks = values[:full].reshape(block_shape)
+    combine.accumulate(blocks, axis=1, out=prefix[:full].reshape(block_shape))
+    combine.accumulate(blocks[:, ::-1], axis=1, out=suffix[:full].reshape(block_shape)[:, ::-1])
+    # Partial last block
+    combine.accumulate(values[full:], axis=0, out=prefix[full:])
+    combine.accumulate(values[full:][::-1], axis=0, out=suffix[full:][::-1])
+    # Window [i - window + 1, i]: suffix of the block holding its start, prefix of the block holding i
+    combine(suffix[:n - window + 1], prefix[window - 1:n], out=out[window - 1:])
+    return out
+
+
+def _sparse_table(values: np.ndarray, windows: Sequence[int], combine: np.ufunc) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    out = np.full((len(windows), n), np.nan).T
+    if any(window < 1 for window in windows):
+        raise ValueError("windows must be >= 1")
+
+    order = sorted(range(len(windows)), key=lambda column: windows[column])
+    level = values
+    span = 1
+    for column in order:
+        window = windows[column]
+        if window > n:
+            continue
+        while span * 2 <= window:
+            level = combine(level[:-span], level[span:])
+            span *= 2
+        # level[j] covers [j, j + span); two runs cover [i - window + 1, i]
+        combine(level[:n - window + 1], level[window - span:n - span + 1], out=out[window - 1:, column])
+    return out
@@ -2,7 +2,10 @@
 
 import numpy as np
 import pandas as pd
-from typing import Tuple, List
+from typing import Tuple, List, Sequence, Union
+from app.backtesting.indicators.extrema import rolling_max, rolling_min, rolling_max_multi, rolling_min_multi
+
+ArrayLike = Union[pd.Series, np.ndarray]
 
 
 class TechnicalIndicators:
@@ -18,6 +21,142 @@ class TechnicalIndicators:
         """Exponential Moving Average (EMA)"""
         return data.ewm(span=period, adjust=False).mean()
     
+    @staticmethod
+    def moving_average_multi(data: ArrayLike, periods: Sequence[int]) -> np.ndarray:
+        """
+        Simple Moving Average for several periods from one cumulative-sum pass
+        
+        Window sums are differences of a single running sum, so each period
+        costs a few vectorized subtractions instead of a rolling pass.
+        Values match `moving_average` to rounding; windows of repeated
+        values and all-positive or all-negative windows are made exact the
+        same way the pandas kernel does.
+        
+        Args:
+            data: Price series
+            periods: Window lengths, one output column each
+        
+        Returns:
+            float64 matrix of shape (bars, periods), NaN until each window is full
+        """
+        values = np.asarray(data, dtype=np.float64)
+        n = len(values)
+        out = np.full((len(periods), n), np.nan).T
+        if n == 0:
+            return out
+        
+        valid = ~np.isnan(values)
+        all_valid = bool(valid.all())
+        # Center on the first valid value to keep the running sum small
+        offset = values[valid][0] if valid.any() else 0.0
+        running_sum = _prepend_zero(np.cumsum(np.where(valid, values - offset, 0.0)))
+        running_valid = None if all_valid else _prepend_zero(np.cumsum(valid))
+        sign_bits = np.signbit(values) & valid
+        negatives = int(np.count_nonzero(sign_bits))
+        running_negative = None
+        if 0 < negatives < len(values):
+            running_negative = _prepend_zero(np.cumsum(sign_bits))
+        run_length = _same_value_run_length(values)
+        longest_run = int(run_length.max())
+        
+        for column, period in enumerate(periods):
+            if period < 1:
+                raise ValueError("periods must be >= 1")
+            if period > n:
+                continue
+            mean = out[period - 1:, column]
+            np.subtract(running_sum[period:], running_sum[:-period], out=mean)
+            mean /= period
+            mean += offset
+            # Same sign corrections as the rolling kernel
+            if negatives == 0:
+                np.maximum(mean, 0.0, out=mean)
+            elif running_negative is None:
+                np.minimum(mean, 0.0, out=mean)
+            else:
+                negative = running_negative[period:] - running_negative[:-period]
+                mean[(negative == 0) & (mean < 0)] = 0.0
+                mean[(negative == period) & (mean > 0)] = 0.0
+            if period <= longest_run:
+                repeated = run_length[period - 1:] >= period
+                mean[repeated] = values[period - 1:][repeated]
+            if running_valid is not None:
+                mean[(running_valid[period:] - running_valid[:-period]) < period] = np.nan
+        return out
+    
+    @staticmethod
+    def ema_multi(data: ArrayLike, periods: Sequence[int]) -> np.ndarray:
+        """
+        Exponential Moving Average for several periods
+        
+        The recurrence is inherently sequential, so each period is one
+        compiled ewm pass over a shared zero-copy Series; columns are
+        bit-identical to `exponential_moving_average`. Duplicate periods
+        are computed once.
+        
+        Returns:
+            float64 matrix of shape (bars, periods)
+        """
+        series = pd.Series(np.asarray(data, dtype=np.float64), copy=False)
+        out = np.empty((len(periods), len(series))).T
+        computed = {}
+        for column, period in enumerate(periods):
+            if period not in computed:
+                computed[period] = column
+                out[:, column] = series.ewm(span=period, adjust=False).mean().to_numpy()
+            else:
+                out[:, column] = out[:, computed[period]]
+        return out
+    
+    @staticmethod
+    def rsi_multi(data: ArrayLike, periods: Sequence[int]) -> np.ndarray:
+        """
+        Relative Strength Index for several periods
+        
+        Gains and losses are derived once and averaged for every period
+        with moving_average_multi.
+        
+        Returns:
+            float64 matrix of shape (bars, periods)
+        """
+        values = np.asarray(data, dtype=np.float64)
+        delta = np.empty_like(values)
+        delta[:1] = np.nan
+        np.subtract(values[1:], values[:-1], out=delta[1:])
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = -np.where(delta < 0, delta, 0.0)
+        
+        average_gain = TechnicalIndicators.moving_average_multi(gain, periods)
+        average_loss = TechnicalIndicators.moving_average_multi(loss, periods)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = np.divide(average_gain, average_loss, out=average_gain)
+            rs += 1
+            np.divide(100, rs, out=rs)
+            return np.subtract(100, rs, out=rs)
+    
+    @staticmethod
+    def bollinger_bands_multi(data: ArrayLike, periods: Sequence[int],
+                              std_dev: float = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Bollinger Bands for several periods
+        
+        The middle bands come from moving_average_multi. Standard
+        deviations use the rolling kernel per period: a running sum of
+        squares loses too much precision at price scale.
+        
+        Returns:
+            (upper, middle, lower) float64 matrices of shape (bars, periods)
+        """
+        series = pd.Series(np.asarray(data, dtype=np.float64), copy=False)
+        middle = TechnicalIndicators.moving_average_multi(series.to_numpy(), periods)
+        upper = np.empty_like(middle, order="F")
+        lower = np.empty_like(middle, order="F")
+        for column, period in enumerate(periods):
+            band = series.rolling(window=period).std().to_numpy() * std_dev
+            np.add(middle[:, column], band, out=upper[:, column])
+            np.subtract(middle[:, column], band, out=lower[:, column])
+        return upper, middle, lower
+    
     @staticmethod
     def rsi(data: pd.Series, period: int = 14) -> pd.Series:
         """Relative Strength Index (RSI)"""
@@ -53,13 +192,18 @@ class TechnicalIndicators:
         return upper_band, sma, lower_band
     
     @staticmethod
-    def atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
-        """Average True Range (ATR)"""
+    def true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+        """True Range: largest of high-low and the gaps to the previous close"""
         tr1 = high - low
         tr2 = abs(high - close.shift())
         tr3 = abs(low - close.shift())
         
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+    
+    @staticmethod
+    def atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
+        """Average True Range (ATR)"""
+        tr = TechnicalIndicators.true_range(high, low, close)
         atr = tr.rolling(window=period).mean()
         
         return atr
@@ -67,8 +211,8 @@ class TechnicalIndicators:
     @staticmethod
     def stochastic(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14, smooth_k: int = 3, smooth_d: int = 3) -> Tuple[pd.Series, pd.Series]:
         """Stochastic Oscillator"""
-        lowest_low = low.rolling(window=period).min()
-        highest_high = high.rolling(window=period).max()
+        lowest_low = _rolling_extremum(rolling_min, low, period)
+        highest_high = _rolling_extremum(rolling_max, high, period)
         
         k_percent = 100 * ((close - lowest_low) / (highest_high - lowest_low))
         k_percent_smooth = k_percent.rolling(window=smooth_k).mean()
@@ -76,6 +220,58 @@ class TechnicalIndicators:
         
         return k_percent_smooth, d_percent
     
+    @staticmethod
+    def donchian_channels(high: pd.Series, low: pd.Series, period: int = 20) -> Tuple[pd.Series, pd.Series, pd.Series]:
+        """Donchian Channels: highest high, midpoint and lowest low of the last period bars"""
+        upper = _rolling_extremum(rolling_max, high, period)
+        lower = _rolling_extremum(rolling_min, low, period)
+        middle = (upper + lower) / 2
+        
+        return upper, middle, lower
+    
+    @staticmethod
+    def williams_r(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
+        """Williams %R"""
+        lowest_low = _rolling_extremum(rolling_min, low, period)
+        highest_high = _rolling_extremum(rolling_max, high, period)
+        
+        return -100 * ((highest_high - close) / (highest_high - lowest_low))
+    
+    @staticmethod
+    def donchian_channels_multi(high: ArrayLike, low: ArrayLike,
+                                periods: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Donchian Channels for several periods
+        
+        Channel bounds for every period come from one sparse table of
+        highs and one of lows (see rolling_max_multi).
+        
+        Returns:
+            (upper, middle, lower) float64 matrices of shape (bars, periods)
+        """
+        upper = rolling_max_multi(high, periods)
+        lower = rolling_min_multi(low, periods)
+        middle = np.add(upper, lower, order="F")
+        middle /= 2
+        return upper, middle, lower
+    
+    @staticmethod
+    def williams_r_multi(high: ArrayLike, low: ArrayLike, close: ArrayLike,
+                         periods: Sequence[int]) -> np.ndarray:
+        """
+        Williams %R for several periods from one pair of sparse tables
+        
+        Returns:
+            float64 matrix of shape (bars, periods)
+        """
+        upper, _, lower = TechnicalIndicators.donchian_channels_multi(high, low, periods)
+        close = np.asarray(close, dtype=np.float64)[:, np.newaxis]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distance = np.subtract(upper, close, out=np.empty_like(upper, order="F"))
+            np.subtract(upper, lower, out=upper)
+            np.divide(distance, upper, out=distance)
+            return np.multiply(distance, -100, out=distance)
+    
     @staticmethod
     def adx(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
         """Average Directional Index (ADX)"""
@@ -85,11 +281,7 @@ class TechnicalIndicators:
         plus_dm = plus_dm.where((plus_dm > minus_dm) & (plus_dm > 0), 0)
         minus_dm = minus_dm.where((minus_dm > plus_dm) & (minus_dm > 0), 0)
         
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        
+        tr = TechnicalIndicators.true_range(high, low, close)
         atr = tr.rolling(window=period).mean()
         
         plus_di = 100 * (plus_dm.rolling(window=period).mean() / atr)
@@ -104,26 +296,129 @@ class TechnicalIndicators:
         return adx
 
 
+def _prepend_zero(values: np.ndarray) -> np.ndarray:
+    out = np.empty(len(values) + 1, dtype=values.dtype)
+    out[0] = 0
+    out[1:] = values
+    return out
+
+
+def _same_value_run_length(values: np.ndarray) -> np.ndarray:
+    """Number of consecutive bars, ending at each bar, with the same value"""
+    positions = np.arange(len(values))
+    changed = np.ones(len(values), dtype=bool)
+    changed[1:] = values[1:] != values[:-1]
+    return positions - np.maximum.accumulate(np.where(changed, positions, 0)) + 1
+
+
+def _rolling_extremum(kernel, data: pd.Series, period: int) -> pd.Series:
+    """Apply an extrema kernel to a Series, keeping its index"""
+    return pd.Series(kernel(data.to_numpy(dtype=np.float64), period), index=data.index)
+
+
+def _as_columns(data) -> np.ndarray:
+    """float64 view of a Series, DataFrame or array as a (bars, columns) matrix"""
+    values = np.asarray(data, dtype=np.float64)
+    return values.reshape(len(values), -1) if values.ndim == 1 else values
+
+
+def _like(result: np.ndarray, template):
+    """Wrap a (bars, columns) result in the container type of the first input"""
+    if isinstance(template, pd.Series):
+        return pd.Series(result[:, 0], index=template.index)
+    if isinstance(template, pd.DataFrame):
+        return pd.DataFrame(result, index=template.index, columns=template.columns)
+    return result[:, 0] if np.ndim(template) == 1 else result
+
+
+def _rolling_sum(values: np.ndarray, period: int) -> np.ndarray:
+    """Column-wise rolling sum with the compensated pandas kernel, NaN until the window is full"""
+    return pd.DataFrame(values, copy=False).rolling(window=period).sum().to_numpy()
+
+
+def _typical_price(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    return (high + low + close) / 3
+
+
 class VolumeIndicators:
-    """Volume-based indicators"""
+    """
+    Volume-based indicators
+    
+    Every indicator accepts pandas Series, 1-D arrays, or multi-symbol
+    panels as DataFrames or 2-D arrays of shape (bars, symbols), and
+    returns the same container type as its first argument. Panels are
+    computed column-wise in one vectorized pass.
+    """
     
     @staticmethod
-    def on_balance_volume(close: pd.Series, volume: pd.Series) -> pd.Series:
+    def on_balance_volume(close: ArrayLike, volume: ArrayLike) -> ArrayLike:
         """On-Balance Volume (OBV)"""
-        obv = np.zeros(len(close))
-        obv[0] = volume.iloc[0]
-        
-        for i in range(1, len(close)):
-            if close.iloc[i] > close.iloc[i-1]:
-                obv[i] = obv[i-1] + volume.iloc[i]
-            elif close.iloc[i] < close.iloc[i-1]:
-                obv[i] = obv[i-1] - volume.iloc[i]
-            else:
-                obv[i] = obv[i-1]
-        
-        return pd.Series(obv, index=close.index)
+        prices = _as_columns(close)
+        volumes = _as_columns(volume)
+        steps = np.empty(np.broadcast_shapes(prices.shape, volumes.shape))
+        steps[:1] = volumes[:1]
+        change = prices[1:] - prices[:-1]
+        steps[1:] = np.where(change > 0, volumes[1:], np.where(change < 0, -volumes[1:], 0.0))
+        return _like(np.cumsum(steps, axis=0), close)
     
     @staticmethod
-    def volume_moving_average(volume: pd.Series, period: int = 20) -> pd.Series:
+    def volume_moving_average(volume: ArrayLike, period: int = 20) -> ArrayLike:
         """Volume Moving Average"""
-        return volume.rolling(window=period).mean()
+        if isinstance(volume, pd.Series):
+            return volume.rolling(window=period).mean()
+        averages = pd.DataFrame(_as_columns(volume), copy=False).rolling(window=period).mean().to_numpy()
+        return _like(averages, volume)
+    
+    @staticmethod
+    def vwap(high: ArrayLike, low: ArrayLike, close: ArrayLike, volume: ArrayLike) -> ArrayLike:
+        """Cumulative Volume Weighted Average Price of the typical price"""
+        volumes = _as_columns(volume)
+        price_volume = _typical_price(_as_columns(high), _as_columns(low), _as_columns(close)) * volumes
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _like(np.cumsum(price_volume, axis=0) / np.cumsum(volumes, axis=0), high)
+    
+    @staticmethod
+    def rolling_vwap(high: ArrayLike, low: ArrayLike, close: ArrayLike, volume: ArrayLike,
+                     period: int = 20) -> ArrayLike:
+        """Volume Weighted Average Price over a rolling window"""
+        volumes = _as_columns(volume)
+        price_volume = _typical_price(_as_columns(high), _as_columns(low), _as_columns(close)) * volumes
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _like(_rolling_sum(price_volume, period) / _rolling_sum(volumes, period), high)
+    
+    @staticmethod
+    def accumulation_distribution(high: ArrayLike, low: ArrayLike, close: ArrayLike,
+                                  volume: ArrayLike) -> ArrayLike:
+        """Accumulation/Distribution line; bars with high == low add no flow"""
+        highs, lows, closes = _as_columns(high), _as_columns(low), _as_columns(close)
+        ranges = highs - lows
+        with np.errstate(divide="ignore", invalid="ignore"):
+            multiplier = np.where(ranges != 0, ((closes - lows) - (highs - closes)) / ranges, 0.0)
+        return _like(np.cumsum(multiplier * _as_columns(volume), axis=0), high)
+    
+    @staticmethod
+    def money_flow_index(high: ArrayLike, low: ArrayLike, close: ArrayLike, volume: ArrayLike,
+                         period: int = 14) -> ArrayLike:
+        """Money Flow Index (MFI); the first bar carries no flow"""
+        typical = _typical_price(_as_columns(high), _as_columns(low), _as_columns(close))
+        raw_flow = typical * _as_columns(volume)
+        positive = np.zeros_like(raw_flow)
+        negative = np.zeros_like(raw_flow)
+        change = typical[1:] - typical[:-1]
+        np.copyto(positive[1:], raw_flow[1:], where=change > 0)
+        np.copyto(negative[1:], raw_flow[1:], where=change < 0)
+        
+        positive_sum = _rolling_sum(positive, period)
+        negative_sum = _rolling_sum(negative, period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mfi = 100 - 100 / (1 + positive_sum / negative_sum)
+        return _like(mfi, high)
+    
+    @staticmethod
+    def chaikin_oscillator(high: ArrayLike, low: ArrayLike, close: ArrayLike, volume: ArrayLike,
+                           fast: int = 3, slow: int = 10) -> ArrayLike:
+        """Chaikin Oscillator: fast minus slow EMA of the Accumulation/Distribution line"""
+        ad = pd.DataFrame(_as_columns(VolumeIndicators.accumulation_distribution(
+            _as_columns(high), _as_columns(low), _as_columns(close), _as_columns(volume))), copy=False)
+        oscillator = ad.ewm(span=fast, adjust=False).mean() - ad.ewm(span=slow, adjust=False).mean()
+        return _like(oscillator.to_numpy(), high)
@@ -0,0 +1,159 @@
+"""Technical indicators over multi-symbol panels"""
+
+import numpy as np
+import pandas as pd
+from typing import Tuple, Union
+from app.backtesting.indicators.extrema import rolling_max, rolling_min
+from app.backtesting.indicators.indicators import _as_columns, _like
+
+PanelLike = Union[pd.DataFrame, np.ndarray]
+
+
+class PanelIndicators:
+    """
+    Technical indicators over (bars, symbols) panels
+
+    Inputs are DataFrames with one column per symbol or 2-D arrays, and
+    results have the type of the first input. Each indicator runs the
+    same pandas kernels as TechnicalIndicators once over the whole
+    panel instead of once per symbol.
+
+    Missing bars (NaN in any input) are skipped per symbol: the valid bars
+    of each symbol are packed to the top of its column, computed, and
+    scattered back. Every column therefore equals the TechnicalIndicators
+    result on that symbol's valid bars alone, with NaN at its missing
+    bars, and warm-up counts each symbol's own bars: a symbol listed
+    halfway through the panel gets its first SMA(20) on its 20th bar.
+    """
+
+    @staticmethod
+    def moving_average(data: PanelLike, period: int) -> PanelLike:
+        """Simple Moving Average (SMA) of every symbol"""
+        panel = _PackedPanel(_as_columns(data))
+        frame = panel.pack(0)
+        return _like(panel.unpack(frame.rolling(window=period).mean()), data)
+
+    @staticmethod
+    def exponential_moving_average(data: PanelLike, period: int) -> PanelLike:
+        """Exponential Moving Average (EMA) of every symbol"""
+        panel = _PackedPanel(_as_columns(data))
+        frame = panel.pack(0)
+        return _like(panel.unpack(frame.ewm(span=period, adjust=False).mean()), data)
+
+    @staticmethod
+    def rsi(data: PanelLike, period: int = 14) -> PanelLike:
+        """Relative Strength Index (RSI) of every symbol"""
+        panel = _PackedPanel(_as_columns(data))
+        delta = panel.pack(0).diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+
+        rs = gain / loss
+        rsi = 100 - (100 / (1 + rs))
+        return _like(panel.unpack(rsi), data)
+
+    @staticmethod
+    def macd(data: PanelLike, fast: int = 12, slow: int = 26,
+             signal: int = 9) -> Tuple[PanelLike, PanelLike, PanelLike]:
+        """Moving Average Convergence Divergence (MACD) of every symbol"""
+        panel = _PackedPanel(_as_columns(data))
+        frame = panel.pack(0)
+        ema_fast = frame.ewm(span=fast, adjust=False).mean()
+        ema_slow = frame.ewm(span=slow, adjust=False).mean()
+
+        macd_line = ema_fast - ema_slow
+        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+        histogram = macd_line - signal_line
+
+        return tuple(_like(panel.unpack(output), data) for output in (macd_line, signal_line, histogram))
+
+    @staticmethod
+    def true_range(high: PanelLike, low: PanelLike, close: PanelLike) -> PanelLike:
+        """True Range of every symbol"""
+        panel = _PackedPanel(_as_columns(high), _as_columns(low), _as_columns(close))
+        return _like(panel.unpack(_true_range(*panel.pack_all())), high)
+
+    @staticmethod
+    def atr(high: PanelLike, low: PanelLike, close: PanelLike, period: int = 14) -> PanelLike:
+        """Average True Range (ATR) of every symbol"""
+        panel = _PackedPanel(_as_columns(high), _as_columns(low), _as_columns(close))
+        tr = pd.DataFrame(_true_range(*panel.pack_all()), copy=False)
+        return _like(panel.unpack(tr.rolling(window=period).mean()), high)
+
+    @staticmethod
+    def stochastic(high: PanelLike, low: PanelLike, close: PanelLike, period: int = 14,
+                   smooth_k: int = 3, smooth_d: int = 3) -> Tuple[PanelLike, PanelLike]:
+        """Stochastic Oscillator of every symbol"""
+        panel = _PackedPanel(_as_columns(high), _as_columns(low), _as_columns(close))
+        high_frame, low_frame, close_frame = panel.pack_all()
+        lowest_low = pd.DataFrame(rolling_min(low_frame.to_numpy(), period), copy=False)
+        highest_high = pd.DataFrame(rolling_max(high_frame.to_numpy(), period), copy=False)
+
+        k_percent = 100 * ((close_frame - lowest_low) / (highest_high - lowest_low))
+        k_percent_smooth = k_percent.rolling(window=smooth_k).mean()
+        d_percent = k_percent_smooth.rolling(window=smooth_d).mean()
+
+        return _like(panel.unpack(k_percent_smooth), high), _like(panel.unpack(d_percent), high)
+
+
+def to_panel(data: pd.DataFrame, column: str, index: str = "timestamp", symbol: str = "symbol") -> pd.DataFrame:
+    """
+    Pivot long-format bars (one row per symbol and timestamp) into a panel
+
+    Args:
+        data: Rows with index, symbol and value columns, e.g. market_data records
+        column: Value to pivot, e.g. "close"
+
+    Returns:
+        DataFrame indexed by timestamp with one column per symbol, NaN where a symbol has no bar
+    """
+    return data.pivot(index=index, columns=symbol, values=column).sort_index()
+
+
+class _PackedPanel:
+    """
+    Inputs with the valid bars of each symbol moved, in order, to the top of its column
+
+    Packing and scattering are boolean-mask copies over symbol-major
+    (symbols, bars) buffers, which keeps each symbol's bars contiguous for
+    the column-wise pandas kernels. Complete panels are used as they are.
+    """
+
+    def __init__(self, *inputs: np.ndarray):
+        self.inputs = inputs
+        self.valid = None
+        valid = ~np.isnan(inputs[0].T)
+        for values in inputs[1:]:
+            valid &= ~np.isnan(values.T)
+        if not valid.all():
+            self.valid = np.ascontiguousarray(valid)
+            counts = np.count_nonzero(self.valid, axis=1)
+            self.head = np.arange(self.valid.shape[1]) < counts[:, np.newaxis]
+
+    def pack(self, position: int) -> pd.DataFrame:
+        values = self.inputs[position]
+        if self.valid is not None:
+            packed = np.full(self.valid.shape, np.nan)
+            packed[self.head] = np.ascontiguousarray(values.T)[self.valid]
+            values = packed.T
+        return pd.DataFrame(values, copy=False)
+
+    def pack_all(self) -> Tuple[pd.DataFrame, ...]:
+        return tuple(self.pack(position) for position in range(len(self.inputs)))
+
+    def unpack(self, result: pd.DataFrame) -> np.ndarray:
+        values = np.asarray(result, dtype=np.float64)
+        if self.valid is None:
+            return values
+        out = np.full(self.valid.shape, np.nan)
+        out[self.valid] = np.ascontiguousarray(values.T)[self.head]
+        return out.T
+
+
+def _true_range(high: pd.DataFrame, low: pd.DataFrame, close: pd.DataFrame) -> np.ndarray:
+    """Column-wise TechnicalIndicators.true_range; fmax skips the missing previous close like max(axis=1)"""
+    high, low, close = (np.asarray(frame, dtype=np.float64) for frame in (high, low, close))
+    previous = np.empty_like(close)
+    previous[:1] = np.nan
+    previous[1:] = close[:-1]
+    return np.fmax(np.fmax(high - low, np.abs(high - previous)), np.abs(low - previous))
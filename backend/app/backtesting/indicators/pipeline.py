@@ -0,0 +1,312 @@
+"""Declarative indicator pipeline that computes shared intermediates once"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+from app.backtesting.indicators.cache import IndicatorCache, fingerprint
+from app.backtesting.indicators.extrema import rolling_max, rolling_min
+from app.backtesting.indicators.indicators import TechnicalIndicators, VolumeIndicators
+
+
+@dataclass(frozen=True)
+class Node:
+    """One operation of the plan over input nodes with fixed parameters; equal nodes are computed once"""
+    op: str
+    inputs: Tuple["Node", ...] = ()
+    params: Tuple[Tuple[str, Any], ...] = ()
+
+
+# Operations on pandas Series, written as in TechnicalIndicators so outputs match it exactly
+OPERATIONS: Dict[str, Callable[..., pd.Series]] = {
+    "diff": lambda s: s.diff(),
+    "neg": lambda s: -s,
+    "sub": lambda a, b: a - b,
+    "sma": lambda s, period: s.rolling(window=period).mean(),
+    "ema": lambda s, period: s.ewm(span=period, adjust=False).mean(),
+    "rolling_std": lambda s, period: s.rolling(window=period).std(),
+    "rolling_min": lambda s, period: pd.Series(rolling_min(s.to_numpy(), period), index=s.index),
+    "rolling_max": lambda s, period: pd.Series(rolling_max(s.to_numpy(), period), index=s.index),
+    "gain": lambda delta: delta.where(delta > 0, 0),
+    "loss": lambda delta: -delta.where(delta < 0, 0),
+    "rsi": lambda gain, loss: 100 - (100 / (1 + gain / loss)),
+    "band": lambda middle, std, width: middle + (std * width),
+    "true_range": TechnicalIndicators.true_range,
+    "plus_dm": lambda up, down: up.where((up > down) & (up > 0), 0),
+    "minus_dm": lambda down, plus_dm: down.where((down > plus_dm) & (down > 0), 0),
+    "di": lambda dm_mean, atr: 100 * (dm_mean / atr),
+    "dx": lambda plus_di, minus_di: 100 * (abs(plus_di - minus_di) / (plus_di + minus_di)),
+    "stochastic_k": lambda close, lowest, highest: 100 * ((close - lowest) / (highest - lowest)),
+    "obv": VolumeIndicators.on_balance_volume,
+}
+
+
+class PlanBuilder:
+    """Creates nodes, returning the existing node when an identical one was already requested"""
+
+    def __init__(self):
+        self.nodes: Dict[Node, int] = {}
+        self.requests = 0
+
+    def node(self, op: str, *inputs: Node, **params) -> Node:
+        node = Node(op, inputs, tuple(sorted(params.items())))
+        self.requests += 1
+        if node not in self.nodes:
+            self.nodes[node] = len(self.nodes)
+        return node
+
+    def column(self, name: str) -> Node:
+        return self.node("column", name=name)
+
+    def sma(self, source: Node, period: int) -> Node:
+        return self.node("sma", source, period=period)
+
+    def ema(self, source: Node, period: int) -> Node:
+        return self.node("ema", source, period=period)
+
+    def true_range(self) -> Node:
+        return self.node("true_range", self.column("high"), self.column("low"), self.column("close"))
+
+
+def _sma(b: PlanBuilder, period: int = 20, source: str = "close"):
+    return {"value": b.sma(b.column(source), period)}
+
+
+def _ema(b: PlanBuilder, period: int = 20, source: str = "close"):
+    return {"value": b.ema(b.column(source), period)}
+
+
+def _rsi(b: PlanBuilder, period: int = 14, source: str = "close"):
+    delta = b.node("diff", b.column(source))
+    gain = b.sma(b.node("gain", delta), period)
+    loss = b.sma(b.node("loss", delta), period)
+    return {"value": b.node("rsi", gain, loss)}
+
+
+def _macd(b: PlanBuilder, fast: int = 12, slow: int = 26, signal: int = 9, source: str = "close"):
+    close = b.column(source)
+    line = b.node("sub", b.ema(close, fast), b.ema(close, slow))
+    signal_line = b.ema(line, signal)
+    return {"line": line, "signal": signal_line, "histogram": b.node("sub", line, signal_line)}
+
+
+def _bollinger_bands(b: PlanBuilder, period: int = 20, std_dev: float = 2, source: str = "close"):
+    close = b.column(source)
+    middle = b.sma(close, period)
+    std = b.node("rolling_std", close, period=period)
+    return {
+        "upper": b.node("band", middle, std, width=std_dev),
+        "middle": middle,
+        "lower": b.node("band", middle, std, width=-std_dev),
+    }
+
+
+def _true_range(b: PlanBuilder):
+    return {"value": b.true_range()}
+
+
+def _atr(b: PlanBuilder, period: int = 14):
+    return {"value": b.sma(b.true_range(), period)}
+
+
+def _stochastic(b: PlanBuilder, period: int = 14, smooth_k: int = 3, smooth_d: int = 3):
+    lowest = b.node("rolling_min", b.column("low"), period=period)
+    highest = b.node("rolling_max", b.column("high"), period=period)
+    k = b.sma(b.node("stochastic_k", b.column("close"), lowest, highest), smooth_k)
+    return {"k": k, "d": b.sma(k, smooth_d)}
+
+
+def _adx(b: PlanBuilder, period: int = 14):
+    up = b.node("diff", b.column("high"))
+    down = b.node("neg", b.node("diff", b.column("low")))
+    plus_dm = b.node("plus_dm", up, down)
+    minus_dm = b.node("minus_dm", down, plus_dm)
+    atr = b.sma(b.true_range(), period)
+    plus_di = b.node("di", b.sma(plus_dm, period), atr)
+    minus_di = b.node("di", b.sma(minus_dm, period), atr)
+    return {"value": b.sma(b.node("dx", plus_di, minus_di), period)}
+
+
+def _on_balance_volume(b: PlanBuilder):
+    return {"value": b.node("obv", b.column("close"), b.column("volume"))}
+
+
+# Indicator name -> builder returning its components; the first component is the default output
+INDICATORS: Dict[str, Callable[..., Dict[str, Node]]] = {
+    "sma": _sma,
+    "ema": _ema,
+    "rsi": _rsi,
+    "macd": _macd,
+    "bollinger_bands": _bollinger_bands,
+    "true_range": _true_range,
+    "atr": _atr,
+    "stochastic": _stochastic,
+    "adx": _adx,
+    "on_balance_volume": _on_balance_volume,
+}
+
+
+@dataclass
+class IndicatorPlan:
+    """Topologically ordered nodes with the requested outputs and sharing statistics"""
+    nodes: List[Node]
+    outputs: Dict[str, Node]
+    node_requests: int
+    unshared_nodes: int
+    labels: Dict[Node, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.labels = {node: f"n{i}" for i, node in enumerate(self.nodes)}
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Nodes needed if every output were computed on its own, per node actually computed"""
+        return self.unshared_nodes / len(self.nodes) if self.nodes else 1.0
+
+    @property
+    def shared_nodes(self) -> int:
+        """Nodes consumed by more than one downstream node or output"""
+        uses = Counter(i for node in self.nodes for i in node.inputs)
+        uses.update(self.outputs.values())
+        return sum(1 for count in uses.values() if count > 1)
+
+    @staticmethod
+    def ancestors(node: Node) -> Set[Node]:
+        """The node and everything it depends on"""
+        seen = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current not in seen:
+                seen.add(current)
+                stack.extend(current.inputs)
+        return seen
+
+    def describe(self, node: Node) -> str:
+        arguments = [self.labels[i] for i in node.inputs]
+        arguments += [f"{key}={value}" for key, value in node.params]
+        return f"{node.op}({', '.join(arguments)})"
+
+    def __str__(self) -> str:
+        produces: Dict[Node, List[str]] = {}
+        for name, node in self.outputs.items():
+            produces.setdefault(node, []).append(name)
+        lines = [
+            f"IndicatorPlan: {len(self.outputs)} outputs, {len(self.nodes)} nodes "
+            f"({self.unshared_nodes} without sharing, reuse {self.reuse_ratio:.2f}x)"
+        ]
+        width = max((len(self.describe(node)) for node in self.nodes), default=0)
+        for node in self.nodes:
+            line = f"  {self.labels[node]:>4}  {self.describe(node):<{width}}"
+            if node in produces:
+                line += f"  -> {', '.join(produces[node])}"
+            lines.append(line.rstrip())
+        return "\n".join(lines)
+
+
+class IndicatorPipeline:
+    """
+    Declarative set of indicator outputs computed over one OHLCV frame.
+
+    Each request names an output and an indicator (see INDICATORS). The
+    planner expands every request into primitive nodes (true range,
+    EMA(n), rolling means and sums, ...) and merges identical nodes, so
+    an intermediate shared by several indicators is computed once. Nodes
+    are released as soon as their last consumer has run. Outputs are
+    identical to the TechnicalIndicators functions.
+    """
+
+    def __init__(self):
+        self.requests: Dict[str, Tuple[str, Optional[str], Dict[str, Any]]] = {}
+        self._plan: Optional[IndicatorPlan] = None
+
+    def request(self, name: str, indicator: str, component: Optional[str] = None, **params) -> "IndicatorPipeline":
+        """
+        Add an output column
+
+        Args:
+            name: Output column name
+            indicator: Indicator name from INDICATORS
+            component: Output of a multi-output indicator, e.g. "signal" for macd (default: the first)
+            **params: Indicator parameters
+
+        Returns:
+            The pipeline, so requests can be chained
+        """
+        if indicator not in INDICATORS:
+            raise ValueError(f"Unknown indicator: {indicator}")
+        self.requests[name] = (indicator, component, params)
+        self._plan = None
+        return self
+
+    def plan(self) -> IndicatorPlan:
+        """Build (once) the DAG for the current requests"""
+        if self._plan is not None:
+            return self._plan
+        builder = PlanBuilder()
+        outputs = {}
+        for name, (indicator, component, params) in self.requests.items():
+            components = INDICATORS[indicator](builder, **params)
+            if component is None:
+                component = next(iter(components))
+            if component not in components:
+                raise ValueError(f"{indicator} has no output {component!r}; choose from {list(components)}")
+            outputs[name] = components[component]
+
+        # Drop components that were built but not requested, e.g. the MACD histogram
+        ancestors = [IndicatorPlan.ancestors(node) for node in outputs.values()]
+        used = set().union(*ancestors)
+        nodes = [node for node in builder.nodes if node in used]
+        plan = IndicatorPlan(nodes=nodes, outputs=outputs, node_requests=builder.requests,
+                             unshared_nodes=sum(len(a) for a in ancestors))
+        self._plan = plan
+        return plan
+
+    def compute(self, data: pd.DataFrame, cache: Optional[IndicatorCache] = None) -> pd.DataFrame:
+        """
+        Execute the plan on an OHLCV frame
+
+        Args:
+            data: DataFrame with the columns the requested indicators read
+            cache: Optional IndicatorCache; outputs found there (same input
+                columns and node) are not recomputed, and new outputs are stored
+
+        Returns:
+            DataFrame with one column per request, indexed like data
+        """
+        plan = self.plan()
+        results: Dict[Node, pd.Series] = {}
+        cache_keys: Dict[Node, Tuple] = {}
+        pending = dict(plan.outputs)
+
+        if cache is not None:
+            columns = {dict(node.params)["name"] for node in plan.nodes if node.op == "column"}
+            prints = {name: fingerprint(data[name].to_numpy()) for name in columns}
+            for name, node in plan.outputs.items():
+                sources = sorted(dict(n.params)["name"] for n in plan.ancestors(node) if n.op == "column")
+                cache_keys[node] = ("pipeline", node, tuple(prints[source] for source in sources))
+                values = cache.get(cache_keys[node])
+                if values is not None:
+                    results[node] = pd.Series(values[0], index=data.index, copy=False)
+                    del pending[name]
+
+        outputs = set(plan.outputs.values())
+        needed = set().union(*(plan.ancestors(node) for node in pending.values())) if pending else set()
+        remaining = Counter(i for node in plan.nodes if node in needed for i in node.inputs)
+        for node in plan.nodes:
+            if node not in needed or node in results:
+                continue
+            if node.op == "column":
+                value = data[dict(node.params)["name"]]
+            else:
+                value = OPERATIONS[node.op](*(results[i] for i in node.inputs), **dict(node.params))
+            results[node] = value
+            for i in node.inputs:
+                remaining[i] -= 1
+                if remaining[i] == 0 and i not in outputs:
+                    del results[i]
+            if cache is not None and node in cache_keys:
+                cache.put(cache_keys[node], (np.array(value, dtype=np.float64, copy=True),))
+
+        return pd.DataFrame({name: results[node] for name, node in plan.outputs.items()}, index=data.index)
@@ -0,0 +1,537 @@
+"""Stateful indicators updated one bar at a time"""
+
+import math
+from bisect import bisect_right
+from collections import deque
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+class Checkpointable:
+    """
+    State snapshot as plain Python values.
+
+    get_state returns every attribute, with deques as lists and nested
+    indicators as nested dicts, so a snapshot can be pickled or written as
+    JSON. set_state restores it onto an instance built with the same
+    parameters.
+    """
+
+    def get_state(self) -> Dict[str, Any]:
+        return {name: _dump(value) for name, value in vars(self).items()}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            current = getattr(self, name, None)
+            if isinstance(current, Checkpointable):
+                current.set_state(value)
+            elif isinstance(current, deque):
+                setattr(self, name, deque((tuple(v) if isinstance(v, list) else v for v in value),
+                                          maxlen=current.maxlen))
+            else:
+                setattr(self, name, value)
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, Checkpointable):
+        return value.get_state()
+    if isinstance(value, deque):
+        return list(value)
+    return value
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    """Float division with NumPy semantics (x/0 is +/-inf, 0/0 and NaN are NaN)"""
+    if denominator == 0:
+        if numerator != numerator or numerator == 0:
+            return math.nan
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+class StreamingIndicator(Checkpointable):
+    """Base class for O(1)-per-bar indicators; NaN is returned until warmed up"""
+
+    def update(self, value: float) -> float:
+        raise NotImplementedError
+
+    @property
+    def ready(self) -> bool:
+        return not math.isnan(self.value)
+
+
+class RollingMean(Checkpointable):
+    """
+    Fixed-window mean that follows pandas `rolling(window).mean()` bit for bit.
+
+    Uses the same Kahan-compensated add/remove sums, sign counters and
+    repeated-value shortcut as the pandas kernel.
+    """
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.same_count = 0
+        self.prev_value = math.nan
+        self.value = math.nan
+
+    def update(self, value: float) -> float:
+        if self.window == 1:
+            # pandas restarts the sums whenever consecutive windows do not overlap
+            self.__init__(1)
+        elif len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(value)
+        self._add(value)
+        self.value = self._mean()
+        return self.value
+
+    def _add(self, value: float) -> None:
+        if value != value:
+            return
+        self.nobs += 1
+        y = value - self.compensation_add
+        t = self.sum_x + y
+        self.compensation_add = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct += 1
+        if value == self.prev_value:
+            self.same_count += 1
+        else:
+            self.same_count = 1
+        self.prev_value = value
+
+    def _remove(self, value: float) -> None:
+        if value != value:
+            return
+        self.nobs -= 1
+        y = -value - self.compensation_remove
+        t = self.sum_x + y
+        self.compensation_remove = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct -= 1
+
+    def _mean(self) -> float:
+        if self.nobs < self.window:
+            return math.nan
+        if self.same_count >= self.nobs:
+            return self.prev_value
+        result = self.sum_x / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+
+class RollingVariance(Checkpointable):
+    """
+    Fixed-window sample variance following pandas `rolling(window).var()`.
+
+    Welford updates with Kahan-compensated means for adds and removes,
+    as in the pandas kernel, including its zero result for windows of
+    repeated values.
+    """
+
+    def __init__(self, window: int, ddof: int = 1):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self.ddof = ddof
+        self.values = deque(maxlen=window)
+        self.nobs = 0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.same_count = 0
+        self.prev_value = math.nan
+        self.value = math.nan
+
+    def update(self, value: float) -> float:
+        if self.window == 1:
+            self.__init__(1, self.ddof)
+        elif len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(value)
+        self._add(value)
+        self.value = self._variance()
+        return self.value
+
+    def _add(self, value: float) -> None:
+        if value != value:
+            return
+        self.nobs += 1
+        if value == self.prev_value:
+            self.same_count += 1
+        else:
+            self.same_count = 1
+        self.prev_value = value
+        prev_mean = self.mean_x - self.compensation_add
+        y = value - self.compensation_add
+        t = y - self.mean_x
+        self.compensation_add = t + self.mean_x - y
+        self.mean_x += t / self.nobs
+        self.ssqdm_x += (value - prev_mean) * (value - self.mean_x)
+
+    def _remove(self, value: float) -> None:
+        if value != value:
+            return
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean_x - self.compensation_remove
+            y = value - self.compensation_remove
+            t = y - self.mean_x
+            self.compensation_remove = t + self.mean_x - y
+            self.mean_x -= t / self.nobs
+            self.ssqdm_x -= (value - prev_mean) * (value - self.mean_x)
+        else:
+            self.mean_x = 0.0
+            self.ssqdm_x = 0.0
+
+    def _variance(self) -> float:
+        if self.nobs < self.window or self.nobs <= self.ddof:
+            return math.nan
+        if self.nobs == 1 or self.same_count >= self.nobs:
+            return 0.0
+        return max(self.ssqdm_x / (self.nobs - self.ddof), 0.0)
+
+
+class RollingExtremum(Checkpointable):
+    """
+    Fixed-window min or max with a monotonic deque, amortized O(1) per bar.
+
+    The deque keeps (bar number, value) candidates in monotonic order, so
+    the front is always the extremum of the current window. Matches pandas
+    `rolling(window).min()` / `.max()`, including NaN until the window
+    holds `window` valid values.
+    """
+
+    def __init__(self, window: int, maximum: bool = False):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self.maximum = maximum
+        self.candidates = deque()
+        self.valid = deque(maxlen=window)
+        self.nobs = 0
+        self.count = 0
+        self.value = math.nan
+
+    def update(self, value: float) -> float:
+        position = self.count
+        self.count += 1
+        if len(self.valid) == self.window:
+            self.nobs -= self.valid[0]
+        is_valid = value == value
+        self.valid.append(int(is_valid))
+        self.nobs += is_valid
+
+        if is_valid:
+            candidates = self.candidates
+            if self.maximum:
+                while candidates and candidates[-1][1] <= value:
+                    candidates.pop()
+            else:
+                while candidates and candidates[-1][1] >= value:
+                    candidates.pop()
+            candidates.append((position, value))
+        while self.candidates and self.candidates[0][0] <= position - self.window:
+            self.candidates.popleft()
+
+        self.value = self.candidates[0][1] if self.nobs >= self.window else math.nan
+        return self.value
+
+
+class RollingExtrema(Checkpointable):
+    """
+    Min or max over several windows from one monotonic deque.
+
+    The deque is sized for the longest window. The extremum of a shorter
+    window is its oldest candidate still inside that window, found by
+    bisecting the candidates' bar numbers, so an update costs amortized
+    O(1) plus O(log window) per window. Each window matches
+    RollingExtremum, and pandas, on its own.
+    """
+
+    def __init__(self, windows: Sequence[int], maximum: bool = False):
+        if not windows or min(windows) < 1:
+            raise ValueError("windows must be >= 1")
+        self.windows = list(windows)
+        self.maximum = maximum
+        self.positions = deque()
+        self.candidates = deque()
+        # Running count of valid values after each of the last max(windows) + 1 bars
+        self.valid_counts = deque(maxlen=max(self.windows) + 1)
+        self.nobs = 0
+        self.count = 0
+        self.values = [math.nan] * len(self.windows)
+
+    def update(self, value: float) -> List[float]:
+        position = self.count
+        self.count += 1
+        if value == value:
+            self.nobs += 1
+            positions, candidates = self.positions, self.candidates
+            if self.maximum:
+                while candidates and candidates[-1] <= value:
+                    candidates.pop()
+                    positions.pop()
+            else:
+                while candidates and candidates[-1] >= value:
+                    candidates.pop()
+                    positions.pop()
+            candidates.append(value)
+            positions.append(position)
+        self.valid_counts.append(self.nobs)
+        while self.positions and self.positions[0] <= position - self.valid_counts.maxlen + 1:
+            self.positions.popleft()
+            self.candidates.popleft()
+
+        for column, window in enumerate(self.windows):
+            before = self.valid_counts[-1 - window] if len(self.valid_counts) > window else 0
+            if self.nobs - before < window:
+                self.values[column] = math.nan
+            else:
+                self.values[column] = self.candidates[bisect_right(self.positions, position - window)]
+        return self.values
+
+
+class StreamingSMA(StreamingIndicator):
+    """Simple Moving Average (SMA)"""
+
+    def __init__(self, period: int):
+        self.mean = RollingMean(period)
+
+    @property
+    def value(self) -> float:
+        return self.mean.value
+
+    def update(self, value: float) -> float:
+        return self.mean.update(value)
+
+
+class StreamingEMA(StreamingIndicator):
+    """Exponential Moving Average (EMA), matching pandas `ewm(span, adjust=False)`"""
+
+    def __init__(self, period: int):
+        if period < 1:
+            raise ValueError("period must be >= 1")
+        self.alpha = 2.0 / (period + 1)
+        self.old_weight = 1.0 - self.alpha
+        self.value = math.nan
+
+    def update(self, value: float) -> float:
+        if self.value != self.value:
+            self.value = value
+        elif value == value and self.value != value:
+            self.value = (self.old_weight * self.value + self.alpha * value) / (self.old_weight + self.alpha)
+        return self.value
+
+
+class StreamingRSI(StreamingIndicator):
+    """Relative Strength Index (RSI) over rolling mean gains and losses"""
+
+    def __init__(self, period: int = 14):
+        self.gain = RollingMean(period)
+        self.loss = RollingMean(period)
+        self.prev = math.nan
+        self.value = math.nan
+
+    def update(self, value: float) -> float:
+        delta = value - self.prev
+        self.prev = value
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-(delta if delta < 0 else 0.0))
+        if gain != gain or loss != loss or (gain == 0 and loss == 0):
+            self.value = math.nan
+        elif loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - (100 / (1 + gain / loss))
+        return self.value
+
+
+class StreamingMACD(StreamingIndicator):
+    """Moving Average Convergence Divergence (MACD)"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+        self.value = math.nan
+        self.signal_value = math.nan
+
+    def update(self, value: float) -> float:
+        self.value = self.fast.update(value) - self.slow.update(value)
+        self.signal_value = self.signal.update(self.value)
+        return self.value
+
+    @property
+    def lines(self) -> Tuple[float, float, float]:
+        """(macd, signal line, histogram)"""
+        return self.value, self.signal_value, self.value - self.signal_value
+
+
+class StreamingBollingerBands(StreamingIndicator):
+    """Bollinger Bands; value is the middle band"""
+
+    def __init__(self, period: int = 20, std_dev: float = 2):
+        self.mean = RollingMean(period)
+        self.variance = RollingVariance(period)
+        self.std_dev = std_dev
+        self.value = math.nan
+        self.upper = math.nan
+        self.lower = math.nan
+
+    def update(self, value: float) -> float:
+        self.value = self.mean.update(value)
+        std = math.sqrt(self.variance.update(value))
+        self.upper = self.value + std * self.std_dev
+        self.lower = self.value - std * self.std_dev
+        return self.value
+
+    @property
+    def bands(self) -> Tuple[float, float, float]:
+        """(upper, middle, lower)"""
+        return self.upper, self.value, self.lower
+
+
+class TrueRange(Checkpointable):
+    """Bar true range: the largest of high-low and the gaps to the previous close"""
+
+    def __init__(self):
+        self.prev_close = math.nan
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        ranges = [r for r in (high - low, abs(high - self.prev_close), abs(low - self.prev_close)) if r == r]
+        self.value = max(ranges) if ranges else math.nan
+        self.prev_close = close
+        return self.value
+
+
+class StreamingATR(StreamingIndicator):
+    """Average True Range (ATR)"""
+
+    def __init__(self, period: int = 14):
+        self.true_range = TrueRange()
+        self.mean = RollingMean(period)
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        self.value = self.mean.update(self.true_range.update(high, low, close))
+        return self.value
+
+
+class StreamingStochastic(StreamingIndicator):
+    """Stochastic Oscillator; value is the smoothed %K, d_value the %D line"""
+
+    def __init__(self, period: int = 14, smooth_k: int = 3, smooth_d: int = 3):
+        self.lowest_low = RollingExtremum(period)
+        self.highest_high = RollingExtremum(period, maximum=True)
+        self.k_mean = RollingMean(smooth_k)
+        self.d_mean = RollingMean(smooth_d)
+        self.value = math.nan
+        self.d_value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        lowest_low = self.lowest_low.update(low)
+        highest_high = self.highest_high.update(high)
+        k_percent = 100 * _divide(close - lowest_low, highest_high - lowest_low)
+        self.value = self.k_mean.update(k_percent)
+        self.d_value = self.d_mean.update(self.value)
+        return self.value
+
+
+class StreamingDonchianChannels(StreamingIndicator):
+    """Donchian Channels; value is the middle line, upper and lower the channel"""
+
+    def __init__(self, period: int = 20):
+        self.highest_high = RollingExtremum(period, maximum=True)
+        self.lowest_low = RollingExtremum(period)
+        self.upper = math.nan
+        self.lower = math.nan
+        self.value = math.nan
+
+    def update(self, high: float, low: float) -> float:
+        self.upper = self.highest_high.update(high)
+        self.lower = self.lowest_low.update(low)
+        self.value = (self.upper + self.lower) / 2
+        return self.value
+
+    @property
+    def channels(self) -> Tuple[float, float, float]:
+        return self.upper, self.value, self.lower
+
+
+class StreamingWilliamsR(StreamingIndicator):
+    """Williams %R"""
+
+    def __init__(self, period: int = 14):
+        self.lowest_low = RollingExtremum(period)
+        self.highest_high = RollingExtremum(period, maximum=True)
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        lowest_low = self.lowest_low.update(low)
+        highest_high = self.highest_high.update(high)
+        self.value = -100 * _divide(highest_high - close, highest_high - lowest_low)
+        return self.value
+
+
+class StreamingADX(StreamingIndicator):
+    """Average Directional Index (ADX)"""
+
+    def __init__(self, period: int = 14):
+        self.true_range = TrueRange()
+        self.atr = RollingMean(period)
+        self.plus_dm_mean = RollingMean(period)
+        self.minus_dm_mean = RollingMean(period)
+        self.dx_mean = RollingMean(period)
+        self.prev_high = math.nan
+        self.prev_low = math.nan
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        up_move = high - self.prev_high
+        down_move = -(low - self.prev_low)
+        self.prev_high = high
+        self.prev_low = low
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > plus_dm and down_move > 0 else 0.0
+
+        atr = self.atr.update(self.true_range.update(high, low, close))
+        plus_di = 100 * _divide(self.plus_dm_mean.update(plus_dm), atr)
+        minus_di = 100 * _divide(self.minus_dm_mean.update(minus_dm), atr)
+        dx = 100 * _divide(abs(plus_di - minus_di), plus_di + minus_di)
+        self.value = self.dx_mean.update(dx)
+        return self.value
+
+
+class StreamingOBV(StreamingIndicator):
+    """On-Balance Volume (OBV)"""
+
+    def __init__(self):
+        self.started = False
+        self.prev_close = math.nan
+        self.value = math.nan
+
+    def update(self, close: float, volume: float) -> float:
+        if not self.started:
+            self.started = True
+            self.value = volume
+        elif close > self.prev_close:
+            self.value = self.value + volume
+        elif close < self.prev_close:
+            self.value = self.value - volume
+        self.prev_close = close
+        return self.value
@@ -1,13 +1,29 @@
 """Trading strategies module"""
 
-from app.backtesting.strategies.base_strategy import BaseStrategy
+from app.backtesting.strategies.base_strategy import BaseStrategy, BarArrays, StrategyOutput
 from app.backtesting.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
 from app.backtesting.strategies.rsi_strategy import RSIStrategy
 from app.backtesting.strategies.macd_strategy import MACDStrategy
+from app.backtesting.strategies.timeframes import ResampledBars, TimeframeCache, resample_bars
+from app.backtesting.strategies.incremental import (
+    IncrementalStrategy,
+    IncrementalMovingAverageCrossover,
+    IncrementalRSI,
+    IncrementalMACD,
+)
 
 __all__ = [
     "BaseStrategy",
+    "BarArrays",
+    "StrategyOutput",
     "MovingAverageCrossoverStrategy",
     "RSIStrategy",
     "MACDStrategy",
+    "ResampledBars",
+    "TimeframeCache",
+    "resample_bars",
+    "IncrementalStrategy",
+    "IncrementalMovingAverageCrossover",
+    "IncrementalRSI",
+    "IncrementalMACD",
 ]
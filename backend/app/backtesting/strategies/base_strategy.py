@@ -1,9 +1,15 @@
 """Base strategy class"""
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple, TYPE_CHECKING
+import numpy as np
 import pandas as pd
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+
+if TYPE_CHECKING:
+    from app.backtesting.strategies.timeframes import ResampledBars
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
 
 
 @dataclass
@@ -19,6 +25,78 @@ class Trade:
     pnl_percent: float
 
 
+@dataclass(frozen=True)
+class BarArrays:
+    """
+    Read-only OHLCV column views handed to compute_signals.
+
+    Columns share memory with the source DataFrame whenever it already
+    holds float64 data, so no bar data is copied. Columns missing from
+    the frame are None.
+
+    `timeframes` holds the higher-timeframe views the engine built for a
+    strategy's declared timeframes; timeframe() falls back to the shared
+    timeframe cache for any other rule.
+    """
+    close: np.ndarray
+    index: pd.Index
+    open: Optional[np.ndarray] = None
+    high: Optional[np.ndarray] = None
+    low: Optional[np.ndarray] = None
+    volume: Optional[np.ndarray] = None
+    timeframes: Dict[str, "ResampledBars"] = field(default_factory=dict, compare=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def timeframe(self, rule: str) -> "ResampledBars":
+        """Bars resampled to a higher timeframe, with the index map for aligning values back"""
+        view = self.timeframes.get(rule)
+        if view is None:
+            from app.backtesting.strategies.timeframes import timeframe_cache
+            view = timeframe_cache.resample(self, rule)
+        return view
+
+    def with_timeframes(self, rules: Sequence[str], symbol: Optional[str] = None) -> "BarArrays":
+        """Copy of these bars carrying the views for rules, taken from the shared timeframe cache"""
+        from app.backtesting.strategies.timeframes import timeframe_cache
+        views = {rule: timeframe_cache.resample(self, rule, symbol) for rule in rules}
+        return replace(self, timeframes={**self.timeframes, **views})
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame) -> "BarArrays":
+        """Wrap the OHLCV columns of a DataFrame without copying them"""
+        columns = {
+            name: _readonly(data[name].to_numpy(dtype=np.float64, copy=False))
+            for name in OHLCV_COLUMNS if name in data.columns
+        }
+        return cls(index=data.index, **columns)
+
+    def series(self, name: str) -> pd.Series:
+        """Column as a zero-copy pandas Series with a default index, for the indicator functions"""
+        return pd.Series(getattr(self, name), copy=False)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Copy the columns into a new DataFrame (used by the generate_signals adapter)"""
+        return pd.DataFrame(
+            {name: getattr(self, name) for name in OHLCV_COLUMNS if getattr(self, name) is not None},
+            index=self.index,
+        )
+
+
+def _readonly(values: np.ndarray) -> np.ndarray:
+    view = values.view()
+    view.flags.writeable = False
+    return view
+
+
+@dataclass
+class StrategyOutput:
+    """Result of compute_signals: int8 signal per bar plus optional named indicator arrays"""
+    signal: np.ndarray
+    indicators: Dict[str, np.ndarray] = field(default_factory=dict)
+
+
 class BaseStrategy(ABC):
     """Base class for all trading strategies"""
     
@@ -29,16 +107,122 @@ class BaseStrategy(ABC):
         self.signals = []
         self.trades = []
     
-    @abstractmethod
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+    def compute_signals(self, bars: BarArrays) -> StrategyOutput:
         """
-        Generate trading signals. Must return DataFrame with 'signal' column.
-        Signal values:
+        Compute trading signals from read-only bar arrays.
+        Signal values (int8):
         - 1 = BUY signal
         - -1 = SELL signal
         - 0 = HOLD (no action)
+        
+        Strategies that only implement generate_signals are run through it
+        on a copy of the bars; bars missing from its output (e.g. dropped
+        over a warmup) get no signal.
+        """
+        if type(self).generate_signals is BaseStrategy.generate_signals:
+            raise NotImplementedError(f"{type(self).__name__} must implement compute_signals or generate_signals")
+        output = self.generate_signals(bars.to_frame())
+        if not output.index.equals(bars.index):
+            if not output.index.is_unique:
+                raise ValueError(f"{type(self).__name__}.generate_signals returned duplicate index labels")
+            output = output.reindex(bars.index)
+        signal = output["signal"].fillna(0).to_numpy()
+        return StrategyOutput(signal=self._regime(signal == 1, signal == -1))
+    
+    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Generate trading signals. Returns a copy of data with a 'signal'
+        column and one column per indicator output of compute_signals.
+        """
+        output = self.compute_signals(BarArrays.from_frame(data))
+        data = data.copy()
+        for name, values in output.indicators.items():
+            data[name] = values
+        data["signal"] = output.signal.astype(int)
+        return data
+    
+    def warmup_bars(self) -> Optional[int]:
+        """
+        Bars of history compute_signals needs before a bar to give that bar, and the one
+        before it, the same signal as a run over the full history; None when the
+        indicators have unbounded memory (e.g. EMAs)
+        """
+        return None
+    
+    def timeframes(self) -> Tuple[str, ...]:
+        """
+        Higher timeframes compute_signals reads through bars.timeframe(rule), as pandas
+        frequency strings; the engine builds (or takes from the cache) their views once
+        per run before calling compute_signals
+        """
+        return ()
+    
+    def compute_signals_chunk(self, bars: BarArrays,
+                              state: Optional[Dict[str, Any]]) -> Tuple[np.ndarray, Dict[str, Any]]:
         """
-        pass
+        Signals for the next chunk of a series too large to compute at once
+        
+        The default keeps the last warmup_bars() bars as state and runs
+        compute_signals over them followed by the chunk; strategies whose
+        indicators never forget override it to carry indicator values instead.
+        
+        Args:
+            bars: The chunk's bars
+            state: What the previous chunk returned, None for the first chunk
+        
+        Returns:
+            Tuple of (int8 signals of the chunk, state for the next chunk)
+        """
+        warmup = self.warmup_bars()
+        if warmup is None:
+            raise NotImplementedError(f"{type(self).__name__} does not support chunked runs")
+        if state is not None:
+            tail = state["bars"]
+            bars = BarArrays(index=tail.index.append(bars.index), **{
+                name: np.concatenate([getattr(tail, name), getattr(bars, name)])
+                for name in OHLCV_COLUMNS if getattr(bars, name) is not None
+            })
+            skip = len(tail)
+        else:
+            skip = 0
+        signal = self.compute_signals(bars).signal[skip:]
+        keep = max(len(bars) - warmup, 0)
+        tail = BarArrays(index=bars.index[keep:], **{
+            name: getattr(bars, name)[keep:].copy() for name in OHLCV_COLUMNS if getattr(bars, name) is not None
+        })
+        return signal, {"bars": tail}
+    
+    @classmethod
+    def signal_matrix(cls, data: pd.DataFrame, parameter_sets: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Signals for many parameter sets, as consumed by BacktestEngine.run_sweep
+        
+        Args:
+            data: DataFrame with OHLCV data
+            parameter_sets: One parameters dict per column
+        
+        Returns:
+            int8 matrix of shape (bars, parameter sets)
+        """
+        strategies = [cls(parameters) for parameters in parameter_sets]
+        rules = sorted({rule for strategy in strategies for rule in strategy.timeframes()})
+        bars = BarArrays.from_frame(data).with_timeframes(rules)
+        matrix = np.zeros((len(data), len(parameter_sets)), dtype=np.int8)
+        for column, strategy in enumerate(strategies):
+            matrix[:, column] = strategy.compute_signals(bars).signal
+        return matrix
+    
+    @staticmethod
+    def _regime(buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+        """int8 regime: 1 where buy holds, -1 where sell holds, else 0"""
+        return buy.astype(np.int8) - sell.astype(np.int8)
+    
+    @staticmethod
+    def _crossovers(regime: np.ndarray) -> np.ndarray:
+        """Keep a regime value only on the bars where it changes (the first bar is kept)"""
+        signal = regime.copy()
+        signal[1:][regime[1:] == regime[:-1]] = 0
+        return signal
     
     def _validate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
         """Validate and clean signals DataFrame"""
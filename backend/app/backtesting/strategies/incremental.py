@@ -0,0 +1,110 @@
+"""Bar-by-bar versions of the built-in strategies"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Mapping
+from app.backtesting.strategies.base_strategy import BaseStrategy
+from app.backtesting.strategies.moving_average_crossover import MovingAverageCrossoverStrategy
+from app.backtesting.strategies.rsi_strategy import RSIStrategy
+from app.backtesting.strategies.macd_strategy import MACDStrategy
+from app.backtesting.indicators.streaming import StreamingSMA, StreamingRSI, StreamingMACD
+
+
+class IncrementalStrategy(ABC):
+    """
+    Strategy that emits one signal per bar with O(1) state.
+
+    Signals follow the batch `generate_signals` contract bar for bar, so a
+    replayed frame produces the same signal column.
+    """
+
+    @abstractmethod
+    def on_bar(self, bar: Mapping[str, float]) -> int:
+        """Consume one bar and return its signal (1 = BUY, -1 = SELL, 0 = HOLD)"""
+        pass
+
+
+class _CrossoverFilter:
+    """Pass a raw regime signal through only when it changes (first bar passes as-is)"""
+
+    def __init__(self):
+        self.prev = None
+
+    def __call__(self, raw: int) -> int:
+        signal = raw if self.prev is None or raw != self.prev else 0
+        self.prev = raw
+        return signal
+
+
+class IncrementalMovingAverageCrossover(MovingAverageCrossoverStrategy, IncrementalStrategy):
+    """
+    Moving Average Crossover Strategy, one bar at a time
+
+    The higher-timeframe trend filter is not supported: the batch version
+    sees a period's close on the period's last base bar, which a stream
+    only learns is the last one when the next bar arrives.
+    """
+
+    def __init__(self, parameters: Dict[str, Any]):
+        super().__init__(parameters)
+        self._validate_parameters()
+        if self.parameters.get("trend_timeframe"):
+            raise ValueError("The incremental moving average crossover has no trend_timeframe filter")
+        self.fast_ma = StreamingSMA(self.parameters["fast_period"])
+        self.slow_ma = StreamingSMA(self.parameters["slow_period"])
+        self.crossover = _CrossoverFilter()
+
+    def on_bar(self, bar: Mapping[str, float]) -> int:
+        close = float(bar["close"])
+        fast = self.fast_ma.update(close)
+        slow = self.slow_ma.update(close)
+        return self.crossover(1 if fast > slow else -1 if fast < slow else 0)
+
+
+class IncrementalRSI(RSIStrategy, IncrementalStrategy):
+    """RSI Strategy, one bar at a time"""
+
+    def __init__(self, parameters: Dict[str, Any]):
+        super().__init__(parameters)
+        self._validate_parameters()
+        self.rsi = StreamingRSI(self.parameters["rsi_period"])
+        self.crossover = _CrossoverFilter()
+
+    def on_bar(self, bar: Mapping[str, float]) -> int:
+        rsi = self.rsi.update(float(bar["close"]))
+        if rsi > self.parameters["overbought_threshold"]:
+            raw = -1
+        elif rsi < self.parameters["oversold_threshold"]:
+            raw = 1
+        else:
+            raw = 0
+        return self.crossover(raw)
+
+
+class IncrementalMACD(MACDStrategy, IncrementalStrategy):
+    """MACD Strategy, one bar at a time"""
+
+    def __init__(self, parameters: Dict[str, Any]):
+        super().__init__(parameters)
+        self.macd = StreamingMACD(
+            self.parameters["fast_period"], self.parameters["slow_period"], self.parameters["signal_period"]
+        )
+
+    def on_bar(self, bar: Mapping[str, float]) -> int:
+        macd = self.macd.update(float(bar["close"]))
+        signal_line = self.macd.signal_value
+        return 1 if macd > signal_line else -1 if macd < signal_line else 0
+
+
+INCREMENTAL_STRATEGIES = {
+    MovingAverageCrossoverStrategy: IncrementalMovingAverageCrossover,
+    RSIStrategy: IncrementalRSI,
+    MACDStrategy: IncrementalMACD,
+}
+
+
+def incremental_version(strategy: BaseStrategy) -> IncrementalStrategy:
+    """Fresh incremental counterpart of a batch strategy with the same parameters"""
+    for batch_class, incremental_class in INCREMENTAL_STRATEGIES.items():
+        if type(strategy) is batch_class or type(strategy) is incremental_class:
+            return incremental_class(strategy.parameters)
+    raise ValueError(f"No incremental version of {type(strategy).__name__}")
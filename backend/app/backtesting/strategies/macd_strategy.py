@@ -1,8 +1,10 @@
 """MACD Strategy"""
 
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
-from app.backtesting.strategies.base_strategy import BaseStrategy
+from typing import Dict, Any, List, Optional, Tuple
+from app.backtesting.strategies.base_strategy import BaseStrategy, BarArrays, StrategyOutput
+from app.backtesting.indicators.cache import cached_indicators
 from app.backtesting.indicators.indicators import TechnicalIndicators
 
 
@@ -19,28 +21,84 @@ class MACDStrategy(BaseStrategy):
         default_params.update(parameters)
         super().__init__("MACD Strategy", default_params)
     
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+    def compute_signals(self, bars: BarArrays) -> StrategyOutput:
         """
         Generate signals based on MACD
         Buy when MACD > Signal line, Sell when MACD < Signal line
         """
-        data = data.copy()
-        
         fast = self.parameters.get("fast_period", 12)
         slow = self.parameters.get("slow_period", 26)
         signal = self.parameters.get("signal_period", 9)
         
         # Calculate MACD
-        data["macd"], data["signal_line"], data["histogram"] = TechnicalIndicators.macd(
-            data["close"], fast, slow, signal
+        macd, signal_line, histogram = cached_indicators.macd(bars.series("close"), fast, slow, signal)
+        macd = macd.to_numpy()
+        signal_line = signal_line.to_numpy()
+        
+        return StrategyOutput(
+            signal=self._regime(macd > signal_line, macd < signal_line),
+            indicators={"macd": macd, "signal_line": signal_line, "histogram": histogram.to_numpy()},
         )
+    
+    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+        """DataFrame adapter; also keeps the legacy 'position' column (change of signal from the bar before)"""
+        data = super().generate_signals(data)
+        data["position"] = data["signal"].diff()
+        return data
+    
+    def compute_signals_chunk(self, bars: BarArrays,
+                              state: Optional[Dict[str, Any]]) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        MACD signals of the next chunk, continuing the three EMAs from their last values
         
-        # Generate signals
-        data["signal"] = 0
-        data.loc[data["macd"] > data["signal_line"], "signal"] = 1  # BUY
-        data.loc[data["macd"] < data["signal_line"], "signal"] = -1  # SELL
+        An adjust=False EMA only depends on its previous value, so seeding each
+        EMA with the value it had on the bar before the chunk gives the same
+        lines as a run over the full history.
+        """
+        fast = self.parameters.get("fast_period", 12)
+        slow = self.parameters.get("slow_period", 26)
+        signal = self.parameters.get("signal_period", 9)
+        state = state or {}
+        close = np.asarray(bars.close, dtype=np.float64)
+        if len(close) == 0:
+            return np.zeros(0, dtype=np.int8), state
         
-        # Find signal changes
-        data["position"] = data["signal"].diff()
+        ema_fast = _continue_ema(close, fast, state.get("fast"))
+        ema_slow = _continue_ema(close, slow, state.get("slow"))
+        macd = ema_fast - ema_slow
+        signal_line = _continue_ema(macd, signal, state.get("signal"))
         
-        return data
+        state = {"fast": ema_fast[-1], "slow": ema_slow[-1], "signal": signal_line[-1]}
+        return self._regime(macd > signal_line, macd < signal_line), state
+    
+    @classmethod
+    def signal_matrix(cls, data: pd.DataFrame, parameter_sets: List[Dict[str, Any]]) -> np.ndarray:
+        """MACD signals for many parameter sets, computing each distinct EMA and MACD line once"""
+        keys = [
+            (parameters["fast_period"], parameters["slow_period"], parameters["signal_period"])
+            for parameters in (cls(parameters).parameters for parameters in parameter_sets)
+        ]
+        periods = sorted({fast for fast, _, _ in keys} | {slow for _, slow, _ in keys})
+        emas = TechnicalIndicators.ema_multi(data["close"], periods)
+        column = {period: j for j, period in enumerate(periods)}
+        
+        signals = {}
+        matrix = np.empty((len(keys), len(data)), dtype=np.int8).T
+        for k, key in enumerate(keys):
+            if key not in signals:
+                fast, slow, signal = key
+                macd = emas[:, column[fast]] - emas[:, column[slow]]
+                signal_line = TechnicalIndicators.ema_multi(macd, [signal])[:, 0]
+                signals[key] = cls._regime(macd > signal_line, macd < signal_line)
+            matrix[:, k] = signals[key]
+        return matrix
+
+
+def _continue_ema(values: np.ndarray, period: int, seed: Optional[float]) -> np.ndarray:
+    """TechnicalIndicators.exponential_moving_average of values, picking up from the EMA value seed"""
+    if seed is None:
+        return pd.Series(values).ewm(span=period, adjust=False).mean().to_numpy()
+    seeded = np.empty(len(values) + 1)
+    seeded[0] = seed
+    seeded[1:] = values
+    return pd.Series(seeded, copy=False).ewm(span=period, adjust=False).mean().to_numpy()[1:]
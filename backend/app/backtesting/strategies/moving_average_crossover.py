@@ -1,56 +1,119 @@
 """Moving Average Crossover Strategy"""
 
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
-from app.backtesting.strategies.base_strategy import BaseStrategy
+from typing import Dict, Any, List, Optional, Tuple
+from app.backtesting.strategies.base_strategy import BaseStrategy, BarArrays, StrategyOutput
+from app.backtesting.indicators.cache import cached_indicators
 from app.backtesting.indicators.indicators import TechnicalIndicators
 
 
 class MovingAverageCrossoverStrategy(BaseStrategy):
-    """Moving Average Crossover Strategy"""
+    """
+    Moving Average Crossover Strategy
+    
+    With a trend_timeframe (e.g. "D" over hourly bars), BUY crossovers are only
+    taken while the last completed higher-timeframe close is above its
+    trend_period moving average; SELL crossovers are always kept.
+    """
     
     def __init__(self, parameters: Dict[str, Any]):
         """Initialize strategy with parameters"""
         default_params = {
             "fast_period": 10,
             "slow_period": 20,
+            "trend_timeframe": None,
+            "trend_period": 20,
         }
         default_params.update(parameters)
         super().__init__("Moving Average Crossover", default_params)
     
+    def _validate_parameters(self):
+        """Validate periods"""
+        fast_period = self.parameters.get("fast_period", 10)
+        slow_period = self.parameters.get("slow_period", 20)
+        if fast_period >= slow_period:
+            raise ValueError("fast_period must be less than slow_period")
+        if fast_period < 1 or slow_period < 2:
+            raise ValueError("periods must be >= 1")
+    
     def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+        """DataFrame adapter; also keeps the legacy 'signal_change' column (change of signal from the bar before)"""
+        data = super().generate_signals(data)
+        data["signal_change"] = data["signal"].diff()
+        return data
+    
+    def warmup_bars(self) -> Optional[int]:
+        """The slow average of the bar before a chunk; the trend filter's periods do not fit a bar count"""
+        if self.parameters.get("trend_timeframe"):
+            return None
+        return self.parameters.get("slow_period", 20)
+    
+    def timeframes(self) -> Tuple[str, ...]:
+        """The trend filter's timeframe, if any"""
+        trend_timeframe = self.parameters.get("trend_timeframe")
+        return (trend_timeframe,) if trend_timeframe else ()
+    
+    def compute_signals(self, bars: BarArrays) -> StrategyOutput:
         """
         Generate signals based on moving average crossover
         Buy when fast MA > slow MA, Sell when fast MA < slow MA
         """
-        data = data.copy()
-        
         fast_period = self.parameters.get("fast_period", 10)
         slow_period = self.parameters.get("slow_period", 20)
-        
-        # Validate periods
-        if fast_period >= slow_period:
-            raise ValueError("fast_period must be less than slow_period")
-        if fast_period < 1 or slow_period < 2:
-            raise ValueError("periods must be >= 1")
+        self._validate_parameters()
         
         # Calculate moving averages
-        data["fast_ma"] = TechnicalIndicators.moving_average(data["close"], fast_period)
-        data["slow_ma"] = TechnicalIndicators.moving_average(data["close"], slow_period)
-        
-        # Generate initial signals based on MA relationship
-        data["signal"] = 0
-        data.loc[data["fast_ma"] > data["slow_ma"], "signal"] = 1  # BUY
-        data.loc[data["fast_ma"] < data["slow_ma"], "signal"] = -1  # SELL
+        close = bars.series("close")
+        fast_ma = cached_indicators.moving_average(close, fast_period).to_numpy()
+        slow_ma = cached_indicators.moving_average(close, slow_period).to_numpy()
         
         # Only trigger on crossovers (signal changes), not continuous holding
-        data["signal_change"] = data["signal"].diff()
+        regime = self._regime(fast_ma > slow_ma, fast_ma < slow_ma)
+        signal = self._crossovers(regime)
+        indicators = {"fast_ma": fast_ma, "slow_ma": slow_ma}
+        
+        trend_timeframe = self.parameters.get("trend_timeframe")
+        if trend_timeframe:
+            trend_period = self.parameters.get("trend_period", 20)
+            uptrend, indicators["trend_ma"] = self._trend(bars, trend_timeframe, trend_period)
+            signal[(signal == 1) & ~uptrend] = 0
         
-        # Reset signal to 0 except on crossover points
-        data.loc[data["signal_change"] == 0, "signal"] = 0
-        data.loc[data["signal_change"].notna() & (data["signal_change"] != 0), "signal"] = data.loc[data["signal_change"].notna() & (data["signal_change"] != 0), "signal"]
+        return StrategyOutput(signal=signal, indicators=indicators)
+    
+    @staticmethod
+    def _trend(bars: BarArrays, rule: str, period: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(higher-timeframe close above its moving average, that average) as of each base bar"""
+        view = bars.timeframe(rule)
+        trend_ma = cached_indicators.moving_average(view.bars.series("close"), period).to_numpy()
+        return view.align(view.bars.close > trend_ma, fill=False), view.align(trend_ma)
+    
+    @classmethod
+    def signal_matrix(cls, data: pd.DataFrame, parameter_sets: List[Dict[str, Any]]) -> np.ndarray:
+        """Crossover signals for many parameter sets from one multi-period SMA pass, one trend filter per timeframe"""
+        strategies = [cls(parameters) for parameters in parameter_sets]
+        for strategy in strategies:
+            strategy._validate_parameters()
+        fast = [strategy.parameters["fast_period"] for strategy in strategies]
+        slow = [strategy.parameters["slow_period"] for strategy in strategies]
+        periods = sorted(set(fast) | set(slow))
+        averages = TechnicalIndicators.moving_average_multi(data["close"], periods)
+        column = {period: j for j, period in enumerate(periods)}
         
-        # Fill NaN at the beginning with 0
-        data["signal"] = data["signal"].fillna(0).astype(int)
+        rules = sorted({rule for strategy in strategies for rule in strategy.timeframes()})
+        bars = BarArrays.from_frame(data).with_timeframes(rules) if rules else None
+        uptrends = {}
         
-        return data
+        matrix = np.empty((len(strategies), len(data)), dtype=np.int8).T
+        for k, strategy in enumerate(strategies):
+            fast_ma = averages[:, column[fast[k]]]
+            slow_ma = averages[:, column[slow[k]]]
+            signal = cls._crossovers(cls._regime(fast_ma > slow_ma, fast_ma < slow_ma))
+            trend_timeframe = strategy.parameters.get("trend_timeframe")
+            if trend_timeframe:
+                trend = (trend_timeframe, strategy.parameters.get("trend_period", 20))
+                if trend not in uptrends:
+                    uptrends[trend] = cls._trend(bars, *trend)[0]
+                signal[(signal == 1) & ~uptrends[trend]] = 0
+            matrix[:, k] = signal
+        return matrix
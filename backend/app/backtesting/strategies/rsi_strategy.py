@@ -1,8 +1,10 @@
 """RSI Strategy"""
 
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
-from app.backtesting.strategies.base_strategy import BaseStrategy
+from typing import Dict, Any, List
+from app.backtesting.strategies.base_strategy import BaseStrategy, BarArrays, StrategyOutput
+from app.backtesting.indicators.cache import cached_indicators
 from app.backtesting.indicators.indicators import TechnicalIndicators
 
 
@@ -19,19 +21,11 @@ class RSIStrategy(BaseStrategy):
         default_params.update(parameters)
         super().__init__("RSI Strategy", default_params)
     
-    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
-        """
-        Generate signals based on RSI
-        Buy when RSI < oversold_threshold, Sell when RSI > overbought_threshold
-        Hold between thresholds
-        """
-        data = data.copy()
-        
+    def _validate_parameters(self):
+        """Validate RSI period and thresholds"""
         rsi_period = self.parameters.get("rsi_period", 14)
         oversold = self.parameters.get("oversold_threshold", 30)
         overbought = self.parameters.get("overbought_threshold", 70)
-        
-        # Validate parameters
         if not (0 < oversold < 50):
             raise ValueError("oversold_threshold should be between 0 and 50")
         if not (50 < overbought < 100):
@@ -40,25 +34,50 @@ class RSIStrategy(BaseStrategy):
             raise ValueError("oversold_threshold must be less than overbought_threshold")
         if rsi_period < 2:
             raise ValueError("rsi_period must be >= 2")
+    
+    def generate_signals(self, data: pd.DataFrame) -> pd.DataFrame:
+        """DataFrame adapter; also keeps the legacy 'signal_change' column (change of signal from the bar before)"""
+        data = super().generate_signals(data)
+        data["signal_change"] = data["signal"].diff()
+        return data
+    
+    def warmup_bars(self) -> int:
+        """The RSI of the bar before a chunk, whose first price change needs one more bar"""
+        return self.parameters.get("rsi_period", 14) + 1
+    
+    def compute_signals(self, bars: BarArrays) -> StrategyOutput:
+        """
+        Generate signals based on RSI
+        Buy when RSI < oversold_threshold, Sell when RSI > overbought_threshold
+        Hold between thresholds
+        """
+        rsi_period = self.parameters.get("rsi_period", 14)
+        oversold = self.parameters.get("oversold_threshold", 30)
+        overbought = self.parameters.get("overbought_threshold", 70)
+        self._validate_parameters()
         
         # Calculate RSI
-        data["rsi"] = TechnicalIndicators.rsi(data["close"], rsi_period)
-        
-        # Generate signals with hysteresis to avoid whipsaws
-        data["signal"] = 0
+        rsi = cached_indicators.rsi(bars.series("close"), rsi_period).to_numpy()
         
-        # Buy only on first touch of oversold
-        data.loc[data["rsi"] < oversold, "signal"] = 1
-        # Sell only on first touch of overbought
-        data.loc[data["rsi"] > overbought, "signal"] = -1
-        
-        # Create crossover-only signals
-        data["signal_change"] = data["signal"].diff()
+        # Buy on first touch of oversold, sell on first touch of overbought
+        regime = self._regime(rsi < oversold, rsi > overbought)
         
-        # Only trigger on state changes
-        data.loc[data["signal_change"] == 0, "signal"] = 0
-        
-        # Fill NaN values
-        data["signal"] = data["signal"].fillna(0).astype(int)
+        return StrategyOutput(signal=self._crossovers(regime), indicators={"rsi": rsi})
+    
+    @classmethod
+    def signal_matrix(cls, data: pd.DataFrame, parameter_sets: List[Dict[str, Any]]) -> np.ndarray:
+        """RSI signals for many parameter sets from one multi-period RSI pass"""
+        strategies = [cls(parameters) for parameters in parameter_sets]
+        for strategy in strategies:
+            strategy._validate_parameters()
+        periods = sorted({strategy.parameters["rsi_period"] for strategy in strategies})
+        rsi = TechnicalIndicators.rsi_multi(data["close"], periods)
+        column = {period: j for j, period in enumerate(periods)}
         
-        return data
+        matrix = np.empty((len(strategies), len(data)), dtype=np.int8).T
+        for k, strategy in enumerate(strategies):
+            values = rsi[:, column[strategy.parameters["rsi_period"]]]
+            regime = cls._regime(values < strategy.parameters["oversold_threshold"],
+                                 values > strategy.parameters["overbought_threshold"])
+            matrix[:, k] = cls._crossovers(regime)
+        return matrix
@@ -0,0 +1,177 @@
+"""Higher-timeframe views of base bars, aligned back onto the base bars without lookahead"""
+
+from dataclasses import dataclass
+from typing import Hashable, Optional
+import numpy as np
+import pandas as pd
+from app.backtesting.indicators.cache import IndicatorCache, fingerprint
+from app.backtesting.strategies.base_strategy import OHLCV_COLUMNS, BarArrays
+
+DEFAULT_TIMEFRAME_CACHE_BYTES = 128 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ResampledBars:
+    """
+    OHLCV bars of a higher timeframe plus the index map back to the base bars.
+
+    Higher-timeframe bar k aggregates base bars starts[k] up to (not
+    including) starts[k + 1] and is labelled with the start of its period.
+    bar_map[i] is the last higher-timeframe bar whose base bars all close
+    at or before base bar i, or -1 while none has, so a value aligned
+    through it never uses a base bar after i.
+    """
+    rule: str
+    bars: BarArrays
+    starts: np.ndarray
+    bar_map: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.bars)
+
+    def align(self, values: np.ndarray, fill=np.nan) -> np.ndarray:
+        """
+        Higher-timeframe values (one per resampled bar) as seen from each base bar
+
+        Args:
+            values: Array with one value per resampled bar, e.g. an indicator of bars.close
+            fill: Value for the base bars before the first resampled bar completes
+
+        Returns:
+            Array with one value per base bar
+        """
+        values = np.asarray(values)
+        if len(values) != len(self.bars):
+            raise ValueError(f"expected {len(self.bars)} values for timeframe {self.rule}, got {len(values)}")
+        if len(values) == 0:
+            return np.full(len(self.bar_map), fill)
+        aligned = values[np.maximum(self.bar_map, 0)]
+        # bar_map is non-decreasing, so the bars without a completed period form a prefix
+        warmup = int(np.searchsorted(self.bar_map, 0))
+        if warmup:
+            aligned = aligned.astype(np.result_type(aligned, fill), copy=False)
+            aligned[:warmup] = fill
+        return aligned
+
+
+def resample_bars(bars: BarArrays, rule: str) -> ResampledBars:
+    """
+    Aggregate base bars into a higher timeframe in one pass
+
+    Periods are taken from DatetimeIndex.floor for fixed-width rules ("15min",
+    "4h", "D") and from to_period for calendar rules ("W", "M", "Q", "Y").
+    Open is the first open, high/low the extremes, close the last close and
+    volume the sum of the period's base bars; columns missing from bars stay
+    None. Periods without base bars are skipped rather than filled.
+
+    Args:
+        bars: Base bars with a sorted DatetimeIndex
+        rule: pandas frequency string of the higher timeframe
+
+    Returns:
+        ResampledBars for the rule
+    """
+    index = bars.index
+    if not isinstance(index, pd.DatetimeIndex):
+        raise ValueError("resampling needs bars with a DatetimeIndex")
+    if not index.is_monotonic_increasing:
+        raise ValueError("resampling needs bars in time order")
+    keys = _period_keys(index, rule)
+    n = len(bars)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return ResampledBars(rule=rule, bars=bars, starts=empty, bar_map=empty)
+
+    key_values = keys.asi8
+    starts = np.flatnonzero(key_values[1:] != key_values[:-1]) + 1
+    starts = np.concatenate([[0], starts])
+    last = np.append(starts[1:], n) - 1
+    columns = {"close": bars.close[last]}
+    if bars.open is not None:
+        columns["open"] = bars.open[starts]
+    if bars.high is not None:
+        columns["high"] = np.maximum.reduceat(bars.high, starts)
+    if bars.low is not None:
+        columns["low"] = np.minimum.reduceat(bars.low, starts)
+    if bars.volume is not None:
+        columns["volume"] = np.add.reduceat(bars.volume, starts)
+    labels = keys[starts]
+    if isinstance(labels, pd.PeriodIndex):
+        labels = labels.to_timestamp()
+    if index.tz is not None and labels.tz is None:
+        labels = labels.tz_localize(index.tz)
+
+    # Period k is complete at its last base bar
+    bar_map = np.searchsorted(last, np.arange(n), side="right") - 1
+    resampled = BarArrays(index=labels, **{name: _frozen(values) for name, values in columns.items()})
+    return ResampledBars(rule=rule, bars=resampled, starts=_frozen(starts), bar_map=_frozen(bar_map))
+
+
+def _period_keys(index: pd.DatetimeIndex, rule: str) -> pd.Index:
+    """Period of every base bar, as floored timestamps or a PeriodIndex"""
+    try:
+        return index.floor(rule)
+    except ValueError:
+        pass
+    try:
+        return index.tz_localize(None).to_period(rule) if index.tz is not None else index.to_period(rule)
+    except ValueError:
+        raise ValueError(f"Unsupported timeframe: {rule}") from None
+
+
+def _frozen(values: np.ndarray) -> np.ndarray:
+    values.flags.writeable = False
+    return values
+
+
+class TimeframeCache:
+    """
+    LRU cache of ResampledBars keyed by symbol, closes, timeframe and bar range.
+
+    Entries live in an IndicatorCache, so they share its byte budget and
+    hit/miss counters. The closes are fingerprinted the same way
+    CachedIndicators keys its inputs, so corrected or re-adjusted prices
+    of a symbol over the same range are resampled again.
+    """
+
+    def __init__(self, cache: Optional[IndicatorCache] = None):
+        self.cache = cache if cache is not None else IndicatorCache(DEFAULT_TIMEFRAME_CACHE_BYTES)
+
+    def resample(self, bars: BarArrays, rule: str, symbol: Optional[str] = None) -> ResampledBars:
+        """ResampledBars of bars for rule, built on the first request for this symbol and range"""
+        key = self.key(bars, rule, symbol)
+        entry = self.cache.get(key)
+        if entry is None:
+            view = resample_bars(bars, rule)
+            entry = _ViewEntry(view)
+            self.cache.put(key, entry)
+        return entry.view
+
+    @staticmethod
+    def key(bars: BarArrays, rule: str, symbol: Optional[str] = None) -> Hashable:
+        """Cache key: (symbol and close fingerprint, rule, first and last timestamp, bar count)"""
+        source = symbol, fingerprint(bars.close)
+        if len(bars) == 0:
+            return source, rule, None, None, 0
+        return source, rule, bars.index[0], bars.index[-1], len(bars)
+
+    def stats(self):
+        return self.cache.stats()
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+class _ViewEntry(tuple):
+    """Arrays of a ResampledBars, so IndicatorCache can size them, carrying the view itself"""
+
+    def __new__(cls, view: ResampledBars):
+        arrays = [view.starts, view.bar_map] + [
+            getattr(view.bars, name) for name in OHLCV_COLUMNS if getattr(view.bars, name) is not None
+        ]
+        entry = super().__new__(cls, arrays)
+        entry.view = view
+        return entry
+
+
+timeframe_cache = TimeframeCache()
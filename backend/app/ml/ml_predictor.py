@@ -7,7 +7,20 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
-from app.backtesting.indicators.indicators import TechnicalIndicators
+from app.backtesting.indicators.cache import indicator_cache
+from app.backtesting.indicators.pipeline import IndicatorPipeline
+
+FEATURE_PIPELINE = (
+    IndicatorPipeline()
+    .request("sma_10", "sma", period=10)
+    .request("sma_20", "sma", period=20)
+    .request("rsi", "rsi", period=14)
+    .request("macd", "macd")
+    .request("macd_signal", "macd", component="signal")
+    .request("bb_upper", "bollinger_bands", component="upper")
+    .request("bb_lower", "bollinger_bands", component="lower")
+    .request("atr", "atr")
+)
 
 
 class MLPredictor:
@@ -40,20 +53,10 @@ class MLPredictor:
         """Prepare features for ML model"""
         features = data.copy()
         
-        # Technical indicators as features
-        features["sma_10"] = TechnicalIndicators.moving_average(data["close"], 10)
-        features["sma_20"] = TechnicalIndicators.moving_average(data["close"], 20)
-        features["rsi"] = TechnicalIndicators.rsi(data["close"], 14)
-        
-        macd, signal, _ = TechnicalIndicators.macd(data["close"])
-        features["macd"] = macd
-        features["macd_signal"] = signal
-        
-        upper, mid, lower = TechnicalIndicators.bollinger_bands(data["close"])
-        features["bb_upper"] = upper
-        features["bb_lower"] = lower
-        
-        features["atr"] = TechnicalIndicators.atr(data["high"], data["low"], data["close"])
+        # Technical indicators as features, with shared intermediates computed once
+        indicators = FEATURE_PIPELINE.compute(data, cache=indicator_cache)
+        for name in indicators.columns:
+            features[name] = indicators[name]
         
         # Price features
         features["price_change"] = data["close"].pct_change()
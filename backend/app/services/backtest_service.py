@@ -52,7 +52,7 @@ class BacktestService:
         engine = BacktestEngine(initial_capital=strategy.initial_capital)
         
         # Run backtest
-        metrics, details = engine.run_backtest(market_data, strategy_instance)
+        metrics, details = engine.run_backtest(market_data, strategy_instance, symbol=strategy.symbol)
         
         # Create result record
         result = BacktestResult(
@@ -2,7 +2,17 @@
 
 import numpy as np
 import pandas as pd
-from typing import Tuple
+from typing import Tuple, Union
+from app.backtesting.engine.ledger import TradeLedger
+
+Trades = Union[TradeLedger, list]
+
+
+def trade_pnls(trades: Trades) -> np.ndarray:
+    """PnL column of a TradeLedger, or of a list of trade dicts"""
+    if isinstance(trades, TradeLedger):
+        return trades.pnl
+    return np.fromiter((t['pnl'] for t in trades), dtype=np.float64, count=len(trades))
 
 
 class PerformanceCalculator:
@@ -66,22 +76,24 @@ class PerformanceCalculator:
         return float(calmar)
     
     @staticmethod
-    def calculate_win_rate(trades: list) -> float:
+    def calculate_win_rate(trades: Trades) -> float:
         """Calculate win rate percentage"""
-        if len(trades) == 0:
+        pnls = trade_pnls(trades)
+        if len(pnls) == 0:
             return 0
         
-        winning_trades = sum(1 for t in trades if t['pnl'] > 0)
-        return (winning_trades / len(trades)) * 100
+        winning_trades = np.count_nonzero(pnls > 0)
+        return (winning_trades / len(pnls)) * 100
     
     @staticmethod
-    def calculate_profit_factor(trades: list) -> float:
+    def calculate_profit_factor(trades: Trades) -> float:
         """Calculate profit factor"""
-        if len(trades) == 0:
+        pnls = trade_pnls(trades)
+        if len(pnls) == 0:
             return 0
         
-        total_profit = sum(t['pnl'] for t in trades if t['pnl'] > 0)
-        total_loss = abs(sum(t['pnl'] for t in trades if t['pnl'] < 0))
+        total_profit = pnls[pnls > 0].sum()
+        total_loss = abs(pnls[pnls < 0].sum())
         
         if total_loss < 1e-6:
             return 0 if total_profit < 1e-6 else float('inf')
@@ -104,22 +116,16 @@ class RiskMetrics:
         return returns[returns <= var].mean()
     
     @staticmethod
-    def max_consecutive_losses(trades: list) -> int:
+    def max_consecutive_losses(trades: Trades) -> int:
         """Calculate maximum consecutive losing trades"""
-        if len(trades) == 0:
+        losses = trade_pnls(trades) < 0
+        if not losses.any():
             return 0
         
-        max_consec = 0
-        current_consec = 0
-        
-        for trade in trades:
-            if trade['pnl'] < 0:
-                current_consec += 1
-                max_consec = max(max_consec, current_consec)
-            else:
-                current_consec = 0
-        
-        return max_consec
+        edges = np.diff(np.concatenate(([0], losses.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        return int((ends - starts).max())
     
     @staticmethod
     def recovery_factor(total_return: float, max_drawdown: float) -> float:
@@ -134,19 +140,21 @@ class TradeAnalytics:
     """Analyze trade statistics"""
     
     @staticmethod
-    def calculate_average_win(trades: list) -> float:
+    def calculate_average_win(trades: Trades) -> float:
         """Calculate average winning trade"""
-        winning_trades = [t['pnl'] for t in trades if t['pnl'] > 0]
-        return np.mean(winning_trades) if winning_trades else 0
+        pnls = trade_pnls(trades)
+        winning_trades = pnls[pnls > 0]
+        return np.mean(winning_trades) if len(winning_trades) else 0
     
     @staticmethod
-    def calculate_average_loss(trades: list) -> float:
+    def calculate_average_loss(trades: Trades) -> float:
         """Calculate average losing trade"""
-        losing_trades = [t['pnl'] for t in trades if t['pnl'] < 0]
-        return np.mean(losing_trades) if losing_trades else 0
+        pnls = trade_pnls(trades)
+        losing_trades = pnls[pnls < 0]
+        return np.mean(losing_trades) if len(losing_trades) else 0
     
     @staticmethod
-    def calculate_expectancy(trades: list, win_rate: float) -> float:
+    def calculate_expectancy(trades: Trades, win_rate: float) -> float:
         """Calculate expectancy (average trade value)"""
         if len(trades) == 0:
             return 0
@@ -160,7 +168,7 @@ class TradeAnalytics:
         return (win_prob * avg_win) + (loss_prob * avg_loss)
     
     @staticmethod
-    def calculate_payoff_ratio(trades: list) -> float:
+    def calculate_payoff_ratio(trades: Trades) -> float:
         """Calculate payoff ratio (average win / average loss)"""
         avg_win = TradeAnalytics.calculate_average_win(trades)
         avg_loss = abs(TradeAnalytics.calculate_average_loss(trades))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Checkpoint overhead benchmark
+
+Runs a chunked backtest over a long minute history without checkpoints
+and with a checkpoint every 1, 5 and 20 chunks, then interrupts a run
+halfway and times resuming it from its last checkpoint and writing one
+checkpoint on its own. Every
+checkpointed and resumed run must match the plain run exactly.
+
+Usage:
+    python -m benchmarks.bench_checkpoint [bars] [chunk size]
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, best_of, report
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.checkpoint import load_checkpoint, save_checkpoint
+from app.backtesting.engine.chunked import BarStore
+from app.backtesting.strategies import MACDStrategy
+
+
+class Interrupted(Exception):
+    pass
+
+
+class InterruptedMACD(MACDStrategy):
+    """MACD that raises on chunk number fail_at, standing in for a killed process"""
+    fail_at = None
+    calls = 0
+
+    def compute_signals_chunk(self, bars, state):
+        self.calls += 1
+        if self.calls == self.fail_at:
+            raise Interrupted
+        return super().compute_signals_chunk(bars, state)
+
+
+def main(n_bars: int = 5_000_000, chunk_size: int = 100_000, rounds: int = 3):
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        store = BarStore.write(directory / "bars", synthetic_ohlcv(n_bars))
+        checkpoint = directory / "run.ckpt"
+        engine = BacktestEngine(direction="long_short", borrow_rate=0.05)
+
+        def run(every=None, strategy=None):
+            return engine.run_chunked(store, strategy or InterruptedMACD({}), chunk_size=chunk_size,
+                                      equity_path=directory / "equity.npy",
+                                      checkpoint_path=checkpoint if every else None, checkpoint_every=every or 1)[0]
+
+        run()  # warm the page cache before timing
+        expected = run()
+        expected_trades = engine.trades.records.copy()
+        # Interleave the settings round by round so drift on a busy machine hits them all alike
+        settings = (None, 1, 5, 20)
+        best = dict.fromkeys(settings, float("inf"))
+        for _ in range(rounds):
+            for every in settings:
+                elapsed, metrics = best_of(lambda: run(every), repeat=1)
+                assert metrics == expected and np.array_equal(engine.trades.records, expected_trades)
+                best[every] = min(best[every], elapsed)
+        rows = [("none", f"{best[None]:.2f}", "-", "-")]
+        for every in settings[1:]:
+            rows.append((f"every {every}", f"{best[every]:.2f}", f"{(best[every] / best[None] - 1) * 100:+.1f}%", ""))
+
+        chunks = -(-n_bars // chunk_size)
+        interrupted = InterruptedMACD({})
+        interrupted.fail_at = chunks // 2 + 1
+        try:
+            run(5, interrupted)
+        except Interrupted:
+            pass
+        size = checkpoint.stat().st_size
+        state = load_checkpoint(checkpoint)
+        save_time, _ = best_of(lambda: save_checkpoint(directory / "probe.ckpt", state), repeat=10)
+        elapsed, metrics = best_of(lambda: run(5), repeat=1)
+        assert metrics == expected and np.array_equal(engine.trades.records, expected_trades)
+        rows.append(("resume at chunk %d" % (chunks // 2 // 5 * 5), f"{elapsed:.2f}", "",
+                     f"{size / 2**10:,.0f} KiB, saved in {save_time * 1e3:.1f} ms"))
+
+    report(f"{n_bars:,} bars, chunks of {chunk_size:,}, {len(expected_trades)} trades", rows,
+           ["checkpoint", "seconds", "overhead", "checkpoint size"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
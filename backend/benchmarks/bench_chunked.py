@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Chunked backtest benchmark
+
+Runs the same strategy over a long minute history with the in-memory
+engine (whole DataFrame resident) and with the chunked engine reading a
+memory-mapped BarStore, reporting time and peak Python-side allocations
+(tracemalloc; memory-mapped pages are not allocations).
+
+Usage:
+    python -m benchmarks.bench_chunked [bars] [chunk size]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, report
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.chunked import BarStore
+from app.backtesting.strategies import MovingAverageCrossoverStrategy, MACDStrategy
+
+
+def measure(fn):
+    """(seconds, peak traced bytes, result); tracing slows allocations down, so timing runs untraced"""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main(n_bars: int = 10_000_000, chunk_size: int = 1_000_000):
+    with tempfile.TemporaryDirectory() as directory:
+        data = synthetic_ohlcv(n_bars)
+        store = BarStore.write(directory, data)
+        frame_bytes = data.memory_usage(index=True).sum()
+        rows = []
+        for strategy in (MovingAverageCrossoverStrategy({"fast_period": 50, "slow_period": 200}), MACDStrategy({})):
+            engine = BacktestEngine()
+            memory_time, memory_peak, expected = measure(lambda: engine.run_backtest(data, strategy)[0])
+            expected_trades = engine.trades.records.copy()
+            chunked = BacktestEngine()
+            chunk_time, chunk_peak, metrics = measure(
+                lambda: chunked.run_chunked(store, strategy, chunk_size=chunk_size)[0])
+            assert np.array_equal(chunked.trades.records, expected_trades)
+            assert np.isclose(metrics.roi, expected.roi) and np.isclose(metrics.sharpe_ratio, expected.sharpe_ratio)
+            rows.append((strategy.name, len(expected_trades), f"{memory_time:.2f}", f"{chunk_time:.2f}",
+                         f"{(memory_peak + frame_bytes) / 2**20:,.0f}", f"{chunk_peak / 2**20:,.0f}"))
+        del data
+
+    report(f"{n_bars:,} bars, chunks of {chunk_size:,}", rows,
+           ["strategy", "trades", "in-memory s", "chunked s", "in-memory MiB (incl. frame)", "chunked MiB"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Cost model benchmark
+
+Times BacktestEngine.run_backtest with each cost model against the flat
+commission alone, prices a large batch of fills with TieredCommission
+against a per-fill Python loop, and compares one run_cost_sweep over
+several models with a separate run_sweep per model.
+
+Usage:
+    python -m benchmarks.bench_costs [bars]
+"""
+
+import sys
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, best_of, report
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.costs import (
+    Fills, PercentCommission, PerShareFee, SpreadCost, SquareRootImpact, TieredCommission,
+)
+from app.backtesting.engine.sweep import parameter_grid
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+from app.backtesting.strategies.base_strategy import BarArrays
+
+GRID = parameter_grid({"fast_period": list(range(5, 55, 5)), "slow_period": [100, 200, 400, 800]})
+
+
+def models():
+    return {
+        "percent": PercentCommission(0.0005),
+        "per share": PerShareFee(0.005, minimum=1.0, max_fraction=0.01),
+        "spread": SpreadCost(),
+        "sqrt impact": SquareRootImpact(0.5),
+        "tiered": TieredCommission(minimum=0.35, period="M"),
+    }
+
+
+def per_fill_tiered(model: TieredCommission, fills: Fills, period: np.ndarray) -> float:
+    """Per-fill loop walking the tiers, kept as the baseline"""
+    traded, current, total = 0.0, None, 0.0
+    for bar, quantity in zip(fills.bar.tolist(), fills.quantity.tolist()):
+        if period[bar] != current:
+            traded, current = 0.0, period[bar]
+        cost, remaining, level = 0.0, quantity, traded
+        for i, rate in enumerate(model.rates):
+            upper = model.thresholds[i + 1] if i + 1 < len(model.thresholds) else np.inf
+            part = min(remaining, max(upper - level, 0.0))
+            cost += part * rate
+            remaining -= part
+            level += part
+        traded += quantity
+        total += max(cost, model.minimum)
+    return total
+
+
+def main(n_bars: int = 1_000_000):
+    data = synthetic_ohlcv(n_bars)
+    strategy = MovingAverageCrossoverStrategy({"fast_period": 50, "slow_period": 200})
+    plain_time, _ = best_of(lambda: BacktestEngine(10000.0, 0.001).run_backtest(data, strategy), repeat=5)
+    plain_engine = BacktestEngine(10000.0, 0.001)
+    plain_metrics, _ = plain_engine.run_backtest(data, strategy)
+    rows = [("flat commission", f"{plain_time * 1000:.0f}", "1.00x", f"{plain_metrics.roi:.1f}")]
+    for name, model in models().items():
+        engine = BacktestEngine(10000.0, 0.001, cost_model=model)
+        seconds, (metrics, _) = best_of(lambda: engine.run_backtest(data, strategy), repeat=5)
+        rows.append((name, f"{seconds * 1000:.0f}", f"{seconds / plain_time:.2f}x", f"{metrics.roi:.1f}"))
+    report(f"run_backtest, {n_bars:,} bars, {plain_metrics.total_trades:,} trades (ms)", rows,
+           ["cost model", "ms", "vs flat", "roi %"])
+
+    rng = np.random.default_rng(3)
+    m = 1_000_000
+    bar = np.sort(rng.integers(0, n_bars, m))
+    fills = Fills(bar=bar, price=data["close"].to_numpy()[bar], quantity=rng.integers(1, 5000, m).astype(float),
+                  side=np.ones(m, dtype=np.int8))
+    tiered = TieredCommission(minimum=0.35, period="M")
+    tiered.prepare(BarArrays.from_frame(data))
+    loop_time, expected = best_of(lambda: per_fill_tiered(tiered, fills, tiered.period_of_bar), repeat=1)
+    vector_time, costs = best_of(lambda: tiered.fill_costs(fills), repeat=3)
+    assert np.isclose(costs.sum(), expected)
+    report(f"TieredCommission, {m:,} fills (ms)", [(f"{loop_time * 1000:,.0f}", f"{vector_time * 1000:.1f}",
+                                                     f"{loop_time / vector_time:.0f}x")],
+           ["per-fill loop", "fill_costs", "speedup"])
+
+    signals = MovingAverageCrossoverStrategy.signal_matrix(data, GRID)
+    engine = BacktestEngine(10000.0, 0.001)
+
+    def separate():
+        return [BacktestEngine(10000.0, 0.001, cost_model=model).run_sweep(data, signals, GRID)
+                for model in models().values()]
+
+    separate_time, _ = best_of(separate, repeat=1)
+    plain_sweep_time, _ = best_of(lambda: engine.run_sweep(data, signals, GRID), repeat=1)
+    joint_time, _ = best_of(lambda: engine.run_cost_sweep(data, signals, models(), GRID), repeat=1)
+    report(f"{len(GRID)} parameter sets x {len(models())} cost models (s)",
+           [(f"{plain_sweep_time:.2f}", f"{separate_time:.2f}", f"{joint_time:.2f}",
+             f"{separate_time / joint_time:.2f}x")],
+           ["sweep, no model", "one sweep per model", "run_cost_sweep", "speedup"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Execution core throughput benchmark
+
+Measures bars/second of the array-native execution core at 10k, 1M and
+10M bars, with the legacy pandas per-bar loop as a baseline where it is
+fast enough to run.
+
+Usage:
+    python -m benchmarks.bench_execution
+"""
+
+import sys
+from benchmarks.common import synthetic_ohlcv, crossover_signals, best_of, legacy_execute_trades, report
+from app.backtesting.engine.execution import ExecutionCore
+
+SIZES = [10_000, 1_000_000, 10_000_000]
+LEGACY_MAX_BARS = 100_000
+
+
+def main(sizes=SIZES):
+    rows = []
+    core = ExecutionCore()
+    for n in sizes:
+        data = synthetic_ohlcv(n)
+        close = data["close"].to_numpy()
+        signal = crossover_signals(close)
+
+        core_time, _ = best_of(lambda: core.execute(close, signal))
+        if n <= LEGACY_MAX_BARS:
+            legacy_time, _ = best_of(lambda: legacy_execute_trades(close, signal), repeat=1)
+            legacy = f"{n / legacy_time:,.0f}"
+            speedup = f"{legacy_time / core_time:,.0f}x"
+        else:
+            legacy = speedup = "skipped"
+
+        rows.append((f"{n:,}", f"{core_time * 1000:,.1f}", f"{n / core_time:,.0f}", legacy, speedup))
+
+    report("Execution core (MA crossover signals)", rows,
+           ["bars", "core ms", "core bars/s", "legacy bars/s", "speedup"])
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or SIZES)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Successive-halving benchmark
+
+Compares an exhaustive sweep (signal_matrix for every parameter set over
+the full history, then run_sweep) with SuccessiveHalving, without and
+with abort rules, and reports the wall-clock saving, the share of
+simulated bars and whether the same winner was found.
+
+Usage:
+    python -m benchmarks.bench_halving [bars]
+"""
+
+import sys
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, best_of, report
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.execution import AbortRules
+from app.backtesting.engine.halving import SuccessiveHalving
+from app.backtesting.engine.sweep import parameter_grid
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+
+GRID = parameter_grid({"fast_period": list(range(5, 95, 5)), "slow_period": list(range(100, 1450, 100))})
+
+
+def exhaustive(data, engine: BacktestEngine):
+    signals = MovingAverageCrossoverStrategy.signal_matrix(data, GRID)
+    return engine.run_sweep(data, signals, GRID)
+
+
+def main(n_bars: int = 500_000):
+    data = synthetic_ohlcv(n_bars)
+    engine = BacktestEngine(10000.0, 0.001)
+    exhaustive_time, sweep = best_of(lambda: exhaustive(data, engine), repeat=1)
+    best = sweep.best("sharpe_ratio")
+    rows = [("exhaustive", f"{exhaustive_time:.2f}", "1.00", "100%", GRID[best], "-")]
+
+    for label, rules in [("halving", None), ("halving + abort", AbortRules(max_drawdown=95.0))]:
+        search = SuccessiveHalving(10000.0, 0.001, eta=3, min_bars=5_000, abort=rules)
+        seconds, result = best_of(lambda: search.run(data, MovingAverageCrossoverStrategy, GRID), repeat=1)
+        aborted = sum(int((~rung.result.completed).sum()) for rung in result.rungs)
+        rank = "-"
+        if result.best is not None:
+            rank = f"#{int(np.sum(sweep.metrics['sharpe_ratio'] > sweep.metrics['sharpe_ratio'][result.best])) + 1}"
+        rows.append((label, f"{seconds:.2f}", f"{exhaustive_time / seconds:.2f}",
+                     f"{result.work_fraction:.0%}", result.parameters, f"{rank} ({aborted} aborted)"))
+
+    report(f"{n_bars:,} bars, {len(GRID)} parameter sets (s)", rows,
+           ["search", "seconds", "speedup", "bars simulated", "winner", "exhaustive rank"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Indicator cache benchmark
+
+Times a per-set moving-average crossover sweep (many parameter sets
+sharing a handful of periods) and the ML feature indicators recomputed
+after the strategies ran: with caching disabled (zero byte budget), with
+the shared cache cleared before the pass (cold), and with it left warm.
+
+Usage:
+    python -m benchmarks.bench_indicator_cache [bars]
+"""
+
+import sys
+import time
+from benchmarks.common import synthetic_ohlcv, report
+from app.backtesting.indicators.cache import cached_indicators, indicator_cache
+from app.backtesting.strategies import BarArrays, MovingAverageCrossoverStrategy, RSIStrategy, MACDStrategy
+
+
+def feature_indicators(data):
+    """The indicator calls of MLPredictor.prepare_features"""
+    close = data["close"]
+    cached_indicators.moving_average(close, 10)
+    cached_indicators.moving_average(close, 20)
+    cached_indicators.rsi(close, 14)
+    cached_indicators.macd(close)
+    cached_indicators.bollinger_bands(close)
+    cached_indicators.atr(data["high"], data["low"], close)
+
+
+def timed(fn, cold: bool):
+    if cold:
+        indicator_cache.clear()
+    indicator_cache.reset_stats()
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start, indicator_cache.stats()
+
+
+def main(n_bars: int = 500_000):
+    data = synthetic_ohlcv(n_bars)
+    parameter_sets = [{"fast_period": f, "slow_period": s} for f in (5, 10, 20, 50) for s in (100, 150, 200, 250)]
+    parameter_sets *= 4
+
+    bars = BarArrays.from_frame(data)
+
+    def sweep():
+        for parameters in parameter_sets:
+            MovingAverageCrossoverStrategy(parameters).compute_signals(bars)
+
+    def strategies_then_features():
+        for strategy in (MovingAverageCrossoverStrategy({"fast_period": 10, "slow_period": 20}),
+                         RSIStrategy({}), MACDStrategy({})):
+            strategy.generate_signals(data)
+        feature_indicators(data)
+
+    rows = []
+    for name, fn in ((f"sweep of {len(parameter_sets)} sets", sweep), ("strategies + ML features", strategies_then_features)):
+        budget, indicator_cache.max_bytes = indicator_cache.max_bytes, 0
+        uncached_time, _ = timed(fn, cold=True)
+        indicator_cache.max_bytes = budget
+        cold_time, cold_stats = timed(fn, cold=True)
+        fn()
+        warm_time, warm_stats = timed(fn, cold=False)
+        rows.append((name, f"{uncached_time * 1000:,.0f}", f"{cold_time * 1000:,.0f}", f"{cold_stats.hits}/{cold_stats.misses}",
+                     f"{warm_time * 1000:,.0f}", f"{warm_stats.hits}/{warm_stats.misses}",
+                     f"{cold_stats.nbytes / 1e6:,.0f}"))
+    report(f"{n_bars:,} bars", rows, ["", "uncached ms", "cold ms", "hits/misses", "warm ms", "hits/misses", "cache MB"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
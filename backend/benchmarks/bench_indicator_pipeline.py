@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Indicator pipeline benchmark
+
+Computes a feature set with overlapping intermediates (SMA/Bollinger
+share SMA(20), ATR/ADX share the true range and ATR(14), MACD shares
+its EMAs) once with independent TechnicalIndicators calls and once
+through an IndicatorPipeline, and prints the plan with its reuse ratio.
+
+Usage:
+    python -m benchmarks.bench_indicator_pipeline [bars]
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from benchmarks.common import synthetic_ohlcv, best_of, report
+from app.backtesting.indicators.cache import IndicatorCache
+from app.backtesting.indicators.indicators import TechnicalIndicators
+from app.backtesting.indicators.pipeline import IndicatorPipeline
+
+PIPELINE = (
+    IndicatorPipeline()
+    .request("sma_20", "sma", period=20)
+    .request("rsi", "rsi", period=14)
+    .request("macd", "macd")
+    .request("macd_signal", "macd", component="signal")
+    .request("bb_upper", "bollinger_bands", component="upper")
+    .request("bb_lower", "bollinger_bands", component="lower")
+    .request("atr", "atr", period=14)
+    .request("adx", "adx", period=14)
+    .request("stoch_k", "stochastic", component="k")
+    .request("stoch_d", "stochastic", component="d")
+)
+
+
+def independent(data: pd.DataFrame) -> pd.DataFrame:
+    """The same features from one TechnicalIndicators call per output"""
+    high, low, close = data["high"], data["low"], data["close"]
+    return pd.DataFrame({
+        "sma_20": TechnicalIndicators.moving_average(close, 20),
+        "rsi": TechnicalIndicators.rsi(close, 14),
+        "macd": TechnicalIndicators.macd(close)[0],
+        "macd_signal": TechnicalIndicators.macd(close)[1],
+        "bb_upper": TechnicalIndicators.bollinger_bands(close)[0],
+        "bb_lower": TechnicalIndicators.bollinger_bands(close)[2],
+        "atr": TechnicalIndicators.atr(high, low, close, 14),
+        "adx": TechnicalIndicators.adx(high, low, close, 14),
+        "stoch_k": TechnicalIndicators.stochastic(high, low, close)[0],
+        "stoch_d": TechnicalIndicators.stochastic(high, low, close)[1],
+    }, index=data.index)
+
+
+def main(n_bars: int = 1_000_000):
+    data = synthetic_ohlcv(n_bars)
+    plan = PIPELINE.plan()
+    print(plan)
+
+    naive_time, expected = best_of(lambda: independent(data))
+    pipeline_time, result = best_of(lambda: PIPELINE.compute(data))
+    assert np.array_equal(result.to_numpy(), expected.to_numpy(), equal_nan=True)
+
+    cache = IndicatorCache()
+    PIPELINE.compute(data, cache=cache)
+    cached_time, _ = best_of(lambda: PIPELINE.compute(data, cache=cache))
+
+    report(f"{n_bars:,} bars, {len(plan.outputs)} outputs (ms)", [
+        ("independent calls", f"{naive_time * 1000:,.0f}", "1.0x"),
+        ("pipeline", f"{pipeline_time * 1000:,.0f}", f"{naive_time / pipeline_time:.2f}x"),
+        ("pipeline, cached", f"{cached_time * 1000:,.0f}", f"{naive_time / cached_time:.1f}x"),
+    ], ["path", "time", "speedup"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Trade ledger benchmark
+
+Compares the memory and metric time of trades kept as a list of dicts
+(the previous representation) with the columnar TradeLedger, for a
+high-turnover run.
+
+Usage:
+    python -m benchmarks.bench_ledger [trades]
+"""
+
+import sys
+import tracemalloc
+import numpy as np
+import pandas as pd
+from benchmarks.common import best_of, report
+from app.backtesting.engine.ledger import TradeLedger
+from app.utils.analytics import PerformanceCalculator, RiskMetrics
+
+
+def dict_trade_stats(trades):
+    """Trade statistics as previously computed in _calculate_metrics"""
+    pnls = [t["pnl"] for t in trades]
+    winning_trades = len([t for t in trades if t["pnl"] > 0])
+    losing_trades = len([t for t in trades if t["pnl"] < 0])
+    total_profit = sum([t["pnl"] for t in trades if t["pnl"] > 0])
+    total_loss = abs(sum([t["pnl"] for t in trades if t["pnl"] < 0]))
+    return winning_trades, losing_trades, total_profit, total_loss, np.mean(pnls), max(pnls), min(pnls)
+
+
+def ledger_trade_stats(ledger):
+    """The same statistics on the ledger's pnl column"""
+    pnls = ledger.pnl
+    wins = pnls > 0
+    losses = pnls < 0
+    return (np.count_nonzero(wins), np.count_nonzero(losses), pnls[wins].sum(), abs(pnls[losses].sum()),
+            np.mean(pnls), pnls.max(), pnls.min())
+
+
+def traced(build):
+    """(traced bytes still held, result) after building a structure"""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+
+def main(n_trades: int = 200_000):
+    rng = np.random.default_rng(0)
+    pnl = rng.normal(0, 50, n_trades)
+    records = [(2 * i, 2 * i + 1, 100.0, 100.0 + p / 10, 10, p, p / 10) for i, p in enumerate(pnl.tolist())]
+
+    def build_ledger():
+        ledger = TradeLedger()
+        for record in records:
+            ledger.append(record)
+        return ledger
+
+    ledger_bytes, ledger = traced(build_ledger)
+    index = pd.date_range("2000-01-01", periods=2 * n_trades, freq="min")
+    dict_bytes, dicts = traced(lambda: ledger.to_dicts(index))
+
+    dict_time, _ = best_of(lambda: dict_trade_stats(dicts))
+    ledger_time, _ = best_of(lambda: ledger_trade_stats(ledger))
+    dict_analytics, _ = best_of(lambda: (PerformanceCalculator.calculate_profit_factor(dicts),
+                                         RiskMetrics.max_consecutive_losses(dicts)))
+    ledger_analytics, _ = best_of(lambda: (PerformanceCalculator.calculate_profit_factor(ledger),
+                                           RiskMetrics.max_consecutive_losses(ledger)))
+
+    rows = [
+        ("memory MB", f"{dict_bytes / 1e6:,.1f}", f"{ledger_bytes / 1e6:,.1f}", f"{dict_bytes / ledger_bytes:,.1f}x"),
+        ("trade metrics ms", f"{dict_time * 1000:,.2f}", f"{ledger_time * 1000:,.2f}", f"{dict_time / ledger_time:,.1f}x"),
+        ("analytics ms", f"{dict_analytics * 1000:,.2f}", f"{ledger_analytics * 1000:,.2f}",
+         f"{dict_analytics / ledger_analytics:,.1f}x"),
+    ]
+    report(f"{n_trades:,} trades", rows, ["", "list of dicts", "TradeLedger", "ratio"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
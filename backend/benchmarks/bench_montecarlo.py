@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo benchmark
+
+Times the matrix-at-once Monte Carlo methods against one path at a time:
+ExecutionCore re-run per cost draw, and per-path block bootstrap and
+trade reshuffle, over ten years of daily bars.
+
+Usage:
+    python -m benchmarks.bench_montecarlo [bars] [paths] [workers]
+"""
+
+import sys
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, crossover_signals, best_of, report
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.execution import ExecutionCore
+from app.backtesting.engine.montecarlo import MonteCarlo
+
+
+def engine_metrics(equity: np.ndarray, initial_capital: float) -> np.ndarray:
+    """ROI, Sharpe and max drawdown of one path with BacktestEngine's scalar helpers"""
+    returns = np.diff(equity) / equity[:-1]
+    return np.array([[(equity[-1] - initial_capital) / initial_capital * 100],
+                     [BacktestEngine._calculate_sharpe_ratio(returns)],
+                     [BacktestEngine._calculate_max_drawdown(equity)]])
+
+
+def path_from_returns(simulation: MonteCarlo, returns: np.ndarray) -> np.ndarray:
+    return simulation.equity[0] * np.concatenate([[1.0], np.cumprod(1 + returns)])
+
+
+def per_path_cost_draws(simulation: MonteCarlo, close: np.ndarray, signal: np.ndarray, paths: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    rows = []
+    for _ in range(paths):
+        core = ExecutionCore(simulation.initial_capital, rng.uniform(0.0005, 0.002), rng.uniform(0.0, 0.001))
+        rows.append(engine_metrics(core.execute(close, signal).equity, simulation.initial_capital))
+    return np.hstack(rows)
+
+
+def per_path_bootstrap(simulation: MonteCarlo, paths: int, block: int = 20) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    returns = simulation._returns()
+    width = len(returns)
+    rows = []
+    for _ in range(paths):
+        starts = rng.integers(0, width, size=-(-width // block))
+        index = (starts[:, np.newaxis] + np.arange(block)).ravel()[:width] % width
+        rows.append(engine_metrics(path_from_returns(simulation, returns[index]), simulation.initial_capital))
+    return np.hstack(rows)
+
+
+def per_path_reshuffle(simulation: MonteCarlo, paths: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    returns = simulation._returns()
+    starts = np.maximum(simulation.entries, 1) - 1
+    segments = [returns[start:stop] for start, stop in zip(starts, simulation.exits)]
+    rows = []
+    for _ in range(paths):
+        resampled = np.zeros(len(returns))
+        shuffled = np.concatenate([segments[k] for k in rng.permutation(len(segments))] or [resampled[:0]])
+        resampled[:len(shuffled)] = shuffled
+        rows.append(engine_metrics(path_from_returns(simulation, resampled), simulation.initial_capital))
+    return np.hstack(rows)
+
+
+def main(n_bars: int = 2520, paths: int = 10_000, workers: int = 2):
+    data = synthetic_ohlcv(n_bars, freq="D")
+    close = data["close"].to_numpy()
+    data["signal"] = crossover_signals(close, fast=10, slow=40)
+    engine = BacktestEngine(10000.0, commission=0.001, slippage=0.0005)
+    engine._execute_trades(data)
+    simulation = MonteCarlo.from_backtest(engine, data)
+
+    cases = [
+        ("cost draws", lambda: per_path_cost_draws(simulation, close, data["signal"].to_numpy(), paths),
+         lambda w: simulation.cost_draws(paths, seed=0, workers=w)),
+        ("block bootstrap", lambda: per_path_bootstrap(simulation, paths),
+         lambda w: simulation.block_bootstrap(paths, seed=0, workers=w)),
+        ("trade reshuffle", lambda: per_path_reshuffle(simulation, paths),
+         lambda w: simulation.reshuffle_trades(paths, seed=0, workers=w)),
+    ]
+    rows = []
+    for name, loop, vectorized in cases:
+        loop_time, _ = best_of(loop, repeat=1)
+        matrix_time, serial = best_of(lambda: vectorized(1), repeat=3)
+        pool_time, pooled = best_of(lambda: vectorized(workers), repeat=1)
+        assert np.array_equal(serial.roi, pooled.roi)
+        rows.append((name, f"{loop_time * 1000:,.0f}", f"{matrix_time * 1000:,.0f}", f"{pool_time * 1000:,.0f}",
+                     f"{loop_time / matrix_time:.1f}x"))
+
+    report(f"{paths:,} paths over {n_bars:,} bars, {len(engine.trades)} trades (ms)", rows,
+           ["method", "per path", "matrix", f"{workers} workers", "speedup"])
+    print(simulation.run(paths, seed=0)["block_bootstrap"].percentiles().round(2))
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Multi-period indicator benchmark
+
+Compares the batched *_multi indicators with calling the single-period
+indicator once per period, over the periods of a fast 5..50 / slow
+20..200 crossover sweep. EMA is also compared with a log-depth
+(doubling) scan across all periods at once. The last rows time a
+crossover signal_matrix built per parameter set versus from one
+multi-period SMA pass.
+
+Usage:
+    python -m benchmarks.bench_multi_indicators [bars]
+"""
+
+import sys
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, best_of, report
+from app.backtesting.indicators.cache import indicator_cache
+from app.backtesting.indicators.indicators import TechnicalIndicators
+from app.backtesting.strategies import BaseStrategy, MovingAverageCrossoverStrategy
+
+PERIODS = list(range(5, 201))
+
+
+def ema_scan(values: np.ndarray, periods) -> np.ndarray:
+    """EMA of every period by Hillis-Steele doubling over the linear recurrence"""
+    alpha = 2.0 / (np.asarray(periods, dtype=np.float64) + 1.0)
+    out = values[:, np.newaxis] * alpha
+    out[0] = values[0]
+    decay = 1.0 - alpha
+    step = 1
+    while step < len(values):
+        out[step:] += decay * out[:-step].copy()
+        decay = decay * decay
+        step *= 2
+    return out
+
+
+def main(n_bars: int = 200_000):
+    data = synthetic_ohlcv(n_bars)
+    close = data["close"]
+    values = close.to_numpy()
+    m = len(PERIODS)
+
+    cases = [
+        ("SMA", lambda: [TechnicalIndicators.moving_average(close, p) for p in PERIODS],
+         lambda: TechnicalIndicators.moving_average_multi(close, PERIODS)),
+        ("EMA", lambda: [TechnicalIndicators.exponential_moving_average(close, p) for p in PERIODS],
+         lambda: TechnicalIndicators.ema_multi(close, PERIODS)),
+        ("EMA doubling scan", lambda: [TechnicalIndicators.exponential_moving_average(close, p) for p in PERIODS],
+         lambda: ema_scan(values, PERIODS)),
+        ("RSI", lambda: [TechnicalIndicators.rsi(close, p) for p in PERIODS],
+         lambda: TechnicalIndicators.rsi_multi(close, PERIODS)),
+        ("Bollinger", lambda: [TechnicalIndicators.bollinger_bands(close, p) for p in PERIODS],
+         lambda: TechnicalIndicators.bollinger_bands_multi(close, PERIODS)),
+    ]
+    rows = []
+    for name, looped, batched in cases:
+        loop_time, _ = best_of(looped, repeat=1)
+        batch_time, _ = best_of(batched, repeat=1)
+        rows.append((name, m, f"{loop_time * 1000:,.0f}", f"{batch_time * 1000:,.0f}",
+                     f"{m * n_bars / batch_time / 1e6:,.0f}", f"{loop_time / batch_time:,.1f}x"))
+
+    grid = [{"fast_period": f, "slow_period": s} for f in range(5, 55, 5) for s in range(20, 220, 20) if f < s]
+    budget, indicator_cache.max_bytes = indicator_cache.max_bytes, 0
+    per_set_time, per_set = best_of(lambda: BaseStrategy.signal_matrix.__func__(MovingAverageCrossoverStrategy, data, grid),
+                                    repeat=1)
+    indicator_cache.max_bytes = budget
+    batch_time, batched = best_of(lambda: MovingAverageCrossoverStrategy.signal_matrix(data, grid), repeat=1)
+    rows.append(("crossover signal_matrix", len(grid), f"{per_set_time * 1000:,.0f}", f"{batch_time * 1000:,.0f}",
+                 f"{len(grid) * n_bars / batch_time / 1e6:,.0f}", f"{per_set_time / batch_time:,.1f}x"))
+
+    report(f"{n_bars:,} bars", rows, ["", "columns", "per-period ms", "batched ms", "M values/s", "speedup"])
+    changed = np.count_nonzero(per_set != batched)
+    print(f"\nsignal cells differing between per-set and batched crossover signals: {changed}")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
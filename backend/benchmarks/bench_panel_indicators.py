@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Panel indicator benchmark
+
+Times each PanelIndicators call over a (bars, symbols) universe with
+late listings and scattered missing bars against the per-symbol loop
+it replaces (dropna, TechnicalIndicators, reindex), and checks both
+give the same values.
+
+Usage:
+    python -m benchmarks.bench_panel_indicators [bars] [symbols]
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from benchmarks.common import best_of, report
+from app.backtesting.indicators.indicators import TechnicalIndicators
+from app.backtesting.indicators.panel import PanelIndicators
+
+
+def synthetic_panel(n_bars: int, symbols: int, seed: int = 42):
+    """High/low/close panels; a fifth of the symbols list late and 1% of bars are missing"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, (n_bars, symbols)), axis=0))
+    spread = np.abs(rng.normal(0, 0.0005, (n_bars, symbols))) * close
+    listing = rng.integers(0, n_bars // 2, symbols)
+    listing[: symbols * 4 // 5] = 0
+    close[np.arange(n_bars)[:, np.newaxis] < listing] = np.nan
+    close[rng.random((n_bars, symbols)) < 0.01] = np.nan
+    index = pd.date_range("2015-01-01", periods=n_bars, freq="D")
+    columns = [f"S{i:04d}" for i in range(symbols)]
+    return tuple(pd.DataFrame(v, index=index, columns=columns) for v in (close + spread, close - spread, close))
+
+
+def per_symbol(function, *frames):
+    """The loop a panel call replaces: one single-series call per symbol"""
+    outputs = {}
+    for symbol in frames[0].columns:
+        bars = pd.concat([frame[symbol] for frame in frames], axis=1).dropna()
+        result = function(*(bars.iloc[:, i] for i in range(len(frames))))
+        outputs[symbol] = (result[0] if isinstance(result, tuple) else result).reindex(frames[0].index)
+    return pd.DataFrame(outputs)
+
+
+def main(n_bars: int = 2_500, symbols: int = 500):
+    high, low, close = synthetic_panel(n_bars, symbols)
+    cases = [
+        ("SMA(20)", lambda c: TechnicalIndicators.moving_average(c, 20),
+         lambda: PanelIndicators.moving_average(close, 20), (close,)),
+        ("EMA(20)", lambda c: TechnicalIndicators.exponential_moving_average(c, 20),
+         lambda: PanelIndicators.exponential_moving_average(close, 20), (close,)),
+        ("RSI(14)", TechnicalIndicators.rsi, lambda: PanelIndicators.rsi(close), (close,)),
+        ("MACD", TechnicalIndicators.macd, lambda: PanelIndicators.macd(close)[0], (close,)),
+        ("ATR(14)", TechnicalIndicators.atr, lambda: PanelIndicators.atr(high, low, close), (high, low, close)),
+        ("Stochastic", TechnicalIndicators.stochastic,
+         lambda: PanelIndicators.stochastic(high, low, close)[0], (high, low, close)),
+    ]
+
+    rows = []
+    for name, single, panel_call, frames in cases:
+        loop_time, expected = best_of(lambda: per_symbol(single, *frames), repeat=1)
+        panel_time, result = best_of(panel_call)
+        assert np.array_equal(result.to_numpy(), expected.to_numpy(), equal_nan=True), name
+        rows.append((name, f"{loop_time * 1000:,.0f}", f"{panel_time * 1000:,.1f}",
+                     f"{loop_time / panel_time:.0f}x"))
+
+    report(f"{symbols} symbols x {n_bars:,} bars (ms)", rows, ["indicator", "per symbol", "panel", "speedup"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Process-pool sweep scaling benchmark
+
+Runs the same moving-average crossover grid through ParallelSweepRunner
+with 1..N worker processes and reports speedup and parallel efficiency.
+
+Usage:
+    python -m benchmarks.bench_parallel [bars] [max_workers]
+"""
+
+import os
+import sys
+import time
+from benchmarks.common import synthetic_ohlcv, report
+from app.backtesting.engine.parallel import ParallelSweepRunner
+from app.backtesting.engine.sweep import parameter_grid
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+
+
+def main(n_bars: int = 50_000, max_workers: int = 0):
+    max_workers = max_workers or os.cpu_count() or 1
+    data = synthetic_ohlcv(n_bars)
+    grid = parameter_grid({"fast_period": range(5, 45, 2), "slow_period": range(50, 250, 20)})
+
+    rows = []
+    baseline = None
+    for workers in sorted({1, 2, 4, 8, 16, 32, max_workers}):
+        if workers > max_workers:
+            continue
+        runner = ParallelSweepRunner(max_workers=workers, chunk_size=max(1, len(grid) // (4 * workers)))
+        start = time.perf_counter()
+        runner.run(data, MovingAverageCrossoverStrategy, grid)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        rows.append((workers, f"{elapsed:,.2f}", f"{len(grid) / elapsed:,.1f}",
+                     f"{baseline / elapsed:,.2f}x", f"{baseline / elapsed / workers:.0%}"))
+
+    report(f"{len(grid)} parameter sets x {n_bars:,} bars", rows,
+           ["workers", "seconds", "sets/s", "speedup", "efficiency"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Portfolio engine benchmark
+
+Runs a 20/100 moving-average crossover universe through PortfolioEngine
+with each sizing rule and reports wall time, rebalance count and fills.
+Signals come from PanelIndicators, so the whole pipeline is timed too.
+
+Usage:
+    python -m benchmarks.bench_portfolio [symbols] [years]
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from benchmarks.common import best_of, report
+from app.backtesting.engine.portfolio import PortfolioEngine
+from app.backtesting.engine.sizing import EqualWeight, FixedFraction, VolatilityTarget
+from app.backtesting.indicators.panel import PanelIndicators
+
+
+def crossover_panel(close: pd.DataFrame, fast: int = 20, slow: int = 100) -> np.ndarray:
+    """BUY/SELL on fast/slow SMA crossings of every symbol"""
+    spread = (PanelIndicators.moving_average(close, fast) - PanelIndicators.moving_average(close, slow)).to_numpy()
+    regime = np.sign(np.nan_to_num(spread)).astype(np.int8)
+    signal = np.zeros_like(regime)
+    changed = np.diff(regime, axis=0) != 0
+    signal[1:][changed] = regime[1:][changed]
+    return signal
+
+
+def main(symbols: int = 500, years: int = 10):
+    n_bars = 252 * years
+    rng = np.random.default_rng(42)
+    close = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, (n_bars, symbols)), axis=0)),
+                         index=pd.bdate_range("2014-01-01", periods=n_bars),
+                         columns=[f"S{i:04d}" for i in range(symbols)])
+    signal_time, signal = best_of(lambda: crossover_panel(close), repeat=1)
+
+    rows = []
+    for name, sizing, rebalance_every in [
+        ("equal weight", EqualWeight(), None),
+        ("equal weight, monthly", EqualWeight(), 21),
+        ("fixed fraction 0.2%", FixedFraction(0.002), None),
+        ("volatility target 15%", VolatilityTarget(0.15), 21),
+    ]:
+        engine = PortfolioEngine(1_000_000, sizing=sizing, rebalance_every=rebalance_every)
+        elapsed, result = best_of(lambda: engine.run(close, signal))
+        rebalances = len(np.unique(result.fills["bar"]))
+        rows.append((name, f"{elapsed:.2f}", f"{rebalances:,}", f"{len(result.fills):,}",
+                     f"{result.metrics.roi:,.1f}", f"{result.metrics.sharpe_ratio:.2f}"))
+
+    report(f"{symbols} symbols x {n_bars:,} daily bars (signals {signal_time:.2f} s)", rows,
+           ["sizing", "seconds", "rebalances", "fills", "roi %", "sharpe"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Rolling extrema benchmark
+
+Times the van Herk/Gil-Werman kernel against pandas rolling max for one
+window, the sparse-table kernel against per-window passes for a sweep
+of windows, the incremental deque per bar, and the Stochastic, Donchian
+and Williams %R indicators rebuilt on the kernels against their pandas
+rolling formulations.
+
+Usage:
+    python -m benchmarks.bench_rolling_extrema [bars]
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from benchmarks.common import synthetic_ohlcv, best_of, report
+from app.backtesting.indicators.extrema import rolling_max, rolling_max_multi
+from app.backtesting.indicators.indicators import TechnicalIndicators
+from app.backtesting.indicators.streaming import RollingExtremum, RollingExtrema
+
+WINDOWS = [5, 10, 14, 20, 30, 50, 100, 200]
+STREAM_SAMPLE = 200_000
+
+
+def pandas_stochastic(high, low, close, period=14, smooth_k=3, smooth_d=3):
+    """The previous rolling().min()/max() formulation"""
+    lowest_low = low.rolling(window=period).min()
+    highest_high = high.rolling(window=period).max()
+    k = (100 * ((close - lowest_low) / (highest_high - lowest_low))).rolling(window=smooth_k).mean()
+    return k, k.rolling(window=smooth_d).mean()
+
+
+def each(function, windows):
+    """Run function per window without keeping the results alive"""
+    for window in windows:
+        function(window)
+
+
+def main(n_bars: int = 10_000_000):
+    data = synthetic_ohlcv(n_bars)
+    high, low, close = data["high"], data["low"], data["close"]
+    values = high.to_numpy()
+    ms = lambda seconds: f"{seconds * 1000:,.0f}"
+
+    rows = []
+    for window in (14, 200):
+        pandas_time, expected = best_of(lambda: high.rolling(window).max().to_numpy())
+        kernel_time, result = best_of(lambda: rolling_max(values, window))
+        assert np.array_equal(result, expected, equal_nan=True)
+        rows.append((f"max, window {window}", ms(pandas_time), ms(kernel_time), f"{pandas_time / kernel_time:.1f}x"))
+
+    loop_time, _ = best_of(lambda: each(lambda w: high.rolling(w).max(), WINDOWS), repeat=1)
+    single_time, _ = best_of(lambda: each(lambda w: rolling_max(values, w), WINDOWS), repeat=1)
+    table_time, matrix = best_of(lambda: rolling_max_multi(values, WINDOWS), repeat=1)
+    assert np.array_equal(matrix[:, -1], rolling_max(values, WINDOWS[-1]), equal_nan=True)
+    del matrix
+    rows.append((f"max, {len(WINDOWS)} windows", ms(loop_time), ms(table_time), f"{loop_time / table_time:.1f}x"))
+    rows.append(("  (van Herk per window)", "", ms(single_time), f"{loop_time / single_time:.1f}x"))
+
+    del expected, result
+    stoch_time, expected = best_of(lambda: pandas_stochastic(high, low, close), repeat=1)
+    new_time, result = best_of(lambda: TechnicalIndicators.stochastic(high, low, close), repeat=1)
+    np.testing.assert_array_equal(result[1].to_numpy(), expected[1].to_numpy())
+    rows.append(("stochastic", ms(stoch_time), ms(new_time), f"{stoch_time / new_time:.1f}x"))
+
+    donchian_pandas, _ = best_of(lambda: (high.rolling(20).max(), low.rolling(20).min()), repeat=1)
+    donchian_time, _ = best_of(lambda: TechnicalIndicators.donchian_channels(high, low, 20), repeat=1)
+    rows.append(("donchian(20)", ms(donchian_pandas), ms(donchian_time), f"{donchian_pandas / donchian_time:.1f}x"))
+
+    williams_loop, _ = best_of(lambda: each(lambda w: TechnicalIndicators.williams_r(high, low, close, w), WINDOWS),
+                               repeat=1)
+    williams_multi, _ = best_of(lambda: TechnicalIndicators.williams_r_multi(high, low, close, WINDOWS), repeat=1)
+    rows.append((f"williams %R, {len(WINDOWS)} windows", ms(williams_loop), ms(williams_multi),
+                 f"{williams_loop / williams_multi:.1f}x"))
+
+    report(f"{n_bars:,} bars (ms)", rows, ["operation", "baseline", "new", "speedup"])
+
+    sample = values[:STREAM_SAMPLE].tolist()
+    single = RollingExtremum(200, maximum=True)
+    one_time, _ = best_of(lambda: [single.update(v) for v in sample], repeat=1)
+    several = RollingExtrema(WINDOWS, maximum=True)
+    ten_time, _ = best_of(lambda: [several.update(v) for v in sample], repeat=1)
+    report("incremental update (us per bar)", [
+        ("RollingExtremum(200)", f"{one_time / STREAM_SAMPLE * 1e6:.2f}"),
+        (f"RollingExtrema, {len(WINDOWS)} windows", f"{ten_time / STREAM_SAMPLE * 1e6:.2f}"),
+    ], ["mode", "time"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Short and stop-and-reverse benchmark
+
+Times ExecutionCore.execute and a MACD parameter sweep in long, short and
+long_short mode, so symmetric strategies can be compared with long-only
+throughput, and the long_short core against a per-bar Python loop.
+Commission is zero so no mode runs out of capital and stops trading.
+
+Usage:
+    python -m benchmarks.bench_short [bars]
+"""
+
+import sys
+from benchmarks.common import synthetic_ohlcv, crossover_signals, best_of, report
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.execution import ExecutionCore
+from app.backtesting.engine.sweep import parameter_grid
+from app.backtesting.strategies import MACDStrategy
+
+DIRECTIONS = ("long", "short", "long_short")
+MINUTES_PER_YEAR = 252 * 390
+GRID = parameter_grid({"fast_period": [20, 30, 40, 50, 60, 80], "slow_period": [200, 300, 400, 600],
+                       "signal_period": [50]})
+
+
+def per_bar_reverse(close, signal, borrow_per_bar=0.02 / MINUTES_PER_YEAR):
+    """Per-bar stop-and-reverse loop with borrow accrual, kept as the baseline"""
+    cash, position, entry_price, entry_bar = 10000.0, 0, 0.0, 0
+    close, signal = close.tolist(), signal.tolist()
+    for i in range(len(close)):
+        s = signal[i]
+        if position * s < 0:
+            q = abs(position)
+            if position > 0:
+                cash += q * close[i]
+            else:
+                cash += q * (2 * entry_price - close[i]) - borrow_per_bar * q * entry_price * (i - entry_bar)
+            position = 0
+        if position == 0 and s != 0:
+            entry_price, entry_bar = close[i], i
+            quantity = int(cash / entry_price)
+            position = quantity * s
+            cash -= quantity * entry_price
+    return cash
+
+
+def main(n_bars: int = 1_000_000):
+    data = synthetic_ohlcv(n_bars)
+    close = data["close"].to_numpy()
+    signal = crossover_signals(close)
+    rows, baseline = [], None
+    for direction in DIRECTIONS:
+        core = ExecutionCore(commission=0.0, direction=direction, borrow_rate=0.02,
+                             periods_per_year=MINUTES_PER_YEAR)
+        seconds, result = best_of(lambda: core.execute(close, signal), repeat=5)
+        baseline = baseline or seconds
+        rows.append((direction, f"{seconds * 1000:.1f}", f"{seconds / baseline:.2f}x", f"{len(result.trades):,}"))
+    report(f"ExecutionCore, {n_bars:,} bars, MA 50/200 (ms)", rows, ["direction", "ms", "vs long", "trades"])
+
+    loop_time, _ = best_of(lambda: per_bar_reverse(close, signal), repeat=1)
+    core_time, _ = best_of(lambda: ExecutionCore(commission=0.0, direction="long_short", borrow_rate=0.02,
+                                                         periods_per_year=MINUTES_PER_YEAR).execute(close, signal),
+                           repeat=5)
+    report("long_short with borrow (ms)", [(f"{loop_time * 1000:,.0f}", f"{core_time * 1000:.1f}",
+                                            f"{loop_time / core_time:.0f}x")],
+           ["per-bar loop", "ExecutionCore", "speedup"])
+
+    signals = MACDStrategy.signal_matrix(data, GRID)
+    rows, baseline = [], None
+    for direction in DIRECTIONS:
+        # BacktestEngine accrues borrow per 1/252 year, so scale the annual rate to minute bars
+        engine = BacktestEngine(10000.0, 0.0, direction=direction, borrow_rate=0.02 * 252 / MINUTES_PER_YEAR)
+        seconds, sweep = best_of(lambda: engine.run_sweep(data, signals, GRID), repeat=1)
+        baseline = baseline or seconds
+        trades = sum(sweep[column].total_trades for column in range(len(GRID)))
+        rows.append((direction, f"{seconds:.2f}", f"{seconds / baseline:.2f}x", f"{trades:,}",
+                     f"{trades / seconds:,.0f}"))
+    report(f"run_sweep, MACD, {len(GRID)} parameter sets (s)", rows,
+           ["direction", "seconds", "vs long", "trades", "trades/s"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Signal pipeline memory benchmark
+
+Compares the DataFrame signal contract as it was (the engine copies the
+frame, the strategy copies it again and adds helper columns) with
+compute_signals on read-only BarArrays. Reports peak traced memory and
+wall-clock time for the signal stage alone and for a full run_backtest
+(whose peak includes building the API trade and equity lists).
+
+Usage:
+    python -m benchmarks.bench_signals [bars]
+"""
+
+import sys
+import time
+import tracemalloc
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, report
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.strategies import BarArrays, MovingAverageCrossoverStrategy
+
+PARAMETERS = {"fast_period": 50, "slow_period": 200}
+
+
+class LegacyMovingAverageCrossover:
+    """The previous DataFrame implementation, run through the engine's generate_signals path"""
+
+    def generate_signals(self, data):
+        data = data.copy()
+        data["fast_ma"] = data["close"].rolling(window=PARAMETERS["fast_period"]).mean()
+        data["slow_ma"] = data["close"].rolling(window=PARAMETERS["slow_period"]).mean()
+        data["signal"] = 0
+        data.loc[data["fast_ma"] > data["slow_ma"], "signal"] = 1
+        data.loc[data["fast_ma"] < data["slow_ma"], "signal"] = -1
+        data["signal_change"] = data["signal"].diff()
+        data.loc[data["signal_change"] == 0, "signal"] = 0
+        data["signal"] = data["signal"].fillna(0).astype(int)
+        return data
+
+
+def peak(fn):
+    """(peak traced bytes, untraced seconds, result) of a call"""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = fn()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_bytes, elapsed, result
+
+
+def main(n_bars: int = 2_000_000):
+    data = synthetic_ohlcv(n_bars)
+    legacy = LegacyMovingAverageCrossover()
+    strategy = MovingAverageCrossoverStrategy(PARAMETERS)
+
+    legacy_signal_bytes, legacy_signal_time, frame = peak(lambda: legacy.generate_signals(data.copy()))
+    signal_bytes, signal_time, output = peak(lambda: strategy.compute_signals(BarArrays.from_frame(data)))
+    assert np.array_equal(frame["signal"].to_numpy(), output.signal)
+    del frame, output
+
+    legacy_run_bytes, legacy_run_time, _ = peak(lambda: BacktestEngine().run_backtest(data, legacy))
+    run_bytes, run_time, _ = peak(lambda: BacktestEngine().run_backtest(data, strategy))
+
+    input_mb = data.memory_usage(index=True).sum() / 1e6
+    rows = [
+        ("signals peak MB", f"{legacy_signal_bytes / 1e6:,.1f}", f"{signal_bytes / 1e6:,.1f}",
+         f"{legacy_signal_bytes / signal_bytes:,.1f}x"),
+        ("signals ms", f"{legacy_signal_time * 1000:,.1f}", f"{signal_time * 1000:,.1f}",
+         f"{legacy_signal_time / signal_time:,.1f}x"),
+        ("backtest peak MB", f"{legacy_run_bytes / 1e6:,.1f}", f"{run_bytes / 1e6:,.1f}",
+         f"{legacy_run_bytes / run_bytes:,.1f}x"),
+        ("backtest ms", f"{legacy_run_time * 1000:,.1f}", f"{run_time * 1000:,.1f}",
+         f"{legacy_run_time / run_time:,.1f}x"),
+    ]
+    report(f"{n_bars:,} bars, input frame {input_mb:,.1f} MB", rows,
+           ["", "DataFrame copies", "compute_signals", "ratio"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Position sizing benchmark
+
+Times ExecutionCore.execute and a parameter sweep with each sizing rule
+against all-in sizing, and an ATR fixed-risk run against a per-bar loop
+that updates the ATR and sizes each entry in Python.
+
+Usage:
+    python -m benchmarks.bench_sizing [bars]
+"""
+
+import sys
+from collections import deque
+from benchmarks.common import synthetic_ohlcv, crossover_signals, best_of, report
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.execution import ExecutionCore
+from app.backtesting.engine.sizing import (
+    ATRVolatilityTarget, FixedFraction, FixedRisk, KellyFraction, VolatilityTarget,
+)
+from app.backtesting.engine.sweep import parameter_grid
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+
+GRID = parameter_grid({"fast_period": list(range(5, 55, 5)), "slow_period": [100, 200, 400, 800]})
+
+
+def rules():
+    return {
+        "fixed fraction": FixedFraction(0.5),
+        "volatility target": VolatilityTarget(target=0.01, lookback=100),
+        "ATR volatility target": ATRVolatilityTarget(target=0.01, atr_period=14),
+        "fixed risk": FixedRisk(risk=0.001, atr_multiple=3.0),
+        "half Kelly": KellyFraction(lookback=500, kelly=0.5),
+    }
+
+
+def per_bar_fixed_risk(close, high, low, signal, risk=0.001, multiple=3.0, period=14):
+    """Per-bar loop keeping a rolling ATR and sizing each entry from it, kept as the baseline"""
+    cash, position, entry_price = 10000.0, 0, 0.0
+    window, total, previous = deque(), 0.0, None
+    for i in range(len(close)):
+        true_range = high[i] - low[i] if previous is None else \
+            max(high[i] - low[i], abs(high[i] - previous), abs(low[i] - previous))
+        previous = close[i]
+        window.append(true_range)
+        total += true_range
+        if len(window) > period:
+            total -= window.popleft()
+        if signal[i] == 1 and position == 0 and len(window) == period:
+            atr = total / period
+            entry_price = close[i]
+            position = int(cash * min(risk * close[i] / (multiple * atr), 1.0) / entry_price)
+            cash -= position * entry_price
+        elif signal[i] == -1 and position > 0:
+            cash += position * close[i]
+            position = 0
+    return cash
+
+
+def main(n_bars: int = 1_000_000):
+    data = synthetic_ohlcv(n_bars)
+    close, high, low = (data[c].to_numpy() for c in ("close", "high", "low"))
+    signal = crossover_signals(close)
+    plain_time, plain = best_of(lambda: ExecutionCore().execute(close, signal), repeat=5)
+    rows = [("all-in", f"{plain_time * 1000:.1f}", "1.00x", f"{plain.trades['quantity'].mean():.0f}")]
+    for name, rule in rules().items():
+        core = ExecutionCore(sizing=rule)
+        seconds, result = best_of(lambda: core.execute(close, signal, high, low), repeat=5)
+        rows.append((name, f"{seconds * 1000:.1f}", f"{seconds / plain_time:.2f}x",
+                     f"{result.trades['quantity'].mean():.0f}"))
+    report(f"ExecutionCore, {n_bars:,} bars, MA 50/200, {len(plain.trades):,} trades (ms)", rows,
+           ["sizing", "ms", "vs all-in", "mean shares"])
+
+    loop_time, _ = best_of(lambda: per_bar_fixed_risk(close, high, low, signal), repeat=1)
+    core_time, _ = best_of(lambda: ExecutionCore(sizing=FixedRisk(0.001, 3.0)).execute(close, signal, high, low),
+                           repeat=5)
+    report("ATR fixed-risk sizing (ms)", [(f"{loop_time * 1000:,.0f}", f"{core_time * 1000:.1f}",
+                                           f"{loop_time / core_time:.0f}x")],
+           ["per-bar loop", "ExecutionCore", "speedup"])
+
+    signals = MovingAverageCrossoverStrategy.signal_matrix(data, GRID)
+    sweep_time, _ = best_of(lambda: BacktestEngine(10000.0, 0.001).run_sweep(data, signals, GRID), repeat=1)
+    rows = [("all-in", f"{sweep_time:.2f}", "1.00x")]
+    for name, rule in rules().items():
+        engine = BacktestEngine(10000.0, 0.001, sizing=rule)
+        seconds, _ = best_of(lambda: engine.run_sweep(data, signals, GRID), repeat=1)
+        rows.append((name, f"{seconds:.2f}", f"{seconds / sweep_time:.2f}x"))
+    report(f"run_sweep, {len(GRID)} parameter sets (s)", rows, ["sizing", "seconds", "vs all-in"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
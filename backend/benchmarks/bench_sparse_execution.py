@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Sparse execution benchmark
+
+Times the dense (every bar) and sparse (non-zero signals only) paths of
+ExecutionCore across signal densities, from crossover-like signals to a
+signal on every bar, and shows which path mode="auto" takes.
+
+Usage:
+    python -m benchmarks.bench_sparse_execution [bars]
+"""
+
+import sys
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, crossover_signals, best_of, report
+from app.backtesting.engine.execution import ExecutionCore, SPARSE_DENSITY
+
+DENSITIES = [0.0001, 0.001, 0.01, 0.1, 0.25, 0.5, 1.0]
+
+
+def main(n_bars: int = 10_000_000):
+    close = synthetic_ohlcv(n_bars)["close"].to_numpy()
+    rng = np.random.default_rng(1)
+    cases = [("MA 50/200 crossover", crossover_signals(close))]
+    for density in DENSITIES:
+        signal = rng.choice(np.array([-1, 0, 1], dtype=np.int8), size=n_bars,
+                            p=[density / 2, 1 - density, density / 2])
+        cases.append((f"random {density:g}", signal))
+
+    dense, sparse = ExecutionCore(mode="dense"), ExecutionCore(mode="sparse")
+    rows = []
+    for name, signal in cases:
+        density = np.count_nonzero(signal) / n_bars
+        dense_time, expected = best_of(lambda: dense.execute(close, signal), repeat=2)
+        sparse_time, result = best_of(lambda: sparse.execute(close, signal), repeat=2)
+        assert np.array_equal(result.equity, expected.equity)
+        rows.append((name, f"{density:.2%}", f"{dense_time * 1000:,.0f}", f"{sparse_time * 1000:,.0f}",
+                     f"{dense_time / sparse_time:.1f}x", "sparse" if density <= SPARSE_DENSITY else "dense"))
+
+    report(f"{n_bars:,} bars (ms)", rows, ["signals", "density", "dense", "sparse", "speedup", "auto"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
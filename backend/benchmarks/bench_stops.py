@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Intrabar stop benchmark
+
+Times ExecutionCore.execute with stop-loss, take-profit and trailing
+stops against the no-stop path, for crossover signals of several
+lengths, and against a per-bar Python loop checking every bar's high
+and low.
+
+Usage:
+    python -m benchmarks.bench_stops [bars]
+"""
+
+import sys
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, crossover_signals, best_of, report
+from app.backtesting.engine.execution import ExecutionCore, StopRules
+
+RULES = [
+    ("stop loss 1%", StopRules(stop_loss=0.01)),
+    ("take profit 2%", StopRules(take_profit=0.02)),
+    ("trailing 0.5%", StopRules(trailing_stop=0.005)),
+    ("all three", StopRules(stop_loss=0.01, take_profit=0.02, trailing_stop=0.005)),
+]
+
+
+def per_bar_trailing(close, high, low, signal, trail):
+    """Per-bar loop with a trailing stop, kept as the baseline"""
+    cash, position, peak = 10000.0, 0, 0.0
+    for i in range(len(close)):
+        if position > 0:
+            if low[i] <= peak * (1 - trail):
+                cash += position * peak * (1 - trail)
+                position = 0
+            else:
+                peak = max(peak, high[i])
+        if signal[i] == 1 and position == 0:
+            position = int(cash / close[i])
+            cash -= position * close[i]
+            peak = close[i]
+        elif signal[i] == -1 and position > 0:
+            cash += position * close[i]
+            position = 0
+    return cash
+
+
+def main(n_bars: int = 1_000_000):
+    data = synthetic_ohlcv(n_bars)
+    close, high, low, open_ = (data[c].to_numpy() for c in ("close", "high", "low", "open"))
+    rows = []
+    for fast, slow in [(20, 100), (50, 200), (500, 2000)]:
+        signal = crossover_signals(close, fast, slow)
+        plain_time, plain = best_of(lambda: ExecutionCore().execute(close, signal), repeat=5)
+        for name, rules in RULES:
+            core = ExecutionCore(stops=rules)
+            seconds, result = best_of(lambda: core.execute(close, signal, high, low, open_), repeat=5)
+            rows.append((f"MA {fast}/{slow}", name, len(plain.trades), len(result.trades),
+                         f"{plain_time * 1000:.1f}", f"{seconds * 1000:.1f}", f"{seconds / plain_time:.2f}x"))
+    report(f"{n_bars:,} bars (ms)", rows, ["signals", "stops", "trades", "with stops", "no stops", "stops",
+                                          "ratio"])
+
+    signal = crossover_signals(close)
+    loop_time, _ = best_of(lambda: per_bar_trailing(close, high, low, signal, 0.005), repeat=1)
+    core_time, _ = best_of(lambda: ExecutionCore(stops=StopRules(trailing_stop=0.005)).execute(
+        close, signal, high, low, open_), repeat=5)
+    report("Trailing stop, MA 50/200 (ms)", [(f"{loop_time * 1000:,.0f}", f"{core_time * 1000:.1f}",
+                                             f"{loop_time / core_time:.0f}x")],
+           ["per-bar loop", "ExecutionCore", "speedup"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Streaming engine latency benchmark
+
+Replays synthetic bars through StreamingEngine one at a time and reports
+per-bar on_bar latency percentiles in microseconds for each incremental
+strategy.
+
+Usage:
+    python -m benchmarks.bench_streaming [bars]
+"""
+
+import sys
+import time
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, report
+from app.backtesting.engine.streaming import StreamingEngine
+from app.backtesting.strategies import IncrementalMovingAverageCrossover, IncrementalRSI, IncrementalMACD
+
+STRATEGIES = [
+    ("MA crossover 50/200", lambda: IncrementalMovingAverageCrossover({"fast_period": 50, "slow_period": 200})),
+    ("RSI 14", lambda: IncrementalRSI({})),
+    ("MACD 12/26/9", lambda: IncrementalMACD({})),
+]
+
+
+def main(n_bars: int = 200_000):
+    data = synthetic_ohlcv(n_bars)
+    bars = data[["open", "high", "low", "close", "volume"]].to_dict("records")
+    timestamps = data.index.tolist()
+
+    rows = []
+    for name, factory in STRATEGIES:
+        engine = StreamingEngine(factory())
+        latencies = np.empty(n_bars)
+        clock = time.perf_counter_ns
+        for i, bar in enumerate(bars):
+            start = clock()
+            engine.on_bar(bar, timestamps[i])
+            latencies[i] = clock() - start
+        engine.finish()
+        us = latencies / 1000
+        rows.append((name, f"{us.mean():.2f}", f"{np.percentile(us, 50):.2f}", f"{np.percentile(us, 99):.2f}",
+                     f"{us.max():.1f}", f"{n_bars / (latencies.sum() / 1e9):,.0f}", len(engine.trades)))
+
+    report(f"on_bar latency over {n_bars:,} bars (microseconds)", rows,
+           ["strategy", "mean", "p50", "p99", "max", "bars/s", "trades"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
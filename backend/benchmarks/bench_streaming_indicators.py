@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Streaming indicator update benchmark
+
+For each stateful indicator, compares the cost of one O(1) update with
+recomputing the batch indicator over the full history, which is what
+refreshing a pandas indicator on every new bar costs.
+
+Usage:
+    python -m benchmarks.bench_streaming_indicators [history bars]
+"""
+
+import sys
+import time
+from benchmarks.common import synthetic_ohlcv, best_of, report
+from app.backtesting.indicators.indicators import TechnicalIndicators, VolumeIndicators
+from app.backtesting.indicators.streaming import (
+    StreamingSMA, StreamingEMA, StreamingRSI, StreamingMACD, StreamingBollingerBands,
+    StreamingATR, StreamingStochastic, StreamingADX, StreamingOBV,
+)
+
+INDICATORS = [
+    ("SMA 20", StreamingSMA(20), "c", lambda d: TechnicalIndicators.moving_average(d["close"], 20)),
+    ("EMA 20", StreamingEMA(20), "c", lambda d: TechnicalIndicators.exponential_moving_average(d["close"], 20)),
+    ("RSI 14", StreamingRSI(14), "c", lambda d: TechnicalIndicators.rsi(d["close"], 14)),
+    ("MACD 12/26/9", StreamingMACD(), "c", lambda d: TechnicalIndicators.macd(d["close"])),
+    ("Bollinger 20", StreamingBollingerBands(), "c", lambda d: TechnicalIndicators.bollinger_bands(d["close"])),
+    ("ATR 14", StreamingATR(), "hlc", lambda d: TechnicalIndicators.atr(d["high"], d["low"], d["close"])),
+    ("Stochastic 14", StreamingStochastic(), "hlc",
+     lambda d: TechnicalIndicators.stochastic(d["high"], d["low"], d["close"])),
+    ("ADX 14", StreamingADX(), "hlc", lambda d: TechnicalIndicators.adx(d["high"], d["low"], d["close"])),
+    ("OBV", StreamingOBV(), "cv", lambda d: VolumeIndicators.on_balance_volume(d["close"], d["volume"])),
+]
+
+
+def main(n_bars: int = 100_000):
+    data = synthetic_ohlcv(n_bars)
+    columns = {"c": ["close"], "hlc": ["high", "low", "close"], "cv": ["close", "volume"]}
+
+    rows = []
+    for name, indicator, inputs, batch in INDICATORS:
+        bars = data[columns[inputs]].to_numpy().tolist()
+        start = time.perf_counter()
+        for bar in bars:
+            indicator.update(*bar)
+        update_us = (time.perf_counter() - start) / n_bars * 1e6
+        batch_seconds, _ = best_of(lambda: batch(data), repeat=1 if name == "OBV" else 3)
+        rows.append((name, f"{update_us:.2f}", f"{batch_seconds * 1e6:,.0f}", f"{batch_seconds * 1e6 / update_us:,.0f}x"))
+
+    report(f"per-bar refresh with {n_bars:,} bars of history (microseconds)", rows,
+           ["indicator", "update", "batch recompute", "ratio"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Parameter-sweep benchmark
+
+Runs a moving-average crossover grid through BacktestEngine.run_sweep and
+compares it with one engine run per parameter set. The per-run timings
+are measured on a sample of columns and extrapolated to the full grid.
+
+Usage:
+    python -m benchmarks.bench_sweep [bars] [combinations]
+"""
+
+import sys
+import time
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, crossover_signals, best_of, legacy_execute_trades, report
+from app.backtesting.engine.backtest import BacktestEngine
+
+SAMPLE_COLUMNS = 50
+
+
+def build_signals(close: np.ndarray, combinations: int) -> np.ndarray:
+    """Crossover signal matrix over a fast/slow period grid"""
+    fast = np.arange(5, 55)
+    slow = np.arange(60, 60 + max(1, combinations // len(fast)))
+    matrix = np.zeros((len(close), len(fast) * len(slow)), dtype=np.int8)
+    for column, (f, s) in enumerate((f, s) for f in fast for s in slow):
+        matrix[:, column] = crossover_signals(close, f, s)
+    return matrix[:, :combinations]
+
+
+def main(n_bars: int = 2_520, combinations: int = 10_000):
+    data = synthetic_ohlcv(n_bars, freq="D")
+    close = data["close"].to_numpy()
+    signals = build_signals(close, combinations)
+    m = signals.shape[1]
+    engine = BacktestEngine()
+
+    sweep_time, _ = best_of(lambda: engine.run_sweep(data, signals), repeat=1)
+
+    sample = signals[:, :SAMPLE_COLUMNS]
+    start = time.perf_counter()
+    for column in range(sample.shape[1]):
+        single = BacktestEngine()
+        signals_data = data.assign(signal=sample[:, column])
+        single._calculate_metrics(single._execute_trades(signals_data), signals_data)
+    looped_time = (time.perf_counter() - start) / sample.shape[1] * m
+
+    start = time.perf_counter()
+    for column in range(5):
+        legacy_execute_trades(close, sample[:, column])
+    legacy_time = (time.perf_counter() - start) / 5 * m
+
+    rows = [
+        ("run_sweep", f"{sweep_time:,.2f}", f"{m / sweep_time:,.0f}", "1x"),
+        ("engine per set", f"{looped_time:,.2f}", f"{m / looped_time:,.0f}", f"{looped_time / sweep_time:,.1f}x"),
+        ("legacy loop per set", f"{legacy_time:,.2f}", f"{m / legacy_time:,.0f}", f"{legacy_time / sweep_time:,.0f}x"),
+    ]
+    report(f"{m:,} parameter sets x {n_bars:,} bars", rows, ["mode", "seconds", "sets/s", "vs sweep"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
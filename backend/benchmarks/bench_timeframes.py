@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Multi-timeframe benchmark
+
+Times a daily trend filter over minute bars the old way, resampling with
+pandas and aligning with reindex/ffill inside every signal computation,
+against the cached ResampledBars views and their precomputed index map,
+for one alignment and for a parameter sweep.
+
+Usage:
+    python -m benchmarks.bench_timeframes [bars]
+"""
+
+import sys
+import numpy as np
+from benchmarks.common import synthetic_ohlcv, best_of, report
+from app.backtesting.engine.sweep import parameter_grid
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+from app.backtesting.strategies.base_strategy import BarArrays
+from app.backtesting.strategies.timeframes import resample_bars, timeframe_cache
+
+GRID = parameter_grid({"fast_period": list(range(5, 55, 5)), "slow_period": [100, 200, 400, 800],
+                       "trend_timeframe": ["D"], "trend_period": [20]})
+
+
+def pandas_uptrend(data, rule="D", period=20):
+    """Resample, then shift each period's value to its last base bar and forward fill, kept as the baseline"""
+    close = data["close"].resample(rule).last().dropna()
+    uptrend = close > close.rolling(period).mean()
+    period_end = data.index.floor(rule)
+    is_last = np.append(period_end[1:] != period_end[:-1], True)
+    known = uptrend.reindex(period_end[is_last])
+    known.index = data.index[is_last]
+    return known.reindex(data.index).ffill().fillna(False).astype(bool).to_numpy()
+
+
+def pandas_signal_matrix(data, parameter_sets):
+    """Per-parameter-set signals with the trend filter recomputed by pandas each time"""
+    plain = [{"fast_period": p["fast_period"], "slow_period": p["slow_period"]} for p in parameter_sets]
+    matrix = MovingAverageCrossoverStrategy.signal_matrix(data, plain)
+    for column, parameters in enumerate(parameter_sets):
+        uptrend = pandas_uptrend(data, parameters["trend_timeframe"], parameters["trend_period"])
+        matrix[(matrix[:, column] == 1) & ~uptrend, column] = 0
+    return matrix
+
+
+def main(n_bars: int = 1_000_000):
+    data = synthetic_ohlcv(n_bars)
+    bars = BarArrays.from_frame(data)
+    view = resample_bars(bars, "D")
+    values = view.bars.close
+    resample_time, _ = best_of(lambda: resample_bars(bars, "D"), repeat=3)
+    pandas_time, expected = best_of(lambda: pandas_uptrend(data), repeat=3)
+    align_time, _ = best_of(lambda: view.align(values), repeat=10)
+    cached_time, (uptrend, _) = best_of(lambda: MovingAverageCrossoverStrategy._trend(bars, "D", 20), repeat=10)
+    assert np.array_equal(uptrend, expected)
+    report(f"Daily trend over {n_bars:,} minute bars, {len(view):,} days (ms)",
+           [(f"{pandas_time * 1000:.1f}", f"{resample_time * 1000:.1f}", f"{align_time * 1000:.2f}",
+             f"{cached_time * 1000:.2f}", f"{pandas_time / cached_time:.0f}x")],
+           ["pandas resample+ffill", "resample_bars", "align", "cached trend", "speedup"])
+
+    timeframe_cache.clear()
+    pandas_sweep, expected = best_of(lambda: pandas_signal_matrix(data, GRID), repeat=1)
+    cached_sweep, matrix = best_of(lambda: MovingAverageCrossoverStrategy.signal_matrix(data, GRID), repeat=3)
+    assert np.array_equal(matrix, expected)
+    report(f"signal_matrix, {len(GRID)} parameter sets (s)",
+           [(f"{pandas_sweep:.2f}", f"{cached_sweep:.2f}", f"{pandas_sweep / cached_sweep:.1f}x")],
+           ["pandas per set", "cached views", "speedup"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Volume indicator benchmark
+
+Times the vectorized OBV against the original per-bar .iloc loop (the
+loop is timed on a slice and scaled), then the rest of the volume suite
+on one long series and on a multi-symbol panel of the same total size.
+
+Usage:
+    python -m benchmarks.bench_volume_indicators [bars] [symbols]
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from benchmarks.common import synthetic_ohlcv, best_of, report
+from app.backtesting.indicators.indicators import VolumeIndicators
+
+LOOP_SAMPLE = 50_000
+
+
+def legacy_obv(close: pd.Series, volume: pd.Series) -> pd.Series:
+    """The original per-bar OBV loop"""
+    obv = np.zeros(len(close))
+    obv[0] = volume.iloc[0]
+    for i in range(1, len(close)):
+        if close.iloc[i] > close.iloc[i - 1]:
+            obv[i] = obv[i - 1] + volume.iloc[i]
+        elif close.iloc[i] < close.iloc[i - 1]:
+            obv[i] = obv[i - 1] - volume.iloc[i]
+        else:
+            obv[i] = obv[i - 1]
+    return pd.Series(obv, index=close.index)
+
+
+def main(n_bars: int = 2_000_000, symbols: int = 50):
+    data = synthetic_ohlcv(n_bars)
+    hlcv = [data[c] for c in ("high", "low", "close", "volume")]
+    panel = [pd.DataFrame(s.to_numpy().reshape(symbols, -1).T) for s in hlcv]
+
+    sample = data.iloc[:LOOP_SAMPLE]
+    loop_time, _ = best_of(lambda: legacy_obv(sample["close"], sample["volume"]), repeat=1)
+    loop_time *= n_bars / LOOP_SAMPLE
+    obv_time, obv = best_of(lambda: VolumeIndicators.on_balance_volume(data["close"], data["volume"]))
+    assert np.array_equal(obv.iloc[:LOOP_SAMPLE].to_numpy(), legacy_obv(sample["close"], sample["volume"]).to_numpy())
+
+    rows = [("OBV", f"{loop_time * 1000:,.0f}", f"{obv_time * 1000:,.1f}", "",
+             f"{loop_time / obv_time:,.0f}x")]
+    for name in ("vwap", "rolling_vwap", "accumulation_distribution", "money_flow_index", "chaikin_oscillator"):
+        indicator = getattr(VolumeIndicators, name)
+        series_time, _ = best_of(lambda: indicator(*hlcv))
+        panel_time, _ = best_of(lambda: indicator(*panel))
+        rows.append((name, "", f"{series_time * 1000:,.1f}", f"{panel_time * 1000:,.1f}", ""))
+    panel_obv, _ = best_of(lambda: VolumeIndicators.on_balance_volume(panel[2], panel[3]))
+    rows[0] = rows[0][:3] + (f"{panel_obv * 1000:,.1f}",) + rows[0][4:]
+
+    report(f"{n_bars:,} bars; panel of {symbols} symbols x {n_bars // symbols:,} bars (ms)", rows,
+           ["indicator", "loop (scaled)", "series", "panel", "speedup"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
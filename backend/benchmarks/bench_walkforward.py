@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Walk-forward benchmark
+
+Compares WalkForwardRunner against the hand-scripted loop it replaces:
+every fold backtests every parameter set on its in-sample slice with
+run_backtest (indicators recomputed per window), then runs the winner
+on the out-of-sample slice.
+
+Usage:
+    python -m benchmarks.bench_walkforward [bars] [workers]
+"""
+
+import sys
+from benchmarks.common import synthetic_ohlcv, best_of, report
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.sweep import parameter_grid
+from app.backtesting.engine.walkforward import WalkForwardRunner
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+
+GRID = parameter_grid({"fast_period": [5, 10, 15, 20, 30], "slow_period": [50, 100, 150, 200]})
+
+
+def scripted(data, runner: WalkForwardRunner):
+    chosen = []
+    for (train_start, train_stop), (test_start, test_stop) in runner.folds(len(data)):
+        train = data.iloc[train_start:train_stop]
+        scores = [BacktestEngine().run_backtest(train, MovingAverageCrossoverStrategy(p))[0].sharpe_ratio
+                  for p in GRID]
+        best = GRID[max(range(len(GRID)), key=scores.__getitem__)]
+        BacktestEngine().run_backtest(data.iloc[test_start:test_stop], MovingAverageCrossoverStrategy(best))
+        chosen.append(best)
+    return chosen
+
+
+def main(n_bars: int = 500_000, workers: int = 2):
+    data = synthetic_ohlcv(n_bars)
+    rows = []
+    for train_size, test_size in [(n_bars // 5, n_bars // 20), (n_bars // 10, n_bars // 50)]:
+        runner = WalkForwardRunner(train_size, test_size)
+        pooled = WalkForwardRunner(train_size, test_size, max_workers=workers)
+        folds = len(runner.folds(n_bars))
+        scripted_time, _ = best_of(lambda: scripted(data, runner), repeat=1)
+        runner_time, result = best_of(lambda: runner.run(data, MovingAverageCrossoverStrategy, GRID), repeat=2)
+        pool_time, _ = best_of(lambda: pooled.run(data, MovingAverageCrossoverStrategy, GRID), repeat=1)
+        rows.append((f"{train_size:,}/{test_size:,}", folds, f"{scripted_time:.2f}", f"{runner_time:.2f}",
+                     f"{pool_time:.2f}", f"{scripted_time / runner_time:.1f}x"))
+
+    report(f"{n_bars:,} bars, {len(GRID)} parameter sets (s)", rows,
+           ["train/test", "folds", "scripted", "runner", f"{workers} workers", "speedup"])
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
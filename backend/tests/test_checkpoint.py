@@ -0,0 +1,121 @@
+"""Tests for checkpointing and resuming chunked backtests"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.checkpoint import load_checkpoint, save_checkpoint
+from app.backtesting.engine.chunked import BarStore
+from app.backtesting.engine.execution import StopRules
+from app.backtesting.engine.ledger import TRADE_DTYPE
+from app.backtesting.strategies import MACDStrategy, MovingAverageCrossoverStrategy
+from app.backtesting.strategies.base_strategy import BarArrays
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interruptible(strategy_class):
+    """Subclass of strategy_class whose chunk computation raises on call number fail_at"""
+
+    class Interruptible(strategy_class):
+        fail_at = None
+        calls = 0
+
+        def compute_signals_chunk(self, bars, state):
+            self.calls += 1
+            if self.calls == self.fail_at:
+                raise Interrupted
+            return super().compute_signals_chunk(bars, state)
+
+    return Interruptible
+
+
+@pytest.fixture
+def market_data():
+    rng = np.random.default_rng(25)
+    n = 4000
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    return pd.DataFrame({"open": close, "high": close * 1.002, "low": close * 0.998, "close": close,
+                         "volume": rng.integers(100, 1000, n).astype(float)},
+                        index=pd.date_range("2022-01-01", periods=n, freq="min"))
+
+
+def test_checkpoint_round_trip(tmp_path):
+    index = pd.date_range("2022-03-27 00:30", periods=4, freq="h", tz="Europe/Paris")
+    bars = BarArrays(close=np.arange(4.0), index=index, volume=np.ones(4))
+    records = np.array([(1, 5, 10.0, 11.0, -3, 2.5, 0.1)], dtype=TRADE_DTYPE)
+    state = {"cursor": 7, "cash": 1.5, "peak": -np.inf, "last": None, "name": "x", "flags": [1, 2],
+             "trades": records, "strategy": {"bars": bars, "ema": {"fast": 0.25}, "empty": {}}}
+    path = tmp_path / "run.ckpt"
+    save_checkpoint(path, state)
+    loaded = load_checkpoint(path)
+
+    assert loaded["cursor"] == 7 and isinstance(loaded["cursor"], int)
+    assert (loaded["cash"], loaded["peak"], loaded["last"], loaded["name"]) == (1.5, -np.inf, None, "x")
+    assert loaded["flags"] == [1, 2] and loaded["strategy"]["empty"] == {}
+    assert np.array_equal(loaded["trades"], records) and loaded["trades"].dtype == TRADE_DTYPE
+    assert loaded["strategy"]["ema"] == {"fast": 0.25}
+    restored = loaded["strategy"]["bars"]
+    assert restored.index.equals(index) and str(restored.index.tz) == "Europe/Paris"
+    assert np.array_equal(restored.close, bars.close) and restored.high is None
+    assert not (tmp_path / "run.ckpt.tmp").exists()
+
+    with pytest.raises(TypeError):
+        save_checkpoint(path, {"strategy": object()})
+
+
+@pytest.mark.parametrize("strategy_class, parameters", [
+    (MovingAverageCrossoverStrategy, {"fast_period": 10, "slow_period": 40}),
+    (MACDStrategy, {}),
+], ids=["ma", "macd"])
+@pytest.mark.parametrize("fail_at, checkpoint_every", [(2, 1), (9, 3), (16, 2)])
+def test_resume_matches_uninterrupted_run(market_data, tmp_path, strategy_class, parameters, fail_at,
+                                          checkpoint_every):
+    store = BarStore.write(tmp_path / "bars", market_data)
+    cls = interruptible(strategy_class)
+    engine = BacktestEngine(10000.0, 0.001, 0.0005, direction="long_short", borrow_rate=0.05)
+    expected, _ = engine.run_chunked(store, cls(parameters), chunk_size=250, equity_path=tmp_path / "expected.npy")
+    expected_trades = engine.trades.records.copy()
+
+    checkpoint = tmp_path / "run.ckpt"
+    flaky = cls(parameters)
+    flaky.fail_at = fail_at
+    with pytest.raises(Interrupted):
+        engine.run_chunked(store, flaky, chunk_size=250, equity_path=tmp_path / "equity.npy",
+                           checkpoint_path=checkpoint, checkpoint_every=checkpoint_every)
+    assert load_checkpoint(checkpoint)["cursor"] == (fail_at - 1) // checkpoint_every * checkpoint_every * 250
+
+    resumed = cls(parameters)
+    metrics, _ = engine.run_chunked(store, resumed, chunk_size=250, equity_path=tmp_path / "equity.npy",
+                                    checkpoint_path=checkpoint, checkpoint_every=checkpoint_every)
+    assert metrics == expected
+    assert np.array_equal(engine.trades.records, expected_trades)
+    assert np.array_equal(np.load(tmp_path / "equity.npy"), np.load(tmp_path / "expected.npy"))
+    assert resumed.calls == 16 - (fail_at - 1) // checkpoint_every * checkpoint_every
+    assert not checkpoint.exists()
+
+
+def test_checkpoint_from_another_run_is_rejected(market_data, tmp_path):
+    store = BarStore.write(tmp_path / "bars", market_data)
+    cls = interruptible(MACDStrategy)
+    flaky = cls({})
+    flaky.fail_at = 5
+    checkpoint = tmp_path / "run.ckpt"
+    with pytest.raises(Interrupted):
+        BacktestEngine(10000.0).run_chunked(store, flaky, chunk_size=500, checkpoint_path=checkpoint)
+    with pytest.raises(ValueError):
+        BacktestEngine(10000.0).run_chunked(store, cls({"fast_period": 5}), chunk_size=500,
+                                            checkpoint_path=checkpoint)
+    with pytest.raises(ValueError):
+        BacktestEngine(10000.0).run_chunked(store, cls({}), chunk_size=500, checkpoint_path=checkpoint,
+                                            equity_path=tmp_path / "missing.npy")
+    with pytest.raises(ValueError):
+        BacktestEngine(10000.0, slippage=0.001).run_chunked(store, cls({}), chunk_size=500,
+                                                            checkpoint_path=checkpoint)
+    # Options the chunked loop cannot simulate never reach a checkpoint, so they cannot slip past the run key
+    with pytest.raises(ValueError, match="stops"):
+        BacktestEngine(10000.0, stops=StopRules(stop_loss=0.01)).run_chunked(store, cls({}), chunk_size=500,
+                                                                             checkpoint_path=checkpoint)
+    assert load_checkpoint(checkpoint)["cursor"] == 2000
@@ -0,0 +1,127 @@
+"""Tests for chunked backtesting over memory-mapped bar stores"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from dataclasses import asdict
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.chunked import BarStore, ChunkedEngine, EquityStatistics
+from app.backtesting.engine.costs import PercentCommission
+from app.backtesting.engine.execution import AbortRules, ExecutionCore, PositionState, StopRules
+from app.backtesting.engine.sizing import FixedFraction
+from app.backtesting.strategies import MovingAverageCrossoverStrategy, RSIStrategy, MACDStrategy
+from app.backtesting.strategies.base_strategy import BaseStrategy, BarArrays, StrategyOutput
+
+
+@pytest.fixture
+def market_data():
+    """Random walk OHLCV data"""
+    rng = np.random.default_rng(21)
+    n = 3000
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    return pd.DataFrame({
+        "open": close, "high": close * 1.002, "low": close * 0.998,
+        "close": close, "volume": rng.integers(100, 1000, n).astype(float),
+    }, index=pd.date_range("2021-01-01", periods=n, freq="min"))
+
+
+@pytest.fixture
+def store(market_data, tmp_path):
+    return BarStore.write(tmp_path / "bars", market_data)
+
+
+def test_store_round_trip(market_data, store):
+    assert len(store) == len(market_data)
+    assert isinstance(store.close, np.memmap)
+    bars = store.bars(100, 250)
+    assert np.array_equal(bars.close, market_data["close"].to_numpy()[100:250])
+    assert np.array_equal(bars.volume, market_data["volume"].to_numpy()[100:250])
+    assert (bars.index == market_data.index[100:250]).all()
+    assert (store.labels() == market_data.index).all()
+
+
+@pytest.mark.parametrize("strategy", [
+    MovingAverageCrossoverStrategy({"fast_period": 12, "slow_period": 40}),
+    RSIStrategy({"rsi_period": 14}),
+    MACDStrategy({}),
+], ids=["ma", "rsi", "macd"])
+@pytest.mark.parametrize("chunk_size", [7, 250, 1000, 5000])
+def test_chunked_run_matches_in_memory(market_data, store, tmp_path, strategy, chunk_size):
+    """Trades, equity and final state equal a whole-frame run; metrics agree to rounding"""
+    engine = BacktestEngine(10000.0, commission=0.001, slippage=0.0005)
+    expected_metrics, _ = engine.run_backtest(market_data, strategy)
+    expected_equity = np.array(engine.equity_curve)
+    expected_trades = engine.trades.records.copy()
+    expected_state = engine.final_state
+
+    chunked = BacktestEngine(10000.0, commission=0.001, slippage=0.0005)
+    metrics, details = chunked.run_chunked(store, strategy, chunk_size=chunk_size,
+                                           equity_path=tmp_path / "equity.npy")
+
+    assert len(expected_trades) > 3
+    assert np.array_equal(chunked.trades.records, expected_trades)
+    assert np.array_equal(np.load(tmp_path / "equity.npy"), expected_equity)
+    assert chunked.final_state == expected_state
+    assert details["bars"] == len(market_data)
+    assert details["trades"][0]["entry_date"] == market_data.index[expected_trades["entry_index"][0]]
+    for name, value in asdict(expected_metrics).items():
+        assert getattr(metrics, name) == pytest.approx(value, rel=1e-9, abs=1e-12), name
+
+
+def test_position_carried_across_chunks():
+    """A position opened in one chunk is held through the next and closed on a later signal"""
+    close = np.array([10.0, 11.0, 12.0, 13.0, 12.5, 14.0])
+    signal = np.array([1, 0, 0, 0, -1, 0], dtype=np.int8)
+    core = ExecutionCore(1000.0, commission=0.0)
+    state = PositionState(cash=1000.0)
+
+    first = core.execute_chunk(close[:3], signal[:3], state, offset=0)
+    assert state.position == 100 and len(first.trades) == 0
+    second = core.execute_chunk(close[3:], signal[3:], state, offset=3)
+    assert state.position == 0
+    assert second.trades["entry_index"].tolist() == [0] and second.trades["exit_index"].tolist() == [4]
+    assert np.array_equal(np.concatenate([first.equity, second.equity]), core.execute(close, signal).equity)
+
+
+def test_equity_statistics_merge_chunks():
+    rng = np.random.default_rng(2)
+    equity = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, 1000)))
+    stats = EquityStatistics(1000.0)
+    for start in range(0, 1000, 77):
+        stats.update(equity[start:start + 77])
+    stats.revise_last(equity[-1] * 0.99)
+    revised = equity.copy()
+    revised[-1] *= 0.99
+    metrics = stats.to_metrics(BacktestEngine._trade_statistics(np.empty(0)))
+
+    returns = np.diff(revised) / revised[:-1]
+    assert metrics.roi == pytest.approx((revised[-1] - 1000.0) / 10)
+    assert metrics.sharpe_ratio == pytest.approx(BacktestEngine._calculate_sharpe_ratio(returns), rel=1e-10)
+    assert metrics.max_drawdown == BacktestEngine._calculate_max_drawdown(revised)
+
+
+def test_strategy_without_chunk_support(store):
+    class Unbounded(BaseStrategy):
+        def __init__(self):
+            super().__init__("Unbounded", {})
+
+        def compute_signals(self, bars: BarArrays) -> StrategyOutput:
+            return StrategyOutput(signal=np.zeros(len(bars), dtype=np.int8))
+
+    with pytest.raises(NotImplementedError):
+        ChunkedEngine(chunk_size=500).run(store, Unbounded())
+    with pytest.raises(ValueError):
+        ChunkedEngine(chunk_size=0)
+
+
+@pytest.mark.parametrize("settings", [
+    {"abort": AbortRules(max_drawdown=20.0)},
+    {"stops": StopRules(stop_loss=0.01)},
+    {"cost_model": PercentCommission(0.001)},
+    {"sizing": FixedFraction(0.5)},
+], ids=["abort", "stops", "cost_model", "sizing"])
+def test_run_chunked_refuses_unsupported_settings(store, settings):
+    """Engine options the chunked loop does not simulate are refused instead of dropped"""
+    engine = BacktestEngine(10000.0, **settings)
+    with pytest.raises(ValueError, match=next(iter(settings))):
+        engine.run_chunked(store, MACDStrategy({}), chunk_size=500)
@@ -0,0 +1,131 @@
+"""Tests for the vectorized cost models"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.costs import (
+    Fills, PercentCommission, PerShareFee, SpreadCost, SquareRootImpact, TieredCommission,
+)
+from app.backtesting.engine.execution import AbortRules
+from app.backtesting.engine.sweep import SweepCore, parameter_grid
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+from app.backtesting.strategies.base_strategy import BarArrays
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(21)
+    n = 3000
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.roll(close, 1)
+    open_[0] = close[0]
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.004, n)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.004, n)))
+    volume = rng.uniform(5e3, 5e4, n)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume},
+                        index=pd.date_range("2015-01-01", periods=n, freq="h"))
+
+
+def make_fills(bar, quantity, price=10.0, run=None):
+    bar = np.asarray(bar, dtype=np.int64)
+    return Fills(bar=bar, price=np.full(len(bar), price), quantity=np.asarray(quantity, dtype=np.float64),
+                 side=np.ones(len(bar), dtype=np.int8), run=None if run is None else np.asarray(run))
+
+
+def test_per_share_fee_minimum_and_cap():
+    fee = PerShareFee(per_share=0.01, minimum=1.0, max_fraction=0.005)
+    costs = fee.fill_costs(make_fills([0, 1, 2], [50, 500, 20], price=5.0))
+    # 0.50 -> minimum 1.00; 5.00 -> capped at 0.5% of 2500; 0.20 -> minimum 1.00, capped at 0.5% of 100
+    assert costs.tolist() == pytest.approx([1.0, 5.0, 0.5])
+
+
+def test_tiered_commission_crosses_tiers_per_run():
+    tiered = TieredCommission(tiers=[(0, 0.01), (100, 0.005), (300, 0.001)])
+    tiered.prepare(BarArrays(close=np.ones(10), index=pd.RangeIndex(10)))
+    # Fills given out of bar order; run 1 accumulates separately from run 0
+    fills = make_fills(bar=[5, 1, 3, 2], quantity=[400, 150, 100, 150], run=[0, 0, 0, 1])
+    costs = tiered.fill_costs(fills)
+    # run 0: bar 1 -> 150 shares: 100 * 0.01 + 50 * 0.005 = 1.25
+    #        bar 3 -> 100 shares from 150: 100 * 0.005 = 0.50
+    #        bar 5 -> 400 shares from 250: 50 * 0.005 + 350 * 0.001 = 0.60
+    # run 1: bar 2 -> 150 shares from 0 = 1.25
+    assert costs.tolist() == pytest.approx([0.60, 1.25, 0.50, 1.25])
+
+
+def test_tiered_commission_restarts_each_period():
+    index = pd.date_range("2020-01-30", periods=4, freq="D")
+    tiered = TieredCommission(tiers=[(0, 0.01), (100, 0.001)], period="M")
+    tiered.prepare(BarArrays(close=np.ones(4), index=index))
+    costs = tiered.fill_costs(make_fills(bar=[0, 1, 2, 3], quantity=[100, 100, 100, 100]))
+    assert costs.tolist() == pytest.approx([1.0, 0.1, 1.0, 0.1])
+
+
+def test_spread_estimate_has_no_lookahead(bars):
+    spread = SpreadCost.estimate(bars["high"].to_numpy(), bars["low"].to_numpy(), window=10)
+    assert np.all(spread >= 0) and spread.mean() > 0
+    changed = bars.copy()
+    changed.iloc[2000:, changed.columns.get_loc("high")] *= 1.05
+    moved = SpreadCost.estimate(changed["high"].to_numpy(), changed["low"].to_numpy(), window=10)
+    np.testing.assert_array_equal(moved[:2000], spread[:2000])
+    assert np.all(moved[2001:2010] > spread[2001:2010])
+    with pytest.raises(ValueError, match="high and low"):
+        SpreadCost().prepare(BarArrays(close=np.ones(3), index=pd.RangeIndex(3)))
+
+
+def test_square_root_impact_scaling(bars):
+    impact = SquareRootImpact(coefficient=0.5)
+    impact.prepare(BarArrays.from_frame(bars))
+    small, large = impact.fill_costs(make_fills(bar=[500, 500], quantity=[100, 400]))
+    # Cost grows with quantity ** 1.5
+    assert large / small == pytest.approx(8.0)
+    with pytest.raises(ValueError):
+        SquareRootImpact().prepare(BarArrays(close=np.ones(3), index=pd.RangeIndex(3)))
+
+
+def test_engine_cost_model_lowers_equity_and_pnl(bars):
+    strategy = MovingAverageCrossoverStrategy({"fast_period": 10, "slow_period": 40})
+    plain = BacktestEngine(10000.0, 0.001)
+    plain_metrics, plain_details = plain.run_backtest(bars, strategy)
+    model = PerShareFee(0.01, minimum=1.0)
+    charged = BacktestEngine(10000.0, 0.001, cost_model=model)
+    metrics, details = charged.run_backtest(bars, strategy)
+
+    fees = model.fill_costs(Fills.from_trades(plain.trades.records))
+    assert metrics.total_trades == plain_metrics.total_trades
+    assert metrics.total_return == pytest.approx(plain_metrics.total_return - fees.sum())
+    pnl_drop = np.array([t["pnl"] for t in plain_details["trades"]]) - [t["pnl"] for t in details["trades"]]
+    np.testing.assert_allclose(pnl_drop, fees[:len(pnl_drop)] + fees[len(pnl_drop):])
+    paid = np.asarray(plain_details["equity_curve"]) - details["equity_curve"]
+    assert paid[-1] == pytest.approx(fees.sum()) and np.all(np.diff(paid) > -1e-9)
+
+
+@pytest.mark.parametrize("max_cells", [1 << 22, 4000])
+def test_cost_sweep_matches_single_runs(bars, max_cells):
+    grid = parameter_grid({"fast_period": [5, 10, 20], "slow_period": [40, 80]})
+    signals = MovingAverageCrossoverStrategy.signal_matrix(bars, grid)
+    models = {
+        "spread": SpreadCost(),
+        "impact + fee": SquareRootImpact(0.3) + PerShareFee(0.005, minimum=1.0),
+        "tiered": TieredCommission(tiers=[(0, 0.005), (2000, 0.002)], period="D"),
+    }
+    engine = BacktestEngine(10000.0, 0.001, slippage=0.0005)
+    bar_arrays = BarArrays.from_frame(bars)
+    for model in models.values():
+        model.prepare(bar_arrays)
+    outputs = SweepCore(10000.0, 0.001, 0.0005, max_cells=max_cells).run_costs(
+        bars["close"].to_numpy(), signals, list(models.values()))
+    results = dict(zip(models, outputs))
+    assert engine.run_cost_sweep(bars, signals, models, grid)["spread"].metrics["roi"] == pytest.approx(
+        results["spread"]["roi"])
+
+    for name, model in models.items():
+        for column, parameters in enumerate(grid):
+            single, _ = BacktestEngine(10000.0, 0.001, 0.0005, cost_model=model).run_backtest(
+                bars, MovingAverageCrossoverStrategy(parameters))
+            for field in ("total_return", "sharpe_ratio", "max_drawdown", "profit_factor", "worst_trade"):
+                assert results[name][field][column] == pytest.approx(getattr(single, field), rel=1e-9), (name, field)
+            assert results[name]["total_trades"][column] == single.total_trades
+
+    with pytest.raises(ValueError):
+        BacktestEngine(abort=AbortRules(max_drawdown=50.0)).run_cost_sweep(bars, signals, models)
@@ -0,0 +1,155 @@
+"""Tests for the array-native execution core"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.execution import ExecutionCore, MarketArrays, normalize_signal, index_to_epoch
+
+
+def legacy_execute_trades(signals_data, initial_capital, commission, slippage):
+    """Reference copy of the original per-bar pandas loop"""
+    equity = np.zeros(len(signals_data))
+    equity[0] = initial_capital
+    trades = []
+    position = 0
+    position_value = 0
+    entry_price = 0
+    entry_date = None
+    cash = initial_capital
+
+    for i in range(len(signals_data)):
+        current_price = signals_data["close"].iloc[i]
+        if signals_data["signal"].iloc[i] == 1 and position == 0:
+            entry_price = current_price * (1 + slippage)
+            entry_date = signals_data.index[i]
+            quantity = int(cash / entry_price)
+            if quantity > 0:
+                position = quantity
+                position_value = quantity * entry_price
+                cash -= position_value
+        elif signals_data["signal"].iloc[i] == -1 and position > 0:
+            exit_price = current_price * (1 - slippage)
+            gross_pnl = (exit_price - entry_price) * position
+            commission_cost = (position_value + position * exit_price) * commission
+            net_pnl = gross_pnl - commission_cost
+            cash += position * exit_price + net_pnl
+            trades.append({
+                "entry_date": entry_date, "entry_price": entry_price,
+                "exit_date": signals_data.index[i], "exit_price": exit_price,
+                "quantity": position, "side": "BUY", "pnl": net_pnl,
+                "pnl_percent": (net_pnl / position_value) * 100 if position_value > 0 else 0,
+            })
+            position = 0
+            position_value = 0
+        if position > 0:
+            equity[i] = cash + position * current_price
+        else:
+            equity[i] = cash
+
+    if position > 0:
+        exit_price = signals_data["close"].iloc[-1] * (1 - slippage)
+        pnl = (exit_price - entry_price) * position
+        commission_cost = (position_value + position * exit_price) * commission
+        net_pnl = pnl - commission_cost
+        trades.append({
+            "entry_date": entry_date, "entry_price": entry_price,
+            "exit_date": signals_data.index[-1], "exit_price": exit_price,
+            "quantity": position, "side": "BUY", "pnl": net_pnl,
+            "pnl_percent": (net_pnl / position_value) * 100 if position_value > 0 else 0,
+        })
+        equity[-1] = cash + position * exit_price
+
+    return equity, trades
+
+
+def make_signals(n, density, seed):
+    """Random walk closes with sparse random signals"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2020-01-01", periods=n, freq="min")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    signal = rng.choice([-1, 0, 1], size=n, p=[density / 2, 1 - density, density / 2])
+    return pd.DataFrame({"close": close, "signal": signal}, index=dates)
+
+
+@pytest.mark.parametrize("density,seed", [(0.02, 1), (0.3, 2), (1.0, 3)])
+@pytest.mark.parametrize("commission,slippage", [(0.001, 0.0), (0.0, 0.0005)])
+def test_execute_trades_bit_identical(density, seed, commission, slippage):
+    """Array core reproduces the legacy loop exactly"""
+    signals_data = make_signals(2000, density, seed)
+    expected_equity, expected_trades = legacy_execute_trades(signals_data, 10000.0, commission, slippage)
+
+    engine = BacktestEngine(initial_capital=10000.0, commission=commission, slippage=slippage)
+    equity = engine._execute_trades(signals_data)
+
+    assert np.array_equal(equity, expected_equity)
+    assert engine.trades.to_dicts(signals_data.index) == expected_trades
+
+
+def test_execute_trades_open_position_closed_on_last_bar():
+    """A position still open at the end is closed at the final close"""
+    signals_data = make_signals(50, 0.0, 4)
+    signals_data.iloc[10, signals_data.columns.get_loc("signal")] = 1
+    expected_equity, expected_trades = legacy_execute_trades(signals_data, 10000.0, 0.001, 0.0)
+
+    engine = BacktestEngine(initial_capital=10000.0)
+    equity = engine._execute_trades(signals_data)
+
+    assert len(engine.trades) == 1
+    assert engine.trades["exit_index"][0] == len(signals_data) - 1
+    assert np.array_equal(equity, expected_equity)
+    assert engine.trades.to_dicts(signals_data.index) == expected_trades
+
+
+def test_execute_trades_insufficient_cash_skips_entry():
+    """An entry that cannot buy a single share leaves the engine flat"""
+    signals_data = make_signals(100, 0.2, 5)
+    core = ExecutionCore(initial_capital=50.0)
+    arrays = MarketArrays.from_frame(signals_data)
+    result = core.execute(arrays.close, arrays.signal)
+
+    assert len(result.trades) == 0
+    assert np.all(result.equity == 50.0)
+
+
+def test_market_arrays_from_frame():
+    """Extracted arrays are contiguous with int64 epoch index"""
+    signals_data = make_signals(10, 0.5, 6)
+    arrays = MarketArrays.from_frame(signals_data)
+
+    assert arrays.close.dtype == np.float64 and arrays.close.flags.c_contiguous
+    assert arrays.signal.dtype == np.int8
+    assert arrays.index.dtype == np.int64
+    assert arrays.index[0] == signals_data.index[0].value
+    assert len(arrays) == 10
+
+
+def test_normalize_signal_treats_other_values_as_hold():
+    """Non +/-1 values, including NaN, are holds"""
+    raw = np.array([1.0, -1.0, 0.0, np.nan, 2.0])
+    assert normalize_signal(raw).tolist() == [1, -1, 0, 0, 0]
+
+
+def test_index_to_epoch_non_datetime():
+    """Non-datetime indexes fall back to bar positions"""
+    assert index_to_epoch(pd.RangeIndex(3)).tolist() == [0, 1, 2]
+
+
+@pytest.mark.parametrize("density,seed", [(0.0, 7), (0.001, 8), (0.05, 9), (0.5, 10), (1.0, 11)])
+def test_sparse_path_matches_dense(density, seed):
+    """Jumping between non-zero signals gives the same equity and trades as scanning every bar"""
+    arrays = MarketArrays.from_frame(make_signals(5000, density, seed))
+    results = [
+        ExecutionCore(commission=0.001, slippage=0.0005, mode=mode).execute(arrays.close, arrays.signal)
+        for mode in ("dense", "sparse", "auto")
+    ]
+
+    for result in results[1:]:
+        assert np.array_equal(result.equity, results[0].equity)
+        assert np.array_equal(result.trades.records, results[0].trades.records)
+        assert result.state == results[0].state
+
+
+def test_unknown_execution_mode_raises():
+    with pytest.raises(ValueError):
+        ExecutionCore(mode="vectorized")
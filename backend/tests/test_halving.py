@@ -0,0 +1,142 @@
+"""Tests for early-abort rules and the successive-halving optimizer"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from dataclasses import asdict
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.execution import AbortRules, ExecutionCore
+from app.backtesting.engine.halving import SuccessiveHalving
+from app.backtesting.engine.sweep import SweepCore, parameter_grid
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+
+
+@pytest.fixture
+def market_data():
+    """Random walk OHLCV data"""
+    rng = np.random.default_rng(8)
+    n = 4000
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0001, 0.01, n)))
+    return pd.DataFrame({
+        "open": close, "high": close * 1.01, "low": close * 0.99,
+        "close": close, "volume": np.full(n, 1e6),
+    }, index=pd.date_range("2015-01-01", periods=n, freq="D"))
+
+
+@pytest.fixture
+def grid():
+    return parameter_grid({"fast_period": [3, 5, 8, 12, 20], "slow_period": [30, 50, 80, 120, 200]})
+
+
+def test_abort_on_drawdown():
+    """The run stops on the first bar 10% below the peak and closes the position there"""
+    close = np.array([100.0, 110.0, 120.0, 112.0, 107.0, 130.0])
+    signal = np.array([1, 0, 0, 0, 0, 0], dtype=np.int8)
+    result = ExecutionCore(1000.0, commission=0.0, abort=AbortRules(max_drawdown=10.0)).execute(close, signal)
+
+    assert result.aborted_at == 4
+    assert result.equity.tolist() == [1000.0, 1100.0, 1200.0, 1120.0, 1070.0]
+    assert result.trades["exit_index"].tolist() == [4]
+    assert ExecutionCore(1000.0, commission=0.0).execute(close, signal).aborted_at is None
+
+
+def test_abort_on_floor_and_trade_count():
+    close = np.linspace(100.0, 80.0, 50)
+    signal = np.zeros(50, dtype=np.int8)
+    signal[[5, 30]] = [1, -1]
+
+    unguarded = ExecutionCore(1000.0, commission=0.0).execute(close, signal).equity
+    floor = ExecutionCore(1000.0, commission=0.0, abort=AbortRules(equity_floor=950.0)).execute(close, signal)
+    assert floor.aborted_at == np.argmax(unguarded < 950.0) < 30
+    assert np.array_equal(floor.equity, unguarded[:floor.aborted_at + 1])
+
+    rules = AbortRules(min_trades=2, min_trades_by=20)
+    quiet = ExecutionCore(1000.0, commission=0.0, abort=rules).execute(close, signal)
+    assert quiet.aborted_at == 20 and len(quiet.equity) == 21
+    assert ExecutionCore(1000.0, abort=AbortRules(min_trades=1, min_trades_by=20)).execute(close, signal).aborted_at is None
+    with pytest.raises(ValueError):
+        AbortRules(min_trades=1)
+
+
+@pytest.mark.parametrize("rules", [
+    AbortRules(max_drawdown=15.0),
+    AbortRules(equity_floor=9500.0),
+    AbortRules(min_trades=12, min_trades_by=1500),
+    AbortRules(max_drawdown=30.0, min_trades=4, min_trades_by=600),
+])
+def test_sweep_abort_matches_execution_core(market_data, grid, rules):
+    """Abort bars and metrics of the vectorized sweep equal per-column guarded runs"""
+    close = market_data["close"].to_numpy()
+    signals = MovingAverageCrossoverStrategy.signal_matrix(market_data, grid)
+    result = BacktestEngine(10000.0, 0.001, abort=rules).run_sweep(market_data, signals, grid)
+
+    assert (result.aborted_at >= 0).any()
+    for column in range(len(grid)):
+        engine = BacktestEngine(10000.0, 0.001, abort=rules)
+        equity = engine._execute(close, signals[:, column])
+        assert result.aborted_at[column] == (-1 if engine.aborted_at is None else engine.aborted_at)
+        assert asdict(result[column]) == pytest.approx(asdict(engine._calculate_metrics(equity)))
+    if result.completed.any():
+        assert result.completed[result.best("roi")]
+
+
+def test_sweep_without_rules_is_unchanged(market_data, grid):
+    close = market_data["close"].to_numpy()
+    signals = MovingAverageCrossoverStrategy.signal_matrix(market_data, grid)
+    plain = SweepCore(10000.0, 0.001).run(close, signals)
+    lenient = SweepCore(10000.0, 0.001, abort=AbortRules(max_drawdown=99.0)).run(close, signals)
+    assert "aborted_at" not in plain
+    assert (lenient.pop("aborted_at") == -1).all()
+    for name, values in plain.items():
+        assert np.array_equal(values, lenient[name]), name
+
+
+def test_schedule():
+    search = SuccessiveHalving(eta=3, min_bars=100)
+    assert search.schedule(8100, 81) == [(100, 81), (300, 27), (900, 9), (2700, 3), (8100, 1)]
+    assert search.schedule(8100, 100) == [(100, 100), (300, 34), (900, 12), (2700, 4), (8100, 2)]
+    assert search.schedule(1000, 81) == [(111, 81), (333, 27), (1000, 9)]
+    assert search.schedule(1000, 2) == [(1000, 2)]
+
+
+def test_successive_halving(market_data, grid):
+    """Each rung promotes its best third to a longer prefix; the winner's metrics are full-history metrics"""
+    search = SuccessiveHalving(10000.0, 0.001, eta=3, min_bars=300, metric="roi")
+    result = search.run(market_data, MovingAverageCrossoverStrategy, grid)
+    signals = MovingAverageCrossoverStrategy.signal_matrix(market_data, grid)
+
+    assert [(rung.bars, len(rung.candidates)) for rung in result.rungs] == [(444, 25), (1333, 9), (4000, 3)]
+    for rung, following in zip(result.rungs, result.rungs[1:]):
+        prefix = BacktestEngine(10000.0, 0.001).run_sweep(market_data.iloc[:rung.bars],
+                                                         signals[:rung.bars, rung.candidates])
+        assert np.array_equal(prefix.metrics["roi"], rung.result.metrics["roi"])
+        ranked = rung.candidates[np.argsort(-prefix.metrics["roi"], kind="stable")]
+        assert following.candidates.tolist() == ranked[:len(following.candidates)].tolist()
+
+    full = BacktestEngine(10000.0, 0.001).run_sweep(market_data, signals)
+    finalists = result.rungs[-1].candidates
+    assert result.best == finalists[np.argmax(full.metrics["roi"][finalists])]
+    assert result.metrics == full[result.best]
+    assert result.parameters == grid[result.best]
+    assert result.work == 444 * 25 + 1333 * 9 + 4000 * 3
+    assert result.work_fraction == pytest.approx(result.work / (4000 * 25))
+    assert result.to_frame()["promoted"].tolist() == [9, 3, 0]
+
+    precomputed = search.run_signals(market_data["close"].to_numpy(), signals, grid)
+    assert precomputed.best == result.best and precomputed.metrics == result.metrics
+
+
+def test_successive_halving_drops_aborted(market_data, grid):
+    rules = AbortRules(max_drawdown=20.0)
+    result = SuccessiveHalving(10000.0, 0.001, min_bars=300, abort=rules).run(
+        market_data, MovingAverageCrossoverStrategy, grid)
+    for rung in result.rungs[:-1]:
+        aborted = rung.candidates[~rung.result.completed]
+        assert not np.isin(aborted, rung.promoted).any()
+    if result.best is not None:
+        assert result.rungs[-1].result.completed[result.rungs[-1].candidates.tolist().index(result.best)]
+
+    strict = SuccessiveHalving(10000.0, 0.001, min_bars=300, abort=AbortRules(equity_floor=1e9)).run(
+        market_data, MovingAverageCrossoverStrategy, grid)
+    assert strict.best is None and strict.metrics is None
+    assert len(strict.rungs) == 1
@@ -0,0 +1,154 @@
+"""Tests for the memoizing indicator layer"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.indicators.cache import CachedIndicators, IndicatorCache, fingerprint
+from app.backtesting.indicators.indicators import TechnicalIndicators, VolumeIndicators
+from app.backtesting.strategies import BarArrays, MovingAverageCrossoverStrategy
+
+
+@pytest.fixture
+def market_data():
+    """Random walk OHLCV bars"""
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 500)))
+    return pd.DataFrame({
+        "high": close * 1.01,
+        "low": close * 0.99,
+        "close": close,
+        "volume": rng.uniform(1000, 2000, 500),
+    }, index=pd.date_range("2023-01-01", periods=500, freq="h"))
+
+
+@pytest.fixture
+def cached():
+    return CachedIndicators(IndicatorCache())
+
+
+def test_hit_returns_same_values_with_callers_index(cached, market_data):
+    """A second call is served from the cache and re-wrapped with the caller's index"""
+    first = cached.moving_average(market_data["close"], 20)
+    values_only = pd.Series(market_data["close"].to_numpy())
+    second = cached.moving_average(values_only, 20)
+
+    assert cached.stats().hits == 1 and cached.stats().misses == 1
+    pd.testing.assert_series_equal(first, TechnicalIndicators.moving_average(market_data["close"], 20))
+    pd.testing.assert_series_equal(second, TechnicalIndicators.moving_average(values_only, 20))
+
+
+def test_defaults_share_an_entry(cached, market_data):
+    """rsi(close) and rsi(close, 14) are the same computation"""
+    cached.rsi(market_data["close"])
+    cached.rsi(market_data["close"], period=14)
+    cached.rsi(market_data["close"], 10)
+
+    assert cached.stats().hits == 1
+    assert cached.stats().entries == 2
+
+
+def test_tuple_and_multi_input_indicators(cached, market_data):
+    """Tuple results and several Series arguments round-trip through the cache"""
+    args = (market_data["high"], market_data["low"], market_data["close"])
+    for _ in range(2):
+        k, d = cached.stochastic(*args)
+        atr = cached.atr(*args)
+        obv = cached.on_balance_volume(market_data["close"], market_data["volume"])
+
+    expected_k, expected_d = TechnicalIndicators.stochastic(*args)
+    pd.testing.assert_series_equal(k, expected_k)
+    pd.testing.assert_series_equal(d, expected_d)
+    pd.testing.assert_series_equal(atr, TechnicalIndicators.atr(*args))
+    pd.testing.assert_series_equal(obv, VolumeIndicators.on_balance_volume(market_data["close"], market_data["volume"]))
+    assert cached.stats().hits == 3
+
+
+def test_fingerprint_sees_every_value():
+    """Any edit changes the fingerprint, even with NaNs in the series or values swapped"""
+    values = np.random.default_rng(3).normal(size=100_000)
+    values[5] = np.nan
+    changed = values.copy()
+    changed[1001] += 50
+    swapped = values.copy()
+    swapped[[1001, 1002]] = swapped[[1002, 1001]]
+
+    assert fingerprint(values) == fingerprint(values.copy())
+    assert fingerprint(changed) != fingerprint(values)
+    assert fingerprint(swapped) != fingerprint(values)
+    assert fingerprint(values.astype(np.float32)) != fingerprint(values)
+
+
+def test_nan_series_edit_misses(cached):
+    """A mid-array edit of a series with warm-up NaNs is recomputed, not served stale"""
+    close = pd.Series(np.linspace(50.0, 60.0, 5000))
+    close.iloc[5] = np.nan
+    cached.moving_average(close, 5)
+    close.iloc[1001] += 50
+
+    result = cached.moving_average(close, 5)
+    assert cached.stats().misses == 2
+    pd.testing.assert_series_equal(result, TechnicalIndicators.moving_average(close, 5))
+
+
+def test_changed_data_misses(cached, market_data):
+    """Modified input data is recomputed"""
+    close = market_data["close"].copy()
+    cached.moving_average(close, 5)
+    close.iloc[3] += 1.0
+
+    result = cached.moving_average(close, 5)
+    assert cached.stats().misses == 2
+    pd.testing.assert_series_equal(result, TechnicalIndicators.moving_average(close, 5))
+
+
+def test_cached_arrays_are_read_only(cached, market_data):
+    """Entries are shared between callers, so they cannot be written"""
+    cached.moving_average(market_data["close"], 5)
+    hit = cached.moving_average(market_data["close"], 5)
+    with pytest.raises(ValueError):
+        hit.to_numpy()[0] = 0.0
+
+
+def test_lru_eviction_respects_byte_budget(market_data):
+    """Least recently used entries are evicted once the budget is exceeded"""
+    entry_bytes = len(market_data) * 8
+    cached = CachedIndicators(IndicatorCache(max_bytes=2 * entry_bytes))
+    close = market_data["close"]
+
+    cached.moving_average(close, 5)
+    cached.moving_average(close, 10)
+    cached.moving_average(close, 5)
+    cached.moving_average(close, 20)
+
+    stats = cached.stats()
+    assert stats.evictions == 1 and stats.entries == 2 and stats.nbytes == 2 * entry_bytes
+    cached.moving_average(close, 5)
+    cached.moving_average(close, 10)
+    assert cached.stats().hits == 2 and cached.stats().misses == 4
+
+
+def test_oversized_results_are_not_stored(market_data):
+    """A result larger than the whole budget bypasses the cache"""
+    cached = CachedIndicators(IndicatorCache(max_bytes=100))
+    cached.moving_average(market_data["close"], 5)
+    assert cached.stats().entries == 0
+
+
+def test_unknown_indicator_raises(cached):
+    with pytest.raises(AttributeError):
+        cached.not_an_indicator
+
+
+def test_strategies_reuse_moving_averages(market_data):
+    """Strategies sharing a period compute its moving average once through the shared cache"""
+    from app.backtesting.indicators.cache import indicator_cache
+
+    indicator_cache.clear()
+    indicator_cache.reset_stats()
+    bars = BarArrays.from_frame(market_data)
+    for fast_period in range(2, 12):
+        MovingAverageCrossoverStrategy({"fast_period": fast_period, "slow_period": 30}).compute_signals(bars)
+
+    stats = indicator_cache.stats()
+    assert stats.misses == 11
+    assert stats.hits == 9
@@ -0,0 +1,112 @@
+"""Tests for the declarative indicator pipeline"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.indicators.cache import IndicatorCache
+from app.backtesting.indicators.indicators import TechnicalIndicators, VolumeIndicators
+from app.backtesting.indicators.pipeline import IndicatorPipeline
+
+
+@pytest.fixture
+def market_data():
+    """Random walk OHLCV bars"""
+    rng = np.random.default_rng(11)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+    return pd.DataFrame({
+        "high": close * (1 + rng.uniform(0, 0.02, 400)),
+        "low": close * (1 - rng.uniform(0, 0.02, 400)),
+        "close": close,
+        "volume": rng.uniform(1000, 2000, 400),
+    }, index=pd.date_range("2023-01-01", periods=400, freq="h"))
+
+
+@pytest.fixture
+def pipeline():
+    return (
+        IndicatorPipeline()
+        .request("sma_20", "sma", period=20)
+        .request("rsi", "rsi", period=14)
+        .request("macd", "macd")
+        .request("macd_signal", "macd", component="signal")
+        .request("bb_upper", "bollinger_bands", component="upper")
+        .request("bb_lower", "bollinger_bands", component="lower")
+        .request("atr", "atr", period=14)
+        .request("adx", "adx", period=14)
+        .request("stoch_d", "stochastic", component="d")
+        .request("obv", "on_balance_volume")
+    )
+
+
+def test_outputs_match_indicator_functions(pipeline, market_data):
+    """Every output is identical to the corresponding TechnicalIndicators call"""
+    result = pipeline.compute(market_data)
+    high, low, close = market_data["high"], market_data["low"], market_data["close"]
+    macd, signal, _ = TechnicalIndicators.macd(close)
+    upper, _, lower = TechnicalIndicators.bollinger_bands(close)
+    _, stoch_d = TechnicalIndicators.stochastic(high, low, close)
+    expected = {
+        "sma_20": TechnicalIndicators.moving_average(close, 20),
+        "rsi": TechnicalIndicators.rsi(close, 14),
+        "macd": macd,
+        "macd_signal": signal,
+        "bb_upper": upper,
+        "bb_lower": lower,
+        "atr": TechnicalIndicators.atr(high, low, close, 14),
+        "adx": TechnicalIndicators.adx(high, low, close, 14),
+        "stoch_d": stoch_d,
+        "obv": VolumeIndicators.on_balance_volume(close, market_data["volume"]),
+    }
+
+    assert list(result.columns) == list(expected)
+    for name, series in expected.items():
+        np.testing.assert_array_equal(result[name].to_numpy(), series.to_numpy(), err_msg=name)
+    assert result.index.equals(market_data.index)
+
+
+def test_shared_intermediates_are_planned_once(pipeline):
+    """True range, SMA(20), EMA(12/26) and the MACD line appear once in the plan"""
+    plan = pipeline.plan()
+    ops = [node.op for node in plan.nodes]
+
+    assert ops.count("true_range") == 1
+    assert ops.count("column") == 4
+    assert sum(1 for node in plan.nodes if node.op == "sma" and dict(node.params)["period"] == 20) == 1
+    assert ops.count("ema") == 3
+    assert plan.unshared_nodes == sum(len(plan.ancestors(node)) for node in plan.outputs.values())
+    assert plan.reuse_ratio > 1.5
+    assert plan.shared_nodes >= 6
+
+
+def test_plan_is_printable(pipeline):
+    """The plan lists every node once with the outputs it produces"""
+    text = str(pipeline.plan())
+    lines = text.splitlines()
+
+    assert lines[0].startswith(f"IndicatorPlan: 10 outputs, {len(pipeline.plan().nodes)} nodes")
+    assert len(lines) == len(pipeline.plan().nodes) + 1
+    assert sum("true_range(" in line for line in lines) == 1
+    assert any(line.endswith("-> macd") for line in lines)
+
+
+def test_cache_skips_recomputation(market_data):
+    """A second compute on the same data is served from the cache"""
+    cache = IndicatorCache()
+    pipeline = IndicatorPipeline().request("atr", "atr").request("rsi", "rsi")
+    first = pipeline.compute(market_data, cache=cache)
+    second = pipeline.compute(market_data, cache=cache)
+
+    assert cache.stats().misses == 2 and cache.stats().hits == 2
+    pd.testing.assert_frame_equal(first, second)
+
+    changed = market_data.copy()
+    changed.iloc[5, changed.columns.get_loc("high")] += 1.0
+    pipeline.compute(changed, cache=cache)
+    assert cache.stats().hits == 3
+
+
+def test_unknown_indicator_and_component_raise():
+    with pytest.raises(ValueError):
+        IndicatorPipeline().request("x", "not_an_indicator")
+    with pytest.raises(ValueError):
+        IndicatorPipeline().request("x", "macd", component="nope").plan()
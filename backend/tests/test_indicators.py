@@ -3,7 +3,8 @@
 import pytest
 import pandas as pd
 import numpy as np
-from app.backtesting.indicators.indicators import TechnicalIndicators
+from app.backtesting.indicators.indicators import TechnicalIndicators, VolumeIndicators
+from app.backtesting.indicators.extrema import rolling_max, rolling_min, rolling_max_multi, rolling_min_multi
 
 
 @pytest.fixture
@@ -59,3 +60,205 @@ def test_bollinger_bands(sample_data):
     # Upper band should always be >= middle band >= lower band
     assert (upper[~upper.isna()] >= middle[~middle.isna()]).all()
     assert (middle[~middle.isna()] >= lower[~lower.isna()]).all()
+
+
+@pytest.fixture
+def price_path():
+    """Random walk closes with a flat stretch and a missing bar"""
+    rng = np.random.default_rng(11)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, 3000)))
+    close[400:450] = close[400]
+    close[900] = np.nan
+    return pd.Series(close)
+
+
+PERIODS = [1, 2, 5, 14, 20, 60]
+
+
+def test_moving_average_multi_matches_per_period(price_path):
+    """Cumulative-sum SMA columns agree with rolling means, exactly on flat windows"""
+    matrix = TechnicalIndicators.moving_average_multi(price_path, PERIODS)
+
+    assert matrix.shape == (len(price_path), len(PERIODS))
+    for column, period in enumerate(PERIODS):
+        expected = TechnicalIndicators.moving_average(price_path, period).to_numpy()
+        np.testing.assert_allclose(matrix[:, column], expected, rtol=1e-12)
+        assert np.array_equal(np.isnan(matrix[:, column]), np.isnan(expected))
+        flat = np.arange(400 + period - 1, 450)
+        assert np.array_equal(matrix[flat, column], expected[flat])
+
+
+def test_ema_multi_is_bit_identical(price_path):
+    """EMA columns equal the single-period EMA, duplicates included"""
+    matrix = TechnicalIndicators.ema_multi(price_path, [12, 26, 12])
+    for column, period in enumerate([12, 26, 12]):
+        expected = TechnicalIndicators.exponential_moving_average(price_path, period).to_numpy()
+        assert np.array_equal(matrix[:, column], expected, equal_nan=True)
+
+
+def test_rsi_multi_matches_per_period(price_path):
+    """Batched RSI agrees with rsi, including NaN on flat windows"""
+    matrix = TechnicalIndicators.rsi_multi(price_path, PERIODS[1:])
+    for column, period in enumerate(PERIODS[1:]):
+        expected = TechnicalIndicators.rsi(price_path, period).to_numpy()
+        assert np.array_equal(np.isnan(matrix[:, column]), np.isnan(expected))
+        np.testing.assert_allclose(matrix[:, column], expected, rtol=1e-9, atol=1e-9)
+
+
+def test_bollinger_bands_multi_matches_per_period(price_path):
+    """Batched bands agree with bollinger_bands"""
+    upper, middle, lower = TechnicalIndicators.bollinger_bands_multi(price_path, [10, 20], std_dev=2)
+    for column, period in enumerate([10, 20]):
+        expected = TechnicalIndicators.bollinger_bands(price_path, period, 2)
+        for got, want in zip((upper, middle, lower), expected):
+            np.testing.assert_allclose(got[:, column], want.to_numpy(), rtol=1e-12)
+
+
+def test_multi_period_longer_than_data():
+    """Periods longer than the series give all-NaN columns"""
+    matrix = TechnicalIndicators.moving_average_multi(np.arange(5.0), [3, 10])
+    assert np.isnan(matrix[:, 1]).all()
+    assert matrix[-1, 0] == 3.0
+
+
+@pytest.mark.parametrize("window", [1, 2, 7, 50, 2999, 3000, 3001])
+def test_rolling_extrema_match_pandas(price_path, window):
+    """Van Herk/Gil-Werman extrema equal pandas rolling min/max, NaN windows included"""
+    values = price_path.to_numpy()
+    rolling = price_path.rolling(window)
+    assert np.array_equal(rolling_max(values, window), rolling.max().to_numpy(), equal_nan=True)
+    assert np.array_equal(rolling_min(values, window), rolling.min().to_numpy(), equal_nan=True)
+
+
+def test_rolling_extrema_columns_and_windows(price_path):
+    """2-D inputs are computed column-wise; sparse-table columns equal per-window kernels"""
+    panel = np.column_stack([price_path.to_numpy(), price_path.to_numpy()[::-1]])
+    np.testing.assert_array_equal(rolling_min(panel, 14)[:, 1], rolling_min(panel[:, 1], 14))
+
+    windows = [14, 1, 3, 64, 65, 5000, 14]
+    maxima = rolling_max_multi(price_path, windows)
+    minima = rolling_min_multi(price_path, windows)
+    for column, window in enumerate(windows):
+        assert np.array_equal(maxima[:, column], rolling_max(price_path, window), equal_nan=True)
+        assert np.array_equal(minima[:, column], rolling_min(price_path, window), equal_nan=True)
+
+
+def test_donchian_and_williams_r(sample_data):
+    """Channels bound the bars and Williams %R stays in [-100, 0]; batched columns agree"""
+    high, low, close = sample_data['high'], sample_data['low'], sample_data['close']
+    upper, middle, lower = TechnicalIndicators.donchian_channels(high, low, 20)
+    williams = TechnicalIndicators.williams_r(high, low, close, 14)
+
+    pd.testing.assert_series_equal(upper, high.rolling(20).max(), check_names=False)
+    pd.testing.assert_series_equal(middle, (upper + lower) / 2)
+    assert williams.isna().sum() == 13
+    assert williams.dropna().between(-100, 0).all()
+
+    batched = TechnicalIndicators.williams_r_multi(high, low, close, [14, 20])
+    np.testing.assert_array_equal(batched[:, 0], williams.to_numpy())
+    channels = TechnicalIndicators.donchian_channels_multi(high, low, [20])
+    for got, want in zip(channels, (upper, middle, lower)):
+        np.testing.assert_array_equal(got[:, 0], want.to_numpy())
+
+
+@pytest.fixture
+def volume_panel():
+    """Three symbols of OHLCV bars as wide (bars x symbols) frames, with a zero-range bar"""
+    rng = np.random.default_rng(12)
+    shape = (400, 3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, shape), axis=0))
+    close[50:53, 0] = close[50, 0]
+    high = close * (1 + rng.uniform(0, 0.01, shape))
+    low = close * (1 - rng.uniform(0, 0.01, shape))
+    high[20, 1] = low[20, 1] = close[20, 1]
+    volume = rng.uniform(1e3, 1e4, shape)
+    index = pd.date_range("2023-01-01", periods=shape[0], freq="h")
+    columns = ["AAA", "BBB", "CCC"]
+    return tuple(pd.DataFrame(a, index=index, columns=columns) for a in (high, low, close, volume))
+
+
+def reference_obv(close, volume):
+    """The original per-bar OBV loop"""
+    obv = np.zeros(len(close))
+    obv[0] = volume[0]
+    for i in range(1, len(close)):
+        if close[i] > close[i - 1]:
+            obv[i] = obv[i - 1] + volume[i]
+        elif close[i] < close[i - 1]:
+            obv[i] = obv[i - 1] - volume[i]
+        else:
+            obv[i] = obv[i - 1]
+    return obv
+
+
+def reference_volume_indicators(high, low, close, volume, period=14, fast=3, slow=10):
+    """Straightforward pandas versions of the volume indicators for one symbol"""
+    typical = (high + low + close) / 3
+    flow = typical * volume
+    multiplier = (((close - low) - (high - close)) / (high - low)).where(high != low, 0.0)
+    ad = (multiplier * volume).cumsum()
+    change = typical.diff()
+    positive = flow.where(change > 0, 0.0).rolling(period).sum()
+    negative = flow.where(change < 0, 0.0).rolling(period).sum()
+    return {
+        "vwap": flow.cumsum() / volume.cumsum(),
+        "rolling_vwap": flow.rolling(period).sum() / volume.rolling(period).sum(),
+        "accumulation_distribution": ad,
+        "money_flow_index": 100 - 100 / (1 + positive / negative),
+        "chaikin_oscillator": ad.ewm(span=fast, adjust=False).mean() - ad.ewm(span=slow, adjust=False).mean(),
+    }
+
+
+def test_on_balance_volume_matches_loop(volume_panel):
+    """Vectorized OBV is bit-identical to the original loop"""
+    _, _, close, volume = volume_panel
+    obv = VolumeIndicators.on_balance_volume(close["AAA"], volume["AAA"])
+
+    assert isinstance(obv, pd.Series) and obv.index.equals(close.index)
+    assert np.array_equal(obv.to_numpy(), reference_obv(close["AAA"].to_numpy(), volume["AAA"].to_numpy()))
+
+
+@pytest.mark.parametrize("name,kwargs", [
+    ("vwap", {}),
+    ("rolling_vwap", {"period": 14}),
+    ("accumulation_distribution", {}),
+    ("money_flow_index", {"period": 14}),
+    ("chaikin_oscillator", {"fast": 3, "slow": 10}),
+])
+def test_volume_indicators_match_reference(volume_panel, name, kwargs):
+    """Series, array and panel inputs all match the reference per symbol"""
+    high, low, close, volume = volume_panel
+    indicator = getattr(VolumeIndicators, name)
+
+    panel = indicator(high, low, close, volume, **kwargs)
+    array_panel = indicator(high.to_numpy(), low.to_numpy(), close.to_numpy(), volume.to_numpy(), **kwargs)
+    assert isinstance(panel, pd.DataFrame) and list(panel.columns) == list(close.columns)
+    assert isinstance(array_panel, np.ndarray) and array_panel.shape == close.shape
+
+    for column, symbol in enumerate(close.columns):
+        args = (high[symbol], low[symbol], close[symbol], volume[symbol])
+        expected = reference_volume_indicators(*args)[name].to_numpy()
+        single = indicator(*args, **kwargs)
+        flat = indicator(*(a.to_numpy() for a in args), **kwargs)
+
+        assert isinstance(single, pd.Series) and single.index.equals(close.index)
+        np.testing.assert_allclose(single.to_numpy(), expected, rtol=1e-12)
+        np.testing.assert_allclose(flat, expected, rtol=1e-12)
+        np.testing.assert_allclose(panel[symbol].to_numpy(), expected, rtol=1e-12)
+        np.testing.assert_allclose(array_panel[:, column], expected, rtol=1e-12)
+
+
+def test_money_flow_index_bounds(volume_panel):
+    """MFI stays within [0, 100]"""
+    mfi = VolumeIndicators.money_flow_index(*volume_panel).to_numpy()
+    valid = mfi[~np.isnan(mfi)]
+    assert ((valid >= 0) & (valid <= 100)).all()
+
+
+def test_true_range_shared_by_atr(sample_data):
+    """ATR is the moving average of the true range"""
+    tr = TechnicalIndicators.true_range(sample_data['high'], sample_data['low'], sample_data['close'])
+    atr = TechnicalIndicators.atr(sample_data['high'], sample_data['low'], sample_data['close'], 14)
+    assert tr.iloc[0] == sample_data['high'].iloc[0] - sample_data['low'].iloc[0]
+    assert (tr >= sample_data['high'] - sample_data['low']).all()
+    pd.testing.assert_series_equal(atr, tr.rolling(window=14).mean())
@@ -0,0 +1,70 @@
+"""Tests for the columnar trade ledger"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.ledger import TradeLedger, TRADE_DTYPE
+from app.utils.analytics import PerformanceCalculator, RiskMetrics, TradeAnalytics
+
+
+@pytest.fixture
+def records():
+    """Trade records in TRADE_DTYPE field order"""
+    pnls = [120.0, -40.0, -15.0, 0.0, 60.0, -5.0, -7.5, -1.0, 30.0]
+    return [(i * 2, i * 2 + 1, 100.0 + i, 101.0 + i, 10 + i, pnl, pnl / 10) for i, pnl in enumerate(pnls)]
+
+
+def test_ledger_grows_past_capacity(records):
+    """Appends beyond the initial capacity keep every record"""
+    ledger = TradeLedger(capacity=2)
+    for record in records:
+        ledger.append(record)
+
+    assert len(ledger) == len(records)
+    assert ledger.records.dtype == TRADE_DTYPE
+    assert ledger.pnl.tolist() == [r[5] for r in records]
+    assert ledger["quantity"].tolist() == [r[4] for r in records]
+
+
+def test_ledger_extend_and_clear(records):
+    """extend accepts tuples or a structured array"""
+    ledger = TradeLedger.from_records(records)
+    ledger.extend(ledger.records.copy())
+    assert len(ledger) == 2 * len(records)
+    ledger.clear()
+    assert len(ledger) == 0
+
+
+def test_ledger_to_dicts_with_index(records):
+    """Dict conversion maps bar positions to dates"""
+    index = pd.date_range("2024-01-01", periods=20, freq="D")
+    trades = TradeLedger.from_records(records).to_dicts(index)
+
+    assert trades[1] == {
+        "entry_date": index[2], "entry_price": 101.0, "exit_date": index[3], "exit_price": 102.0,
+        "quantity": 11, "side": "BUY", "pnl": -40.0, "pnl_percent": -4.0,
+    }
+    frame = TradeLedger.from_records(records).to_frame(index)
+    assert frame["exit_date"].iloc[0] == index[1]
+
+
+def test_analytics_accept_ledger_and_dicts(records):
+    """Analytics give the same answers for a ledger and for trade dicts"""
+    ledger = TradeLedger.from_records(records)
+    dicts = ledger.to_dicts()
+
+    for trades in (ledger, dicts):
+        assert PerformanceCalculator.calculate_win_rate(trades) == pytest.approx(300 / 9)
+        assert PerformanceCalculator.calculate_profit_factor(trades) == pytest.approx(210 / 68.5)
+        assert RiskMetrics.max_consecutive_losses(trades) == 3
+        assert TradeAnalytics.calculate_average_win(trades) == pytest.approx(70.0)
+        assert TradeAnalytics.calculate_average_loss(trades) == pytest.approx(-68.5 / 5)
+
+
+def test_analytics_empty_ledger():
+    """Empty ledgers produce zero statistics"""
+    ledger = TradeLedger()
+    assert PerformanceCalculator.calculate_win_rate(ledger) == 0
+    assert PerformanceCalculator.calculate_profit_factor(ledger) == 0
+    assert RiskMetrics.max_consecutive_losses(ledger) == 0
+    assert TradeAnalytics.calculate_average_win(ledger) == 0
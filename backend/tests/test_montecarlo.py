@@ -0,0 +1,183 @@
+"""Tests for the Monte Carlo robustness module"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.costs import PercentCommission
+from app.backtesting.engine.execution import AbortRules, StopRules
+from app.backtesting.engine.montecarlo import MonteCarlo, MonteCarloResult, path_metrics
+from app.backtesting.engine.sizing import FixedFraction, VolatilityTarget
+from app.backtesting.engine import montecarlo
+
+
+@pytest.fixture
+def backtest():
+    """Random walk with random signals, run through BacktestEngine; ends in an open position"""
+    rng = np.random.default_rng(11)
+    n = 800
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, n)))
+    signal = rng.choice([-1, 0, 1], size=n, p=[0.03, 0.94, 0.03])
+    signal[-30:] = 0
+    signal[-20] = 1
+    data = pd.DataFrame({"close": close, "signal": signal}, index=pd.date_range("2020-01-01", periods=n, freq="D"))
+    engine = BacktestEngine(10000.0, commission=0.001, slippage=0.0005)
+    metrics = engine._calculate_metrics(engine._execute_trades(data))
+    return engine, data, metrics
+
+
+def test_original_costs_reproduce_the_backtest(backtest):
+    """Drawing the backtest's own commission and slippage gives back its equity curve and metrics"""
+    engine, data, metrics = backtest
+    simulation = MonteCarlo.from_backtest(engine, data)
+    assert simulation.closed_out and len(simulation.entries) > 5
+
+    rng = np.random.default_rng(0)
+    equity, _ = simulation._cost_draws_paths(3, rng, commission=(0.001, 0.001), slippage=(0.0005, 0.0005))
+    assert np.array_equal(equity, np.broadcast_to(engine.equity_curve, equity.shape))
+
+    result = simulation.cost_draws(50, commission=(0.001, 0.001), slippage=(0.0005, 0.0005), seed=1)
+    assert np.allclose(result.roi, metrics.roi)
+    assert np.allclose(result.sharpe_ratio, metrics.sharpe_ratio)
+    assert np.allclose(result.max_drawdown, metrics.max_drawdown)
+
+
+def test_aborted_run_is_resampled_over_its_bars(backtest):
+    """An aborted run's equity ends on the abort bar; the simulation covers only those bars"""
+    _, data, _ = backtest
+    engine = BacktestEngine(10000.0, commission=0.001, slippage=0.0005, abort=AbortRules(max_drawdown=3))
+    metrics = engine._calculate_metrics(engine._execute_trades(data))
+    assert engine.aborted_at is not None and len(engine.equity_curve) < len(data)
+
+    simulation = MonteCarlo.from_backtest(engine, data)
+    result = simulation.cost_draws(5, commission=(0.001, 0.001), slippage=(0.0005, 0.0005), seed=1)
+    assert np.allclose(result.roi, metrics.roi)
+    assert len(simulation.reshuffle_trades(5, seed=1)) == 5
+
+
+@pytest.mark.parametrize("settings, refused", [
+    ({}, False),
+    ({"sizing": FixedFraction(0.3)}, False),
+    ({"sizing": VolatilityTarget(0.2, lookback=20)}, False),
+    ({"stops": StopRules(stop_loss=0.005)}, True),
+    ({"cost_model": PercentCommission(0.002)}, True),
+], ids=["plain", "fixed_fraction", "volatility_target", "stops", "cost_model"])
+def test_original_costs_reproduce_or_refuse(backtest, settings, refused):
+    """Zero-variance cost draws give back the engine's ROI, or are refused when the engine does what they cannot"""
+    _, data, _ = backtest
+    data = data.assign(high=data["close"] * 1.01, low=data["close"] * 0.99)
+    engine = BacktestEngine(10000.0, commission=0.001, slippage=0.0005, **settings)
+    metrics = engine._calculate_metrics(engine._execute_trades(data))
+    simulation = MonteCarlo.from_backtest(engine, data)
+
+    if refused:
+        with pytest.raises(ValueError, match=next(iter(settings))):
+            simulation.cost_draws(5, commission=(0.001, 0.001), slippage=(0.0005, 0.0005), seed=1)
+        assert len(simulation.reshuffle_trades(5, seed=1)) == 5
+    else:
+        result = simulation.cost_draws(5, commission=(0.001, 0.001), slippage=(0.0005, 0.0005), seed=1)
+        assert np.allclose(result.roi, metrics.roi)
+
+
+def test_higher_costs_lower_roi(backtest):
+    engine, data, metrics = backtest
+    simulation = MonteCarlo.from_backtest(engine, data)
+    cheap = simulation.cost_draws(100, commission=(0.0, 0.0), slippage=(0.0, 0.0), seed=2)
+    expensive = simulation.cost_draws(100, commission=(0.005, 0.01), slippage=(0.002, 0.004), seed=2)
+    assert cheap.roi.min() > metrics.roi > expensive.roi.max()
+
+
+def test_reshuffle_keeps_roi_and_sharpe(backtest):
+    """A permutation of whole trades only changes the drawdown"""
+    engine, data, metrics = backtest
+    result = MonteCarlo.from_backtest(engine, data).reshuffle_trades(500, seed=3)
+
+    assert len(result) == 500
+    assert np.allclose(result.roi, metrics.roi)
+    assert np.allclose(result.sharpe_ratio, metrics.sharpe_ratio)
+    assert result.max_drawdown.min() < result.max_drawdown.max() <= 0
+    assert (result.max_drawdown >= -100).all()
+
+
+def test_trade_bootstrap_varies_roi(backtest):
+    engine, data, metrics = backtest
+    result = MonteCarlo.from_backtest(engine, data).reshuffle_trades(500, seed=4, replace=True)
+    assert result.roi.std() > 0
+    assert result.roi.min() < metrics.roi < result.roi.max()
+
+
+def test_block_bootstrap_resamples_bar_returns(backtest):
+    """With one block spanning the whole series starting at 0 the path is the backtest itself"""
+    engine, data, metrics = backtest
+    simulation = MonteCarlo.from_backtest(engine, data)
+
+    class FirstBar:
+        @staticmethod
+        def integers(low, high, size):
+            return np.zeros(size, dtype=np.int64)
+
+    equity, _ = simulation._block_bootstrap_paths(2, FirstBar(), block=len(data))
+    assert np.allclose(equity, engine.equity_curve)
+
+    result = simulation.block_bootstrap(400, block=10, seed=5)
+    assert result.roi.std() > 0 and result.sharpe_ratio.std() > 0
+    returns = np.diff(engine.equity_curve) / engine.equity_curve[:-1]
+    expected_growth = np.log1p(returns).sum()
+    assert np.isclose(np.log1p(result.roi / 100).mean(), expected_growth, atol=0.1)
+
+
+def test_paths_only_depend_on_the_seed(backtest, monkeypatch):
+    """Chunking and worker count do not change the draws"""
+    engine, data, _ = backtest
+    simulation = MonteCarlo.from_backtest(engine, data)
+    monkeypatch.setattr(montecarlo, "CHUNK_CELLS", len(data) * 64)
+
+    first = simulation.block_bootstrap(300, seed=6)
+    again = simulation.block_bootstrap(300, seed=6)
+    pooled = simulation.block_bootstrap(300, seed=6, workers=2)
+    other = simulation.block_bootstrap(300, seed=7)
+
+    assert np.array_equal(first.roi, again.roi)
+    assert np.array_equal(first.roi, pooled.roi)
+    assert np.array_equal(first.max_drawdown, pooled.max_drawdown)
+    assert not np.array_equal(first.roi, other.roi)
+
+
+def test_percentiles_table(backtest):
+    engine, data, _ = backtest
+    results = MonteCarlo.from_backtest(engine, data).run(200, seed=8)
+    assert set(results) == {"reshuffle_trades", "block_bootstrap", "cost_draws"}
+
+    table = results["block_bootstrap"].percentiles()
+    assert list(table.index) == ["roi", "sharpe_ratio", "max_drawdown"]
+    assert list(table.columns) == ["p5", "p25", "p50", "p75", "p95"]
+    assert (table.diff(axis=1).iloc[:, 1:] >= 0).all().all()
+    assert 0 <= results["block_bootstrap"].probability_of_loss <= 1
+
+
+def test_path_metrics_match_engine():
+    rng = np.random.default_rng(9)
+    equity = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, (4, 250)), axis=1))
+    equity[3] = 1000.0
+    metrics = path_metrics(equity, 1000.0)
+    for row in range(4):
+        assert np.isclose(metrics[0, row], (equity[row, -1] - 1000.0) / 10)
+        assert np.isclose(metrics[1, row], BacktestEngine._calculate_sharpe_ratio(np.diff(equity[row]) / equity[row, :-1]))
+        assert np.isclose(metrics[2, row], BacktestEngine._calculate_max_drawdown(equity[row]))
+
+
+def test_no_trades_and_invalid_arguments():
+    close = np.linspace(10, 20, 50)
+    engine = BacktestEngine(1000.0)
+    engine._execute(close, np.zeros(50, dtype=np.int8))
+    simulation = MonteCarlo.from_backtest(engine, pd.DataFrame({"close": close}))
+
+    result = simulation.reshuffle_trades(10, seed=0)
+    assert isinstance(result, MonteCarloResult)
+    assert (result.roi == 0).all() and (result.max_drawdown == 0).all()
+    assert (simulation.cost_draws(10, seed=0).roi == 0).all()
+
+    with pytest.raises(ValueError):
+        simulation.block_bootstrap(10, block=0)
+    with pytest.raises(ValueError):
+        simulation.cost_draws(0)
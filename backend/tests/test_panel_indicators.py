@@ -0,0 +1,101 @@
+"""Tests for multi-symbol panel indicators"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.indicators.indicators import TechnicalIndicators
+from app.backtesting.indicators.panel import PanelIndicators, to_panel
+
+
+@pytest.fixture
+def ohlc_panel():
+    """High/low/close panels of 6 symbols with a late listing, a halt and scattered missing bars"""
+    rng = np.random.default_rng(5)
+    n, m = 300, 6
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n, m)), axis=0))
+    high = close * (1 + rng.uniform(0, 0.02, (n, m)))
+    low = close * (1 - rng.uniform(0, 0.02, (n, m)))
+    close[:120, 1] = np.nan
+    close[150:170, 2] = np.nan
+    close[rng.random((n, m)) < 0.03] = np.nan
+    high[rng.random((n, m)) < 0.01] = np.nan
+    index = pd.date_range("2023-01-01", periods=n, freq="D")
+    columns = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOG", "META"]
+    return tuple(pd.DataFrame(values, index=index, columns=columns) for values in (high, low, close))
+
+
+def per_symbol(function, *frames):
+    """Reference: the single-series indicator on each symbol's valid bars, NaN elsewhere"""
+    outputs = []
+    for symbol in frames[0].columns:
+        columns = pd.concat([frame[symbol] for frame in frames], axis=1).dropna()
+        result = function(*(columns.iloc[:, i] for i in range(len(frames))))
+        results = result if isinstance(result, tuple) else (result,)
+        outputs.append([r.reindex(frames[0].index) for r in results])
+    return [pd.concat([o[i] for o in outputs], axis=1, keys=frames[0].columns) for i in range(len(outputs[0]))]
+
+
+def assert_same(actual, expected):
+    assert isinstance(actual, pd.DataFrame)
+    np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy())
+    assert actual.columns.equals(expected.columns) and actual.index.equals(expected.index)
+
+
+@pytest.mark.parametrize("name,args", [
+    ("moving_average", (20,)),
+    ("exponential_moving_average", (10,)),
+    ("rsi", (14,)),
+])
+def test_single_input_indicators_match_per_symbol(ohlc_panel, name, args):
+    close = ohlc_panel[2]
+    expected, = per_symbol(lambda c: getattr(TechnicalIndicators, name)(c, *args), close)
+    assert_same(getattr(PanelIndicators, name)(close, *args), expected)
+
+
+def test_macd_matches_per_symbol(ohlc_panel):
+    close = ohlc_panel[2]
+    for actual, expected in zip(PanelIndicators.macd(close), per_symbol(TechnicalIndicators.macd, close)):
+        assert_same(actual, expected)
+
+
+def test_ohlc_indicators_skip_bars_missing_in_any_input(ohlc_panel):
+    """ATR and stochastic drop a bar when any of high, low or close is missing"""
+    assert_same(PanelIndicators.atr(*ohlc_panel), per_symbol(TechnicalIndicators.atr, *ohlc_panel)[0])
+    for actual, expected in zip(PanelIndicators.stochastic(*ohlc_panel),
+                                per_symbol(TechnicalIndicators.stochastic, *ohlc_panel)):
+        assert_same(actual, expected)
+
+
+def test_warm_up_is_per_symbol(ohlc_panel):
+    """A symbol listed late gets its first value after its own warm-up"""
+    close = ohlc_panel[2]
+    sma = PanelIndicators.moving_average(close, 20)
+    first_listed_bar = close["MSFT"].first_valid_index()
+    twentieth_bar = close["MSFT"].dropna().index[19]
+
+    assert sma["MSFT"].first_valid_index() == twentieth_bar > first_listed_bar
+    assert sma.isna().to_numpy()[close.isna().to_numpy()].all()
+
+
+def test_arrays_in_arrays_out():
+    """2-D arrays give 2-D arrays; a complete panel takes the no-packing path"""
+    values = 100 + np.cumsum(np.random.default_rng(2).normal(size=(50, 3)), axis=0)
+    result = PanelIndicators.rsi(values, 5)
+
+    assert isinstance(result, np.ndarray) and result.shape == (50, 3)
+    for j in range(3):
+        np.testing.assert_array_equal(result[:, j], TechnicalIndicators.rsi(pd.Series(values[:, j]), 5).to_numpy())
+
+
+def test_to_panel_pivots_long_bars():
+    """Long-format rows become one column per symbol with NaN for absent bars"""
+    rows = pd.DataFrame({
+        "timestamp": pd.to_datetime(["2023-01-02", "2023-01-01", "2023-01-01"]),
+        "symbol": ["AAPL", "AAPL", "MSFT"],
+        "close": [2.0, 1.0, 5.0],
+    })
+    panel = to_panel(rows, "close")
+
+    assert list(panel.columns) == ["AAPL", "MSFT"]
+    assert panel["AAPL"].tolist() == [1.0, 2.0]
+    assert panel["MSFT"].iloc[0] == 5.0 and np.isnan(panel["MSFT"].iloc[1])
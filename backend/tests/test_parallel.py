@@ -0,0 +1,109 @@
+"""Tests for the process-pool sweep runner"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.costs import PercentCommission
+from app.backtesting.engine.execution import AbortRules, StopRules
+from app.backtesting.engine.parallel import ParallelSweepRunner, SharedOHLCV
+from app.backtesting.engine.sizing import FixedFraction
+from app.backtesting.engine.sweep import parameter_grid
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+
+
+@pytest.fixture
+def market_data():
+    """Random walk OHLCV data"""
+    rng = np.random.default_rng(5)
+    dates = pd.date_range("2022-01-01", periods=300, freq="h")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+    return pd.DataFrame({
+        "open": close, "high": close * 1.01, "low": close * 0.99,
+        "close": close, "volume": np.full(300, 1e6),
+    }, index=dates)
+
+
+def test_shared_ohlcv_round_trip(market_data):
+    """Workers see the same bars the owner placed in shared memory"""
+    with SharedOHLCV.create(market_data) as owner:
+        worker = SharedOHLCV.attach(owner.spec)
+        frame = worker.frame()
+        assert list(frame.columns) == list(market_data.columns)
+        assert (frame.index == market_data.index).all()
+        assert np.array_equal(frame.to_numpy(), market_data.to_numpy())
+        assert np.shares_memory(frame["close"].to_numpy(), worker.arrays()["close"])
+        del frame
+        worker.close()
+
+
+def test_parallel_sweep_matches_single_process(market_data):
+    """Chunked process-pool results equal an in-process sweep"""
+    grid = parameter_grid({"fast_period": [3, 5, 8], "slow_period": [13, 21, 34]})
+    runner = ParallelSweepRunner(max_workers=2, chunk_size=4)
+
+    result = runner.run(market_data, MovingAverageCrossoverStrategy, grid)
+
+    signals = MovingAverageCrossoverStrategy.signal_matrix(market_data, grid)
+    expected = BacktestEngine().run_sweep(market_data, signals, parameters=grid)
+    assert result.parameters == grid
+    for name, values in expected.metrics.items():
+        assert np.array_equal(result.metrics[name], values), name
+
+
+def test_time_zone_survives_shared_memory(market_data):
+    """Workers bucket calendar timeframes in the data's zone, so trend-filtered sweeps match serial ones"""
+    data = market_data.tz_localize("UTC").tz_convert("America/New_York")
+    with SharedOHLCV.create(data) as owner:
+        worker = SharedOHLCV.attach(owner.spec)
+        assert worker.frame().index.equals(data.index)
+        worker.close()
+
+    grid = parameter_grid({"fast_period": [3, 5], "slow_period": [13, 21], "trend_timeframe": ["D"],
+                           "trend_period": [3]})
+    result = ParallelSweepRunner(max_workers=2, chunk_size=2).run(data, MovingAverageCrossoverStrategy, grid)
+    signals = MovingAverageCrossoverStrategy.signal_matrix(data, grid)
+    expected = BacktestEngine().run_sweep(data, signals, parameters=grid)
+    for name, values in expected.metrics.items():
+        assert np.array_equal(result.metrics[name], values), name
+
+
+@pytest.mark.parametrize("settings", [
+    {"abort": AbortRules(max_drawdown=15.0), "sizing": FixedFraction(0.5), "direction": "long_short",
+     "borrow_rate": 0.05},
+    {"cost_model": PercentCommission(0.0005), "direction": "short"},
+], ids=["abort_sizing_long_short", "cost_model_short"])
+def test_parallel_sweep_uses_the_whole_engine_configuration(market_data, settings):
+    """Workers simulate the engine's direction, borrow, sizing, abort rules and cost model, not long-only defaults"""
+    grid = parameter_grid({"fast_period": [3, 5, 8], "slow_period": [13, 21]})
+    engine = BacktestEngine(10000.0, 0.001, 0.0005, **settings)
+    result = ParallelSweepRunner(max_workers=2, chunk_size=2, engine=engine).run(
+        market_data, MovingAverageCrossoverStrategy, grid)
+
+    signals = MovingAverageCrossoverStrategy.signal_matrix(market_data, grid)
+    expected = engine.run_sweep(market_data, signals, parameters=grid)
+    plain = BacktestEngine().run_sweep(market_data, signals, parameters=grid)
+    for name, values in expected.metrics.items():
+        # Narrower sweep batches may round the trade statistics differently in the last bit
+        np.testing.assert_allclose(result.metrics[name], values, rtol=1e-12, err_msg=name)
+    assert not np.allclose(result.metrics["roi"], plain.metrics["roi"])
+
+    with pytest.raises(ValueError):
+        ParallelSweepRunner(engine=BacktestEngine(stops=StopRules(stop_loss=0.01)))
+
+
+def test_parallel_sweep_streams_chunks(market_data):
+    """Chunks are yielded individually with their offsets"""
+    grid = parameter_grid({"fast_period": [3, 5], "slow_period": [13, 21, 34]})
+    runner = ParallelSweepRunner(max_workers=2, chunk_size=4)
+
+    chunks = list(runner.iter_chunks(market_data, MovingAverageCrossoverStrategy, grid))
+
+    assert sorted(start for start, _ in chunks) == [0, 4]
+    assert sorted(len(result) for _, result in chunks) == [2, 4]
+
+
+def test_parallel_sweep_rejects_bad_chunk_size():
+    """chunk_size must be positive"""
+    with pytest.raises(ValueError):
+        ParallelSweepRunner(chunk_size=0)
@@ -0,0 +1,118 @@
+"""Tests for the multi-symbol portfolio engine and sizing rules"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.portfolio import PortfolioEngine
+from app.backtesting.engine.sizing import EqualWeight, FixedFraction, VolatilityTarget
+
+
+@pytest.fixture
+def universe():
+    """Random walk closes for 8 symbols with crossover-style signals and a late listing"""
+    rng = np.random.default_rng(3)
+    n, m = 600, 8
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0005, 0.015, (n, m)), axis=0))
+    close[:100, 7] = np.nan
+    signal = rng.choice([-1, 0, 1], size=(n, m), p=[0.02, 0.96, 0.02])
+    columns = [f"SYM{i}" for i in range(m)]
+    index = pd.date_range("2020-01-01", periods=n, freq="D")
+    return pd.DataFrame(close, index=index, columns=columns), pd.DataFrame(signal, index=index, columns=columns)
+
+
+@pytest.mark.parametrize("sizing,rebalance_every", [
+    (EqualWeight(), None), (EqualWeight(max_positions=4), 20), (FixedFraction(0.2), None), (VolatilityTarget(), 10),
+])
+def test_book_accounting_is_consistent(universe, sizing, rebalance_every):
+    """Cash never goes negative, holdings are whole shares and per-symbol P&L adds up to the final equity"""
+    close, signal = universe
+    result = PortfolioEngine(100000.0, commission=0.001, slippage=0.0005, sizing=sizing,
+                             rebalance_every=rebalance_every).run(close, signal)
+
+    assert result.equity.shape == (len(close),) and result.holdings.shape == close.shape
+    assert (result.cash >= 0).all()
+    assert np.array_equal(result.holdings, np.floor(result.holdings))
+    assert np.isclose(result.equity[-1], 100000.0 + result.symbol_metrics["pnl"].sum())
+    assert np.isclose(result.trades.pnl.sum(), result.symbol_metrics["pnl"].sum())
+    assert result.metrics.total_trades == len(result.trades) == result.symbol_metrics["round_trips"].sum()
+    assert list(result.symbol_metrics.index) == list(close.columns)
+    assert (result.holdings[:100, 7] == 0).all()
+
+
+def test_equal_weight_allocation_by_hand():
+    """Two symbols entering together split the cash; the book is sold on the last bar"""
+    close = np.array([[10.0, 20.0], [11.0, 20.0], [12.0, 25.0], [12.0, 25.0]])
+    signal = np.array([[1, 1], [0, 0], [0, 0], [0, 0]])
+    result = PortfolioEngine(1000.0, commission=0.0).run(close, signal)
+
+    assert result.holdings[0].tolist() == [50, 25]
+    assert result.equity.tolist() == [1000.0, 1050.0, 1225.0, 1225.0]
+    assert len(result.trades) == 2
+    assert result.trades["pnl"].tolist() == [100.0, 125.0]
+    assert result.symbols == ["0", "1"]
+
+
+def test_entries_funded_from_shared_cash_and_exits_free_it():
+    """A later entry only gets the cash left over, and is filled once an exit frees cash"""
+    close = np.full((5, 2), 10.0)
+    signal = np.array([[1, 0], [0, 1], [-1, 0], [0, 0], [0, 0]])
+    result = PortfolioEngine(1000.0, commission=0.0).run(close, signal)
+
+    assert result.holdings[0].tolist() == [100, 0]
+    assert result.holdings[1].tolist() == [100, 0]
+    assert result.holdings[2].tolist() == [0, 100]
+
+
+def test_scheduled_rebalance_resizes_open_positions():
+    """Open positions keep their size on signal changes and move to target weights on schedule"""
+    close = np.full((5, 2), 10.0)
+    signal = np.array([[1, 0], [0, 1], [0, 0], [0, 0], [0, 0]])
+    result = PortfolioEngine(1000.0, commission=0.0, rebalance_every=2).run(close, signal)
+
+    assert result.holdings[1].tolist() == [100, 0]
+    assert result.holdings[2].tolist() == [50, 50]
+
+
+def test_missing_prices_hold_and_mark_at_last_price():
+    """A symbol without a price on a rebalance bar is neither traded nor dropped from the valuation"""
+    close = np.array([[10.0, 10.0], [np.nan, 10.0], [np.nan, 10.0], [12.0, 10.0]])
+    signal = np.array([[1, 0], [0, 1], [0, 0], [0, 0]])
+    result = PortfolioEngine(1000.0, commission=0.0, sizing=EqualWeight(max_positions=2)).run(close, signal)
+
+    assert result.holdings[1].tolist() == [50, 50]
+    assert result.equity[1] == 1000.0
+    assert result.equity[-1] == 1100.0
+
+
+def test_missing_price_defers_entries_and_exits_to_the_next_priced_bar():
+    """An entry or exit blocked by a NaN close is executed on the symbol's next bar with a price"""
+    close = np.array([[10.0, 10.0], [10.0, np.nan], [np.nan, np.nan], [12.0, 20.0], [12.0, 20.0], [12.0, 20.0]])
+    signal = np.array([[1, 0], [0, 1], [-1, 0], [0, 0], [0, 0], [0, 0]])
+    result = PortfolioEngine(1000.0, commission=0.0, sizing=EqualWeight(max_positions=2)).run(close, signal)
+
+    assert result.holdings[:3].tolist() == [[50, 0]] * 3
+    assert result.holdings[3].tolist() == [0, 27]
+    assert result.fills["bar"].tolist() == [0, 3, 3, 5]
+    assert result.equity[-1] == 1100.0
+
+
+def test_sizing_rules():
+    active = np.array([True, True, False, True])
+    np.testing.assert_allclose(EqualWeight().weights(0, active), [1 / 3, 1 / 3, 0, 1 / 3])
+    np.testing.assert_allclose(EqualWeight(max_positions=10).weights(0, active), [0.1, 0.1, 0, 0.1])
+    np.testing.assert_allclose(FixedFraction(0.5).weights(0, active), [1 / 3, 1 / 3, 0, 1 / 3])
+    np.testing.assert_allclose(FixedFraction(0.2).weights(0, active), [0.2, 0.2, 0, 0.2])
+
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0, 1, (300, 4)) * np.array([0.01, 0.02, 0.01, 0.04])
+    rule = VolatilityTarget(target=0.1, lookback=60)
+    rule.prepare(100 * np.cumprod(1 + returns, axis=0))
+    weights = rule.weights(299, active)
+    assert weights[2] == 0 and weights.sum() <= 1
+    assert weights[0] > weights[1] > weights[3]
+    assert not rule.weights(10, active).any()
+
+
+def test_shape_mismatch_raises():
+    with pytest.raises(ValueError):
+        PortfolioEngine().run(np.ones((5, 2)), np.zeros((5, 3)))
@@ -0,0 +1,163 @@
+"""Tests for short and stop-and-reverse execution with borrow costs"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.chunked import BarStore
+from app.backtesting.engine.costs import PerShareFee
+from app.backtesting.engine.execution import AbortRules, ExecutionCore, StopRules
+from app.backtesting.engine.sweep import SweepCore, SweepResult, parameter_grid
+from app.backtesting.strategies import MACDStrategy, MovingAverageCrossoverStrategy
+from app.backtesting.strategies.base_strategy import BarArrays
+
+
+def per_bar_directional(close, signal, direction, initial_capital, commission, slippage, borrow_per_bar):
+    """Reference per-bar loop for long, short and stop-and-reverse positions"""
+    opens = {"long": (1,), "short": (-1,), "long_short": (1, -1)}[direction]
+    equity = np.empty(len(close))
+    trades = []
+    cash, position, entry_price, position_value, entry_bar = initial_capital, 0, 0.0, 0.0, -1
+
+    def close_position(i, exit_price):
+        q = abs(position)
+        if position > 0:
+            net = (exit_price - entry_price) * q - (position_value + q * exit_price) * commission
+            worth = q * exit_price
+        else:
+            borrow = borrow_per_bar * position_value * (i - entry_bar)
+            net = (entry_price - exit_price) * q - ((position_value + q * exit_price) * commission + borrow)
+            worth = q * (2 * entry_price - exit_price)
+        trades.append((entry_bar, i, position, net))
+        return worth, net
+
+    for i in range(len(close)):
+        s = signal[i]
+        if position * s < 0:
+            exit_price = close[i] * (1 - slippage) if position > 0 else close[i] * (1 + slippage)
+            worth, net = close_position(i, exit_price)
+            cash += worth + net
+            position = 0
+            if direction != "long_short":
+                s = 0
+        if position == 0 and s in opens:
+            entry_price = close[i] * (1 + slippage) if s > 0 else close[i] * (1 - slippage)
+            quantity = int(cash / entry_price)
+            if quantity > 0:
+                position, position_value, entry_bar = quantity * s, quantity * entry_price, i
+                cash -= position_value
+        if position > 0:
+            equity[i] = cash + position * close[i]
+        elif position < 0:
+            accrued = borrow_per_bar * position_value * (i - entry_bar)
+            equity[i] = cash - position * (2 * entry_price - close[i]) - accrued
+        else:
+            equity[i] = cash
+    if position != 0:
+        n = len(close) - 1
+        exit_price = close[n] * (1 - slippage) if position > 0 else close[n] * (1 + slippage)
+        worth, _ = close_position(n, exit_price)
+        equity[-1] = cash + worth - (borrow_per_bar * position_value * (n - entry_bar) if position < 0 else 0.0)
+    return equity, trades
+
+
+@pytest.fixture
+def market_data():
+    rng = np.random.default_rng(23)
+    n = 3000
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({"open": close, "high": close * 1.005, "low": close * 0.995, "close": close,
+                         "volume": np.full(n, 1e5)}, index=pd.date_range("2014-01-01", periods=n, freq="D"))
+
+
+def test_short_by_hand():
+    close = np.array([100.0, 90.0, 80.0, 85.0, 85.0])
+    signal = np.array([-1, 0, 0, 1, 0], dtype=np.int8)
+    result = ExecutionCore(1000.0, commission=0.0, direction="short").execute(close, signal)
+    assert result.trades["quantity"].tolist() == [-10]
+    assert result.trades["pnl"].tolist() == [150.0]
+    # Collateral plus P&L while short, then the engine's exit accounting (worth + net P&L) once covered
+    assert result.equity.tolist() == [1000.0, 1100.0, 1200.0, 1300.0, 1300.0]
+
+    borrowed = ExecutionCore(1000.0, commission=0.0, direction="short", borrow_rate=0.252).execute(close, signal)
+    # 0.1% of the 1000 entry notional per bar
+    np.testing.assert_allclose(borrowed.equity[:3], [1000.0, 1099.0, 1198.0])
+    assert borrowed.trades["pnl"][0] == pytest.approx(147.0)
+
+
+def test_stop_and_reverse():
+    close = np.array([10.0, 10.0, 8.0, 8.0, 10.0, 10.0])
+    signal = np.array([1, 0, -1, -1, 1, 0], dtype=np.int8)
+    result = ExecutionCore(1000.0, commission=0.0, direction="long_short").execute(close, signal)
+    trades = result.trades
+    assert trades["entry_index"].tolist() == [0, 2, 4]
+    assert trades["exit_index"].tolist() == [2, 4, 5]
+    assert np.sign(trades["quantity"]).tolist() == [1, -1, 1]
+    long_only = ExecutionCore(1000.0, commission=0.0).execute(close, signal)
+    assert long_only.trades["entry_index"].tolist() == [0, 4]
+
+
+@pytest.mark.parametrize("direction", ["long", "short", "long_short"])
+@pytest.mark.parametrize("borrow_rate", [0.0, 0.05])
+def test_directions_match_per_bar_loop(market_data, direction, borrow_rate):
+    signal = MACDStrategy({}).compute_signals(BarArrays.from_frame(market_data)).signal
+    close = market_data["close"].to_numpy()
+    expected_equity, expected_trades = per_bar_directional(close, signal, direction, 10000.0, 0.001, 0.0005,
+                                                           borrow_rate / 252)
+    runs = [ExecutionCore(10000.0, 0.001, 0.0005, mode=mode, direction=direction, borrow_rate=borrow_rate)
+            for mode in ("dense", "sparse")]
+    runs.append(ExecutionCore(10000.0, 0.001, 0.0005, direction=direction, borrow_rate=borrow_rate,
+                              abort=AbortRules(equity_floor=-np.inf)))
+    for core in runs:
+        result = core.execute(close, signal)
+        records = result.trades
+        assert list(zip(records["entry_index"].tolist(), records["exit_index"].tolist(),
+                        records["quantity"].tolist())) == [t[:3] for t in expected_trades]
+        np.testing.assert_allclose(records["pnl"], [t[3] for t in expected_trades], rtol=1e-12)
+        np.testing.assert_allclose(result.equity, expected_equity, rtol=1e-12)
+
+
+@pytest.mark.parametrize("direction", ["short", "long_short"])
+@pytest.mark.parametrize("max_cells", [1 << 22, 5000])
+def test_direction_sweep_matches_single_runs(market_data, direction, max_cells):
+    grid = [{"fast_period": f, "slow_period": s, "signal_period": 9} for f in (6, 12) for s in (26, 40)]
+    signals = MACDStrategy.signal_matrix(market_data, grid)
+    engine = BacktestEngine(10000.0, 0.001, 0.0005, direction=direction, borrow_rate=0.03)
+    core = SweepCore(10000.0, 0.001, 0.0005, max_cells=max_cells, direction=direction, borrow_rate=0.03)
+    sweep = SweepResult.from_core(core.run(market_data["close"].to_numpy(), signals))
+    charged = engine.run_cost_sweep(market_data, signals, {"fee": PerShareFee(0.01)})["fee"]
+    for column, parameters in enumerate(grid):
+        single, _ = engine.run_backtest(market_data, MACDStrategy(parameters))
+        assert sweep[column].total_trades == single.total_trades > 20
+        for field in ("total_return", "sharpe_ratio", "max_drawdown", "profit_factor", "worst_trade"):
+            assert getattr(sweep[column], field) == pytest.approx(getattr(single, field), rel=1e-9), field
+        fee, _ = BacktestEngine(10000.0, 0.001, 0.0005, direction=direction, borrow_rate=0.03,
+                                cost_model=PerShareFee(0.01)).run_backtest(market_data, MACDStrategy(parameters))
+        assert charged[column].total_return == pytest.approx(fee.total_return, rel=1e-9)
+
+
+def test_long_sweep_unchanged_by_direction_support(market_data):
+    grid = parameter_grid({"fast_period": [5, 10], "slow_period": [30, 60]})
+    signals = MovingAverageCrossoverStrategy.signal_matrix(market_data, grid)
+    sweep = BacktestEngine(10000.0, 0.001).run_sweep(market_data, signals, grid)
+    for column, parameters in enumerate(grid):
+        single, _ = BacktestEngine(10000.0, 0.001).run_backtest(market_data, MovingAverageCrossoverStrategy(parameters))
+        assert sweep[column].total_return == single.total_return
+
+
+def test_chunked_long_short_matches_in_memory(market_data, tmp_path):
+    store = BarStore.write(tmp_path / "bars", market_data)
+    engine = BacktestEngine(10000.0, 0.001, 0.0005, direction="long_short", borrow_rate=0.03)
+    engine.run_backtest(market_data, MACDStrategy({}))
+    chunked = BacktestEngine(10000.0, 0.001, 0.0005, direction="long_short", borrow_rate=0.03)
+    chunked.run_chunked(store, MACDStrategy({}), chunk_size=700, equity_path=tmp_path / "equity.npy")
+    assert np.array_equal(chunked.trades.records, engine.trades.records)
+    np.testing.assert_allclose(np.load(tmp_path / "equity.npy"), engine.equity_curve, rtol=1e-12)
+    assert {t["side"] for t in engine.trades.to_dicts()} == {"BUY", "SELL"}
+
+
+def test_invalid_direction_settings():
+    with pytest.raises(ValueError):
+        ExecutionCore(direction="both")
+    with pytest.raises(ValueError):
+        ExecutionCore(direction="short", stops=StopRules(stop_loss=0.01))
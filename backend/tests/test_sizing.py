@@ -0,0 +1,138 @@
+"""Tests for position sizing rules in the single-symbol and portfolio engines"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.execution import ExecutionCore, StopRules
+from app.backtesting.engine.portfolio import PortfolioEngine
+from app.backtesting.engine.sizing import (
+    ATRVolatilityTarget, EqualWeight, FixedFraction, FixedRisk, KellyFraction, VolatilityTarget,
+)
+from app.backtesting.engine.sweep import parameter_grid
+from app.backtesting.indicators.indicators import TechnicalIndicators
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+from app.backtesting.strategies.base_strategy import BarArrays
+
+RULES = [
+    FixedFraction(0.3),
+    VolatilityTarget(target=0.02, lookback=30),
+    ATRVolatilityTarget(target=0.02, atr_period=10),
+    FixedRisk(risk=0.005, atr_multiple=2.0),
+    KellyFraction(lookback=50, kelly=0.5, max_weight=0.8),
+]
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(9)
+    n = 4000
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, n)))
+    high = close * np.exp(np.abs(rng.normal(0, 0.005, n)))
+    low = close * np.exp(-np.abs(rng.normal(0, 0.005, n)))
+    return pd.DataFrame({"open": close, "high": high, "low": low, "close": close, "volume": np.full(n, 1e5)},
+                        index=pd.date_range("2012-01-01", periods=n, freq="D"))
+
+
+def per_bar_sized(close, signal, fractions, initial_capital, commission, slippage):
+    """Reference per-bar loop committing fractions[i] of cash at each entry"""
+    equity = np.empty(len(close))
+    cash, position, entry_price, position_value = initial_capital, 0, 0.0, 0.0
+    quantities = []
+    for i in range(len(close)):
+        if signal[i] == 1 and position == 0:
+            entry_price = close[i] * (1 + slippage)
+            quantity = int(cash * fractions[i] / entry_price)
+            if quantity > 0:
+                position, position_value = quantity, quantity * entry_price
+                cash -= position_value
+                quantities.append(quantity)
+        elif signal[i] == -1 and position > 0:
+            exit_price = close[i] * (1 - slippage)
+            net_pnl = (exit_price - entry_price) * position - (position_value + position * exit_price) * commission
+            cash += position * exit_price + net_pnl
+            position = 0
+        equity[i] = cash + position * close[i] if position > 0 else cash
+    if position > 0:
+        equity[-1] = cash + position * close[-1] * (1 - slippage)
+    return equity, quantities
+
+
+def test_entry_fractions(bars):
+    close, high, low = (bars[c].to_numpy() for c in ("close", "high", "low"))
+    atr = TechnicalIndicators.atr(bars["high"], bars["low"], bars["close"], 14).to_numpy()
+
+    fractions = FixedRisk(risk=0.01, atr_multiple=2.0).entry_fractions(close, high, low)
+    np.testing.assert_allclose(fractions[14:], np.minimum(0.01 * close / (2 * atr), 1.0)[14:])
+    assert not fractions[:13].any()
+
+    vol = ATRVolatilityTarget(target=0.02, atr_period=14, periods_per_year=1).entry_fractions(close, high, low)
+    np.testing.assert_allclose(vol[14:], np.minimum(0.02 / (atr / close), 1.0)[14:])
+
+    kelly = KellyFraction(lookback=50, kelly=0.5, max_weight=0.8).entry_fractions(close)
+    returns = bars["close"].pct_change().rolling(50)
+    expected = np.clip(0.5 * returns.mean() / returns.var(), 0, 0.8).fillna(0).to_numpy()
+    np.testing.assert_allclose(kelly, expected)
+    assert kelly.max() == 0.8 and kelly.min() == 0.0
+
+    assert EqualWeight(max_positions=4).entry_fractions(close).tolist() == [0.25] * len(close)
+
+
+def test_fixed_fraction_by_hand():
+    close = np.array([10.0, 10.0, 12.0, 12.0])
+    signal = np.array([1, 0, -1, 0], dtype=np.int8)
+    result = ExecutionCore(1000.0, commission=0.0, sizing=FixedFraction(0.25)).execute(close, signal)
+    assert result.trades["quantity"].tolist() == [25]
+    assert result.equity.tolist() == [1000.0, 1000.0, 1100.0, 1100.0]
+
+
+@pytest.mark.parametrize("rule", RULES)
+def test_sized_execution_matches_per_bar_loop(bars, rule):
+    strategy = MovingAverageCrossoverStrategy({"fast_period": 5, "slow_period": 20})
+    signal = strategy.compute_signals(BarArrays.from_frame(bars)).signal
+    close, high, low = (bars[c].to_numpy() for c in ("close", "high", "low"))
+    fractions = rule.entry_fractions(close, high, low)
+    expected_equity, expected_quantities = per_bar_sized(close, signal, fractions, 10000.0, 0.001, 0.0005)
+
+    for mode in ("dense", "sparse"):
+        result = ExecutionCore(10000.0, 0.001, 0.0005, mode=mode, sizing=rule).execute(close, signal, high, low)
+        assert result.trades["quantity"].tolist() == expected_quantities
+        np.testing.assert_allclose(result.equity, expected_equity, rtol=1e-12)
+
+
+@pytest.mark.parametrize("rule", RULES)
+def test_sized_sweep_matches_single_runs(bars, rule):
+    grid = parameter_grid({"fast_period": [5, 10], "slow_period": [20, 60]})
+    signals = MovingAverageCrossoverStrategy.signal_matrix(bars, grid)
+    engine = BacktestEngine(10000.0, 0.001, 0.0005, sizing=rule)
+    sweep = engine.run_sweep(bars, signals, grid)
+    for column, parameters in enumerate(grid):
+        single, _ = engine.run_backtest(bars, MovingAverageCrossoverStrategy(parameters))
+        assert sweep[column].total_trades == single.total_trades
+        for field in ("total_return", "sharpe_ratio", "max_drawdown", "best_trade"):
+            assert getattr(sweep[column], field) == pytest.approx(getattr(single, field), rel=1e-9)
+
+
+def test_sizing_with_stops(bars):
+    """The stop-aware event path sizes its entries the same way"""
+    strategy = MovingAverageCrossoverStrategy({"fast_period": 10, "slow_period": 40})
+    sized = BacktestEngine(10000.0, 0.001, stops=StopRules(stop_loss=0.02), sizing=FixedRisk(0.01, 2.0))
+    sized.run_backtest(bars, strategy)
+    full = BacktestEngine(10000.0, 0.001, stops=StopRules(stop_loss=0.02))
+    full.run_backtest(bars, strategy)
+    assert 0 < sized.trades["quantity"].mean() < full.trades["quantity"].mean()
+
+
+@pytest.mark.parametrize("rule", [ATRVolatilityTarget(target=0.1), FixedRisk(0.01), KellyFraction(lookback=60)])
+def test_portfolio_rules(rule):
+    rng = np.random.default_rng(5)
+    n, m = 500, 4
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0005, 0.015, (n, m)), axis=0))
+    high, low = close * 1.01, close * 0.99
+    signal = rng.choice([-1, 0, 1], size=(n, m), p=[0.02, 0.96, 0.02])
+    result = PortfolioEngine(100000.0, commission=0.001, sizing=rule).run(close, signal, high, low)
+
+    assert (result.cash >= 0).all()
+    assert np.isclose(result.equity[-1], 100000.0 + result.symbol_metrics["pnl"].sum())
+    weights = rule.weights(300, np.array([True, True, False, True]))
+    assert weights[2] == 0 and 0 < weights.sum() <= 1 + 1e-12
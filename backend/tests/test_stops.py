@@ -0,0 +1,158 @@
+"""Tests for intrabar stop-loss, take-profit and trailing-stop execution"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.execution import AbortRules, ExecutionCore, StopRules
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+from app.backtesting.strategies.base_strategy import BarArrays
+
+
+def per_bar_stops(close, high, low, open_, signal, rules, initial_capital, commission, slippage):
+    """Reference per-bar loop checking every bar's high and low against the levels"""
+    equity = np.empty(len(close))
+    exits = []
+    cash, position, entry_price, position_value, peak = initial_capital, 0, 0.0, 0.0, 0.0
+    for i in range(len(close)):
+        if position > 0 and i > entry_bar:
+            level = -np.inf
+            if rules.trailing_stop is not None:
+                level = peak * (1 - rules.trailing_stop)
+            if rules.stop_loss is not None:
+                level = max(level, entry_price * (1 - rules.stop_loss))
+            target = entry_price * (1 + rules.take_profit) if rules.take_profit is not None else np.inf
+            price = None
+            if low[i] <= level:
+                price = min(level, open_[i])
+            elif high[i] >= target:
+                price = max(target, open_[i])
+            if price is not None:
+                exit_price = price * (1 - slippage)
+                net_pnl = (exit_price - entry_price) * position - (position_value + position * exit_price) * commission
+                cash += position * exit_price + net_pnl
+                position = 0
+                exits.append(i)
+            else:
+                peak = max(peak, high[i])
+        if signal[i] == 1 and position == 0:
+            entry_price = close[i] * (1 + slippage)
+            quantity = int(cash / entry_price)
+            if quantity > 0:
+                position, position_value, entry_bar, peak = quantity, quantity * entry_price, i, entry_price
+                cash -= position_value
+        elif signal[i] == -1 and position > 0:
+            exit_price = close[i] * (1 - slippage)
+            net_pnl = (exit_price - entry_price) * position - (position_value + position * exit_price) * commission
+            cash += position * exit_price + net_pnl
+            position = 0
+            exits.append(i)
+        equity[i] = cash + position * close[i] if position > 0 else cash
+    if position > 0:
+        equity[-1] = cash + position * close[-1] * (1 - slippage)
+        exits.append(len(close) - 1)
+    return equity, exits
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(17)
+    n = 5000
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.roll(close, 1) * np.exp(rng.normal(0, 0.004, n))
+    open_[0] = close[0]
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.006, n)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.006, n)))
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": np.full(n, 1e5)},
+                        index=pd.date_range("2010-01-01", periods=n, freq="h"))
+
+
+@pytest.mark.parametrize("rules", [
+    StopRules(stop_loss=0.02),
+    StopRules(take_profit=0.03),
+    StopRules(trailing_stop=0.025),
+    StopRules(stop_loss=0.015, take_profit=0.04, trailing_stop=0.03),
+])
+def test_stops_match_per_bar_loop(bars, rules):
+    strategy = MovingAverageCrossoverStrategy({"fast_period": 10, "slow_period": 40})
+    signal = strategy.compute_signals(BarArrays.from_frame(bars)).signal
+    arrays = [bars[c].to_numpy() for c in ("close", "high", "low", "open")]
+    expected_equity, expected_exits = per_bar_stops(*arrays, signal, rules, 10000.0, 0.001, 0.0005)
+
+    core = ExecutionCore(10000.0, commission=0.001, slippage=0.0005, stops=rules)
+    result = core.execute(arrays[0], signal, high=arrays[1], low=arrays[2], open=arrays[3])
+
+    assert result.trades["exit_index"].tolist() == expected_exits
+    np.testing.assert_allclose(result.equity, expected_equity, rtol=1e-12)
+    plain = ExecutionCore(10000.0, commission=0.001, slippage=0.0005).execute(arrays[0], signal)
+    assert not np.array_equal(result.trades["exit_index"], plain.trades["exit_index"])
+
+
+def test_stop_fill_prices():
+    """Levels fill at the level, or at the open when the bar gaps through them"""
+    close = np.array([100.0, 101.0, 99.0, 103.0, 104.0])
+    high = np.array([100.0, 102.0, 100.0, 106.0, 105.0])
+    low = np.array([100.0, 99.5, 97.5, 98.0, 103.0])
+    open_ = np.array([100.0, 100.5, 96.0, 99.0, 104.0])
+    signal = np.array([1, 0, 0, 0, 0], dtype=np.int8)
+
+    stopped = ExecutionCore(1000.0, commission=0.0, stops=StopRules(stop_loss=0.02)).execute(
+        close, signal, high=high, low=low, open=open_)
+    assert stopped.trades["exit_index"].tolist() == [2]
+    assert stopped.trades["exit_price"].tolist() == [96.0]  # gapped below 98 at the open
+    assert stopped.equity[2:].tolist() == [stopped.state.cash] * 3
+
+    target = ExecutionCore(1000.0, commission=0.0, stops=StopRules(take_profit=0.05)).execute(
+        close, signal, high=high, low=low)
+    assert target.trades["exit_index"].tolist() == [3]
+    assert target.trades["exit_price"][0] == pytest.approx(105.0)
+
+    both = ExecutionCore(1000.0, commission=0.0, stops=StopRules(stop_loss=0.02, take_profit=0.05)).execute(
+        close, signal, high=np.array([100.0, 106.0, 100, 100, 100]), low=np.array([100.0, 97.0, 99, 99, 99]))
+    assert both.trades["exit_price"].tolist() == [98.0]
+
+
+def test_reentry_after_stop():
+    """After a stop the next BUY opens a new position, a SELL while flat is ignored"""
+    close = np.array([100.0, 95.0, 96.0, 97.0, 99.0, 98.0])
+    signal = np.array([1, 0, -1, 1, 0, -1], dtype=np.int8)
+    result = ExecutionCore(1000.0, commission=0.0, stops=StopRules(stop_loss=0.03)).execute(close, signal)
+    assert result.trades["entry_index"].tolist() == [0, 3]
+    assert result.trades["exit_index"].tolist() == [1, 5]
+
+
+def test_engine_stops_and_abort(bars):
+    strategy = MovingAverageCrossoverStrategy({"fast_period": 10, "slow_period": 40})
+    engine = BacktestEngine(10000.0, 0.001, stops=StopRules(trailing_stop=0.02))
+    metrics, details = engine.run_backtest(bars, strategy)
+    plain, _ = BacktestEngine(10000.0, 0.001).run_backtest(bars, strategy)
+    assert metrics.total_trades >= plain.total_trades
+    assert len(details["equity_curve"]) == len(bars)
+    with pytest.raises(ValueError):
+        engine.run_sweep(bars, np.zeros((len(bars), 2)))
+
+    guarded = BacktestEngine(10000.0, 0.001, stops=StopRules(trailing_stop=0.02),
+                             abort=AbortRules(min_trades=10_000, min_trades_by=1000))
+    guarded.run_backtest(bars, strategy)
+    assert guarded.aborted_at == 1000 and len(guarded.equity_curve) == 1001
+    with pytest.raises(ValueError):
+        StopRules(stop_loss=-0.1)
+
+
+@pytest.mark.parametrize("rules", [StopRules(stop_loss=0.01, take_profit=0.01), StopRules(trailing_stop=0.004)])
+def test_batched_hits_match_single_windows(bars, rules):
+    """first_hits over many windows (batched, rescanned or one by one) equals first_hit per window"""
+    rng = np.random.default_rng(4)
+    high, low, open_ = (bars[c].to_numpy() for c in ("high", "low", "open"))
+    start = np.sort(rng.choice(len(bars) - 1, 300, replace=False))
+    stop = np.minimum(start + rng.integers(0, 400, 300), len(bars))
+    for windows in [(start, stop), (start[::2], np.minimum(stop[::2], np.append(start[2::2], len(bars))))]:
+        entry = bars["close"].to_numpy()[windows[0] - 1]
+        found, fills = rules.first_hits(entry, high, low, open_, *windows, horizon=8, max_horizon=64)
+        assert 0 < (found >= 0).sum() < len(found)
+        for row, (a, b) in enumerate(zip(*windows)):
+            expected = rules.first_hit(entry[row], high, low, open_, int(a), int(b))
+            if expected is None:
+                assert found[row] == -1
+            else:
+                assert (found[row], fills[row]) == expected
@@ -3,7 +3,10 @@
 import pytest
 import pandas as pd
 import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
 from app.backtesting.strategies import (
+    BaseStrategy,
+    BarArrays,
     MovingAverageCrossoverStrategy,
     RSIStrategy,
     MACDStrategy
@@ -58,3 +61,166 @@ def test_macd_strategy(sample_data):
     assert 'macd' in signals.columns
     assert 'signal_line' in signals.columns
     assert signals['signal'].isin([0, 1, -1]).all()
+
+
+@pytest.mark.parametrize("strategy, column", [
+    (MovingAverageCrossoverStrategy({"fast_period": 5, "slow_period": 12}), "signal_change"),
+    (RSIStrategy({}), "signal_change"),
+    (MACDStrategy({}), "position"),
+], ids=["ma", "rsi", "macd"])
+def test_generate_signals_keeps_legacy_columns(sample_data, strategy, column):
+    """The DataFrame adapters still return the change-of-signal column each strategy used to emit"""
+    signals = strategy.generate_signals(sample_data)
+    pd.testing.assert_series_equal(signals[column], signals["signal"].diff(), check_names=False)
+
+
+def legacy_crossover_signals(data, fast_period, slow_period):
+    """Reference copy of the original DataFrame implementation"""
+    data = data.copy()
+    data["fast_ma"] = data["close"].rolling(window=fast_period).mean()
+    data["slow_ma"] = data["close"].rolling(window=slow_period).mean()
+    data["signal"] = 0
+    data.loc[data["fast_ma"] > data["slow_ma"], "signal"] = 1
+    data.loc[data["fast_ma"] < data["slow_ma"], "signal"] = -1
+    data["signal_change"] = data["signal"].diff()
+    data.loc[data["signal_change"] == 0, "signal"] = 0
+    return data["signal"].fillna(0).astype(int).to_numpy()
+
+
+def legacy_rsi_signals(data, rsi_period, oversold, overbought):
+    """Reference copy of the original DataFrame implementation"""
+    data = data.copy()
+    delta = data["close"].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
+    data["rsi"] = 100 - (100 / (1 + gain / loss))
+    data["signal"] = 0
+    data.loc[data["rsi"] < oversold, "signal"] = 1
+    data.loc[data["rsi"] > overbought, "signal"] = -1
+    data["signal_change"] = data["signal"].diff()
+    data.loc[data["signal_change"] == 0, "signal"] = 0
+    return data["signal"].fillna(0).astype(int).to_numpy()
+
+
+def legacy_macd_signals(data, fast, slow, signal):
+    """Reference copy of the original DataFrame implementation"""
+    macd = data["close"].ewm(span=fast, adjust=False).mean() - data["close"].ewm(span=slow, adjust=False).mean()
+    signal_line = macd.ewm(span=signal, adjust=False).mean()
+    return np.where(macd > signal_line, 1, np.where(macd < signal_line, -1, 0))
+
+
+@pytest.mark.parametrize("strategy,legacy", [
+    (MovingAverageCrossoverStrategy({"fast_period": 5, "slow_period": 12}), lambda d: legacy_crossover_signals(d, 5, 12)),
+    (RSIStrategy({"rsi_period": 6, "oversold_threshold": 40, "overbought_threshold": 60}),
+     lambda d: legacy_rsi_signals(d, 6, 40, 60)),
+    (MACDStrategy({"fast_period": 4, "slow_period": 9, "signal_period": 3}), lambda d: legacy_macd_signals(d, 4, 9, 3)),
+])
+def test_compute_signals_matches_dataframe_implementation(sample_data, strategy, legacy):
+    """Array signals equal the original DataFrame signals, and the adapter returns them too"""
+    output = strategy.compute_signals(BarArrays.from_frame(sample_data))
+    expected = legacy(sample_data)
+
+    assert output.signal.dtype == np.int8
+    assert np.array_equal(output.signal, expected)
+    assert np.array_equal(strategy.generate_signals(sample_data)["signal"].to_numpy(), expected)
+
+
+def test_bar_arrays_are_read_only_views(sample_data):
+    """Strategies see the caller's memory but cannot write to it"""
+    bars = BarArrays.from_frame(sample_data)
+
+    assert np.shares_memory(bars.close, sample_data["close"].to_numpy())
+    assert bars.high is not None and len(bars) == len(sample_data)
+    with pytest.raises(ValueError):
+        bars.close[0] = 0.0
+
+
+def test_generate_signals_adapter_adds_indicator_columns(sample_data):
+    """The DataFrame contract returns a copy with signal and indicator columns"""
+    original = sample_data.copy()
+    signals = MovingAverageCrossoverStrategy({"fast_period": 5, "slow_period": 12}).generate_signals(sample_data)
+
+    assert {"fast_ma", "slow_ma", "signal"} <= set(signals.columns)
+    pd.testing.assert_frame_equal(sample_data, original)
+
+
+def test_dataframe_only_strategy_runs_through_compute_signals(sample_data):
+    """A strategy implementing only generate_signals still works with the array contract"""
+
+    class DataFrameStrategy(BaseStrategy):
+        def generate_signals(self, data):
+            data["signal"] = np.where(data["close"] > data["open"], 1, -1)
+            return data
+
+    strategy = DataFrameStrategy("frame", {})
+    output = strategy.compute_signals(BarArrays.from_frame(sample_data))
+    expected = np.where(sample_data["close"] > sample_data["open"], 1, -1)
+
+    assert np.array_equal(output.signal, expected)
+    assert "signal" not in sample_data.columns
+
+
+def test_legacy_strategy_reads_extra_columns(sample_data):
+    """run_backtest hands a generate_signals-only strategy the whole frame, not just OHLCV"""
+
+    class SentimentStrategy(BaseStrategy):
+        def generate_signals(self, data):
+            data["signal"] = np.sign(data["sentiment"]).astype(int)
+            return data
+
+    data = sample_data.assign(sentiment=np.where(np.arange(len(sample_data)) % 20 < 10, 1.0, -1.0))
+    engine = BacktestEngine()
+    metrics, details = engine.run_backtest(data, SentimentStrategy("sentiment", {}))
+
+    assert metrics.total_trades > 0
+    assert details["trades"][0]["entry_date"] == data.index[0]
+
+
+def test_legacy_strategy_dropping_rows_keeps_its_dates(sample_data):
+    """Rows dropped by generate_signals never shift signals onto other bars"""
+
+    class WarmupStrategy(BaseStrategy):
+        def generate_signals(self, data):
+            data["ma"] = data["close"].rolling(10).mean()
+            data = data.dropna()
+            data["signal"] = np.where(data["close"] > data["ma"], 1, -1)
+            return data
+
+    strategy = WarmupStrategy("warmup", {})
+    expected = strategy.generate_signals(sample_data.copy())
+    _, details = BacktestEngine().run_backtest(sample_data, strategy)
+    assert details["timestamps"] == expected.index.tolist()
+    first_buy = expected.index[np.argmax(expected["signal"].to_numpy() == 1)]
+    assert details["trades"][0]["entry_date"] == first_buy
+
+    output = strategy.compute_signals(BarArrays.from_frame(sample_data))
+    assert len(output.signal) == len(sample_data)
+    assert not output.signal[:9].any()
+    np.testing.assert_array_equal(output.signal[9:], expected["signal"].to_numpy())
+
+
+def test_strategy_without_signals_raises(sample_data):
+    """A strategy must implement one of the two contracts"""
+
+    class EmptyStrategy(BaseStrategy):
+        pass
+
+    with pytest.raises(NotImplementedError):
+        EmptyStrategy("empty", {}).compute_signals(BarArrays.from_frame(sample_data))
+
+
+def test_backtest_array_contract_matches_dataframe_contract(sample_data):
+    """run_backtest gives the same result through compute_signals and generate_signals"""
+    strategy = MovingAverageCrossoverStrategy({"fast_period": 5, "slow_period": 12})
+
+    class FrameOnly:
+        def generate_signals(self, data):
+            return strategy.generate_signals(data)
+
+    engine = BacktestEngine()
+    metrics, details = engine.run_backtest(sample_data, strategy)
+    expected_metrics, expected_details = BacktestEngine().run_backtest(sample_data, FrameOnly())
+
+    assert metrics == expected_metrics
+    assert details == expected_details
+    assert set(engine.indicators) == {"fast_ma", "slow_ma"}
@@ -0,0 +1,227 @@
+"""Tests for the bar-by-bar streaming engine"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.streaming import StreamingEngine
+import json
+from app.backtesting.indicators.indicators import TechnicalIndicators, VolumeIndicators
+from app.backtesting.indicators.streaming import (
+    StreamingSMA, StreamingEMA, StreamingRSI, StreamingMACD, StreamingBollingerBands,
+    StreamingATR, StreamingStochastic, StreamingADX, StreamingOBV, RollingExtremum, RollingExtrema,
+    StreamingDonchianChannels, StreamingWilliamsR,
+)
+from app.backtesting.strategies import (
+    MovingAverageCrossoverStrategy,
+    RSIStrategy,
+    MACDStrategy,
+    IncrementalMovingAverageCrossover,
+    IncrementalRSI,
+    IncrementalMACD,
+)
+from app.backtesting.strategies.incremental import incremental_version
+
+
+@pytest.fixture
+def market_data():
+    """Random walk OHLCV data"""
+    rng = np.random.default_rng(21)
+    dates = pd.date_range("2021-01-01", periods=1500, freq="h")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 1500)))
+    return pd.DataFrame({
+        "open": close, "high": close * 1.005, "low": close * 0.995,
+        "close": close, "volume": np.full(1500, 1e6),
+    }, index=dates)
+
+
+@pytest.mark.parametrize("indicator,reference", [
+    (lambda: StreamingSMA(20), lambda s: TechnicalIndicators.moving_average(s, 20)),
+    (lambda: StreamingEMA(12), lambda s: TechnicalIndicators.exponential_moving_average(s, 12)),
+    (lambda: StreamingRSI(14), lambda s: TechnicalIndicators.rsi(s, 14)),
+    (lambda: StreamingMACD(12, 26, 9), lambda s: TechnicalIndicators.macd(s, 12, 26, 9)[0]),
+])
+def test_streaming_indicators_match_batch(market_data, indicator, reference):
+    """Streaming indicators reproduce the pandas computations exactly"""
+    streaming = indicator()
+    values = np.array([streaming.update(v) for v in market_data["close"]])
+    assert np.array_equal(values, reference(market_data["close"]).to_numpy(), equal_nan=True)
+
+
+def ohlc_bars(data):
+    """(high, low, close) tuples plus a noisy variant so ranges are not proportional to close"""
+    rng = np.random.default_rng(5)
+    high = data["high"] * (1 + rng.uniform(0, 0.004, len(data)))
+    low = data["low"] * (1 - rng.uniform(0, 0.004, len(data)))
+    return high, low, data["close"]
+
+
+def stochastic_d(high, low, close):
+    return TechnicalIndicators.stochastic(high, low, close)[1]
+
+
+@pytest.mark.parametrize("indicator,output,reference", [
+    (lambda: StreamingBollingerBands(20, 2), lambda ind: ind.upper,
+     lambda h, l, c, v: TechnicalIndicators.bollinger_bands(c, 20, 2)[0]),
+    (lambda: StreamingBollingerBands(20, 2), lambda ind: ind.lower,
+     lambda h, l, c, v: TechnicalIndicators.bollinger_bands(c, 20, 2)[2]),
+    (lambda: StreamingATR(14), None, lambda h, l, c, v: TechnicalIndicators.atr(h, l, c, 14)),
+    (lambda: StreamingStochastic(14, 3, 3), None, lambda h, l, c, v: TechnicalIndicators.stochastic(h, l, c)[0]),
+    (lambda: StreamingStochastic(14, 3, 3), lambda ind: ind.d_value, lambda h, l, c, v: stochastic_d(h, l, c)),
+    (lambda: StreamingADX(14), None, lambda h, l, c, v: TechnicalIndicators.adx(h, l, c, 14)),
+    (lambda: StreamingOBV(), None, lambda h, l, c, v: VolumeIndicators.on_balance_volume(c, v)),
+    (lambda: StreamingDonchianChannels(20), lambda ind: ind.upper,
+     lambda h, l, c, v: TechnicalIndicators.donchian_channels(h, l, 20)[0]),
+    (lambda: StreamingDonchianChannels(20), None, lambda h, l, c, v: TechnicalIndicators.donchian_channels(h, l, 20)[1]),
+    (lambda: StreamingWilliamsR(14), None, lambda h, l, c, v: TechnicalIndicators.williams_r(h, l, c, 14)),
+])
+def test_streaming_ohlc_indicators_match_batch(market_data, indicator, output, reference):
+    """OHLC and volume indicators agree with the batch versions to 1e-9 relative"""
+    high, low, close = ohlc_bars(market_data)
+    volume = pd.Series(np.random.default_rng(6).uniform(1e5, 1e6, len(close)), index=close.index)
+    streaming = indicator()
+    values = []
+    for h, l, c, v in zip(high, low, close, volume):
+        if isinstance(streaming, StreamingBollingerBands):
+            streaming.update(c)
+        elif isinstance(streaming, StreamingOBV):
+            streaming.update(c, v)
+        elif isinstance(streaming, StreamingDonchianChannels):
+            streaming.update(h, l)
+        else:
+            streaming.update(h, l, c)
+        values.append(output(streaming) if output else streaming.value)
+
+    expected = reference(high, low, close, volume).to_numpy()
+    np.testing.assert_allclose(values, expected, rtol=1e-9, atol=1e-12)
+    assert np.array_equal(np.isnan(values), np.isnan(expected))
+
+
+@pytest.mark.parametrize("maximum", [False, True])
+def test_rolling_extremum_matches_pandas(maximum):
+    """Monotonic deque extrema equal pandas rolling min/max, NaN included"""
+    values = np.random.default_rng(9).normal(size=400)
+    values[[50, 51, 200]] = np.nan
+    extremum = RollingExtremum(7, maximum=maximum)
+    result = np.array([extremum.update(v) for v in values])
+    rolling = pd.Series(values).rolling(7)
+    expected = (rolling.max() if maximum else rolling.min()).to_numpy()
+    assert np.array_equal(result, expected, equal_nan=True)
+
+
+@pytest.mark.parametrize("maximum", [False, True])
+def test_rolling_extrema_serves_every_window_from_one_deque(maximum):
+    """Each window of RollingExtrema equals its own pandas rolling min/max, and survives a checkpoint"""
+    values = np.random.default_rng(10).normal(size=400)
+    values[[50, 51, 200]] = np.nan
+    windows = [3, 7, 30, 7]
+    extrema = RollingExtrema(windows, maximum=maximum)
+    result = [list(extrema.update(v)) for v in values[:250]]
+    resumed = RollingExtrema(windows, maximum=maximum)
+    resumed.set_state(json.loads(json.dumps(extrema.get_state())))
+    result += [list(resumed.update(v)) for v in values[250:]]
+
+    result = np.array(result)
+    for column, window in enumerate(windows):
+        rolling = pd.Series(values).rolling(window)
+        expected = (rolling.max() if maximum else rolling.min()).to_numpy()
+        assert np.array_equal(result[:, column], expected, equal_nan=True)
+    assert len(resumed.candidates) <= max(windows)
+
+
+@pytest.mark.parametrize("factory", [
+    lambda: StreamingRSI(14), lambda: StreamingMACD(), lambda: StreamingBollingerBands(),
+    lambda: StreamingStochastic(), lambda: StreamingADX(), lambda: StreamingOBV(), lambda: StreamingWilliamsR(),
+])
+def test_indicator_checkpoint_resumes_exactly(market_data, factory):
+    """A JSON round-tripped snapshot continues with the same values as the uninterrupted indicator"""
+    high, low, close = ohlc_bars(market_data)
+    bars = list(zip(high, low, close))
+
+    def feed(indicator, chunk):
+        out = []
+        for h, l, c in chunk:
+            if isinstance(indicator, (StreamingRSI, StreamingMACD, StreamingBollingerBands)):
+                out.append(indicator.update(c))
+            elif isinstance(indicator, StreamingOBV):
+                out.append(indicator.update(c, h - l))
+            else:
+                out.append(indicator.update(h, l, c))
+        return out
+
+    uninterrupted = factory()
+    expected = feed(uninterrupted, bars)
+
+    first = factory()
+    feed(first, bars[:700])
+    snapshot = json.loads(json.dumps(first.get_state()))
+    resumed = factory()
+    resumed.set_state(snapshot)
+    assert np.array_equal(feed(resumed, bars[700:]), expected[700:], equal_nan=True)
+
+
+@pytest.mark.parametrize("batch_class,incremental_class,params", [
+    (MovingAverageCrossoverStrategy, IncrementalMovingAverageCrossover, {"fast_period": 5, "slow_period": 20}),
+    (RSIStrategy, IncrementalRSI, {"rsi_period": 14, "oversold_threshold": 35, "overbought_threshold": 65}),
+    (MACDStrategy, IncrementalMACD, {}),
+])
+def test_incremental_signals_match_batch(market_data, batch_class, incremental_class, params):
+    """Incremental strategies emit the batch signal column bar for bar"""
+    expected = batch_class(params).generate_signals(market_data)["signal"].to_numpy()
+    strategy = incremental_class(params)
+    signals = [strategy.on_bar({"close": close}) for close in market_data["close"]]
+    assert np.array_equal(signals, expected)
+
+
+@pytest.mark.parametrize("strategy", [
+    MovingAverageCrossoverStrategy({"fast_period": 5, "slow_period": 20}),
+    RSIStrategy({"rsi_period": 14, "oversold_threshold": 35, "overbought_threshold": 65}),
+    MACDStrategy({}),
+])
+def test_replay_matches_batch_engine(market_data, strategy):
+    """Replaying a frame gives the batch engine's trades, equity and metrics"""
+    batch = BacktestEngine(initial_capital=10000.0, commission=0.001, slippage=0.0005)
+    signals_data = strategy.generate_signals(market_data)
+    equity = batch._execute_trades(signals_data)
+    expected_metrics = batch._calculate_metrics(equity, signals_data)
+
+    engine = StreamingEngine(incremental_version(strategy), initial_capital=10000.0, commission=0.001, slippage=0.0005)
+    metrics, details = engine.replay(market_data)
+
+    assert details["trades"] == batch.trades.to_dicts(signals_data.index)
+    assert np.array_equal(details["equity_curve"], equity)
+    for name, value in vars(expected_metrics).items():
+        assert getattr(metrics, name) == pytest.approx(value, rel=1e-9, abs=1e-9), name
+
+
+def test_on_bar_tracks_position_and_cash(market_data):
+    """Position, cash and equity are available after every bar"""
+    engine = StreamingEngine(IncrementalMovingAverageCrossover({"fast_period": 2, "slow_period": 3}), commission=0.0)
+    for timestamp, close in market_data["close"].iloc[:50].items():
+        engine.on_bar({"close": close}, timestamp)
+        if engine.state.position > 0:
+            assert engine.equity == engine.state.cash + engine.state.position * close
+        else:
+            assert engine.equity == engine.state.cash
+    assert engine.bar_count == 50
+
+
+def test_incremental_version_rejects_unknown_strategy():
+    """Only the built-in strategies have incremental counterparts"""
+    with pytest.raises(ValueError):
+        incremental_version(object())
+
+
+def test_incremental_strategy_validates_parameters():
+    """Invalid parameters fail at construction"""
+    with pytest.raises(ValueError):
+        IncrementalMovingAverageCrossover({"fast_period": 20, "slow_period": 10})
+
+
+def test_trend_filter_is_not_streamed(market_data):
+    """A trend-filtered crossover has no incremental version rather than a silently unfiltered one"""
+    strategy = MovingAverageCrossoverStrategy({"fast_period": 5, "slow_period": 20, "trend_timeframe": "D"})
+    with pytest.raises(ValueError, match="trend_timeframe"):
+        incremental_version(strategy)
+    with pytest.raises(ValueError, match="trend_timeframe"):
+        IncrementalMovingAverageCrossover(strategy.parameters)
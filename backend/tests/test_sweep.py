@@ -0,0 +1,119 @@
+"""Tests for the batched parameter sweep"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine, BacktestMetrics
+from app.backtesting.engine.sweep import SweepCore, SweepResult, parameter_grid
+from app.backtesting.strategies import MovingAverageCrossoverStrategy, RSIStrategy, MACDStrategy
+
+
+@pytest.fixture
+def market_data():
+    """Random walk OHLCV data"""
+    rng = np.random.default_rng(7)
+    dates = pd.date_range("2022-01-01", periods=400, freq="D")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))
+    return pd.DataFrame({
+        "open": close, "high": close * 1.01, "low": close * 0.99,
+        "close": close, "volume": np.full(400, 1e6),
+    }, index=dates)
+
+
+def single_run_metrics(data, signal, **engine_kwargs):
+    """Metrics from the single-run engine for one signal column"""
+    engine = BacktestEngine(**engine_kwargs)
+    signals_data = data.assign(signal=signal)
+    equity = engine._execute_trades(signals_data)
+    return engine._calculate_metrics(equity, signals_data)
+
+
+def assert_metrics_match(actual: BacktestMetrics, expected: BacktestMetrics):
+    """Compare metrics field by field"""
+    for name, value in vars(expected).items():
+        assert getattr(actual, name) == pytest.approx(value, rel=1e-9, abs=1e-9), name
+
+
+@pytest.mark.parametrize("engine_kwargs", [
+    {"initial_capital": 10000.0, "commission": 0.001},
+    {"initial_capital": 10000.0, "commission": 0.0, "slippage": 0.001},
+    {"initial_capital": 150.0, "commission": 0.001},
+])
+def test_sweep_matches_single_runs(market_data, engine_kwargs):
+    """Every sweep column equals an independent engine run"""
+    rng = np.random.default_rng(11)
+    signals = rng.choice([-1, 0, 1], size=(len(market_data), 25), p=[0.1, 0.8, 0.1])
+    signals[:, 0] = 0
+    signals[:, 1] = 1
+
+    result = BacktestEngine(**engine_kwargs).run_sweep(market_data, signals)
+
+    assert len(result) == 25
+    for column in range(25):
+        expected = single_run_metrics(market_data, signals[:, column], **engine_kwargs)
+        assert_metrics_match(result[column], expected)
+
+
+def test_sweep_blocks_do_not_change_results(market_data):
+    """Column blocking is invisible in the output"""
+    rng = np.random.default_rng(3)
+    signals = rng.choice([-1, 0, 1], size=(len(market_data), 9), p=[0.2, 0.6, 0.2])
+
+    whole = SweepCore().run(market_data["close"].to_numpy(), signals.astype(np.int8))
+    blocked = SweepCore(max_cells=len(market_data) * 2).run(market_data["close"].to_numpy(), signals.astype(np.int8))
+
+    for name in whole:
+        assert np.allclose(whole[name], blocked[name], rtol=1e-12), name
+
+
+def test_strategy_signal_matrix(market_data):
+    """signal_matrix gives the signals of every parameter set run on its own"""
+    grid = parameter_grid({"fast_period": [5, 10], "slow_period": [20, 30]})
+    matrix = MovingAverageCrossoverStrategy.signal_matrix(market_data, grid)
+
+    assert matrix.shape == (len(market_data), 4)
+    assert matrix.dtype == np.int8
+    for column, params in enumerate(grid):
+        expected = MovingAverageCrossoverStrategy(params).generate_signals(market_data)["signal"]
+        assert np.array_equal(matrix[:, column], expected.to_numpy())
+
+
+@pytest.mark.parametrize("strategy_class,grid", [
+    (RSIStrategy, {"rsi_period": [7, 14], "oversold_threshold": [30, 40], "overbought_threshold": [60]}),
+    (MACDStrategy, {"fast_period": [8, 12], "slow_period": [26], "signal_period": [5, 9]}),
+])
+def test_batched_signal_matrix_matches_compute_signals(market_data, strategy_class, grid):
+    """Batched signal matrices equal running each parameter set on its own"""
+    parameter_sets = parameter_grid(grid)
+    matrix = strategy_class.signal_matrix(market_data, parameter_sets)
+    for column, params in enumerate(parameter_sets):
+        expected = strategy_class(params).generate_signals(market_data)["signal"]
+        assert np.array_equal(matrix[:, column], expected.to_numpy())
+
+
+def test_sweep_result_table(market_data):
+    """Sweep results expose a parameter/metric table and the best column"""
+    grid = parameter_grid({"fast_period": [5, 10], "slow_period": [20, 40]})
+    matrix = MovingAverageCrossoverStrategy.signal_matrix(market_data, grid)
+    result = BacktestEngine().run_sweep(market_data, matrix, parameters=grid)
+
+    frame = result.to_frame()
+    assert list(frame["fast_period"]) == [5, 5, 10, 10]
+    assert "sharpe_ratio" in frame.columns
+    best = result.best("roi")
+    assert result.metrics["roi"][best] == result.metrics["roi"].max()
+
+    joined = SweepResult.concat([result, result])
+    assert len(joined) == 8
+    assert joined.parameters == grid + grid
+
+
+def test_sweep_rejects_mismatched_parameters(market_data):
+    """parameters must line up with signal columns"""
+    with pytest.raises(ValueError):
+        BacktestEngine().run_sweep(market_data, np.zeros((len(market_data), 2)), parameters=[{}])
+
+
+def test_parameter_grid():
+    """Grid expansion is a cartesian product in key order"""
+    assert parameter_grid({"a": [1, 2], "b": [3]}) == [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
@@ -0,0 +1,121 @@
+"""Tests for resampled higher-timeframe views and their alignment onto base bars"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.indicators.cache import IndicatorCache
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+from app.backtesting.strategies.base_strategy import BarArrays
+from app.backtesting.strategies.timeframes import TimeframeCache, resample_bars, timeframe_cache
+
+AGGREGATES = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+@pytest.fixture
+def hourly():
+    """Hourly bars over trading hours only, so some periods are short and weekends are missing"""
+    rng = np.random.default_rng(24)
+    index = pd.date_range("2021-01-04 09:00", periods=6000, freq="h")
+    index = index[(index.hour >= 9) & (index.hour < 17) & (index.dayofweek < 5)]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, len(index))))
+    return pd.DataFrame({"open": close * (1 + rng.normal(0, 0.001, len(index))),
+                         "high": close * 1.004, "low": close * 0.996, "close": close,
+                         "volume": rng.uniform(1e3, 1e4, len(index))}, index=index)
+
+
+@pytest.mark.parametrize("rule, pandas_rule", [("4h", "4h"), ("D", "D"), ("M", "MS")])
+def test_resample_matches_pandas(hourly, rule, pandas_rule):
+    view = resample_bars(BarArrays.from_frame(hourly), rule)
+    expected = hourly.resample(pandas_rule).agg(AGGREGATES).dropna()
+    assert view.bars.index.equals(expected.index)
+    for name in AGGREGATES:
+        np.testing.assert_allclose(getattr(view.bars, name), expected[name].to_numpy(), rtol=1e-12)
+
+
+def test_alignment_has_no_lookahead(hourly):
+    bars = BarArrays.from_frame(hourly)
+    view = resample_bars(bars, "D")
+    aligned = view.align(view.bars.close)
+
+    # Same as shifting the daily closes onto the last hourly bar of each day and forward filling
+    daily = hourly["close"].groupby(hourly.index.normalize()).transform("last")
+    last_of_day = hourly.index.normalize() != np.append(hourly.index.normalize()[1:], pd.NaT)
+    expected = daily.where(last_of_day).ffill().to_numpy()
+    np.testing.assert_array_equal(aligned, expected)
+    assert np.isnan(aligned[:7]).all() and not np.isnan(aligned[7])
+
+    # Changing bars after bar i never changes what bar i sees
+    i = 1000
+    changed = hourly.copy()
+    changed.iloc[i + 1:] *= 1.5
+    moved = resample_bars(BarArrays.from_frame(changed), "D")
+    np.testing.assert_array_equal(moved.align(moved.bars.close)[:i + 1], aligned[:i + 1])
+    np.testing.assert_array_equal(moved.align(moved.bars.high)[:i + 1], view.align(view.bars.high)[:i + 1])
+
+    signal = view.align(np.ones(len(view), dtype=np.int8), fill=0)
+    assert signal.dtype == np.int8 and signal[:7].tolist() == [0] * 7
+    with pytest.raises(ValueError):
+        view.align(np.ones(3))
+
+
+def test_timeframe_cache(hourly):
+    cache = TimeframeCache(IndicatorCache())
+    bars = BarArrays.from_frame(hourly)
+    first = cache.resample(bars, "D")
+    assert cache.resample(BarArrays.from_frame(hourly.copy()), "D") is first
+    assert cache.resample(bars, "D", symbol="XYZ") is not first
+    assert cache.resample(bars, "D", symbol="XYZ") is cache.resample(bars, "D", symbol="XYZ")
+    # Another range of the same symbol is another entry
+    assert len(cache.resample(BarArrays.from_frame(hourly.iloc[:500]), "D", symbol="XYZ")) < len(first)
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (3, 3, 3)
+    with pytest.raises(ValueError):
+        resample_bars(BarArrays(close=np.ones(3), index=pd.RangeIndex(3)), "D")
+
+
+def test_timeframe_cache_sees_corrected_data(hourly):
+    """Re-adjusted prices of a symbol over the same range are resampled again, not served stale"""
+    cache = TimeframeCache(IndicatorCache())
+    first = cache.resample(BarArrays.from_frame(hourly), "D", symbol="XYZ")
+    corrected = hourly.copy()
+    corrected.iloc[103, corrected.columns.get_loc("close")] *= 1.1  # the last hour of a day
+    second = cache.resample(BarArrays.from_frame(corrected), "D", symbol="XYZ")
+    assert second is not first
+    assert not np.array_equal(second.bars.close, first.bars.close)
+
+
+def test_trend_filter_matches_pandas_reference(hourly):
+    parameters = {"fast_period": 5, "slow_period": 20, "trend_timeframe": "D", "trend_period": 10}
+    strategy = MovingAverageCrossoverStrategy(parameters)
+    assert strategy.timeframes() == ("D",) and strategy.warmup_bars() is None
+    output = strategy.compute_signals(BarArrays.from_frame(hourly))
+
+    # Reference: resample, shift to the end of each day, forward fill with reindex
+    daily = hourly["close"].resample("D").last().dropna()
+    trend_ma = daily.rolling(10).mean()
+    day_end = hourly.groupby(hourly.index.normalize()).tail(1).index
+    known = pd.Series((daily > trend_ma).to_numpy(), index=day_end).reindex(hourly.index).ffill()
+    uptrend = known.fillna(False).astype(bool).to_numpy()
+    plain = MovingAverageCrossoverStrategy({"fast_period": 5, "slow_period": 20}).compute_signals(
+        BarArrays.from_frame(hourly)).signal
+    expected = np.where((plain == 1) & ~uptrend, 0, plain)
+    np.testing.assert_array_equal(output.signal, expected)
+    assert (plain == 1).sum() > (output.signal == 1).sum() > 0
+    assert (output.signal == -1).sum() == (plain == -1).sum()
+
+
+def test_engine_builds_declared_views_once(hourly):
+    timeframe_cache.clear()
+    timeframe_cache.cache.reset_stats()
+    grid = [{"fast_period": f, "slow_period": 30, "trend_timeframe": tf, "trend_period": 5}
+            for f in (5, 10) for tf in ("D", "W")]
+    grid.append({"fast_period": 5, "slow_period": 30})
+    matrix = MovingAverageCrossoverStrategy.signal_matrix(hourly, grid)
+    for column, parameters in enumerate(grid):
+        strategy = MovingAverageCrossoverStrategy(parameters)
+        engine = BacktestEngine(10000.0, 0.001)
+        engine.run_backtest(hourly, strategy, symbol="XYZ")
+        np.testing.assert_array_equal(matrix[:, column], strategy.compute_signals(BarArrays.from_frame(hourly)).signal)
+    # One build per timeframe for the fingerprint key and one per timeframe for the symbol key
+    assert timeframe_cache.stats().misses == 4
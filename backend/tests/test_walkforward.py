@@ -0,0 +1,94 @@
+"""Tests for the walk-forward optimization runner"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from app.backtesting.engine.backtest import BacktestEngine
+from app.backtesting.engine.execution import ExecutionCore
+from app.backtesting.engine.sweep import parameter_grid
+from app.backtesting.engine.walkforward import WalkForwardRunner
+from app.backtesting.strategies import MovingAverageCrossoverStrategy
+
+
+@pytest.fixture
+def market_data():
+    """Random walk OHLCV data"""
+    rng = np.random.default_rng(12)
+    n = 1200
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, n)))
+    return pd.DataFrame({
+        "open": close, "high": close * 1.01, "low": close * 0.99,
+        "close": close, "volume": np.full(n, 1e6),
+    }, index=pd.date_range("2020-01-01", periods=n, freq="D"))
+
+
+@pytest.fixture
+def grid():
+    return parameter_grid({"fast_period": [3, 5, 10], "slow_period": [20, 40]})
+
+
+def test_fold_layout():
+    rolling = WalkForwardRunner(train_size=100, test_size=30).folds(250)
+    assert rolling == [((0, 100), (100, 130)), ((30, 130), (130, 160)), ((60, 160), (160, 190)),
+                       ((90, 190), (190, 220)), ((120, 220), (220, 250))]
+    anchored = WalkForwardRunner(train_size=100, test_size=60, anchored=True).folds(250)
+    assert anchored == [((0, 100), (100, 160)), ((0, 160), (160, 220)), ((0, 220), (220, 250))]
+    assert WalkForwardRunner(train_size=100, test_size=30).folds(100) == []
+
+
+def test_folds_match_independent_backtests(market_data, grid):
+    """Each fold picks the in-sample winner and runs it out of sample on the capital carried forward"""
+    runner = WalkForwardRunner(train_size=300, test_size=150, commission=0.001, metric="roi")
+    result = runner.run(market_data, MovingAverageCrossoverStrategy, grid)
+    signals = MovingAverageCrossoverStrategy.signal_matrix(market_data, grid)
+    close = market_data["close"].to_numpy()
+
+    assert len(result.folds) == 6
+    capital = 10000.0
+    for fold in result.folds:
+        start, stop = fold.train
+        in_sample = BacktestEngine(10000.0, 0.001).run_sweep(market_data.iloc[start:stop], signals[start:stop])
+        assert fold.best == in_sample.best("roi")
+        assert fold.parameters == grid[fold.best]
+        assert fold.in_sample == in_sample[fold.best]
+
+        start, stop = fold.test
+        expected = ExecutionCore(capital, 0.001).execute(close[start:stop], signals[start:stop, fold.best])
+        assert np.array_equal(result.equity[start - 300:stop - 300], expected.equity)
+        capital = expected.equity[-1]
+
+    assert len(result.equity) == len(result.index) == 900
+    assert result.index[0] == market_data.index[300]
+    assert result.metrics.roi == pytest.approx((capital - 10000.0) / 100)
+    assert result.trades["entry_index"].min() >= 300
+    assert len(result.trades) == sum(fold.out_of_sample.total_trades for fold in result.folds)
+
+
+def test_pool_matches_single_process(market_data, grid):
+    single = WalkForwardRunner(train_size=400, test_size=200, anchored=True).run(
+        market_data, MovingAverageCrossoverStrategy, grid)
+    pooled = WalkForwardRunner(train_size=400, test_size=200, anchored=True, max_workers=2).run(
+        market_data, MovingAverageCrossoverStrategy, grid)
+
+    assert [fold.best for fold in pooled.folds] == [fold.best for fold in single.folds]
+    assert np.array_equal(pooled.equity, single.equity)
+    assert pooled.metrics == single.metrics
+
+
+def test_fold_table(market_data, grid):
+    result = WalkForwardRunner(train_size=500, test_size=350, metric="max_drawdown").run(
+        market_data, MovingAverageCrossoverStrategy, grid)
+    table = result.to_frame()
+    assert list(table.columns[:5]) == ["train_start", "test_start", "test_stop", "fast_period", "slow_period"]
+    assert len(table) == 2
+    assert table["test_start"].iloc[0] == market_data.index[500]
+    assert table["test_stop"].iloc[-1] == market_data.index[-1]
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        WalkForwardRunner(train_size=1, test_size=10)
+    with pytest.raises(ValueError):
+        WalkForwardRunner(train_size=100, test_size=10, metric="alpha")
+    with pytest.raises(ValueError):
+        WalkForwardRunner(train_size=10, test_size=10).run_signals(np.ones(50), np.zeros((40, 2), dtype=np.int8))